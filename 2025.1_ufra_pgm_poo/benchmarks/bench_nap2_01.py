@@ -0,0 +1,99 @@
+# bench_nap2_01.py — nap2/01 (listas globais em app.py + servicos.py + repositorio.py)
+#
+# Uso:  python benchmarks/bench_nap2_01.py --items 100000 [--budget 30] [--out r.json]
+# O app não carrega arquivo ao abrir (as listas começam no código), então o
+# catálogo sintético é montado direto nas listas globais de app.py; salvar e
+# carregar são medidos com repositorio.salvar/carregar. No fim, o próprio
+# main() roda com cliques simulados (menu -> gerenciar -> emprestar/devolver).
+import shutil
+
+from harness import Bench
+
+bench = Bench.from_cli("nap2/01", "nap2/01")
+
+with bench:
+    background = bench.app_dir / "fundo1.png"
+    if background.exists():  # app.py carrega o fundo relativo à pasta atual
+        shutil.copy(background, "fundo1.png")
+    import app
+    import repositorio
+    from dominio import Aluno, Dvd, Livro, Professor, Revista, Visitante
+    from servicos import processar_devolucao, processar_emprestimo, relatorio_disponiveis, relatorio_emprestados
+
+    def build():
+        rnd = bench.rnd
+        usuarios = [rnd.choice([Aluno, Professor, Visitante])(f"Usuario {u:05d}") for u in range(bench.users)]
+        itens = []
+        for i in range(bench.items):
+            kind = rnd.choice([Livro, Revista, Dvd])
+            arg = {Livro: f"Autor {i % 997}", Revista: f"Ed. {i % 120}", Dvd: 60 + i % 120}[kind]
+            it = kind(f"{kind.__name__} {i:07d}", arg)
+            if rnd.random() < 0.05:
+                u = rnd.choice(usuarios)
+                if u.pode_emprestar():
+                    it.atualizar_status("emprestado")
+                    u.add_emprestado()
+            itens.append(it)
+        app.usuarios[:], app.itens[:], app.transacoes[:] = usuarios, itens, []
+
+    bench.once("build (setup)", build, kind="setup")
+    itens, usuarios, transacoes = app.itens, app.usuarios, app.transacoes
+
+    # ----- Quadros -----
+    bench.frames("frame:menu", app.desenhar_menu)
+    bench.frames("frame:gerenciar", app.desenhar_ger)
+    bench.frames("frame:cadastro_item", app.desenhar_item)
+
+    # ----- Empréstimo / devolução (serviços; app.py guarda tudo em Repositorio, busca por id) -----
+    available = [it for it in itens if it.status == "disponivel"]
+    bench.rnd.shuffle(available)
+    available = available[:bench.ops]
+    pairs = []
+
+    def next_pair(k):
+        # próximo usuário que ainda pode emprestar (os limites são por tipo)
+        for off in range(len(usuarios)):
+            u = usuarios[(k + off) % len(usuarios)]
+            if u.pode_emprestar():
+                pairs.append((u, available[k]))
+                return pairs[-1]
+        raise StopIteration  # todos os usuários atingiram o limite
+
+    def borrow(u, it):
+        processar_emprestimo(usuarios, itens, transacoes, u.id, it.id)
+        if it.status != "emprestado":
+            raise RuntimeError("empréstimo recusado")
+
+    def give_back(u, it):
+        processar_devolucao(usuarios, itens, transacoes, u.id, it.id)
+        if it.status != "disponivel":
+            raise RuntimeError("devolução recusada")
+
+    done = bench.repeat("borrow", borrow, n=len(available), args_for=next_pair)
+    bench.repeat("return", give_back, n=len(done), args_for=lambda k: pairs[k])
+    bench.repeat("report:disponiveis", lambda: relatorio_disponiveis(itens), n=20, kind="query")
+    bench.repeat("report:emprestados", lambda: relatorio_emprestados(itens), n=20, kind="query")
+
+    # ----- Gravação -----
+    bench.once("salvar", lambda: repositorio.salvar("biblio.json", itens, usuarios, transacoes))
+    bench.once("carregar", lambda: repositorio.carregar("biblio.json"))
+
+    # ----- Loop real do app com cliques -----
+    import pygame
+
+    def click(pos):
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos))
+
+    user_row = (app.area_users.x + 20, app.area_users.y + 38 + 5)
+    item_row = (app.area_itens.x + 20, app.area_itens.y + 38 + 5)
+    steps = [app.b_menu_ger.rect.center, user_row, item_row]
+
+    def script(frame):
+        if frame <= len(steps):
+            click(steps[frame - 1])
+        else:
+            click(app.b_emp.rect.center if frame % 2 else app.b_dev.rect.center)
+
+    bench.scripted_loop("loop:main (gerenciar)", app.main, script)
+
+bench.finish()
@@ -0,0 +1,113 @@
+# bench_nap2_02.py — nap2/02 (BiblioApp: diário + catálogo indexado + exportação em segundo plano)
+#
+# Uso:  python benchmarks/bench_nap2_02.py --items 100000 [--budget 30] [--out r.json]
+import json
+import os
+
+from harness import Bench
+
+bench = Bench.from_cli("nap2/02", "nap2/02")
+
+
+def write_data(n_items, n_users, seed):
+    from bench_catalog import synthetic_data  # mesmo gerador do bench_catalog.py da variante
+    os.makedirs("data")
+    with open(os.path.join("data", "library_data.json"), "w", encoding="utf-8") as f:
+        json.dump(synthetic_data(n_items, n_users=n_users, seed=seed), f)
+
+
+with bench:
+    bench.prepare(write_data, bench.items, bench.users, bench.seed)
+    from storage.export import FORMATS
+    from ui.app import BiblioApp
+
+    app = bench.once("startup", BiblioApp)
+    # o histórico é montado numa thread a partir do startup; aqui, quanto falta até ficar pronto
+    bench.once("history:pronto (thread)", app._history_thread.join)
+    items, users = app.data["items"], app.data["users"]
+
+    # ----- Quadros -----
+    def screen(name, **state):
+        def draw():
+            app.current_screen = name
+            for k, v in state.items():
+                setattr(app, k, v)
+            {"dashboard": app.render_dashboard, "shelf": app.render_shelf, "loans": app.render_loans,
+             "reports": app.render_reports, "manage_users": app.render_manage_users}[name]()
+        return draw
+
+    last_row = max(0, (len(items) + app.shelf_grid.cols - 1) // app.shelf_grid.cols - 3)
+    bench.frames("frame:dashboard", screen("dashboard"))
+    bench.frames("frame:render_shelf", screen("shelf", scroll_offset=0))
+    bench.frames("frame:render_shelf (fim)", screen("shelf", scroll_offset=-last_row * app.shelf_grid.pitch_y))
+    bench.frames("frame:loans", screen("loans", scroll_offset=0))
+    bench.frames("frame:manage_users", screen("manage_users"))
+    bench.frames("frame:reports", screen("reports", rep_mode="items", rep_filter_type="All", rep_filter_status="All"))
+    bench.frames("frame:reports (Book, borrowed)", screen("reports", rep_filter_type="Book", rep_filter_status="borrowed"))
+    bench.frames("frame:reports (por usuário)", screen("reports", rep_mode="by_user"))
+    app.rep_mode, app.rep_filter_type, app.rep_filter_status = "items", "All", "All"
+
+    # ----- Empréstimo / devolução -----
+    available = [i for i, it in enumerate(items) if it.get("status", "available") == "available"]
+    bench.rnd.shuffle(available)
+    pairs = []
+    slots = [u for u, user in enumerate(users) for _ in range(user.get("limit", 0))]
+    for u, i in zip(slots, available[:bench.ops]):
+        pairs.append((u, i))
+
+    def select(u, i):
+        app.loan_selected_user, app.loan_selected_item = u, i
+
+    def borrow(u, i):
+        select(u, i)
+        if not app._loan_do_borrow():
+            raise RuntimeError(app.loan_message)
+
+    def give_back(u, i):
+        select(u, i)
+        if not app._loan_do_return():
+            raise RuntimeError(app.loan_message)
+
+    done = bench.repeat("borrow", borrow, n=len(pairs), args_for=lambda k: pairs[k])
+    bench.repeat("return", give_back, n=len(done), args_for=lambda k: pairs[k])
+    bench.once("journal_flush", lambda: app.store._writer.flush())
+
+    def rebuild_history():
+        app.history.rebuild(app.txlog.query())   # o que a thread de carga faz, aqui sem concorrência
+        return app.history
+
+    bench.once("history:rebuild", rebuild_history)
+    bench.frames("frame:reports (por usuário, histórico)", screen("reports", rep_mode="by_user"))
+    app.rep_mode = "items"
+    bench.once("load (snapshot + diário)", app.store.load)
+
+    # ----- Relatórios e exportação -----
+    def filtered():
+        app.rep_filter_type, app.rep_filter_status = "Book", "available"
+        return app._rep_filtered_items()
+
+    bench.repeat("report:filtro", filtered, n=20, kind="query")
+    bench.repeat("report:por usuário", app._rep_group_by_user, n=20, kind="query")
+    app.rep_filter_type, app.rep_filter_status = "All", "All"
+
+    def export(fmt, by_user=False):
+        def run():
+            app._rep_start_export(fmt, by_user=by_user)
+            job = app.rep_job
+            job.wait()
+            if job.state != "done":
+                raise RuntimeError(f"exportação {fmt}: {job.state} {job.error}")
+            app._rep_poll_export()
+            return os.path.getsize(job.path)
+        return run
+
+    for fmt in FORMATS:
+        bench.once(f"export:{fmt}", export(fmt))
+    bench.once("export:json (por usuário)", export("json", by_user=True))
+    bench.once("txlog:query", lambda: sum(1 for _ in app.txlog.query()), kind="query")
+
+    # ----- Gravação -----
+    bench.once("save_data", lambda: app.save_data(app.data))
+    bench.once("load (snapshot)", app.store.load)
+
+bench.finish()
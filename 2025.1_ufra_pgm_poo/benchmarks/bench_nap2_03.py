@@ -0,0 +1,147 @@
+# bench_nap2_03.py — nap2/03 (GerenciadorBiblioteca + AppBiblioManager)
+#
+# Uso:  python benchmarks/bench_nap2_03.py --items 100000 [--budget 30] [--out r.json]
+# Empréstimo e devolução passam pelo formulário (busca por nome), como na interface.
+import json
+import random
+
+from harness import Bench
+
+bench = Bench.from_cli("nap2/03", "nap2/03")
+
+
+def write_data(n_items, n_users, seed):
+    rnd = random.Random(seed)
+    next_id = 1
+    users = []
+    for u in range(n_users):
+        typ = rnd.choice(["Estudante", "Professor", "Visitante"])
+        d = {"tipo": typ, "id": next_id, "nome": f"Usuario {u:05d}", "email": f"u{u}@ufra.edu.br",
+             "itens_emprestados": []}
+        d.update({"Estudante": {"id_estudante": f"EST{u:05d}"}, "Professor": {"departamento": f"Depto {u % 12}"},
+                  "Visitante": {"telefone": f"(91) 9{u:04d}-0000"}}[typ])
+        users.append(d)
+        next_id += 1
+    items = []
+    for i in range(n_items):
+        typ = rnd.choice(["Livro", "Revista", "DVD"])
+        d = {"tipo": typ, "id": next_id, "titulo": f"{typ} {i:07d}", "status": "disponivel"}
+        if typ == "Livro":
+            d.update(autor=f"Autor {i % 997}", isbn=str(9780000000000 + i), ano=1950 + i % 75)
+        elif typ == "Revista":
+            d.update(edicao=f"Ed. {i % 120}", data="2025-01")
+        else:
+            d.update(diretor=f"Diretor {i % 311}", duracao=60 + i % 120)
+        if rnd.random() < 0.05:
+            user = rnd.choice(users)
+            if user["tipo"] != "Estudante" or len(user["itens_emprestados"]) < 3:
+                d["status"] = "emprestado"
+                user["itens_emprestados"].append(d["id"])
+        items.append(d)
+        next_id += 1
+    with open("dados_biblioteca.json", "w", encoding="utf-8") as f:
+        json.dump({"proximo_id": next_id, "itens": items, "usuarios": users, "transacoes": []}, f,
+                  ensure_ascii=False)
+
+
+with bench:
+    bench.prepare(write_data, bench.items, bench.users, bench.seed)
+    from bibliomanager import AppBiblioManager, Professor
+
+    app = bench.once("startup", AppBiblioManager)
+    lib = app.biblioteca
+
+    # ----- Quadros -----
+    def screen(name):
+        def draw():
+            app.tela_atual = name
+            app.renderizar()
+        return draw
+
+    for name in ("menu_principal", "gerenciar_itens", "visualizar_itens", "visualizar_usuarios"):
+        bench.frames(f"frame:{name}", screen(name))
+
+    # ----- Empréstimo / devolução pelo formulário -----
+    available = [it for it in lib.itens.values() if it.esta_disponivel()]
+    bench.rnd.shuffle(available)
+    professors = [u for u in lib.usuarios.values() if isinstance(u, Professor)]
+    pairs = [(professors[k % len(professors)], it) for k, it in enumerate(available[:bench.ops])]
+
+    def submit(form, user, item, expect):
+        app.tela_atual = form
+        app.valores_entrada = {"nome_usuario": user.nome, "nome_item": item.nome}
+        app.processar_formulario()
+        if item.status != expect:
+            raise RuntimeError(app.mensagem)
+
+    done = bench.repeat("borrow", lambda u, it: submit("emprestar_item", u, it, "emprestado"),
+                        n=len(pairs), args_for=lambda k: pairs[k])
+    bench.repeat("return", lambda u, it: submit("devolver_item", u, it, "disponivel"),
+                 n=len(done), args_for=lambda k: pairs[k])
+    # As consultas devolvem visões; mede a primeira página (o que uma tela consome) e a cópia inteira
+    bench.repeat("report:disponiveis", lambda: lib.obter_itens_disponiveis().pagina(0, 50), n=20, kind="query")
+    bench.repeat("report:emprestados", lambda: lib.obter_itens_emprestados().pagina(0, 50), n=20, kind="query")
+    bench.repeat("report:disponiveis (lista)", lambda: list(lib.obter_itens_disponiveis()), n=20, kind="query")
+
+    # ----- Gravação -----
+    def save():
+        if not lib.salvar_dados():
+            raise RuntimeError("salvar_dados devolveu False")
+
+    def load():
+        if not lib.carregar_dados():
+            raise RuntimeError("carregar_dados devolveu False")
+
+    bench.once("salvar_dados", save)
+    bench.once("carregar_dados", load)
+
+    # ----- Armazenamento SQLite (mesmos dados, migrados do JSON) -----
+    from armazenamento import ArmazenamentoJSON, ArmazenamentoSQLite, migrar
+    from bibliomanager import Devolucao, Emprestimo, GerenciadorBiblioteca
+
+    bench.once("sqlite:migrar (json -> db)",
+               lambda: migrar(ArmazenamentoJSON("dados_biblioteca.json"), ArmazenamentoSQLite("dados_biblioteca.db")))
+    sql = GerenciadorBiblioteca(ArmazenamentoSQLite("dados_biblioteca.db"))
+    bench.once("sqlite:carregar_dados", sql.carregar_dados)
+    ids = sql.armazenamento.ids_por_status("disponivel")
+    bench.rnd.shuffle(ids)
+    bench.repeat("sqlite:obter_item (frio)", sql.obter_item, n=min(bench.ops, len(ids)), kind="query",
+                 args_for=lambda k: (ids[k],))
+    sql_pairs = [(p.id, i) for (p, _), i in zip(pairs, ids)]
+
+    def transact(kind, expect):
+        def op(user_id, item_id):
+            if not sql.processar_transacao(kind(user_id, item_id)) or sql.obter_item(item_id).status != expect:
+                raise RuntimeError(f"{kind.__name__} recusado")
+        return op
+
+    done = bench.repeat("sqlite:borrow", transact(Emprestimo, "emprestado"), n=len(sql_pairs),
+                        args_for=lambda k: sql_pairs[k])
+    bench.repeat("sqlite:return", transact(Devolucao, "disponivel"), n=len(done), args_for=lambda k: sql_pairs[k])
+    bench.repeat("sqlite:report:disponiveis", lambda: sql.obter_itens_disponiveis().pagina(0, 50), n=20, kind="query")
+    bench.repeat("sqlite:report:emprestados", lambda: sql.obter_itens_emprestados().pagina(0, 50), n=20, kind="query")
+    bench.once("sqlite:exportar json", lambda: sql.salvar_dados("exportado.json"))
+
+    # ----- Empréstimos em lote: processar_transacoes x processar_transacao em laço -----
+    # Cada caminho empresta (e depois devolve) uma fatia diferente dos itens disponíveis, por professores
+    def bulk_steps(prefix, manager, n):
+        free = [it.id for it in manager.obter_itens_disponiveis().pagina(0, 2 * n)]
+        n = len(free) // 2
+        profs = [p.id for p, _ in pairs] or [u.id for u in manager.usuarios.values() if isinstance(u, Professor)]
+        for label, chunk in (("laço", free[:n]), ("lote", free[n:2 * n])):
+            loans = [Emprestimo(profs[k % len(profs)], i) for k, i in enumerate(chunk)]
+            returns = [Devolucao(t.id_usuario, t.id_item) for t in loans]
+            if label == "laço":
+                run = lambda txs: [manager.processar_transacao(t) for t in txs]
+            else:
+                run = manager.processar_transacoes
+            for kind, txs in (("emprestimos", loans), ("devolucoes", returns)):
+                def step(txs=txs):
+                    if not all(run(txs)):
+                        raise RuntimeError("transação recusada")
+                bench.once(f"{prefix}bulk:{kind} {label} ({len(txs)})", step, kind="op")
+
+    bulk_steps("", lib, 10 * bench.ops)
+    bulk_steps("sqlite:", sql, 10 * bench.ops)
+
+bench.finish()
@@ -0,0 +1,112 @@
+# bench_nap2_04.py — nap2/04 (BiblioManager: dicionários por id + gravação em segundo plano)
+#
+# Uso:  python benchmarks/bench_nap2_04.py --items 100000 [--budget 30] [--out r.json]
+#
+# borrow/return gravam uma linha cada no log de eventos (event_log.py);
+# "load (snapshot + log)" reabre com os empréstimos ainda só no log (e remonta o histórico
+# por usuário/item, history.py).
+import json
+import random
+import uuid
+
+from harness import Bench
+
+bench = Bench.from_cli("nap2/04", "nap2/04")
+
+
+def write_data(n_items, n_users, seed):
+    rnd = random.Random(seed)
+
+    def new_id():
+        return str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+
+    users = {}
+    for u in range(n_users):
+        uid = new_id()
+        typ = rnd.choice(["student", "professor", "visitor"])
+        users[uid] = {"id": uid, "name": f"Usuario {u:05d}", "email": f"u{u}@ufra.edu.br",
+                      "user_type": typ, "borrowed": []}
+    user_ids = list(users)
+    items, transactions = {}, []
+    for i in range(n_items):
+        iid = new_id()
+        typ = rnd.choice(["Book", "Magazine", "DVD"])
+        it = {"id": iid, "name": f"{typ} {i:07d}", "status": "available", "type": typ}
+        if typ == "Book":
+            it.update(author=f"Autor {i % 997}", isbn=str(9780000000000 + i), year=str(1950 + i % 75))
+        elif typ == "Magazine":
+            it["issue"] = f"Ed. {i % 120}"
+        else:
+            it.update(director=f"Diretor {i % 311}", duration=f"{60 + i % 120}")
+        if rnd.random() < 0.05:
+            user = users[rnd.choice(user_ids)]
+            it["status"] = "borrowed"
+            user["borrowed"].append(iid)
+            transactions.append({"id": new_id(), "type": "loan", "user_id": user["id"], "item_id": iid,
+                                 "when": "2025-09-01T10:00:00"})
+        items[iid] = it
+    with open("bibliomanager.json", "w", encoding="utf-8") as f:
+        json.dump({"items": items, "users": users, "transactions": transactions}, f, ensure_ascii=False)
+
+
+with bench:
+    bench.prepare(write_data, bench.items, bench.users, bench.seed)
+    from BiblioManager import DATA_FILE, BiblioManager
+    from biblio_comum.async_writer import write_json_atomic
+
+    app = bench.once("startup", BiblioManager)
+
+    # ----- Quadros -----
+    screens = {"main": app.draw_main, "list_items": app.draw_list_items, "loans": app.draw_loans,
+               "reports": app.draw_reports, "users": app.draw_users}
+    for name, draw in screens.items():
+        bench.frames(f"frame:{name}", draw)
+
+    # ----- Empréstimo / devolução -----
+    available = [it.id for it in app.items.values() if it.status == "available"]
+    bench.rnd.shuffle(available)
+    users = [u for u in app.users.values() if u.user_type == "professor"] or list(app.users.values())
+    pairs = [(users[k % len(users)].id, iid) for k, iid in enumerate(available[:bench.ops])]
+
+    def borrow(uid, iid):
+        app.selected_user, app.selected_item = uid, iid
+        app.do_loan()
+        if app.items[iid].status != "borrowed":
+            raise RuntimeError("empréstimo recusado")
+
+    def give_back(uid, iid):
+        app.selected_user, app.selected_item = uid, iid
+        app.do_return()
+        if app.items[iid].status != "available":
+            raise RuntimeError("devolução recusada")
+
+    done = bench.repeat("borrow", borrow, n=len(pairs), args_for=lambda k: pairs[k])
+    bench.repeat("return", give_back, n=len(done), args_for=lambda k: pairs[k])
+    for flt in ("loan", "return"):
+        app.report_filter = flt
+        bench.frames(f"frame:reports ({flt})", app.draw_reports)
+    app.report_filter = "all"
+    app.report_days = 7   # período: busca binária nas transações ordenadas por id
+    bench.frames("frame:reports (7 dias)", app.draw_reports)
+    app.report_days = None
+    app.selected_user = pairs[0][0] if pairs else None
+    app.report_scope = "user"   # histórico só do usuário: a lista dele no history.py
+    bench.frames("frame:reports (do usuário)", app.draw_reports)
+    app.report_scope = None
+
+    def reload():
+        app.items.clear(), app.users.clear(), app.transactions.clear()
+        app.load()
+
+    bench.once("load (snapshot + log)", reload)
+
+    # ----- Gravação -----
+    # save() devolve o Future da gravação coalescida (inclui a janela do AsyncWriter);
+    # snapshot_write é só o custo de montar e gravar o JSON.
+    bench.once("save", lambda: app.save().result())
+    bench.once("snapshot_write",
+               lambda: write_json_atomic(DATA_FILE, app._payload(), ensure_ascii=False, indent=2))
+    app._writer.close()
+    bench.once("load (de novo)", reload)
+
+bench.finish()
@@ -0,0 +1,71 @@
+# bench_nap2_05.py — nap2/05 (bibliotecaGUI.py: registros por id em memória, sem persistência)
+#
+# Uso:  python benchmarks/bench_nap2_05.py --items 100000 [--budget 30] [--out r.json]
+# As telas são funções (screen, font); main() abre em tela cheia, então aqui a
+# janela é criada com o tamanho padrão do módulo (WIDTH x HEIGHT).
+from harness import Bench
+
+bench = Bench.from_cli("nap2/05", "nap2/05")
+
+with bench:
+    import pygame
+    import bibliotecaGUI as gui
+
+    pygame.init()
+    screen = pygame.display.set_mode((gui.WIDTH, gui.HEIGHT))
+    font = pygame.font.SysFont("Arial", gui.FONT_SIZE)
+
+    def build():
+        rnd = bench.rnd
+        for u in range(bench.users):
+            kind = rnd.choice([gui.Student, gui.Professor, gui.Visitor])
+            gui.add_user(kind(u + 1, f"Usuario {u:05d}"))
+        for i in range(bench.items):
+            kind = rnd.choice(["book", "magazine", "dvd"])
+            if kind == "book":
+                gui.add_item(gui.Book(i + 1, f"Book {i:07d}", str(9780000000000 + i), [f"Autor {i % 997}"]))
+            elif kind == "magazine":
+                gui.add_item(gui.Magazine(i + 1, f"Magazine {i:07d}", f"Ed. {i % 120}"))
+            else:
+                gui.add_item(gui.DVD(i + 1, f"DVD {i:07d}", 60 + i % 120))
+
+    bench.once("build (setup)", build, kind="setup")
+    bench.note("load", reason="a variante não tem persistência")
+    bench.note("save", reason="a variante não tem persistência")
+
+    # ----- Empréstimo / devolução -----
+    professors = [u for u in gui.users if isinstance(u, gui.Professor)] or list(gui.users)
+    picks = bench.rnd.sample(list(gui.items), min(bench.ops, len(gui.items)))
+    pairs = [(professors[k % len(professors)], it) for k, it in enumerate(picks)]
+
+    def borrow(user, item):
+        if not gui.process_loan(user, item):
+            raise RuntimeError("empréstimo recusado")
+
+    done = bench.repeat("borrow", borrow, n=len(pairs), args_for=lambda k: pairs[k])
+
+    # ----- Quadros (com empréstimos em aberto para os relatórios) -----
+    def screen_of(draw, *args):
+        def frame():
+            screen.fill(gui.WHITE)
+            draw(screen, font, *args)
+        return frame
+
+    bench.frames("frame:main_menu", screen_of(gui.main_menu))
+    bench.frames("frame:item_shelf", screen_of(gui.item_shelf))
+    bench.frames("frame:user_list", screen_of(gui.user_list))
+    bench.frames("frame:report_screen", screen_of(gui.report_screen))
+    bench.frames("frame:stats_screen", screen_of(gui.stats_screen))
+    bench.frames("frame:loan_report", screen_of(gui.loan_report))
+    bench.frames("frame:return_report", screen_of(gui.return_report))
+
+    bench.repeat("return", gui.process_return, n=len(done), args_for=lambda k: pairs[k])
+
+    # ----- Remoção (por id, O(1) no registro) -----
+    doomed_items = [it.id for it in bench.rnd.sample(list(gui.items), min(bench.ops, len(gui.items)))]
+    bench.repeat("remove_item", gui.remove_item, n=len(doomed_items), args_for=lambda k: (doomed_items[k],))
+    spare = [u.id for u in gui.users if not u.loans]
+    doomed_users = bench.rnd.sample(spare, min(bench.ops, len(spare)))
+    bench.repeat("remove_user", gui.remove_user, n=len(doomed_users), args_for=lambda k: (doomed_users[k],))
+
+bench.finish()
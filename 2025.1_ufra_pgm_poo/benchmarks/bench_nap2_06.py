@@ -0,0 +1,77 @@
+# bench_nap2_06.py — nap2/06 (main.py: livros/usuarios/emprestimos em JSON, relidos a cada operação)
+#
+# Uso:  python benchmarks/bench_nap2_06.py --items 100000 [--budget 30] [--out r.json]
+# As telas são desenhadas dentro de main(); os quadros são medidos rodando o
+# próprio main() com cliques simulados nos botões do menu.
+import json
+import random
+
+from harness import Bench
+
+bench = Bench.from_cli("nap2/06", "nap2/06")
+
+
+def write_data(n_items, n_users, seed):
+    rnd = random.Random(seed)
+    users = [{"id": u + 1, "matricula": f"{20250000 + u}", "name": f"Usuario {u:05d}",
+              "type": "Professor" if rnd.random() < 0.2 else "Student"} for u in range(n_users)]
+    books, loans = [], []
+    for i in range(n_items):
+        book = {"id": i + 1, "name": f"Livro {i:07d}", "status": "Disponível", "author": f"Autor {i % 997}",
+                "publisher": f"Editora {i % 53}", "year": str(1950 + i % 75), "isbn": str(9780000000000 + i),
+                "type": "Book"}
+        if rnd.random() < 0.05:
+            book["status"] = "Emprestado"
+            loans.append({"user_id": rnd.choice(users)["id"], "item_id": book["id"], "date": "2025-09-01",
+                          "return_date": None})
+        books.append(book)
+    for name, data in (("livros.json", books), ("usuarios.json", users), ("emprestimos.json", loans)):
+        with open(name, "w") as f:
+            json.dump(data, f, indent=4)
+
+
+with bench:
+    bench.prepare(write_data, bench.items, bench.users, bench.seed)
+    import pygame
+    import main as app
+
+    books = bench.once("load_books", app.load_books)
+    users = bench.once("load_users", app.load_users)
+
+    # ----- Empréstimo / devolução (cada operação relê e regrava emprestimos.json) -----
+    available = [b for b in books if b.status == "Disponível"]
+    bench.rnd.shuffle(available)
+    professors = [u for u in users if isinstance(u, app.Professor)] or users
+    pairs = [(professors[k % len(professors)], b) for k, b in enumerate(available[:bench.ops])]
+
+    def run(tx):
+        def op(user, book):
+            ok, msg = tx().process(user, book)
+            if not ok:
+                raise RuntimeError(msg)
+        return op
+
+    done = bench.repeat("borrow", run(app.Loan), n=len(pairs), args_for=lambda k: pairs[k])
+    bench.repeat("return", run(app.Return), n=len(done), args_for=lambda k: pairs[k])
+
+    # save_book relê livros.json inteiro antes de acrescentar (e recusa acima de 100 livros)
+    def new_book(k):
+        return (app.Book(len(books) + k + 1, f"Novo {k}", "Autor", "Editora", "2025", "000"),)
+
+    bench.repeat("save_book", app.save_book, n=20, kind="io", args_for=new_book)
+
+    # ----- Quadros: main() com cliques -----
+    def press(button_index):
+        rect = pygame.Rect(40, 100 + 70 * button_index, 180, 50)  # layout dos botões do menu em main()
+
+        def script(frame):
+            if frame == 1:
+                pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=rect.center))
+        return script
+
+    bench.scripted_loop("loop:home", app.main, lambda frame: None)
+    bench.scripted_loop("loop:ver_livros", app.main, press(3))
+    bench.scripted_loop("loop:ver_usuarios", app.main, press(2))
+    bench.scripted_loop("loop:emprestar", app.main, press(4))
+
+bench.finish()
@@ -0,0 +1,93 @@
+# bench_t07_01.py — t07_01 (Library + LibraryGUI, gravação em segundo plano)
+#
+# Uso:  python benchmarks/bench_t07_01.py --items 100000 [--budget 30] [--out r.json]
+import json
+import random
+
+from harness import Bench
+
+bench = Bench.from_cli("t07_01", "t07_01")
+
+
+def write_data(n_items, n_users, seed):
+    rnd = random.Random(seed)
+    users = []
+    for u in range(n_users):
+        typ = "professor" if rnd.random() < 0.2 else "student"
+        users.append({"id": f"user_{u}", "name": f"Usuario {u:05d}", "user_type": typ,
+                      "borrowed_items": [], "status": "active"})
+    items, transactions = [], []
+    for i in range(n_items):
+        if rnd.random() < 0.7:
+            it = {"id": f"book_{i}", "name": f"Book {i:07d}", "category": "book", "type": "book",
+                  "author": f"Autor {i % 997}", "isbn": str(9780000000000 + i)}
+        else:
+            it = {"id": f"magazine_{i}", "name": f"Magazine {i:07d}", "category": "magazine",
+                  "type": "magazine", "edition": f"Ed. {i % 120}"}
+        it["status"] = "available"
+        user = rnd.choice(users)
+        limit = 10 if user["user_type"] == "professor" else 3
+        if rnd.random() < 0.05 and len(user["borrowed_items"]) < limit:
+            it["status"] = "borrowed"
+            user["borrowed_items"].append(it["id"])
+            transactions.append({"id": f"loan_{len(transactions)}", "user_id": user["id"], "item_id": it["id"],
+                                 "date": "2025-09-01T10:00:00", "status": "completed", "type": "Loan"})
+        items.append(it)
+    with open("library_data.json", "w") as f:
+        json.dump({"items": items, "users": users, "transactions": transactions}, f)
+
+
+with bench:
+    bench.prepare(write_data, bench.items, bench.users, bench.seed)
+    import pygame
+    from gui import LibraryGUI
+    from library import Library
+    from biblio_comum.async_writer import write_json_atomic
+
+    pygame.init()
+    library = bench.once("load", Library)
+    gui = LibraryGUI(library)
+
+    # ----- Quadros -----
+    def screen(state):
+        def draw():
+            gui.state = state
+            gui.clear_background()
+            gui.draw()
+        return draw
+
+    for state in ("menu", "items", "users", "transactions", "report"):
+        bench.frames(f"frame:{state}", screen(state))
+
+    # ----- Empréstimo / devolução -----
+    available = [it for it in library.get_items() if it.status == "available"]
+    bench.rnd.shuffle(available)
+    slots = []
+    for u in library.get_users():
+        slots += [u] * (u._max_borrow_limit() - len(u.borrowed_items))
+    pairs = list(zip(slots, available[:bench.ops]))
+
+    def borrow(user, item):
+        gui.selected_user, gui.selected_item = user, item
+        gui.process_loan()
+        if gui.toast_message != "Empréstimo salvo.":
+            raise RuntimeError(gui.toast_message)
+
+    def give_back(user, item):
+        gui.process_return_for(user, item)
+        if gui.toast_message != "Empréstimo finalizado.":
+            raise RuntimeError(gui.toast_message)
+
+    done = bench.repeat("borrow", borrow, n=len(pairs), args_for=lambda k: pairs[k])
+    bench.repeat("return", give_back, n=len(done), args_for=lambda k: pairs[k])
+    bench.repeat("report:generate_report", library.generate_report, n=20, kind="query")
+
+    # ----- Gravação -----
+    # save_data() devolve o Future da gravação coalescida (inclui a janela do AsyncWriter);
+    # snapshot_write é só o custo de montar e gravar o JSON.
+    bench.once("save_data", lambda: library.save_data().result())
+    bench.once("snapshot_write", lambda: write_json_atomic("library_data.json", library._snapshot(), indent=2))
+    library.close()
+    bench.once("load (de novo)", lambda: Library().close())
+
+bench.finish()
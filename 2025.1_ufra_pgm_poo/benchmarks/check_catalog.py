@@ -0,0 +1,142 @@
+# check_catalog.py — nap2/02: contadores e índices do Catalog conferidos contra varreduras
+#
+# Uso:
+#   python benchmarks/check_catalog.py                    # 2.000 itens, 1.000 operações
+#   python benchmarks/check_catalog.py --items 500 --ops 10000 --seed 7
+#
+# Abre o BiblioApp (sem janela, numa pasta temporária) com BIBLIO_SELF_CHECK=1,
+# então cada _commit já confere contadores e baldes dos índices. Depois faz uma
+# sequência sorteada pelos caminhos da interface (emprestar, devolver, incluir
+# e excluir item e usuário). Depois de cada operação, também compara com as
+# varreduras lineares de bench_catalog.py (as versões de antes do catálogo):
+#   - _count_items/_count_users (dashboard);
+#   - o relatório filtrado por tipo/status, na ordem do catálogo;
+#   - o relatório por usuário.
+# Sai com código 1 na primeira divergência.
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+APP = HERE.parent / "nap2" / "02"
+sys.path.insert(0, str(APP))
+os.environ["BIBLIO_SELF_CHECK"] = "1"
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from bench_catalog import (linear_count_items, linear_count_users, linear_filtered_items,  # noqa: E402
+                           linear_group_by_user, synthetic_data)
+from ui.app import BiblioApp  # noqa: E402
+
+FILTERS = [(t, s) for t in ("All", "Book", "Magazine", "DVD") for s in ("All", "available", "borrowed")]
+
+
+def compare(app):
+    if app._count_items() != linear_count_items(app):
+        raise AssertionError(f"contadores de itens: {app._count_items()} != {linear_count_items(app)}")
+    if app._count_users() != linear_count_users(app):
+        raise AssertionError(f"contadores de usuários: {app._count_users()} != {linear_count_users(app)}")
+    for app.rep_filter_type, app.rep_filter_status in FILTERS:
+        got, want = app._rep_filtered_items(), linear_filtered_items(app)
+        if len(got) != len(want) or any(a is not b for a, b in zip(got, want)):
+            raise AssertionError(f"relatório {app.rep_filter_type}/{app.rep_filter_status}: "
+                                 f"{len(got)} linhas, esperado {len(want)} (ou fora da ordem)")
+    got = {u: [id(r) for r in rows] for u, rows in app._rep_group_by_user().items()}
+    want = {u: [id(r) for r in rows] for u, rows in linear_group_by_user(app).items()}
+    if got != want:
+        raise AssertionError("relatório por usuário diferente da varredura")
+
+
+def run(app, rnd, ops):
+    items, users = app.data["items"], app.data["users"]
+    done = {}
+
+    def borrow():
+        free = [i for i, it in enumerate(items) if it.get("status", "available") == "available"]
+        app.loan_selected_user, app.loan_selected_item = rnd.randrange(len(users)), rnd.choice(free)
+        return app._loan_do_borrow()
+
+    def give_back():
+        names = {u["name"]: k for k, u in enumerate(users)}
+        lent = [i for i, it in enumerate(items) if it.get("status") == "borrowed" and it.get("borrower") in names]
+        if not lent:
+            return False
+        app.loan_selected_item = rnd.choice(lent)
+        app.loan_selected_user = names[items[app.loan_selected_item]["borrower"]]
+        return app._loan_do_return()
+
+    def add_item():
+        app.add_type = rnd.choice(["Book", "Magazine", "DVD"])
+        app._add_build_fields()
+        for key, field in app.add_inputs.items():
+            field.text = f"{key} {rnd.randrange(10**6)}"
+        return app._add_save()
+
+    def delete_item():
+        app.item_selected_index = rnd.randrange(len(items))
+        before = len(items)
+        app._item_delete_selected()
+        return len(items) < before
+
+    def add_user():
+        app.user_type = rnd.choice(["Student", "Professor", "Visitor"])
+        app._user_build_fields()
+        app.user_inputs["name"].text = f"Usuario novo {rnd.randrange(10**6)}"
+        return app._user_save()
+
+    def delete_user():
+        # só quem não está com nada (senão os itens ficariam com um borrower que não existe mais)
+        busy = {it.get("borrower") for it in items if it.get("status") == "borrowed"}
+        free = [k for k, u in enumerate(users) if u["name"] not in busy]
+        if len(users) <= 1 or not free:
+            return False
+        before = len(users)
+        app._user_delete(rnd.choice(free))
+        return len(users) < before
+
+    steps = [(borrow, 40), (give_back, 35), (add_item, 8), (delete_item, 7), (add_user, 5), (delete_user, 5)]
+    for k in range(ops):
+        op = rnd.choices([f for f, _ in steps], weights=[w for _, w in steps])[0]
+        if op():
+            done[op.__name__] = done.get(op.__name__, 0) + 1
+        compare(app)
+    return done
+
+
+def main():
+    p = argparse.ArgumentParser(description="nap2/02: Catalog (BIBLIO_SELF_CHECK) x varredura completa")
+    p.add_argument("--items", type=int, default=2000)
+    p.add_argument("--users", type=int, default=50)
+    p.add_argument("--ops", type=int, default=1000)
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+
+    rnd = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        os.makedirs("data")
+        with open(os.path.join("data", "library_data.json"), "w", encoding="utf-8") as f:
+            json.dump(synthetic_data(args.items, n_users=args.users, seed=args.seed), f)
+        app = BiblioApp()
+        app._history_thread.join()
+        try:
+            compare(app)
+            done = run(app, rnd, args.ops)
+        except AssertionError as e:
+            print(f"FALHOU: {e}")
+            return 1
+        finally:
+            app.store.close()
+            app.txlog.close()
+            os.chdir(HERE)
+    print(f"ok: {args.ops} operações ({', '.join(f'{k} {v}' for k, v in sorted(done.items()))}); "
+          f"contadores, índices e relatórios iguais à varredura")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
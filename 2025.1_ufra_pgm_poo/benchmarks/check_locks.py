@@ -0,0 +1,321 @@
+# check_locks.py — modo com travas (várias mesas): índices, visões e snapshot conferidos contra varreduras
+#
+# Uso:
+#   python benchmarks/check_locks.py                          # nap2/03 e t07_01, 4 mesas
+#   python benchmarks/check_locks.py --variants t07_01 --threads 8 --ops 20000 --seed 7
+#
+# Liga o modo com travas (GerenciadorBiblioteca(concorrente=True) em nap2/03,
+# Library(concurrent=True) em t07_01) e põe --threads mesas fazendo, ao mesmo
+# tempo, uma sequência sorteada de empréstimos, devoluções e inclusões e
+# exclusões de itens e usuários. Uma thread a mais lê enquanto isso:
+#   - nap2/03: percorre as visões por status e faz buscas por nome e prefixo
+#     (a visão não pode repetir item nem quebrar com uma exclusão no meio);
+#   - t07_01: monta o snapshot como a thread de gravação (com a trava de
+#     estado) e confere que cada item emprestado tem exatamente um dono nele.
+# No fim, compara com uma varredura completa:
+#   - as regras do stress_circulation.py (nada emprestado em dobro, emprestado
+#     <=> um dono, empréstimos - devoluções == emprestados, travas usadas);
+#   - nap2/03: partições por status/visões e índices de nomes (itens e
+#     usuários) iguais aos dicionários; rodado também com os dados abertos por
+#     carregar_dados (partições e índices montados no meio das operações);
+#   - t07_01: o library_data.json gravado por close() igual ao _snapshot().
+# Cada variante roda num processo separado (os módulos têm o mesmo nome).
+# Sai com código 1 na primeira variante com divergência.
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent
+VARIANTS = {"nap2_03": "nap2/03", "t07_01": "t07_01"}
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from stress_circulation import Nap203, T0701, check  # noqa: E402
+
+
+# ----- nap2/03 -----
+class Nap203Mesas(Nap203):
+    # Nap203 com inclusão/exclusão; ids vivos lidos do gerenciador (mudam durante o teste)
+    def __init__(self, n_items, n_users, concurrent, reopen=False):
+        super().__init__(n_items, n_users, concurrent)
+        if reopen:
+            # dados abertos do arquivo: entidades, partições e índices de nomes montados sob demanda
+            self.lib.salvar_dados("check_locks.json")
+            self.lib = self.bm.GerenciadorBiblioteca(concorrente=concurrent)
+            assert self.lib.carregar_dados("check_locks.json")
+        self.item_ids, self.user_ids = list(self.lib.itens), list(self.lib.usuarios)
+
+    def add_item(self, rnd):
+        item = self.bm.Livro(f"Livro {rnd.randrange(200)}", "Autor", str(rnd.randrange(10**6)), 2000)
+        return self.lib.adicionar_item(item) and item.id
+
+    def remove_item(self, item_id):
+        return self.lib.remover_item(item_id)
+
+    def add_user(self, rnd):
+        user = self.bm.Professor(f"Mesa {rnd.randrange(50)}", "mesa@ufra.edu.br", "Depto")
+        return self.lib.adicionar_usuario(user) and user.id
+
+    def remove_user(self, user_id):
+        return self.lib.remover_usuario(user_id)
+
+    def held(self, user_id):
+        user = self.lib.usuarios.get(user_id)
+        return list(user.itens_emprestados) if user else []
+
+    def state(self):
+        lib = self.lib
+        items = {i: it.status == "emprestado" for i, it in lib.itens.items()}
+        holders = {u: list(user.itens_emprestados) for u, user in lib.usuarios.items()}
+        return items, holders, len(lib.transacoes)
+
+    def read(self, rnd):
+        lib = self.lib
+        for visao in (lib.obter_itens_disponiveis(), lib.obter_itens_emprestados()):
+            ids = [it.id for it in visao]
+            if len(ids) != len(set(ids)):
+                return ["visão por status com item repetido"]
+        lib.buscar_itens_por_prefixo(f"livro {rnd.randrange(20)}", 20)
+        lib.buscar_usuario_por_nome(f"Mesa {rnd.randrange(50)}")
+        return []
+
+    def check_indexes(self):
+        from indice_nomes import dobrar
+        lib, problems = self.lib, []
+        itens, usuarios = dict(lib.itens.items()), dict(lib.usuarios.items())
+        for status, visao in (("disponivel", lib.obter_itens_disponiveis()),
+                              ("emprestado", lib.obter_itens_emprestados())):
+            ids = [it.id for it in visao]
+            want = {i for i, it in itens.items() if it.status == status}
+            if len(ids) != len(set(ids)) or set(ids) != want or len(visao) != len(want):
+                problems.append(f"visão {status}: {len(ids)} itens ({len(set(ids))} distintos), esperado {len(want)}")
+        for nome, indice, entidades in (("itens", lib._nomes_itens, itens), ("usuários", lib._nomes_usuarios, usuarios)):
+            if len(indice) != len(entidades):
+                problems.append(f"índice de nomes de {nome}: {len(indice)} entradas, esperado {len(entidades)}")
+            for id_, e in entidades.items():
+                if id_ not in indice.buscar(e.nome):
+                    problems.append(f"índice de nomes de {nome}: {id_} ({e.nome!r}) não encontrado")
+                    break
+        achados = lib.buscar_itens_por_prefixo("livro", len(itens) + 1)
+        chaves = [dobrar(it.nome) for it in achados]
+        if chaves != sorted(chaves) or {it.id for it in achados} != {i for i, it in itens.items()
+                                                                      if dobrar(it.nome).startswith("livro")}:
+            problems.append("busca por prefixo diferente da varredura")
+        return problems
+
+
+# ----- t07_01 -----
+class T0701Mesas(T0701):
+    # T0701 com inclusão/exclusão: os dicionários do adaptador acompanham as mudanças
+    def __init__(self, n_items, n_users, concurrent):
+        super().__init__(n_items, n_users, concurrent)
+        from entities import Book, Professor
+        self.Book, self.Professor = Book, Professor
+        self.item_ids, self.user_ids = list(self.items), list(self.users)
+        self._next = 0
+        self._guard = threading.Lock()
+
+    def _new_id(self, prefix):
+        with self._guard:
+            self._next += 1
+            return f"{prefix}_new_{self._next}"
+
+    def _save(self, result):
+        self.lib.save_data()   # como a interface: cada alteração agenda a gravação
+        return result
+
+    def borrow(self, user_id, item_id, tag):
+        return self._save(self._run(self.Loan, user_id, item_id, tag))
+
+    def give_back(self, user_id, item_id, tag):
+        return self._save(self._run(self.Return, user_id, item_id, tag))
+
+    def add_item(self, rnd):
+        item = self.Book(self._new_id("item"), f"Livro {rnd.randrange(200)}", "Autor", str(rnd.randrange(10**6)))
+        self.lib.add_item(item)
+        self.items[item.id] = item
+        return self._save(item.id)
+
+    def remove_item(self, item_id):
+        try:
+            self.lib.delete_item(item_id)
+        except (KeyError, ValueError):
+            return False
+        self.items.pop(item_id, None)
+        return self._save(True)
+
+    def add_user(self, rnd):
+        user = self.Professor(self._new_id("user"), f"Mesa {rnd.randrange(50)}")
+        self.lib.add_user(user)
+        self.users[user.id] = user
+        return self._save(user.id)
+
+    def remove_user(self, user_id):
+        try:
+            self.lib.delete_user(user_id)
+        except (KeyError, ValueError):
+            return False
+        self.users.pop(user_id, None)
+        return self._save(True)
+
+    def _run(self, kind, user_id, item_id, tag):
+        user, item = self.users.get(user_id), self.items.get(item_id)
+        if user is None or item is None:   # excluído por outra mesa
+            return False
+        return super()._run(kind, user_id, item_id, tag)
+
+    def held(self, user_id):
+        user = self.users.get(user_id)
+        return [it.id for it in list(user.borrowed_items)] if user else []
+
+    def state(self):
+        items = {it.id: it.status == "borrowed" for it in self.lib.get_items()}
+        holders = {u.id: [it.id for it in u.borrowed_items] for u in self.lib.get_users()}
+        return items, holders, len(self.lib.get_transactions())
+
+    def read(self, rnd):
+        # o que a thread de gravação faz: monta o snapshot com a trava de estado
+        with self.lib._Library__state:
+            snap = self.lib._snapshot()
+        owners = {}
+        for u in snap["users"]:
+            for i in u["borrowed_items"]:
+                owners[i] = owners.get(i, 0) + 1
+        for it in snap["items"]:
+            if (it["status"] == "borrowed") != (owners.get(it["id"]) == 1):
+                return [f"snapshot com {it['id']} {it['status']} e {owners.get(it['id'], 0)} dono(s)"]
+        return []
+
+    def check_indexes(self):
+        self.lib.close()
+        with open("library_data.json", encoding="utf-8") as f:
+            saved = json.load(f)
+        return [] if saved == self.lib._snapshot() else ["library_data.json diferente do estado final"]
+
+
+def run_case(app, args):
+    threads = args.threads
+    counts = [[0, 0] for _ in range(threads)]   # por thread: empréstimos ok, devoluções ok
+    problems = []
+    start = threading.Barrier(threads + 2)
+    stop = threading.Event()
+
+    def desk(k):
+        rnd = random.Random(args.seed * 1000 + k)
+        start.wait()
+        c = counts[k]
+        for n in range(args.ops):
+            # ids já vistos; um excluído por outra mesa continua sorteável, e a operação falha
+            user, item = rnd.choice(app.user_ids), rnd.choice(app.item_ids)
+            r = rnd.random()
+            if r < 0.45:
+                c[0] += bool(app.borrow(user, item, f"loan_{k}_{n}"))
+            elif r < 0.88:
+                held = app.held(user)   # quase sempre devolve algo que o usuário tem (lido sem trava)
+                if held and rnd.random() < 0.9:
+                    item = rnd.choice(held)
+                c[1] += bool(app.give_back(user, item, f"return_{k}_{n}"))
+            elif r < 0.93:
+                new = app.add_item(rnd)
+                if new:
+                    app.item_ids.append(new)   # list.append é atômico: as outras mesas passam a sortear o novo
+            elif r < 0.97:
+                app.remove_item(item)
+            elif r < 0.99:
+                new = app.add_user(rnd)
+                if new:
+                    app.user_ids.append(new)
+            else:
+                app.remove_user(user)
+
+    def reader():
+        rnd = random.Random(args.seed)
+        start.wait()
+        while not stop.is_set():
+            try:
+                found = app.read(rnd)
+            except Exception as e:   # noqa: BLE001 — leitura sem trava não pode quebrar
+                found = [f"leitura levantou {type(e).__name__}: {e}"]
+            if found:
+                problems.extend(found)
+                return
+
+    workers = [threading.Thread(target=desk, args=(k,)) for k in range(threads)]
+    watcher = threading.Thread(target=reader)
+    for w in workers + [watcher]:
+        w.start()
+    start.wait()
+    for w in workers:
+        w.join()
+    stop.set()
+    watcher.join()
+    loans, returns = (sum(c[i] for c in counts) for i in range(2))
+    problems += check(app, loans, returns, True) + app.check_indexes()
+    return {"ok_loans": loans, "ok_returns": returns, "violations": len(problems), "examples": problems[:5]}
+
+
+def child(args):
+    # Roda uma variante num processo limpo e imprime o JSON no stdout
+    os.chdir(tempfile.mkdtemp(prefix=f"check_locks_{args.child}_"))
+    sys.path.insert(0, str(REPO / VARIANTS[args.child]))
+    sys.setswitchinterval(args.switch)
+    if args.child == "nap2_03":
+        cases = {"memória": lambda: Nap203Mesas(args.items, args.users, True),
+                 "carregar_dados": lambda: Nap203Mesas(args.items, args.users, True, reopen=True)}
+    else:
+        cases = {"memória": lambda: T0701Mesas(args.items, args.users, True)}
+    out = {name: run_case(make(), args) for name, make in cases.items()}
+    sys.stdout.write(json.dumps({"variant": VARIANTS[args.child], "cases": out}, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+    os._exit(0)  # thread de gravação do t07_01 (daemon) não segura a saída
+
+
+def main():
+    p = argparse.ArgumentParser(description="Modo com travas: índices, visões e snapshot x varredura completa")
+    p.add_argument("--variants", default=",".join(VARIANTS), help=f"padrão: {','.join(VARIANTS)}")
+    p.add_argument("--threads", type=int, default=4, help="mesas")
+    p.add_argument("--items", type=int, default=64, help="itens no começo (poucos = mais disputa)")
+    p.add_argument("--users", type=int, default=16)
+    p.add_argument("--ops", type=int, default=5000, help="operações por mesa")
+    p.add_argument("--switch", type=float, default=1e-5, help="sys.setswitchinterval (s)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = p.parse_args()
+    if args.child:
+        return child(args)
+
+    variants = [v.strip().replace("/", "_") for v in args.variants.split(",") if v.strip()]
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        p.error(f"variantes desconhecidas: {', '.join(unknown)}")
+    failed = False
+    for v in variants:
+        cmd = [sys.executable, __file__, "--child", v, "--threads", str(args.threads), "--items", str(args.items),
+               "--users", str(args.users), "--ops", str(args.ops), "--switch", str(args.switch),
+               "--seed", str(args.seed)]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"FALHOU: {v} (exit {proc.returncode})\n{proc.stderr.strip()[-2000:]}")
+            failed = True
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        for name, c in result["cases"].items():
+            status = "FALHOU" if c["violations"] else "ok"
+            print(f"{status}: {result['variant']} ({name}), {args.threads} mesas x {args.ops} operações, "
+                  f"{c['ok_loans']} empréstimos e {c['ok_returns']} devoluções")
+            for e in c["examples"]:
+                print(f"  - {e}")
+            failed |= bool(c["violations"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+# check_relatorios.py — nap2/01: relatórios por status do Repositorio conferidos contra varreduras
+#
+# Uso:
+#   python benchmarks/check_relatorios.py                    # 2.000 itens, 1.000 operações por modo
+#   python benchmarks/check_relatorios.py --items 500 --ops 5000 --seed 7
+#
+# Liga BIBLIO_VERIFICAR=1 (cada relatorio_*/contar_* chama verificar_status, que
+# confere os grupos com uma varredura completa) e roda a mesma sequência
+# sorteada em três modos: Repositorio em memória e aberto por carregar() de um
+# JSON e de um snapshot binário (itens montados só quando pedidos). As
+# operações são as do servicos.py (empréstimo, devolução, criar_item) e as de
+# lista que o Repositorio aceita (insert no meio, del, troca por posição e, de
+# vez em quando, troca de uma fatia); nos modos com arquivo, salvar + carregar
+# no meio da sequência. Depois de cada operação, compara com o filtro da lista:
+#   - relatorio_disponiveis/relatorio_emprestados: os mesmos objetos, na ordem;
+#   - contar_disponiveis/contar_emprestados: as quantidades.
+# Logo depois de cada carregar(), antes de qualquer varredura, também confere
+# com_status/contar_status sem a verificação (o caminho que monta só os itens
+# do grupo). Sai com código 1 na primeira divergência.
+import argparse
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent
+sys.path.insert(0, str(REPO / "nap2" / "01"))
+os.environ["BIBLIO_VERIFICAR"] = "1"
+
+from dominio import Dvd, Livro, Professor, Revista  # noqa: E402
+from repositorio import Repositorio, carregar, salvar  # noqa: E402
+import servicos  # noqa: E402
+from servicos import (contar_disponiveis, contar_emprestados, criar_item, processar_devolucao,  # noqa: E402
+                      processar_emprestimo, relatorio_disponiveis, relatorio_emprestados)
+
+STATUS = (("disponivel", relatorio_disponiveis, contar_disponiveis),
+          ("emprestado", relatorio_emprestados, contar_emprestados))
+
+
+def novo_item(rnd, k):
+    kind = rnd.choice([Livro, Revista, Dvd])
+    arg = {Livro: f"Autor {k % 997}", Revista: f"Ed. {k % 120}", Dvd: 60 + k % 120}[kind]
+    return kind(f"{kind.__name__} {k:07d}", arg, id_=f"i{k}")
+
+
+def build(n_items, n_users, seed):
+    rnd = random.Random(seed)
+    usuarios = [Professor(f"Usuario {u:05d}", id_=f"u{u}") for u in range(n_users)]
+    itens = [novo_item(rnd, k) for k in range(n_items)]
+    return Repositorio(usuarios), Repositorio(itens, por_status=True), Repositorio()
+
+
+def compare(itens, quando):
+    for status, relatorio, contar in STATUS:
+        got, want = relatorio(itens), [it for it in itens if it.status == status]
+        if len(got) != len(want) or any(a is not b for a, b in zip(got, want)):
+            raise AssertionError(f"{quando}: relatório {status} com {len(got)} itens, esperado {len(want)} "
+                                 f"(ou fora da ordem)")
+        if contar(itens) != len(want):
+            raise AssertionError(f"{quando}: contar {status} = {contar(itens)}, esperado {len(want)}")
+
+
+def compare_lazy(itens, quando):
+    # sem verificação e antes de qualquer varredura: com_status monta só os itens do grupo
+    servicos.VERIFICAR_RELATORIOS = False
+    try:
+        got = {status: [it.id for it in relatorio(itens)] for status, relatorio, _ in STATUS}
+        counts = {status: contar(itens) for status, _, contar in STATUS}
+    finally:
+        servicos.VERIFICAR_RELATORIOS = True
+    for status, _, _ in STATUS:
+        want = [it.id for it in itens if it.status == status]
+        if got[status] != want or counts[status] != len(want):
+            raise AssertionError(f"{quando}: relatório {status} montado do arquivo diferente da varredura")
+
+
+def run(modo, args, folder):
+    rnd = random.Random(args.seed)
+    usuarios, itens, transacoes = build(args.items, args.users, args.seed)
+    caminho = os.path.join(folder, "dados.snap" if modo == "binario" else "dados.json")
+
+    def reabrir():
+        nonlocal usuarios, itens, transacoes
+        salvar(caminho, itens, usuarios, transacoes)
+        itens, usuarios, transacoes = carregar(caminho)
+        compare_lazy(itens, f"{modo}, depois de carregar()")
+
+    if modo != "memoria":
+        reabrir()
+    proximo = args.items
+    com = {}   # item -> usuário que está com ele
+    done = {}
+
+    def emprestar():
+        livres = [it.id for it in itens if it.status == "disponivel"]
+        if not livres:
+            return False
+        item_id, usuario_id = rnd.choice(livres), f"u{rnd.randrange(args.users)}"
+        try:
+            processar_emprestimo(usuarios, itens, transacoes, usuario_id, item_id)
+        except ValueError:   # limite do usuário
+            return False
+        com[item_id] = usuario_id
+        return True
+
+    def devolver():
+        presentes = [i for i in com if itens.obter(i) is not None]
+        if not presentes:
+            return False
+        item_id = rnd.choice(presentes)
+        processar_devolucao(usuarios, itens, transacoes, com.pop(item_id), item_id)
+        return True
+
+    def incluir():
+        nonlocal proximo
+        criar_item(itens, novo_item(rnd, proximo))
+        proximo += 1
+        return True
+
+    def inserir_no_meio():
+        nonlocal proximo
+        itens.insert(rnd.randrange(len(itens) + 1), novo_item(rnd, proximo))
+        proximo += 1
+        return True
+
+    def excluir():
+        del itens[rnd.randrange(len(itens))]
+        return True
+
+    def trocar():
+        nonlocal proximo
+        itens[rnd.randrange(len(itens))] = novo_item(rnd, proximo)
+        proximo += 1
+        return True
+
+    def trocar_fatia():
+        nonlocal proximo
+        a = rnd.randrange(len(itens))
+        b = min(len(itens), a + rnd.randrange(1, 5))
+        itens[a:b] = [novo_item(rnd, proximo + k) for k in range(rnd.randrange(0, 5))]
+        proximo += 5
+        return True
+
+    def reabrir_op():
+        reabrir()
+        return True
+
+    steps = [(emprestar, 35), (devolver, 30), (incluir, 8), (inserir_no_meio, 8), (excluir, 8), (trocar, 5),
+             (trocar_fatia, 1)]
+    if modo != "memoria":
+        steps.append((reabrir_op, 2))
+    for k in range(args.ops):
+        op = rnd.choices([f for f, _ in steps], weights=[w for _, w in steps])[0]
+        if op():
+            done[op.__name__] = done.get(op.__name__, 0) + 1
+        compare(itens, f"{modo}, operação {k} ({op.__name__})")
+    return done
+
+
+def main():
+    p = argparse.ArgumentParser(description="nap2/01: relatórios do Repositorio (BIBLIO_VERIFICAR) x varredura")
+    p.add_argument("--items", type=int, default=2000)
+    p.add_argument("--users", type=int, default=40)
+    p.add_argument("--ops", type=int, default=1000, help="operações por modo")
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+
+    assert servicos.VERIFICAR_RELATORIOS, "BIBLIO_VERIFICAR não foi lido"
+    with tempfile.TemporaryDirectory() as folder:
+        for modo in ("memoria", "json", "binario"):
+            try:
+                done = run(modo, args, folder)
+            except AssertionError as e:
+                print(f"FALHOU: {str(e)[:300]}")   # a mensagem do verificar_status traz as listas inteiras
+                return 1
+            print(f"ok: {modo}, {args.ops} operações ({', '.join(f'{k} {v}' for k, v in sorted(done.items()))})")
+    print("relatórios e contagens iguais à varredura nos três modos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+# harness.py — infraestrutura comum dos benchmarks headless (bench_*.py)
+#
+# Cada bench_<variante>.py monta um catálogo sintético no formato daquela
+# variante, abre o app sem janela (driver de vídeo "dummy") numa pasta
+# temporária e mede os fluxos do usuário: carregar, desenhar as telas,
+# emprestar, devolver, relatórios, exportar e salvar. O resultado é UM objeto
+# JSON (stdout ou --out), para comparar execuções com run_all.py --baseline.
+#
+# Cada passo tem um orçamento de tempo (--budget, em segundos). Variantes que
+# desenham a lista inteira a cada quadro chegam a minutos por quadro com 1M de
+# itens; quando o orçamento estoura o passo é marcado "truncated" (parou antes
+# de completar as repetições) ou "timeout" (nem uma repetição terminou) e o
+# benchmark segue para o próximo passo.
+#
+# Memória: "peak_rss_mb" é o pico do processo inteiro (getrusage). Em Linux,
+# cada passo também informa o próprio pico (VmHWM, zerado antes do passo via
+# /proc/self/clear_refs).
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+# RedrawScheduler (nap2/02, nap2/04, t07_01): um quadro por iteração, sem limite de FPS
+os.environ.setdefault("BIBLIO_RENDER", "continuous")
+os.environ.setdefault("BIBLIO_FPS", "0")
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+# ---------- Tempo ----------
+def percentiles(ms):
+    ms = sorted(ms)
+    n = len(ms)
+
+    def pct(p):
+        return ms[min(n - 1, max(0, int(round(p / 100 * n)) - 1))]
+
+    return {"p50_ms": round(pct(50), 3), "p95_ms": round(pct(95), 3), "p99_ms": round(pct(99), 3),
+            "mean_ms": round(sum(ms) / n, 3), "max_ms": round(ms[-1], 3)}
+
+
+@contextlib.contextmanager
+def deadline(seconds):
+    """Interrompe o bloco com BudgetExceeded depois de `seconds` (SIGALRM, só na thread principal)."""
+    if not seconds or seconds <= 0 or not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise BudgetExceeded(f"orçamento de {seconds}s estourado")
+
+    old = signal.signal(signal.SIGALRM, on_alarm)
+    # repete a cada 1s: código do app com "except:" genérico pode engolir o primeiro alarme
+    signal.setitimer(signal.ITIMER_REAL, seconds, 1.0)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old)
+
+
+# ---------- Memória ----------
+def _read_hwm_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_hwm():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":  # macOS devolve bytes
+        kb //= 1024
+    return round(kb / 1024, 1)
+
+
+# ---------- Pygame sem limite de FPS ----------
+class _UncappedClock:
+    """Substitui pygame.time.Clock: tick() não dorme, então o intervalo entre quadros é só trabalho."""
+
+    def __init__(self):
+        self._clock = _UncappedClock.real()
+
+    def tick(self, framerate=0):
+        return self._clock.tick()
+
+    def tick_busy_loop(self, framerate=0):
+        return self._clock.tick()
+
+    def __getattr__(self, name):
+        return getattr(self._clock, name)
+
+
+@contextlib.contextmanager
+def uncapped_clock():
+    import pygame
+    _UncappedClock.real = pygame.time.Clock
+    pygame.time.Clock = _UncappedClock
+    try:
+        yield
+    finally:
+        pygame.time.Clock = _UncappedClock.real
+
+
+# ---------- Benchmark ----------
+class Bench:
+    """Registra os passos de um benchmark e gera o relatório JSON.
+
+    Uso típico (ver bench_*.py):
+        bench = Bench.from_cli("nap2/02", "nap2/02")
+        with bench:
+            bench.prepare(write_data, bench.items)     # processo filho: não conta no pico de RSS
+            app = bench.once("load", App)
+            bench.frames("render_shelf", app.render_shelf)
+            bench.repeat("borrow", borrow_one)
+        bench.finish()
+    """
+
+    def __init__(self, variant, app_dir, items, users=None, frames=60, ops=200, budget=30.0,
+                 seed=42, out=None, keep=False):
+        self.variant = variant
+        self.app_dir = (REPO / app_dir).resolve()
+        self.items = items
+        self.users = users if users is not None else max(50, min(items // 100, 5000))
+        self.n_frames = frames
+        self.ops = ops
+        self.budget = budget
+        self.seed = seed
+        self.out = out
+        self.keep = keep
+        self.rnd = random.Random(seed)
+        self.steps = []
+        self.workdir = None
+        self._cwd = None
+        self._t0 = None
+        self._per_step_rss = None
+
+    @classmethod
+    def from_cli(cls, variant, app_dir, argv=None, **defaults):
+        p = argparse.ArgumentParser(description=f"Benchmark headless de {variant}")
+        p.add_argument("--items", type=int, default=defaults.get("items", 1000))
+        p.add_argument("--users", type=int, default=None, help="padrão: itens/100, entre 50 e 5000")
+        p.add_argument("--frames", type=int, default=defaults.get("frames", 60), help="quadros por tela")
+        p.add_argument("--ops", type=int, default=defaults.get("ops", 200), help="empréstimos/devoluções por passo")
+        p.add_argument("--budget", type=float, default=defaults.get("budget", 30.0), help="segundos por passo")
+        p.add_argument("--seed", type=int, default=42)
+        p.add_argument("--out", default=None, help="arquivo JSON de saída (padrão: stdout)")
+        p.add_argument("--keep", action="store_true", help="não apaga a pasta temporária")
+        a = p.parse_args(argv)
+        return cls(variant, app_dir, a.items, users=a.users, frames=a.frames, ops=a.ops, budget=a.budget,
+                   seed=a.seed, out=a.out, keep=a.keep)
+
+    # ----- Ambiente -----
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        self._cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp(prefix=f"bench_{self.variant.replace('/', '_')}_")
+        os.chdir(self.workdir)
+        if str(self.app_dir) not in sys.path:
+            sys.path.insert(0, str(self.app_dir))
+        self._per_step_rss = _reset_hwm()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        os.chdir(self._cwd)
+        if not self.keep:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+        if exc_type is not None and issubclass(exc_type, Exception):
+            self.steps.append({"name": "<fatal>", "status": "error", "error": f"{exc_type.__name__}: {exc}",
+                               "traceback": traceback.format_exception(exc_type, exc, tb)[-3:]})
+            return True  # o relatório sai mesmo assim
+        return False
+
+    def prepare(self, fn, *args):
+        """Roda fn(*args) num processo filho (fork): gerar os dados não infla o pico de RSS do app."""
+        t0 = time.perf_counter()
+        ctx = multiprocessing.get_context("fork")
+        proc = ctx.Process(target=fn, args=args)
+        proc.start()
+        proc.join()
+        if proc.exitcode != 0:
+            raise RuntimeError(f"preparo dos dados falhou (exit {proc.exitcode})")
+        return round(time.perf_counter() - t0, 3)
+
+    # ----- Passos -----
+    def _begin(self):
+        if self._per_step_rss:
+            _reset_hwm()
+
+    def _record(self, name, kind, timings, status="ok", error=None, **extra):
+        step = {"name": name, "kind": kind, "n": len(timings), "status": status}
+        if timings:
+            step.update(percentiles(timings))
+            step["total_s"] = round(sum(timings) / 1000, 3)
+        if self._per_step_rss:
+            hwm = _read_hwm_kb()
+            if hwm is not None:
+                step["rss_peak_mb"] = round(hwm / 1024, 1)
+        if error:
+            step["error"] = error
+        step.update(extra)
+        self.steps.append(step)
+        return step
+
+    def repeat(self, name, fn, n=None, kind="op", args_for=None, **extra):
+        """Chama fn() (ou fn(*args_for(i))) até n vezes, dentro do orçamento.
+
+        args_for pode levantar StopIteration para encerrar antes (sem erro).
+        """
+        n = self.ops if n is None else n
+        timings, status, error = [], "ok", None
+        self._begin()
+        end = time.perf_counter() + self.budget
+        try:
+            with deadline(self.budget):
+                for i in range(n):
+                    try:
+                        args = args_for(i) if args_for else ()
+                    except StopIteration:  # acabaram os casos (ex.: limites de empréstimo)
+                        break
+                    t0 = time.perf_counter()
+                    fn(*args)
+                    timings.append((time.perf_counter() - t0) * 1000)
+                    if time.perf_counter() >= end and i + 1 < n:
+                        status = "truncated"
+                        break
+        except BudgetExceeded:
+            status = "truncated" if timings else "timeout"
+        except Exception as e:
+            if time.perf_counter() >= end:  # alarme engolido por um "except:" do app
+                status = "truncated" if timings else "timeout"
+            else:
+                status, error = "error", f"{type(e).__name__}: {e}"
+        self._record(name, kind, timings, status, error, requested=n, **extra)
+        return timings
+
+    def once(self, name, fn, kind="io", **extra):
+        """Mede uma única chamada e devolve o resultado de fn() (None se falhar/estourar)."""
+        result = []
+        self.repeat(name, lambda: result.append(fn()), n=1, kind=kind, **extra)
+        return result[0] if result else None
+
+    def frames(self, name, draw, n=None, flip=True, **extra):
+        """Quadros de uma tela: draw() + display.flip(), como no loop do app."""
+        import pygame
+
+        def frame():
+            draw()
+            if flip:
+                pygame.display.flip()
+            pygame.event.pump()
+
+        return self.repeat(name, frame, n=self.n_frames if n is None else n, kind="frame", **extra)
+
+    def scripted_loop(self, name, run, script, n=None, **extra):
+        """Roda o loop principal do próprio app (run()) e mede o intervalo entre display.flip/update.
+
+        script(frame_no) é chamado a cada quadro para postar eventos (cliques, teclas);
+        depois de n quadros (ou do orçamento) o harness posta QUIT.
+        """
+        import pygame
+        n = self.n_frames if n is None else n
+        timings = []
+        state = {"last": None, "frame": 0, "quit": False}
+        real_flip, real_update = pygame.display.flip, pygame.display.update
+        end = time.perf_counter() + self.budget
+
+        def on_frame():
+            now = time.perf_counter()
+            if state["last"] is not None and not state["quit"]:
+                timings.append((now - state["last"]) * 1000)
+            state["frame"] += 1
+            if not state["quit"]:
+                if state["frame"] > n or now >= end:
+                    state["quit"] = True
+                    pygame.event.post(pygame.event.Event(pygame.QUIT))
+                else:
+                    script(state["frame"])
+            state["last"] = time.perf_counter()
+
+        def flip():
+            real_flip()
+            on_frame()
+
+        def update(*args):
+            real_update(*args)
+            on_frame()
+
+        status, error = "ok", None
+        self._begin()
+        pygame.display.flip, pygame.display.update = flip, update
+        try:
+            with uncapped_clock(), deadline(self.budget * 2):
+                run()
+            if len(timings) < n:
+                status = "truncated"
+        except BudgetExceeded:
+            status = "truncated" if timings else "timeout"
+        except SystemExit:
+            pass
+        except Exception as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+        finally:
+            pygame.display.flip, pygame.display.update = real_flip, real_update
+        # a contagem começa no 1º flip: a abertura do app (carregar dados, fontes) fica fora
+        return self._record(name, "frame", timings, status, error, requested=n, **extra)
+
+    def note(self, name, status="skipped", reason=""):
+        """Passo que a variante não tem (ex.: sem persistência) — aparece no relatório como tal."""
+        self.steps.append({"name": name, "kind": "note", "status": status, "reason": reason})
+
+    # ----- Relatório -----
+    def report(self):
+        import pygame
+        return {
+            "variant": self.variant,
+            "items": self.items,
+            "users": self.users,
+            "frames": self.n_frames,
+            "ops": self.ops,
+            "budget_s": self.budget,
+            "seed": self.seed,
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "video_driver": os.environ.get("SDL_VIDEODRIVER"),
+            "wall_s": round(time.perf_counter() - self._t0, 3) if self._t0 else None,
+            "peak_rss_mb": peak_rss_mb(),
+            "steps": self.steps,
+        }
+
+    def finish(self):
+        text = json.dumps(self.report(), ensure_ascii=False)
+        if self.out:
+            with open(self.out, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        else:
+            sys.stdout.write(text + "\n")
+            sys.stdout.flush()
+        # threads de gravação dos apps (daemon) não podem segurar a saída
+        os._exit(0)
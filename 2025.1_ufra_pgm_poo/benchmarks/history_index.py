@@ -0,0 +1,133 @@
+# history_index.py — histórico por usuário/item (history.py) x varrer as transações
+#
+# Uso:
+#   python benchmarks/history_index.py                          # 100k e 1M de transações
+#   python benchmarks/history_index.py --sizes 100000 --out r.json
+#
+# n transações (empréstimo seguido de devolução, 5% dos itens ainda emprestados
+# no fim) entre --users usuários e n/4 itens, como Transaction do nap2/04:
+#   - montar: TransactionHistory.rebuild (o que o load faz);
+#   - consultas, mediana de 200 alvos aleatórios: últimos 20 eventos de um
+#     usuário, empréstimos do usuário e com quem o item está, varrendo a lista
+#     inteira (como era) x pelo histórico;
+#   - conferência: as duas formas dão as mesmas respostas (sai com código 1 se não).
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from operator import attrgetter
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent
+sys.path.insert(0, str(REPO / "nap2" / "04"))
+sys.path.append(str(REPO))  # biblio_comum
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from biblio_comum import ulid  # noqa: E402
+from BiblioManager import Transaction  # noqa: E402
+from biblio_comum.history import TransactionHistory  # noqa: E402
+
+LAST = 20
+
+
+def make_transactions(n, n_users, seed):
+    rnd = random.Random(seed)
+    n_items = max(1, n // 4)
+    ids = ulid.reserve(n)
+    txs, holder = [], {}
+    for k in range(n):
+        item = f"i{rnd.randrange(n_items)}"
+        if item in holder and rnd.random() > 0.05:
+            txs.append(Transaction(ids[k], "return", holder.pop(item), item))
+        elif item not in holder:
+            user = f"u{rnd.randrange(n_users)}"
+            holder[item] = user
+            txs.append(Transaction(ids[k], "loan", user, item))
+        else:
+            txs.append(Transaction(ids[k], "reservation", f"u{rnd.randrange(n_users)}", item))
+    return txs, n_items
+
+
+def scan_last(txs, user):
+    out = []
+    for tx in reversed(txs):
+        if tx.user_id == user:
+            out.append(tx)
+            if len(out) == LAST:
+                break
+    return out
+
+
+def scan_loans(txs, user):
+    return sum(1 for tx in txs if tx.user_id == user and tx.tx_type == "loan")
+
+
+def scan_borrower(txs, item):
+    for tx in reversed(txs):
+        if tx.item_id == item and tx.tx_type in ("loan", "return"):
+            return tx.user_id if tx.tx_type == "loan" else None
+    return None
+
+
+def median_ms(fn, targets):
+    times, answers = [], []
+    for t in targets:
+        t0 = time.perf_counter()
+        answers.append(fn(t))
+        times.append(time.perf_counter() - t0)
+    return round(1000 * statistics.median(times), 4), answers
+
+
+def run(n, n_users, seed):
+    txs, n_items = make_transactions(n, n_users, seed)
+    history = TransactionHistory(attrgetter("user_id"), attrgetter("item_id"), attrgetter("tx_type"))
+    t0 = time.perf_counter()
+    history.rebuild(txs)
+    out = {"n": n, "users": n_users, "items": n_items, "rebuild_s": round(time.perf_counter() - t0, 3)}
+
+    rnd = random.Random(seed + 1)
+    users = [f"u{rnd.randrange(n_users)}" for _ in range(200)]
+    items = [f"i{rnd.randrange(n_items)}" for _ in range(200)]
+    same = True
+    for name, scan, fast, targets in (
+            ("last", lambda u: scan_last(txs, u), lambda u: history.last(LAST, user=u), users),
+            ("loans", lambda u: scan_loans(txs, u), lambda u: history.loan_count(user=u), users),
+            ("borrower", lambda i: scan_borrower(txs, i), history.current_borrower, items)):
+        out[f"{name}_scan_ms"], a = median_ms(scan, targets)
+        out[f"{name}_index_ms"], b = median_ms(fast, targets)
+        same &= a == b
+    out["same"] = same
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description="Histórico por usuário/item x varrer as transações (nap2/04)")
+    p.add_argument("--sizes", default="100000,1000000", help="números de transações")
+    p.add_argument("--users", type=int, default=5000)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", default=None, help="arquivo JSON (padrão: só a tabela)")
+    args = p.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    runs, failed = [], False
+    print(f"{'n':>9s} {'montar s':>9s} {'últimos 20 ms':>20s} {'empréstimos ms':>20s} {'com quem ms':>20s}")
+    for n in sizes:
+        r = run(n, args.users, args.seed)
+        cols = " ".join(f"{r[k + '_scan_ms']:>9.3f} → {r[k + '_index_ms']:>7.4f}" for k in ("last", "loans", "borrower"))
+        print(f"{n:>9d} {r['rebuild_s']:>9.3f} {cols}")
+        failed |= not r["same"]
+        runs.append(r)
+    if failed:
+        print("histórico difere da varredura", file=sys.stderr)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "runs": runs}, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# ids_range.py — ids ordenáveis pelo tempo (ulid.py) e consultas por período (nap2/04)
+#
+# Uso:
+#   python benchmarks/ids_range.py                          # 100k e 1M de transações
+#   python benchmarks/ids_range.py --sizes 100000 --out r.json
+#
+# Três medidas por tamanho n:
+#   - gerar n ids: uuid4 (gen_id antigo do nap2/04), ulid.new_id() um por vez e
+#     ulid.reserve(n) em bloco; e quantos ids repetidos o esquema antigo do
+#     t07_01 (prefixo + random.randint(1000, 9999)) daria;
+#   - consulta por período (últimos 7 dias de transações espalhadas por 365
+#     dias): varrer a lista comparando `when`, como era, x
+#     TransactionStore.between (duas buscas binárias), mediana de 20;
+#   - conferência: as duas consultas devolvem as mesmas transações (sai com
+#     código 1 se não).
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent
+sys.path.insert(0, str(REPO / "nap2" / "04"))
+sys.path.append(str(REPO))  # biblio_comum
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from biblio_comum import ulid  # noqa: E402
+from BiblioManager import Transaction, TransactionStore  # noqa: E402
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - t0
+
+
+def build_store(n, seed):
+    # n transações ao longo de um ano, em ordem de criação (ids com o tempo de cada uma)
+    rnd = random.Random(seed)
+    end = datetime.now()
+    start = end - timedelta(days=365)
+    step = (end - start) / n
+    store = TransactionStore()
+    txs = []
+    for k in range(n):
+        when = start + step * k
+        prefix = ulid.time_prefix(when)
+        tx_id = prefix + "".join(rnd.choice(ulid.ALPHABET) for _ in range(16))
+        txs.append(Transaction(tx_id, "loan" if k % 2 == 0 else "return", f"u{k % 1000}", f"i{k}", when.isoformat()))
+    store.extend(txs)
+    return store, txs
+
+
+def run(n, seed):
+    out = {"n": n}
+    _, out["uuid4_s"] = timed(lambda: [str(uuid.uuid4()) for _ in range(n)])
+    _, out["ulid_new_s"] = timed(lambda: [ulid.new_id() for _ in range(n)])
+    ids, out["ulid_reserve_s"] = timed(lambda: ulid.reserve(n))
+    out["ulid_sorted"] = ids == sorted(ids) and len(set(ids)) == n
+    rnd = random.Random(seed)
+    old = [f"loan_{rnd.randint(1000, 9999)}" for _ in range(n)]
+    out["old_t07_duplicates"] = n - len(set(old))
+
+    store, txs = build_store(n, seed)
+    since = datetime.now() - timedelta(days=7)
+    since_iso = since.isoformat()
+    scans, searches = [], []
+    for _ in range(20):
+        scan, t = timed(lambda: [tx for tx in txs if tx.when >= since_iso])
+        scans.append(t)
+        found, t = timed(lambda: store.between(since))
+        searches.append(t)
+    out["range_n"] = len(found)
+    out["scan_ms"] = round(1000 * statistics.median(scans), 3)
+    out["bisect_ms"] = round(1000 * statistics.median(searches), 3)
+    out["same"] = [tx.id for tx in scan] == [tx.id for tx in found]
+    for key in ("uuid4_s", "ulid_new_s", "ulid_reserve_s"):
+        out[key] = round(out[key], 3)
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description="Ids ordenáveis pelo tempo e consultas por período (nap2/04)")
+    p.add_argument("--sizes", default="100000,1000000", help="números de transações")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", default=None, help="arquivo JSON (padrão: só a tabela)")
+    args = p.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    runs, failed = [], False
+    print(f"{'n':>9s} {'uuid4 s':>8s} {'ulid s':>8s} {'bloco s':>8s} {'repet. antigo':>13s} "
+          f"{'7 dias':>7s} {'varrer ms':>10s} {'busca ms':>9s}")
+    for n in sizes:
+        r = run(n, args.seed)
+        print(f"{n:>9d} {r['uuid4_s']:>8.3f} {r['ulid_new_s']:>8.3f} {r['ulid_reserve_s']:>8.3f} "
+              f"{r['old_t07_duplicates']:>13d} {r['range_n']:>7d} {r['scan_ms']:>10.3f} {r['bisect_ms']:>9.3f}")
+        failed |= not (r["same"] and r["ulid_sorted"])
+        runs.append(r)
+    if failed:
+        print("consulta por busca binária difere da varredura (ou ids fora de ordem)", file=sys.stderr)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "runs": runs}, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# load_nap2_04.py — tempo de BiblioManager.load (nap2/04): if/elif por tipo x registro de tipos
+#
+# Uso:
+#   python benchmarks/load_nap2_04.py                              # 500k entidades
+#   python benchmarks/load_nap2_04.py --entities 100000 --repeat 5 --out r.json
+#
+# Gera um bibliomanager.json com --entities entidades (80% itens, 10% usuários,
+# 10% transações; 5% dos itens emprestados, concentrados em poucos usuários
+# com listas grandes) e mede a carga completa (json.load + montar os objetos):
+#   - antes: json.load + o load antigo (cópia abaixo), um if/elif por registro
+#     e a lista de emprestados reatribuída uma vez por item emprestado;
+#   - depois: BiblioManager.load, que monta cada lista pelo registro de tipos.
+# A parte de montar é a carga menos o json.load (medido à parte, igual nos
+# dois). Mediana de --repeat rodadas. Confere que serialize() de tudo é igual nos dois
+# e sai com código 1 se não for.
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent
+sys.path.insert(0, str(REPO / "nap2" / "04"))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import BiblioManager as bm  # noqa: E402
+
+
+def make_data(n, seed):
+    rnd = random.Random(seed)
+
+    def new_id():
+        return str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+
+    n_users, n_tx = max(1, n // 10), max(1, n // 10)
+    users = {}
+    for u in range(n_users):
+        uid = new_id()
+        users[uid] = {"id": uid, "name": f"Usuario {u:06d}", "email": f"u{u}@ufra.edu.br",
+                      "user_type": rnd.choice(["student", "professor", "visitor"]), "borrowed": []}
+    heavy = list(users.values())[:max(1, n_users // 100)]   # 1% dos usuários com quase todos os empréstimos
+    items = {}
+    for i in range(n - n_users - n_tx):
+        iid = new_id()
+        typ = ("Book", "Magazine", "DVD")[i % 3]
+        it = {"id": iid, "name": f"{typ} {i:07d}", "status": "available", "type": typ}
+        if typ == "Book":
+            it.update(author=f"Autor {i % 997}", isbn=str(9780000000000 + i), year=str(1950 + i % 75))
+        elif typ == "Magazine":
+            it["issue"] = f"Ed. {i % 120}"
+        else:
+            it.update(director=f"Diretor {i % 311}", duration=f"{60 + i % 120}")
+        if i % 20 == 0:
+            it["status"] = "borrowed"
+            rnd.choice(heavy)["borrowed"].append(iid)
+        items[iid] = it
+    item_ids, user_ids = list(items), list(users)
+    transactions = [{"id": new_id(), "type": "loan" if t % 2 == 0 else "return", "user_id": user_ids[t % n_users],
+                     "item_id": item_ids[t % len(item_ids)], "when": f"2025-09-{1 + t % 28:02d}T10:00:00"}
+                    for t in range(n_tx)]
+    return {"log_seq": 0, "items": items, "users": users, "transactions": transactions}
+
+
+def legacy_load(d):
+    # BiblioManager.load como era antes do registro de tipos
+    items, users, transactions = {}, {}, []
+    for k, v in d.get("items", {}).items():
+        t = v.get("type")
+        if t == "Book":
+            items[k] = bm.Book(v["id"], v["name"], v.get("author", ""), v.get("isbn", ""), v.get("year", ""),
+                               v.get("status", "available"))
+        elif t == "Magazine":
+            items[k] = bm.Magazine(v["id"], v["name"], v.get("issue", ""), v.get("status", "available"))
+        elif t == "DVD":
+            items[k] = bm.DVD(v["id"], v["name"], v.get("director", ""), v.get("duration", ""),
+                              v.get("status", "available"))
+    for k, v in d.get("users", {}).items():
+        typ = v.get("user_type", "visitor")
+        if typ == "student":
+            u = bm.Student(v["id"], v["name"], v.get("email", ""))
+        elif typ == "professor":
+            u = bm.Professor(v["id"], v["name"], v.get("email", ""))
+        else:
+            u = bm.Visitor(v["id"], v["name"], v.get("email", ""))
+        for bid in v.get("borrowed", []):
+            u._User__borrowed = v.get("borrowed", [])
+        users[k] = u
+    for tx in d.get("transactions", []):
+        transactions.append(bm.Transaction(tx["id"], tx["type"], tx["user_id"], tx["item_id"], tx.get("when")))
+    return items, users, transactions
+
+
+def registry_load():
+    # o BiblioManager.load de verdade (DATA_FILE na pasta atual), sem abrir a janela: só os
+    # atributos que ele usa
+    app = bm.BiblioManager.__new__(bm.BiblioManager)
+    app.items, app.users, app.transactions = {}, {}, []
+    app.history = bm.TransactionHistory(bm.attrgetter("user_id"), bm.attrgetter("item_id"), bm.attrgetter("tx_type"))
+    app._log = bm.EventLog(bm.LOG_FILE)
+    app.load()
+    return app.items, app.users, app.transactions
+
+
+def digest(loaded):
+    items, users, transactions = loaded
+    return ([v.serialize() for v in items.values()], [v.serialize() for v in users.values()],
+            [t.serialize() for t in transactions])
+
+
+def median_time(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        result = None
+        gc.collect()   # cada rodada começa sem o lixo (e sem os objetos) da anterior
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), result
+
+
+def main():
+    p = argparse.ArgumentParser(description="BiblioManager.load (nap2/04): if/elif x registro de tipos")
+    p.add_argument("--entities", type=int, default=500_000, help="itens + usuários + transações")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", default=None, help="arquivo JSON (padrão: só a tabela)")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        path = bm.DATA_FILE
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(make_data(args.entities, args.seed), f, ensure_ascii=False, indent=2)
+        size = os.path.getsize(path)
+
+        def parse():
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+
+        parse_s, _ = median_time(parse, args.repeat)
+        legacy_s, legacy = median_time(lambda: legacy_load(parse()), args.repeat)
+        legacy = digest(legacy)   # só o resumo: os objetos antigos não ficam vivos durante a outra medição
+        total_s, loaded = median_time(registry_load, args.repeat)
+        same = legacy == digest(loaded)
+        os.chdir(HERE)
+
+    counts = {"items": len(loaded[0]), "users": len(loaded[1]), "transactions": len(loaded[2]),
+              "borrowed": sum(len(u.borrowed) for u in loaded[1].values())}
+    old_build, new_build = legacy_s - parse_s, total_s - parse_s
+    print(f"{args.entities} entidades ({counts['items']} itens, {counts['users']} usuários, "
+          f"{counts['transactions']} transações), {size / 1e6:.1f} MB")
+    print(f"{'':20s} {'carga s':>8s} {'montar s':>9s}")
+    print(f"{'json.load':20s} {parse_s:>8.3f}")
+    print(f"{'antes (if/elif)':20s} {legacy_s:>8.3f} {old_build:>9.3f}")
+    print(f"{'depois (registro)':20s} {total_s:>8.3f} {new_build:>9.3f}")
+    print(f"carga {legacy_s / total_s:.2f}x, montar {old_build / new_build:.2f}x mais rápido")
+    print(f"serialização {'idêntica' if same else 'DIFERENTE'}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "entities": args.entities, "bytes": size,
+                       "counts": counts, "repeat": args.repeat, "parse_s": round(parse_s, 3),
+                       "legacy_load_s": round(legacy_s, 3), "registry_load_s": round(total_s, 3),
+                       "legacy_build_s": round(old_build, 3), "registry_build_s": round(new_build, 3), "same_serialization": same},
+                      f, ensure_ascii=False, indent=2)
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
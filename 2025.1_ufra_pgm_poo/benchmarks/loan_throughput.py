@@ -0,0 +1,129 @@
+# loan_throughput.py — empréstimos/devoluções por segundo em nap2/01: listas x Repositorio
+#
+# Uso:
+#   python benchmarks/loan_throughput.py                         # 10k, 100k e 1M de itens
+#   python benchmarks/loan_throughput.py --sizes 10000,100000 --ops 5000 --out r.json
+#
+# Para cada tamanho, monta o mesmo catálogo (n itens, n/10 usuários) duas vezes:
+# em listas comuns (achar_por_id percorre a lista) e em Repositorio (busca pelo
+# id no dicionário). Cada operação é um processar_emprestimo + processar_devolucao
+# do servicos.py com usuário e item sorteados, então cada uma procura usuário e
+# item duas vezes. Com listas o custo cresce com n (busca linear); --budget
+# limita o tempo de cada caso, e as operações/s são medidas sobre o que rodou.
+#
+# Depois das operações, mede também os relatórios (relatorio_disponiveis e
+# relatorio_emprestados, mediana de 20): nas listas, filtro da lista inteira;
+# no Repositorio(por_status=True), os status guardados. Confere que saem na
+# ordem da lista. "resumo" é o que a tela de empréstimos usa, só as duas
+# quantidades (contar_disponiveis + contar_emprestados). --verify roda o caso
+# do Repositorio com a verificação dos relatórios ligada (BIBLIO_VERIFICAR):
+# cada relatório confere os status guardados com uma varredura completa.
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent
+sys.path.insert(0, str(REPO / "nap2" / "01"))
+
+from dominio import Aluno, Dvd, Livro, Professor, Revista, Visitante  # noqa: E402
+from repositorio import Repositorio  # noqa: E402
+import servicos  # noqa: E402
+from servicos import (contar_disponiveis, contar_emprestados, processar_devolucao, processar_emprestimo,  # noqa: E402
+                      relatorio_disponiveis, relatorio_emprestados)
+
+
+def build(n_items, seed):
+    rnd = random.Random(seed)
+    usuarios = [rnd.choice([Aluno, Professor, Visitante])(f"Usuario {u:06d}", id_=f"u{u}")
+                for u in range(max(1, n_items // 10))]
+    itens = []
+    for i in range(n_items):
+        kind = rnd.choice([Livro, Revista, Dvd])
+        arg = {Livro: f"Autor {i % 997}", Revista: f"Ed. {i % 120}", Dvd: 60 + i % 120}[kind]
+        # 5% já emprestados (os relatórios de emprestados não ficam vazios); a carga não mexe neles
+        itens.append(kind(f"{kind.__name__} {i:07d}", arg, id_=f"i{i}", status="emprestado" if i % 20 == 0 else "disponivel"))
+    return usuarios, itens
+
+
+def run_case(n_items, keyed, args):
+    usuarios, itens = build(n_items, args.seed)
+    if keyed:
+        usuarios, itens = Repositorio(usuarios), Repositorio(itens, por_status=True)
+    transacoes = []
+    rnd = random.Random(args.seed + 1)
+    n_users = len(usuarios)
+    done = 0
+    t0 = time.perf_counter()
+    deadline = t0 + args.budget
+    for k in range(args.ops):
+        u = f"u{rnd.randrange(n_users)}"
+        i = rnd.randrange(n_items)
+        i = f"i{i + 1 if i % 20 == 0 and i + 1 < n_items else i}"
+        processar_emprestimo(usuarios, itens, transacoes, u, i)
+        processar_devolucao(usuarios, itens, transacoes, u, i)
+        done += 1
+        if (k & 63) == 63 and time.perf_counter() > deadline:
+            break
+    elapsed = time.perf_counter() - t0
+    # cada operação acha usuário e item nas duas chamadas: duas transações registradas
+    assert len(transacoes) == 2 * done, "usuário ou item não encontrado"
+    servicos.VERIFICAR_RELATORIOS = keyed and args.verify
+    reports = {}
+    for name, fn, status in (("disponiveis", relatorio_disponiveis, "disponivel"),
+                             ("emprestados", relatorio_emprestados, "emprestado")):
+        times = []
+        for _ in range(20):
+            r0 = time.perf_counter()
+            rows = fn(itens)
+            times.append(time.perf_counter() - r0)
+        assert rows == [it for it in itens if it.status == status], f"relatório {name} fora da ordem da lista"
+        reports[name] = {"n": len(rows), "ms": round(1000 * statistics.median(times), 3)}
+    times = []
+    for _ in range(20):
+        r0 = time.perf_counter()
+        contar_disponiveis(itens), contar_emprestados(itens)
+        times.append(time.perf_counter() - r0)
+    reports["resumo"] = {"ms": round(1000 * statistics.median(times), 4)}
+    servicos.VERIFICAR_RELATORIOS = False
+    return {"items": n_items, "mode": "Repositorio" if keyed else "listas", "ops": done,
+            "seconds": round(elapsed, 3), "ops_per_s": round(done / elapsed) if elapsed else None,
+            "us_per_op": round(1e6 * elapsed / done, 1) if done else None, "reports": reports}
+
+
+def main():
+    p = argparse.ArgumentParser(description="Vazão de empréstimos em nap2/01: listas x Repositorio")
+    p.add_argument("--sizes", default="10000,100000,1000000", help="números de itens")
+    p.add_argument("--ops", type=int, default=20000, help="empréstimo+devolução por caso")
+    p.add_argument("--budget", type=float, default=20.0, help="tempo máximo por caso (s)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--verify", action="store_true", help="confere cada relatório com uma varredura completa")
+    p.add_argument("--out", default=None, help="arquivo JSON (padrão: só a tabela)")
+    args = p.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    runs = []
+    print(f"{'itens':>9s} {'modo':12s} {'ops':>7s} {'ops/s':>9s} {'µs/op':>9s} {'disp. ms':>9s} {'empr. ms':>9s} "
+          f"{'resumo ms':>10s}")
+    for n in sizes:
+        cases = [run_case(n, keyed, args) for keyed in (False, True)]
+        for c in cases:
+            r = c["reports"]
+            print(f"{n:>9d} {c['mode']:12s} {c['ops']:>7d} {c['ops_per_s']:>9d} {c['us_per_op']:>9.1f} "
+                  f"{r['disponiveis']['ms']:>9.3f} {r['emprestados']['ms']:>9.3f} {r['resumo']['ms']:>10.4f}")
+        old, new = cases
+        print(f"{'':9s} {new['ops_per_s'] / old['ops_per_s']:.0f}x mais rápido")
+        runs.extend(cases)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "ops": args.ops, "budget_s": args.budget,
+                       "runs": runs}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+# memory_entities.py — bytes por entidade: representação antiga (__dict__) x compacta (__slots__)
+#
+# Uso:
+#   python benchmarks/memory_entities.py                       # nap2/03, nap2/02 e t07_01, 1M de itens
+#   python benchmarks/memory_entities.py --items 100000 --variants nap2_03 --out mem.json
+#
+# Para cada variante, roda dois processos: BIBLIO_COMPACT=0 (como era) e
+# BIBLIO_COMPACT=1 (compact.py). Cada um monta --items itens, 1% disso em
+# usuários e 10% em transações a partir de registros JSON (um json.loads por
+# registro, como na leitura do arquivo: o status de cada item chega como uma
+# str nova) e mede com tracemalloc quanto ficou alocado por entidade — o
+# objeto, seus atributos, datas e strings próprias.
+#
+# Também confere que nada mudou por fora: o hash de serialize()/serializar()
+# de todas as entidades tem que ser o mesmo nos dois modos (em t07_01 e nap2/02
+# a data da transação é a hora atual e fica fora do hash). Sai com código 1 se
+# algum hash diferir.
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent
+VARIANTS = {"nap2_03": "nap2/03", "nap2_02": "nap2/02", "t07_01": "t07_01"}
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+
+# ----- Registros sintéticos (formato de cada variante) e construtores -----
+def records_nap2_03(n_items, n_users, n_tx):
+    items = []
+    for i in range(n_items):
+        d = {"id": i + 1, "status": "emprestado" if i % 20 == 0 else "disponivel"}
+        typ = ("Livro", "Revista", "DVD")[i % 3]
+        if typ == "Livro":
+            d.update(tipo=typ, titulo=f"Livro {i:07d}", autor=f"Autor {i % 997}", isbn=str(9780000000000 + i), ano=1950 + i % 75)
+        elif typ == "Revista":
+            d.update(tipo=typ, titulo=f"Revista {i:07d}", edicao=f"Ed. {i % 120}", data="2025-01")
+        else:
+            d.update(tipo=typ, titulo=f"DVD {i:07d}", diretor=f"Diretor {i % 311}", duracao=60 + i % 120)
+        items.append(d)
+    users = []
+    for u in range(n_users):
+        typ = ("Estudante", "Professor", "Visitante")[u % 3]
+        d = {"tipo": typ, "id": n_items + u + 1, "nome": f"Usuario {u:06d}", "email": f"u{u}@ufra.edu.br",
+             "itens_emprestados": [k * 20 + 1 for k in range(u % 3)]}
+        d.update({"Estudante": {"id_estudante": f"EST{u:06d}"}, "Professor": {"departamento": f"Depto {u % 12}"},
+                  "Visitante": {"telefone": f"(91) 9{u:04d}-0000"}}[typ])
+        users.append(d)
+    txs = []
+    for t in range(n_tx):
+        d = {"tipo": "Emprestimo" if t % 2 == 0 else "Devolucao", "id": n_items + n_users + t + 1,
+             "id_usuario": n_items + t % max(n_users, 1) + 1, "id_item": t % n_items + 1,
+             "data": f"2025-03-{1 + t % 28:02d}T10:{t % 60:02d}:00.{t % 1000000:06d}"}
+        if d["tipo"] == "Emprestimo":
+            d["data_vencimento"] = f"2025-04-{1 + t % 28:02d}T10:{t % 60:02d}:00"
+        txs.append(d)
+    return items, users, txs
+
+
+def builders_nap2_03():
+    from bibliomanager import GerenciadorBiblioteca
+    g = GerenciadorBiblioteca()
+    return g._criar_item, g._criar_usuario, g._criar_transacao, lambda e: e.serializar(), ()
+
+
+def records_t07_01(n_items, n_users, n_tx):
+    items = [{"id": f"item_{i}", "name": f"Livro {i:07d}", "type": "book" if i % 2 else "magazine",
+              "author": f"Autor {i % 997}", "isbn": str(9780000000000 + i), "edition": f"Ed. {i % 120}",
+              "status": "borrowed" if i % 20 == 0 else "available"} for i in range(n_items)]
+    users = [{"id": f"user_{u}", "name": f"Usuario {u:06d}", "user_type": "student" if u % 2 else "professor",
+              "status": "active"} for u in range(n_users)]
+    txs = [{"id": f"loan_{t}", "user_id": f"user_{t % max(n_users, 1)}", "item_id": f"item_{t % n_items}",
+            "status": "completed"} for t in range(n_tx)]
+    return items, users, txs
+
+
+def builders_t07_01():
+    from entities import Book, Loan, Magazine, Professor, Student
+    items, users = {}, {}
+
+    def item(d):
+        it = (Book(d["id"], d["name"], d["author"], d["isbn"]) if d["type"] == "book"
+              else Magazine(d["id"], d["name"], d["edition"]))
+        it.update_status(d["status"])
+        items[d["id"]] = it
+        return it
+
+    def user(d):
+        u = (Student if d["user_type"] == "student" else Professor)(d["id"], d["name"])
+        u.update_status(d["status"])
+        users[d["id"]] = u
+        return u
+
+    def tx(d):
+        t = Loan(d["id"], users[d["user_id"]], items[d["item_id"]])
+        t.update_status(d["status"])
+        return t
+
+    return item, user, tx, lambda e: e.serialize(), ("date",)
+
+
+def records_nap2_02(n_items, n_users, n_tx):
+    items = [{"type": ("Book", "Magazine", "DVD")[i % 3], "name": f"Item {i:07d}", "author": f"Autor {i % 997}",
+              "isbn": str(9780000000000 + i), "edition": f"Ed. {i % 120}", "duration": 60 + i % 120,
+              "status": "borrowed" if i % 20 == 0 else "available"} for i in range(n_items)]
+    users = [{"type": ("Student", "Professor", "Visitor")[u % 3], "name": f"Usuario {u:06d}"} for u in range(n_users)]
+    txs = [{"type": ("Loan", "Return", "Reservation")[t % 3], "name": f"Transacao {t}"} for t in range(n_tx)]
+    return items, users, txs
+
+
+def builders_nap2_02():
+    from models import items as mi, transactions as mt, users as mu
+
+    def item(d):
+        it = (mi.Book(d["name"], d["author"], d["isbn"]) if d["type"] == "Book"
+              else mi.Magazine(d["name"], d["edition"]) if d["type"] == "Magazine"
+              else mi.DVD(d["name"], d["duration"]))
+        it.status = d["status"]
+        return it
+
+    return (item, lambda d: getattr(mu, d["type"])(d["name"]), lambda d: getattr(mt, d["type"])(d["name"]),
+            lambda e: e.serialize(), ())
+
+
+RECORDS = {"nap2_03": records_nap2_03, "t07_01": records_t07_01, "nap2_02": records_nap2_02}
+BUILDERS = {"nap2_03": builders_nap2_03, "t07_01": builders_t07_01, "nap2_02": builders_nap2_02}
+
+
+def child(args):
+    app_dir = REPO / VARIANTS[args.child]
+    sys.path.insert(0, str(app_dir))
+    n_items = args.items
+    groups = dict(zip(("itens", "usuarios", "transacoes"),
+                      RECORDS[args.child](n_items, max(1, n_items // 100), max(1, n_items // 10))))
+    lines = {g: [json.dumps(r, ensure_ascii=False) for r in recs] for g, recs in groups.items()}
+    del groups
+    build_item, build_user, build_tx, serialize, volatile = BUILDERS[args.child]()
+    build = {"itens": build_item, "usuarios": build_user, "transacoes": build_tx}
+
+    result = {"variant": VARIANTS[args.child], "compact": os.environ.get("BIBLIO_COMPACT"), "groups": {}}
+    digest = hashlib.sha256()
+    keep = []
+    tracemalloc.start()
+    for group, recs in lines.items():
+        out = [None] * len(recs)  # lista criada antes da medição: só as entidades entram na conta
+        fn, loads = build[group], json.loads
+        t0 = time.perf_counter()
+        before = tracemalloc.get_traced_memory()[0]
+        for k, line in enumerate(recs):
+            out[k] = fn(loads(line))
+        after = tracemalloc.get_traced_memory()[0]
+        result["groups"][group] = {"n": len(recs), "bytes_per_entity": round((after - before) / len(recs), 1),
+                                   "build_s": round(time.perf_counter() - t0, 2)}
+        keep.append(out)
+    tracemalloc.stop()
+    sample = keep[0][0]
+    result["example"] = {"class": type(sample).__name__, "has_dict": hasattr(sample, "__dict__"),
+                         "getsizeof": sys.getsizeof(sample)}
+    for out in keep:
+        for e in out:
+            d = serialize(e)
+            for key in volatile:
+                d.pop(key, None)
+            digest.update(json.dumps(d, sort_keys=True, ensure_ascii=False).encode())
+    result["serialized_sha256"] = digest.hexdigest()
+    sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+    os._exit(0)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Memória por entidade: __dict__ x __slots__")
+    p.add_argument("--variants", default=",".join(VARIANTS), help=f"padrão: {','.join(VARIANTS)}")
+    p.add_argument("--items", type=int, default=1_000_000)
+    p.add_argument("--out", default=None, help="arquivo JSON (padrão: só a tabela)")
+    p.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = p.parse_args()
+    if args.child:
+        return child(args)
+
+    variants = [v.strip().replace("/", "_") for v in args.variants.split(",") if v.strip()]
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        p.error(f"variantes desconhecidas: {', '.join(unknown)}")
+    runs, failed = [], False
+    print(f"{'variante':9s} {'grupo':11s} {'n':>9s} {'antes B':>9s} {'depois B':>9s} {'redução':>8s}")
+    for v in variants:
+        modes = {}
+        for compact in ("0", "1"):
+            env = dict(os.environ, BIBLIO_COMPACT=compact)
+            proc = subprocess.run([sys.executable, __file__, "--child", v, "--items", str(args.items)],
+                                  capture_output=True, text=True, env=env, cwd=REPO / VARIANTS[v])
+            if proc.returncode != 0:
+                print(f"{v}: falhou (BIBLIO_COMPACT={compact}, exit {proc.returncode})\n{proc.stderr.strip()[-2000:]}",
+                      file=sys.stderr)
+                break
+            modes[compact] = json.loads(proc.stdout.strip().splitlines()[-1])
+        if len(modes) < 2:
+            failed = True
+            continue
+        old, new = modes["0"], modes["1"]
+        for group, g in old["groups"].items():
+            b, a = g["bytes_per_entity"], new["groups"][group]["bytes_per_entity"]
+            print(f"{VARIANTS[v]:9s} {group:11s} {g['n']:>9d} {b:>9.1f} {a:>9.1f} {100 * (1 - a / b):>7.1f}%")
+        same = old["serialized_sha256"] == new["serialized_sha256"]
+        print(f"{'':9s} serialização {'idêntica' if same else 'DIFERENTE'} nos dois modos")
+        failed |= not same
+        runs.append({"variant": VARIANTS[v], "before": old, "after": new, "same_serialization": same})
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "items": args.items, "runs": runs}, f,
+                      ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
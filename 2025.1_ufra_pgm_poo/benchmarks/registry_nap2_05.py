@@ -0,0 +1,151 @@
+# registry_nap2_05.py — remoção e empréstimo no nap2/05: listas globais x Registry por id
+#
+# Uso:
+#   python benchmarks/registry_nap2_05.py                          # 10k, 100k e 1M itens
+#   python benchmarks/registry_nap2_05.py --sizes 100000 --out r.json
+#
+# n itens e n/10 usuários (os mesmos objetos nas duas versões). Por tamanho,
+# mediana de --ops operações:
+#   - remover item por id: a lista refeita inteira (remove_item antigo, cópia
+#     abaixo) x Registry.remove;
+#   - empréstimo pela tela: achar usuário e item pelo id digitado (next(...) na
+#     lista, como era o laço de eventos) + process_loan x users.get/items.get;
+#   - ids: empréstimos e devoluções alternados; o esquema antigo (len(loans)+1)
+#     dá à devolução o mesmo id do empréstimo seguinte. Conta os repetidos nas
+#     duas versões e sai com código 1 se o Registry repetir algum.
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent
+sys.path.insert(0, str(REPO / "nap2" / "05"))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import bibliotecaGUI as gui  # noqa: E402
+
+
+class Legacy:
+    # o CRUD do bibliotecaGUI como era antes do Registry (listas globais)
+    def __init__(self, items, users):
+        self.items, self.users, self.loans = list(items), list(users), []
+        self.tx_ids = []
+
+    def remove_item(self, item_id):
+        self.items = [i for i in self.items if i.id != item_id]
+
+    def loan_by_id(self, uid, iid):
+        user = next((u for u in self.users if u.id == uid), None)
+        item = next((i for i in self.items if i.id == iid and i.available), None)
+        if user and item:
+            loan = gui.Loan(len(self.loans) + 1, user, item)
+            if loan.process(user, item):
+                self.loans.append(loan)
+                self.tx_ids.append(loan.id)
+
+    def return_by_id(self, uid, iid):
+        user = next((u for u in self.users if u.id == uid), None)
+        item = next((i for i in self.items if i.id == iid and not i.available), None)
+        if user and item:
+            ret = gui.Return(len(self.loans) + 1, user, item)
+            ret.process(user, item)
+            self.tx_ids.append(ret.id)
+
+
+class Current:
+    # o bibliotecaGUI de agora (os registros do módulo)
+    def __init__(self):
+        self.tx_ids = []
+
+    def remove_item(self, item_id):
+        gui.remove_item(item_id)
+
+    def loan_by_id(self, uid, iid):
+        user, item = gui.users.get(uid), gui.items.get(iid)
+        if user and item and item.available:
+            if gui.process_loan(user, item):
+                self.tx_ids.append(gui.open_loans[iid].id)
+
+    def return_by_id(self, uid, iid):
+        user, item = gui.users.get(uid), gui.items.get(iid)
+        if user and item and not item.available:
+            before = gui.loans._next_id   # o id que process_return vai usar
+            if gui.process_return(user, item):
+                self.tx_ids.append(before)
+
+
+def populate(n, seed):
+    rnd = random.Random(seed)
+    gui.items, gui.users, gui.loans = gui.Registry(), gui.Registry(), gui.Registry()
+    gui.open_loans.clear()
+    for u in range(max(1, n // 10)):
+        gui.add_user(gui.Professor(gui.users.new_id(), f"Usuario {u:06d}"))
+    for i in range(n):
+        kind = rnd.choice([gui.Book, gui.Magazine, gui.DVD])
+        iid = gui.items.new_id()
+        if kind is gui.Book:
+            gui.add_item(gui.Book(iid, f"Book {i:07d}", str(9780000000000 + i), [f"Autor {i % 997}"]))
+        elif kind is gui.Magazine:
+            gui.add_item(gui.Magazine(iid, f"Magazine {i:07d}", f"Ed. {i % 120}"))
+        else:
+            gui.add_item(gui.DVD(iid, f"DVD {i:07d}", 60 + i % 120))
+
+
+def median_ms(fn, cases):
+    times = []
+    for args in cases:
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - t0)
+    return round(1000 * statistics.median(times), 4)
+
+
+def run(n, ops, seed):
+    populate(n, seed)
+    rnd = random.Random(seed + 1)
+    ids = rnd.sample(range(1, n + 1), 2 * ops)
+    doomed = [(i,) for i in ids[:ops]]
+    loans = [(rnd.randrange(1, len(gui.users) + 1), i) for i in ids[ops:]]
+    out = {"n": n, "ops": ops}
+    for name, impl in (("legacy", Legacy(gui.items, gui.users)), ("registry", Current())):
+        out[f"{name}_remove_ms"] = median_ms(impl.remove_item, doomed)
+        # empréstimo seguido de devolução, para os ids de transação se alternarem
+        out[f"{name}_loan_ms"] = median_ms(lambda u, i: (impl.loan_by_id(u, i), impl.return_by_id(u, i)), loans)
+        out[f"{name}_duplicate_ids"] = len(impl.tx_ids) - len(set(impl.tx_ids))
+        out[f"{name}_transactions"] = len(impl.tx_ids)
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description="Remoção e empréstimo no nap2/05: listas x Registry")
+    p.add_argument("--sizes", default="10000,100000,1000000", help="números de itens")
+    p.add_argument("--ops", type=int, default=50)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", default=None, help="arquivo JSON (padrão: só a tabela)")
+    args = p.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    runs, failed = [], False
+    print(f"{'n':>9s} {'remover ms':>22s} {'emprestar+devolver ms':>24s} {'ids repetidos':>15s}")
+    for n in sizes:
+        r = run(n, args.ops, args.seed)
+        print(f"{n:>9d} {r['legacy_remove_ms']:>10.3f} → {r['registry_remove_ms']:>9.4f} "
+              f"{r['legacy_loan_ms']:>12.3f} → {r['registry_loan_ms']:>9.4f} "
+              f"{r['legacy_duplicate_ids']:>7d} → {r['registry_duplicate_ids']:>3d}")
+        failed |= r["registry_duplicate_ids"] > 0 or r["registry_transactions"] != r["legacy_transactions"]
+        runs.append(r)
+    if failed:
+        print("o Registry repetiu ids (ou fez outro número de transações)", file=sys.stderr)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "runs": runs}, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# run_all.py — roda os bench_*.py para cada variante e tamanho de catálogo
+#
+# Uso:
+#   python benchmarks/run_all.py                                  # todas as variantes, 1k/100k/1M
+#   python benchmarks/run_all.py --variants nap2_02,t07_01 --sizes 1000,100000 --out results.json
+#   python benchmarks/run_all.py --out new.json --baseline old.json   # compara p50 com outra execução
+#
+# Cada (variante, tamanho) roda num processo separado: as variantes têm módulos
+# com o mesmo nome (main, models, ...) e o pico de RSS precisa ser de um
+# processo limpo. Com --baseline, o código de saída é 1 se algum passo ficou
+# mais lento que --threshold vezes a linha de base.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+VARIANTS = ["nap2_01", "nap2_02", "nap2_03", "nap2_04", "nap2_05", "nap2_06", "t07_01"]
+
+
+def run_one(variant, items, args):
+    script = HERE / f"bench_{variant}.py"
+    fd, out = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    cmd = [sys.executable, str(script), "--items", str(items), "--budget", str(args.budget),
+           "--frames", str(args.frames), "--ops", str(args.ops), "--out", out]
+    t0 = time.perf_counter()
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=args.timeout)
+        with open(out, encoding="utf-8") as f:
+            return json.load(f)
+    except subprocess.TimeoutExpired:
+        return {"variant": variant, "items": items, "error": f"processo passou de {args.timeout}s", "steps": []}
+    except (OSError, ValueError):
+        tail = (proc.stderr or "").strip().splitlines()[-5:]
+        return {"variant": variant, "items": items, "error": f"exit {proc.returncode}", "stderr": tail,
+                "steps": [], "wall_s": round(time.perf_counter() - t0, 3)}
+    finally:
+        os.remove(out)
+
+
+def fmt_ms(v):
+    return "-" if v is None else f"{v:.2f}"
+
+
+def print_table(runs):
+    print(f"{'variante':9s} {'itens':>8s}  {'passo':36s} {'status':9s} {'n':>4s} "
+          f"{'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s} {'RSS MB':>8s}")
+    for r in runs:
+        head = f"{r['variant']:9s} {r['items']:>8d}"
+        if r.get("error"):
+            print(f"{head}  ERRO: {r['error']}")
+        for s in r["steps"]:
+            print(f"{head}  {s['name'][:36]:36s} {s['status']:9s} {s.get('n', 0) or 0:>4d} "
+                  f"{fmt_ms(s.get('p50_ms')):>10s} {fmt_ms(s.get('p95_ms')):>10s} {fmt_ms(s.get('p99_ms')):>10s} "
+                  f"{s.get('rss_peak_mb', '-')!s:>8s}")
+        print(f"{head}  {'(pico de RSS do processo)':36s} {'':9s} {'':>4s} {'':>10s} {'':>10s} {'':>10s} "
+              f"{r.get('peak_rss_mb', '-')!s:>8s}")
+
+
+def compare(runs, baseline, threshold):
+    """Lista (chave, base, atual, razão) dos passos com p50 acima de threshold x base."""
+    base = {}
+    for r in baseline.get("runs", []):
+        for s in r.get("steps", []):
+            if s.get("p50_ms") is not None:
+                base[(r["variant"], r["items"], s["name"])] = s["p50_ms"]
+    worse = []
+    for r in runs:
+        for s in r["steps"]:
+            key = (r["variant"], r["items"], s["name"])
+            old, new = base.get(key), s.get("p50_ms")
+            if old is None:
+                continue
+            if new is None:  # antes terminava, agora estourou o orçamento ou falhou
+                worse.append((key, old, None, float("inf")))
+            elif old > 0 and new / old > threshold:
+                worse.append((key, old, new, new / old))
+    return worse
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmarks headless das variantes do BiblioManager")
+    p.add_argument("--variants", default=",".join(VARIANTS), help=f"padrão: {','.join(VARIANTS)}")
+    p.add_argument("--sizes", default="1000,100000,1000000", help="tamanhos do catálogo (itens)")
+    p.add_argument("--budget", type=float, default=30.0, help="segundos por passo")
+    p.add_argument("--frames", type=int, default=60)
+    p.add_argument("--ops", type=int, default=200)
+    p.add_argument("--timeout", type=float, default=1800.0, help="segundos por processo (variante x tamanho)")
+    p.add_argument("--out", default="bench_results.json")
+    p.add_argument("--baseline", default=None, help="JSON de uma execução anterior para comparar")
+    p.add_argument("--threshold", type=float, default=1.25, help="razão p50 atual/base considerada regressão")
+    args = p.parse_args()
+
+    variants = [v.strip().replace("/", "_") for v in args.variants.split(",") if v.strip()]
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        p.error(f"variantes desconhecidas: {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    runs = []
+    for variant in variants:
+        for items in sizes:
+            print(f"[bench] {variant} com {items} itens...", file=sys.stderr, flush=True)
+            runs.append(run_one(variant, items, args))
+
+    result = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "sizes": sizes, "budget_s": args.budget,
+              "frames": args.frames, "ops": args.ops, "runs": runs}
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print_table(runs)
+    print(f"\nresultados em {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            worse = compare(runs, json.load(f), args.threshold)
+        if not worse:
+            print(f"sem regressões acima de {args.threshold}x em relação a {args.baseline}")
+            return 0
+        print(f"\nREGRESSÕES (p50 > {args.threshold}x de {args.baseline}):")
+        for (variant, items, step), old, new, ratio in worse:
+            now = "sem resultado" if new is None else f"{new:.2f}ms ({ratio:.2f}x)"
+            print(f"  {variant} {items} {step}: {old:.2f}ms -> {now}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
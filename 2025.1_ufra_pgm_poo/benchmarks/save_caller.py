@@ -0,0 +1,130 @@
+# save_caller.py — quanto save_data() (t07_01) custa na thread de quem chama
+#
+# Uso:
+#   python benchmarks/save_caller.py                               # 100k itens
+#   python benchmarks/save_caller.py --items 1000000 --ops 400 --out r.json
+#
+# Gera um library_data.json (formato do t07_01), abre a Library e mede, na
+# thread da interface:
+#   - antes: o que mark_dirty() fazia antes, montar o payload inteiro
+#     (Library._snapshot) a cada notificação; com o arquivo recém-aberto
+#     (entidades ainda não lidas) e depois de get_items()/get_users();
+#   - depois: save_data() como é agora (só marca; o payload é montado na
+#     thread de gravação, com a trava de estado da Library);
+#   - empréstimo/devolução (process_transaction) intercalados com save_data(),
+#     um a cada --pause segundos (cliques na interface): enquanto a thread de
+#     gravação monta o snapshot, uma alteração espera a trava, e o p99/máximo
+#     mostram essa espera.
+# No fim, close() grava o que faltava e o arquivo tem que ser igual a
+# _snapshot(); sai com código 1 se não for.
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent
+sys.path.insert(0, str(REPO / "t07_01"))
+
+
+def write_data(n_items, n_users, seed):
+    rnd = random.Random(seed)
+    users = [{"id": f"user_{u}", "name": f"Usuario {u:05d}", "user_type": "professor" if u % 5 == 0 else "student",
+              "borrowed_items": [], "status": "active"} for u in range(n_users)]
+    items = []
+    for i in range(n_items):
+        if i % 10 < 7:
+            it = {"id": f"book_{i}", "name": f"Book {i:07d}", "category": "book", "type": "book",
+                  "author": f"Autor {i % 997}", "isbn": str(9780000000000 + i)}
+        else:
+            it = {"id": f"magazine_{i}", "name": f"Magazine {i:07d}", "category": "magazine",
+                  "type": "magazine", "edition": f"Ed. {i % 120}"}
+        it["status"] = "available"
+        items.append(it)
+    rnd.shuffle(items)
+    with open("library_data.json", "w") as f:
+        json.dump({"items": items, "users": users, "transactions": []}, f)
+
+
+def timed(fn, n):
+    times = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+def stats(times):
+    times = sorted(times)
+    return {"n": len(times), "p50_ms": round(statistics.median(times), 4),
+            "p99_ms": round(times[min(len(times) - 1, int(len(times) * 0.99))], 4), "max_ms": round(times[-1], 4)}
+
+
+def main():
+    p = argparse.ArgumentParser(description="save_data() do t07_01: custo na thread de quem chama")
+    p.add_argument("--items", type=int, default=100_000)
+    p.add_argument("--users", type=int, default=None, help="padrão: items/100")
+    p.add_argument("--ops", type=int, default=200, help="empréstimos + devoluções (cada um seguido de save_data)")
+    p.add_argument("--pause", type=float, default=0.01, help="segundos entre uma operação e a próxima")
+    p.add_argument("--repeat", type=int, default=5, help="montagens do payload medidas no 'antes'")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", default=None)
+    args = p.parse_args()
+    n_users = args.users or max(1, args.items // 100)
+
+    rows = {}
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        write_data(args.items, n_users, args.seed)
+        from entities import Loan, Professor, Return
+        from library import Library
+
+        library = Library()
+        rows["antes: montar payload (arquivo recém-aberto)"] = stats(timed(library._snapshot, args.repeat))
+        library.get_items(), library.get_users()
+        rows["antes: montar payload (tudo montado)"] = stats(timed(library._snapshot, args.repeat))
+        rows["depois: save_data()"] = stats(timed(library.save_data, args.ops))
+        library.close()
+
+        # alterações com a gravação rodando ao lado
+        library = Library()
+        items = library.get_items()[:args.ops // 2]
+        user = next(u for u in library.get_users() if isinstance(u, Professor))
+        save_s, change_s = [], []
+        for k, item in enumerate(items):
+            for tx in (Loan(f"loan_{k}", user, item), Return(f"return_{k}", user, item)):
+                t0 = time.perf_counter()
+                library.process_transaction(tx)
+                t1 = time.perf_counter()
+                library.save_data()
+                t2 = time.perf_counter()
+                change_s.append((t1 - t0) * 1000)
+                save_s.append((t2 - t1) * 1000)
+                time.sleep(args.pause)
+        rows["depois: save_data() entre alterações"] = stats(save_s)
+        rows["depois: empréstimo/devolução"] = stats(change_s)
+        library.close()
+        with open("library_data.json") as f:
+            same = json.load(f) == library._snapshot()
+        os.chdir(HERE)
+
+    print(f"{args.items} itens, {n_users} usuários")
+    print(f"{'':46s} {'n':>5s} {'p50 ms':>9s} {'p99 ms':>9s} {'máx ms':>9s}")
+    for name, r in rows.items():
+        print(f"{name:46s} {r['n']:>5d} {r['p50_ms']:>9.4f} {r['p99_ms']:>9.4f} {r['max_ms']:>9.4f}")
+    print(f"arquivo gravado {'igual' if same else 'DIFERENTE'} ao estado final")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "items": args.items, "users": n_users,
+                       "rows": rows, "same": same}, f, ensure_ascii=False, indent=2)
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
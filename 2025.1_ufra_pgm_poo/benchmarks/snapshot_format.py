@@ -0,0 +1,103 @@
+# snapshot_format.py — salvar/carregar em nap2/01: JSON x snapshot binário (snapshot.py)
+#
+# Uso:
+#   python benchmarks/snapshot_format.py                          # 10k, 100k e 1M de itens
+#   python benchmarks/snapshot_format.py --sizes 10000,100000 --out r.json
+#
+# Para cada tamanho, monta n itens, n/10 usuários e n/10 transações e grava o
+# mesmo acervo com repositorio.salvar nos dois formatos. Mede o tempo de
+# gravação e o tamanho do arquivo e, para a leitura (carregar detecta o formato
+# sozinho), dois momentos: abrir (carregar + primeiro item) e montar tudo
+# (percorrer as três listas, que monta todos os objetos).
+# Depois confere que os dois arquivos devolvem os mesmos registros (para_dict
+# de tudo) e sai com código 1 se não devolverem.
+import argparse
+import gc
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent
+sys.path.insert(0, str(REPO / "nap2" / "01"))
+
+from dominio import Aluno, Devolucao, Dvd, Emprestimo, Livro, Professor, Revista, Visitante  # noqa: E402
+from repositorio import Repositorio, carregar, salvar  # noqa: E402
+
+FORMATS = {"json": ".json", "binario": ".snap"}
+
+
+def build(n_items, seed):
+    rnd = random.Random(seed)
+    usuarios = Repositorio(rnd.choice([Aluno, Professor, Visitante])(f"Usuario {u:06d}", id_=f"u{u}",
+                                                                     emprestados=u % 3)
+                           for u in range(max(1, n_items // 10)))
+    itens = Repositorio(por_status=True)
+    for i in range(n_items):
+        kind = rnd.choice([Livro, Revista, Dvd])
+        arg = {Livro: f"Autor {i % 997}", Revista: f"Ed. {i % 120}", Dvd: 60 + i % 120}[kind]
+        itens.append(kind(f"{kind.__name__} {i:07d}", arg, id_=f"i{i}", status="emprestado" if i % 20 == 0 else "disponivel"))
+    transacoes = Repositorio((Emprestimo if t % 2 == 0 else Devolucao)(f"u{t % len(usuarios)}", f"i{t % n_items}", id_=f"t{t}")
+                             for t in range(max(1, n_items // 10)))
+    return itens, usuarios, transacoes
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - t0
+
+
+def run_format(n_items, formato, acervo, folder):
+    path = Path(folder) / f"acervo_{n_items}{FORMATS[formato]}"
+    _, save_s = _timed(lambda: salvar(path, *acervo, formato=formato))
+    gc.collect()
+    (itens, usuarios, transacoes), open_s = _timed(lambda: carregar(path))
+    _, first_s = _timed(lambda: itens[0])
+    _, all_s = _timed(lambda: (list(itens), list(usuarios), list(transacoes)))
+    records = [[o.para_dict() for o in lista] for lista in (itens, usuarios, transacoes)]
+    return {"items": n_items, "format": formato, "bytes": path.stat().st_size, "save_s": round(save_s, 3),
+            "open_s": round(open_s + first_s, 3), "all_s": round(all_s, 3)}, records
+
+
+def main():
+    p = argparse.ArgumentParser(description="Salvar/carregar em nap2/01: JSON x snapshot binário")
+    p.add_argument("--sizes", default="10000,100000,1000000", help="números de itens")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", default=None, help="arquivo JSON (padrão: só a tabela)")
+    args = p.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    runs, failed = [], False
+    print(f"{'itens':>9s} {'formato':8s} {'MB':>8s} {'salvar s':>9s} {'abrir s':>8s} {'tudo s':>8s}")
+    with tempfile.TemporaryDirectory() as folder:
+        for n in sizes:
+            acervo = build(n, args.seed)
+            cases, contents = [], []
+            for formato in FORMATS:
+                case, records = run_format(n, formato, acervo, folder)
+                print(f"{n:>9d} {formato:8s} {case['bytes'] / 1e6:>8.1f} {case['save_s']:>9.3f} {case['open_s']:>8.3f} "
+                      f"{case['all_s']:>8.3f}")
+                cases.append(case)
+                contents.append(records)
+                del records
+                gc.collect()
+            same = contents[0] == contents[1]
+            old, new = cases
+            print(f"{'':9s} binário: {old['bytes'] / new['bytes']:.1f}x menor, salvar {old['save_s'] / new['save_s']:.1f}x, "
+                  f"abrir {old['open_s'] / new['open_s']:.1f}x, tudo {old['all_s'] / new['all_s']:.1f}x; registros {'iguais' if same else 'DIFERENTES'}")
+            failed |= not same
+            runs.extend(dict(c, same_records=same) for c in cases)
+            del acervo, contents
+            gc.collect()
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "runs": runs}, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+# stress_circulation.py — várias mesas (threads) emprestando e devolvendo ao mesmo tempo
+#
+# Uso:
+#   python benchmarks/stress_circulation.py                          # nap2/03 e t07_01, 1/2/4/8 threads
+#   python benchmarks/stress_circulation.py --variants t07_01 --threads 1,4,16 --ops 20000 --out r.json
+#   python benchmarks/stress_circulation.py --unsafe                 # também sem travas, para comparar
+#
+# Cada thread sorteia usuário e item num conjunto pequeno de itens (--items,
+# para haver disputa) e tenta emprestar ou devolver. No fim, confere:
+#   - nenhum item com mais de um dono (empréstimo em dobro);
+#   - item "emprestado" <=> exatamente um usuário com ele na lista;
+#   - empréstimos - devoluções com sucesso == itens emprestados (nada perdido);
+#   - nap2/03: uma transação registrada por operação com sucesso (IDs únicos);
+#   - modo com travas: a tabela de travas foi usada (uma tabela vazia é "falsa",
+#     e um `if travas:` no lugar de `is not None` desligava as travas sem erro).
+# Também mede operações/s por número de threads. Com o GIL, código Python puro
+# não ganha velocidade com mais threads; o que se mede é que as travas não
+# derrubam a vazão e que nada se perde.
+#
+# Cada (variante, modo) roda num processo separado (as variantes têm módulos
+# com o mesmo nome). --switch encurta o intervalo de troca de threads do
+# Python para as disputas aparecerem com poucas operações.
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent
+VARIANTS = {"nap2_03": "nap2/03", "t07_01": "t07_01"}
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+
+# ----- Adaptadores: a mesma carga nas duas APIs -----
+class Nap203:
+    def __init__(self, n_items, n_users, concurrent):
+        import bibliomanager as bm
+        self.bm = bm
+        self.lib = bm.GerenciadorBiblioteca(concorrente=concurrent)
+        self.items = []
+        self.users = []
+        for u in range(n_users):
+            user = bm.Professor(f"Mesa {u}", f"u{u}@ufra.edu.br", "Depto")
+            self.lib.adicionar_usuario(user)
+            self.users.append(user.id)
+        for i in range(n_items):
+            item = bm.Livro(f"Livro {i}", "Autor", str(i), 2000)
+            self.lib.adicionar_item(item)
+            self.items.append(item.id)
+
+    def borrow(self, user_id, item_id, tag):
+        return self.lib.processar_transacao(self.bm.Emprestimo(user_id, item_id))
+
+    def give_back(self, user_id, item_id, tag):
+        return self.lib.processar_transacao(self.bm.Devolucao(user_id, item_id))
+
+    def state(self):
+        lib = self.lib
+        items = {i: lib.itens[i].status == "emprestado" for i in self.items}
+        holders = {u: list(lib.usuarios[u].itens_emprestados) for u in self.users}
+        return items, holders, len(lib.transacoes)
+
+    def locks_used(self):
+        return len(self.lib._travas or ())
+
+
+class T0701:
+    def __init__(self, n_items, n_users, concurrent):
+        from entities import Book, Loan, Professor, Return
+        from library import Library
+        self.Loan, self.Return = Loan, Return
+        self.lib = Library(concurrent=concurrent)
+        self.items = {}
+        self.users = {}
+        for u in range(n_users):
+            self.users[f"user_{u}"] = Professor(f"user_{u}", f"Mesa {u}")
+            self.lib.add_user(self.users[f"user_{u}"])
+        for i in range(n_items):
+            self.items[f"item_{i}"] = Book(f"item_{i}", f"Livro {i}", "Autor", str(i))
+            self.lib.add_item(self.items[f"item_{i}"])
+
+    def _run(self, kind, user_id, item_id, tag):
+        try:
+            self.lib.process_transaction(kind(tag, self.users[user_id], self.items[item_id]))
+            return True
+        except ValueError:
+            return False
+
+    def borrow(self, user_id, item_id, tag):
+        return self._run(self.Loan, user_id, item_id, tag)
+
+    def give_back(self, user_id, item_id, tag):
+        return self._run(self.Return, user_id, item_id, tag)
+
+    def state(self):
+        items = {i: it.status == "borrowed" for i, it in self.items.items()}
+        holders = {u: [it.id for it in user.borrowed_items] for u, user in self.users.items()}
+        return items, holders, len(self.lib.get_transactions())
+
+    def locks_used(self):
+        return len(self.lib._Library__locks or ())
+
+
+def check(app, loans, returns, concurrent):
+    """Lista de violações encontradas no estado final."""
+    items, holders, n_transactions = app.state()
+    problems = []
+    if concurrent and loans + returns and not app.locks_used():
+        problems.append("modo com travas sem nenhuma trava pega")
+    owners = {}
+    for user, held in holders.items():
+        for item in held:
+            owners.setdefault(item, []).append(user)
+    for item, users in owners.items():
+        if len(users) > 1 or holders[users[0]].count(item) > 1:
+            problems.append(f"{item} emprestado em dobro: {users}")
+    for item, borrowed in items.items():
+        if borrowed != (item in owners):
+            problems.append(f"{item}: status {'emprestado' if borrowed else 'disponível'}, donos {owners.get(item, [])}")
+    out = sum(items.values())
+    if loans - returns != out:
+        problems.append(f"empréstimos - devoluções = {loans - returns}, mas {out} itens emprestados")
+    if isinstance(app, Nap203) and n_transactions != loans + returns:
+        problems.append(f"{loans + returns} operações com sucesso, {n_transactions} transações registradas")
+    return problems
+
+
+def run_case(adapter, threads, args, concurrent):
+    app = adapter(args.items, args.users, concurrent)
+    user_ids = list(app.users)
+    item_ids = list(app.items)
+    counts = [[0, 0, 0] for _ in range(threads)]  # por thread: empréstimos ok, devoluções ok, tentativas
+    start = threading.Barrier(threads + 1)
+
+    def desk(k):
+        rnd = random.Random(args.seed * 1000 + k)
+        start.wait()
+        c = counts[k]
+        for n in range(args.ops):
+            user, item = rnd.choice(user_ids), rnd.choice(item_ids)
+            if rnd.random() < 0.5:
+                c[0] += app.borrow(user, item, f"loan_{k}_{n}")
+            else:
+                c[1] += app.give_back(user, item, f"return_{k}_{n}")
+            c[2] += 1
+
+    workers = [threading.Thread(target=desk, args=(k,)) for k in range(threads)]
+    for w in workers:
+        w.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+    loans, returns, attempts = (sum(c[i] for c in counts) for i in range(3))
+    problems = check(app, loans, returns, concurrent)
+    return {"threads": threads, "mode": "locks" if concurrent else "sem travas", "ops": attempts,
+            "ok_loans": loans, "ok_returns": returns, "seconds": round(elapsed, 3),
+            "ops_per_s": round(attempts / elapsed) if elapsed else None,
+            "violations": len(problems), "examples": problems[:5]}
+
+
+def child(args):
+    # Roda uma variante num processo limpo e imprime o JSON no stdout
+    app_dir = REPO / VARIANTS[args.child]
+    workdir = tempfile.mkdtemp(prefix=f"stress_{args.child}_")
+    os.chdir(workdir)  # t07_01 lê/grava library_data.json na pasta atual
+    sys.path.insert(0, str(app_dir))
+    sys.setswitchinterval(args.switch)
+    adapter = Nap203 if args.child == "nap2_03" else T0701
+    modes = [True, False] if args.unsafe else [True]
+    cases = [run_case(adapter, t, args, concurrent) for concurrent in modes for t in args.threads]
+    sys.stdout.write(json.dumps({"variant": VARIANTS[args.child], "cases": cases}, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+    os._exit(0)  # thread de gravação do t07_01 (daemon) não segura a saída
+
+
+def main():
+    p = argparse.ArgumentParser(description="Teste de estresse: empréstimos concorrentes")
+    p.add_argument("--variants", default=",".join(VARIANTS), help=f"padrão: {','.join(VARIANTS)}")
+    p.add_argument("--threads", default="1,2,4,8", help="números de threads (mesas)")
+    p.add_argument("--items", type=int, default=64, help="itens disputados (poucos = mais disputa)")
+    p.add_argument("--users", type=int, default=16)
+    p.add_argument("--ops", type=int, default=20000, help="operações por thread")
+    p.add_argument("--switch", type=float, default=1e-5, help="sys.setswitchinterval (s)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--unsafe", action="store_true", help="roda também sem travas (concorrente=False)")
+    p.add_argument("--out", default=None, help="arquivo JSON (padrão: só a tabela)")
+    p.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = p.parse_args()
+    args.threads = [int(t) for t in str(args.threads).split(",") if t.strip()]
+    if args.child:
+        return child(args)
+
+    variants = [v.strip().replace("/", "_") for v in args.variants.split(",") if v.strip()]
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        p.error(f"variantes desconhecidas: {', '.join(unknown)}")
+    results, failed = [], False
+    for v in variants:
+        cmd = [sys.executable, __file__, "--child", v, "--threads", ",".join(map(str, args.threads)),
+               "--items", str(args.items), "--users", str(args.users), "--ops", str(args.ops),
+               "--switch", str(args.switch), "--seed", str(args.seed)] + (["--unsafe"] if args.unsafe else [])
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{v}: falhou (exit {proc.returncode})\n{proc.stderr.strip()[-2000:]}", file=sys.stderr)
+            failed = True
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"{'variante':9s} {'modo':11s} {'threads':>7s} {'ops':>8s} {'ops/s':>9s} {'empr.':>7s} {'devol.':>7s} {'violações':>9s}")
+    for r in results:
+        for c in r["cases"]:
+            print(f"{r['variant']:9s} {c['mode']:11s} {c['threads']:>7d} {c['ops']:>8d} {c['ops_per_s']:>9d} "
+                  f"{c['ok_loans']:>7d} {c['ok_returns']:>7d} {c['violations']:>9d}")
+            for e in c["examples"]:
+                print(f"{'':30s}- {e}")
+            if c["mode"] == "locks" and c["violations"]:
+                failed = True
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "items": args.items, "users": args.users,
+                       "ops_per_thread": args.ops, "switch_s": args.switch, "runs": results}, f,
+                      ensure_ascii=False, indent=2)
+    # código 1 se o modo com travas perdeu alguma atualização
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+# biblio_comum — módulos auxiliares usados por mais de um app (nap2/NN, t07_01)
+#
+# Cada app continua rodando de dentro da própria pasta; o comum.py de cada um
+# põe a raiz do repositório no sys.path, e os módulos daqui são importados como
+# biblio_comum.<módulo>.
@@ -0,0 +1,150 @@
+# async_writer.py — gravação em segundo plano, juntando rajadas de alterações
+#
+# Quem altera os dados só chama mark_dirty(); uma thread espera a janela
+# (window, em segundos) a partir da primeira notificação e então chama write()
+# UMA vez para todas as notificações acumuladas. mark_dirty() devolve um
+# concurrent.futures.Future que fica pronto quando uma gravação iniciada depois
+# da notificação termina — use fut.result() quando precisar ter certeza de que
+# o disco já tem o dado (ler logo depois de gravar, sair do programa...).
+#
+# flush() grava imediatamente o que estiver pendente; close() faz flush e
+# encerra a thread (também é chamado no atexit).
+#
+# json_snapshot_writer() monta o caso comum: gravar um JSON de forma atômica
+# (arquivo temporário + os.replace). mark_dirty() continua só marcando; o
+# payload é montado na thread de gravação, uma vez por rajada, segurando `lock`
+# — a mesma trava que quem altera os dados segura ao alterar, para o snapshot
+# não pegar uma mudança pela metade. after_write(payload), se passado, roda na
+# thread de gravação depois de cada gravação (ex.: encurtar um log).
+import atexit
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+
+class AsyncWriter:
+    def __init__(self, write, window=0.2, name="async-writer"):
+        self._write = write
+        self.window = window
+        self.requests = 0
+        self.writes = 0
+        self._cond = threading.Condition()
+        self._waiters = []       # futures das notificações ainda não gravadas
+        self._due = None         # time.monotonic() em que a rajada atual será gravada
+        self._flush_now = False
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def mark_dirty(self):
+        fut = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AsyncWriter já foi encerrado")
+            self.requests += 1
+            self._waiters.append(fut)
+            if self._due is None:
+                self._due = time.monotonic() + self.window
+            self._cond.notify_all()
+        return fut
+
+    def flush(self, timeout=None):
+        """Grava já o que estiver pendente e espera terminar. Devolve False em timeout."""
+        with self._cond:
+            if self._waiters:
+                self._flush_now = True
+                self._cond.notify_all()
+            end = None if timeout is None else time.monotonic() + timeout
+            while self._waiters or self._busy:
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    @property
+    def pending(self):
+        return len(self._waiters)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._waiters and not self._closed:
+                    self._cond.wait()
+                if not self._waiters:
+                    return  # encerrado e nada pendente
+                while not (self._flush_now or self._closed):
+                    remaining = self._due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                waiters, self._waiters = self._waiters, []
+                self._due = None
+                self._flush_now = False
+                self._busy = True
+            try:
+                self._write()
+                self.writes += 1
+            except Exception as e:
+                for fut in waiters:
+                    fut.set_exception(e)
+            else:
+                for fut in waiters:
+                    fut.set_result(True)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+
+def write_json_atomic(path, payload, **dump_kwargs):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class JsonSnapshotWriter(AsyncWriter):
+    """AsyncWriter que grava em path (JSON, atômico) o estado montado por build_payload().
+
+    mark_dirty() só marca (barato na thread da interface). build_payload roda na
+    thread de gravação, uma vez por rajada, com `lock` seguro: quem altera os
+    dados segura a mesma trava (self.lock; por padrão uma RLock nova), então o
+    payload nunca pega uma alteração pela metade. A conversão para JSON e a
+    escrita acontecem depois de soltar a trava, por isso o payload precisa ser
+    uma cópia (dicts/listas novos), não referências às listas vivas das entidades.
+    """
+
+    def __init__(self, path, build_payload, window=0.2, after_write=None, lock=None, **dump_kwargs):
+        self.path = path
+        self.lock = threading.RLock() if lock is None else lock
+        self._build = build_payload
+        self._after_write = after_write
+        self._dump_kwargs = dump_kwargs
+        super().__init__(self._write_latest, window=window, name=f"writer:{os.path.basename(path)}")
+
+    def _write_latest(self):
+        with self.lock:
+            payload = self._build()
+        write_json_atomic(self.path, payload, **self._dump_kwargs)
+        if self._after_write is not None:
+            self._after_write(payload)
+
+
+def json_snapshot_writer(path, build_payload, window=0.2, after_write=None, lock=None, **dump_kwargs):
+    return JsonSnapshotWriter(path, build_payload, window=window, after_write=after_write, lock=lock,
+                              **dump_kwargs)
@@ -0,0 +1,48 @@
+# compact.py — representação compacta das entidades (muitos objetos na memória)
+#
+# Com 1M de itens, o que pesa é o objeto de cada entidade, não os dados:
+#   - slots(...): __slots__ no lugar do __dict__ por instância (e sem __weakref__);
+#   - intern_status(...): o status é sempre o mesmo objeto str ("available" lido
+#     do JSON vira o literal do código), como um enum, sem mudar o tipo;
+#   - pack_datetime/unpack_datetime: datetime ingênuo guardado como int de
+#     microssegundos desde 1970 (32 bytes em vez de 48), sem perder precisão.
+# Properties e serialize()/serializar() continuam iguais: só muda o que fica
+# guardado em cada instância.
+#
+# BIBLIO_COMPACT=0 volta à representação antiga (__dict__ + datetime), para
+# comparar (benchmarks/memory_entities.py). Vale para as classes definidas
+# depois da importação: defina a variável antes de iniciar o programa.
+import os
+import sys
+from datetime import datetime, timedelta
+
+COMPACT = os.environ.get("BIBLIO_COMPACT", "1") != "0"
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def slots(*names, root=False):
+    """__slots__ da classe: `names` no modo compacto; senão __dict__ na raiz da hierarquia."""
+    if COMPACT:
+        return names
+    return ("__dict__", "__weakref__") if root else ()
+
+
+def intern_status(value):
+    if COMPACT and type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+def pack_datetime(value):
+    # Só datetime sem fuso: com tzinfo (ou outro tipo) guarda como veio
+    if COMPACT and type(value) is datetime and value.tzinfo is None:
+        return (value - _EPOCH) // _MICROSECOND
+    return value
+
+
+def unpack_datetime(value):
+    if type(value) is int:
+        return _EPOCH + timedelta(microseconds=value)
+    return value
@@ -0,0 +1,100 @@
+# history.py — histórico de transações por usuário e por item
+#
+# Em vez de percorrer a lista inteira de transações para achar o histórico de
+# um usuário ou de um item, guarda uma lista por usuário e uma por item
+# (em ordem cronológica), acrescentadas a cada empréstimo/devolução:
+#   - events(user=...)/events(item=...): o histórico todo, O(1) para pegar;
+#   - last(n, user=...): os n eventos mais recentes, O(n);
+#   - loan_count(user=.../item=...): quantos empréstimos, O(1);
+#   - current_borrower(item): com quem o item está agora, O(1);
+#   - top_users(n): quem mais pegou emprestado.
+#
+# O formato da transação fica por conta de quem usa: user_of/item_of/kind_of
+# dizem como ler usuário, item e tipo (objeto com atributos ou dict), e
+# loan_kinds/return_kinds quais tipos são empréstimo e devolução.
+# rebuild(txs) remonta tudo numa passada (ao carregar os dados).
+#
+# keep_events=False guarda só os contadores e os empréstimos em aberto (sem as
+# listas de transações): serve a quem tem o histórico completo em disco e lê os
+# eventos de um usuário/item de lá (no nap2/02, TransactionLog.query).
+import heapq
+from collections import defaultdict
+
+
+class TransactionHistory:
+    def __init__(self, user_of, item_of, kind_of, loan_kinds=("loan",), return_kinds=("return",),
+                 keep_events=True):
+        self._user_of = user_of
+        self._item_of = item_of
+        self._kind_of = kind_of
+        self._loan_kinds = frozenset(loan_kinds)
+        self._return_kinds = frozenset(return_kinds)
+        self.keep_events = keep_events
+        self.clear()
+
+    def clear(self):
+        self._by_user = defaultdict(list)
+        self._by_item = defaultdict(list)
+        self._user_loans = defaultdict(int)
+        self._item_loans = defaultdict(int)
+        self._borrower = {}   # item -> usuário com o empréstimo em aberto
+
+    def add(self, tx):
+        user, item, kind = self._user_of(tx), self._item_of(tx), self._kind_of(tx)
+        if self.keep_events:
+            self._by_user[user].append(tx)
+            self._by_item[item].append(tx)
+        if kind in self._loan_kinds:
+            self._user_loans[user] += 1
+            self._item_loans[item] += 1
+            self._borrower[item] = user
+        elif kind in self._return_kinds and self._borrower.get(item) == user:
+            del self._borrower[item]
+
+    def rebuild(self, txs):
+        """Remonta os índices a partir de todas as transações (da mais antiga à mais nova)."""
+        self.clear()
+        user_of, item_of, kind_of = self._user_of, self._item_of, self._kind_of
+        loans, returns = self._loan_kinds, self._return_kinds
+        by_user, by_item = self._by_user, self._by_item
+        user_loans, item_loans, borrower = self._user_loans, self._item_loans, self._borrower
+        keep = self.keep_events
+        for tx in txs:
+            user, item, kind = user_of(tx), item_of(tx), kind_of(tx)
+            if keep:
+                by_user[user].append(tx)
+                by_item[item].append(tx)
+            if kind in loans:
+                user_loans[user] += 1
+                item_loans[item] += 1
+                borrower[item] = user
+            elif kind in returns and borrower.get(item) == user:
+                del borrower[item]
+
+    def _postings(self, user, item):
+        if (user is None) == (item is None):
+            raise ValueError("informe user ou item (só um)")
+        if not self.keep_events:
+            raise ValueError("histórico montado com keep_events=False: leia os eventos do arquivo")
+        return (self._by_user if item is None else self._by_item).get(user if item is None else item, [])
+
+    def events(self, user=None, item=None):
+        """Histórico do usuário ou do item, do mais antigo ao mais novo (não altere a lista)."""
+        return self._postings(user, item)
+
+    def last(self, n, user=None, item=None):
+        """Os n eventos mais recentes do usuário ou do item, o mais novo primeiro."""
+        postings = self._postings(user, item)
+        return postings[:-n - 1:-1] if n > 0 else []
+
+    def loan_count(self, user=None, item=None):
+        if (user is None) == (item is None):
+            raise ValueError("informe user ou item (só um)")
+        return self._user_loans.get(user, 0) if item is None else self._item_loans.get(item, 0)
+
+    def current_borrower(self, item):
+        return self._borrower.get(item)
+
+    def top_users(self, n):
+        """[(usuário, empréstimos)] dos n que mais pegaram emprestado."""
+        return heapq.nlargest(n, self._user_loans.items(), key=lambda kv: kv[1])
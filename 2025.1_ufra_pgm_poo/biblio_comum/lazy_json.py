@@ -0,0 +1,311 @@
+# lazy_json.py — leitura preguiçosa de um JSON grande no formato {"secao": [{registro}, ...], ...}
+#
+# JsonIndex só acha onde cada seção começa ao abrir o arquivo. Na primeira vez
+# que uma seção é usada, uma passada de regex (em C) atrás das chaves "id" monta
+# {id: posição do registro}, sem decodificar nenhum registro (cerca de 1 s para
+# 1M de itens, contra vários segundos de json.load + montar todos os objetos).
+# record() decodifica só o registro pedido; records() a seção inteira de uma vez
+# (telas que listam tudo, gravação).
+#
+# LazyDict é o dicionário {id: entidade} em cima de uma seção: a entidade só é
+# montada (build(registro)) na primeira vez que é pedida, então a memória cresce
+# com o que foi usado. LazyList é a mesma coisa com cara de lista.
+#
+# Formato esperado (o que json.dump grava nestes apps): cada seção é uma lista
+# de objetos sem objetos dentro (listas de ids tudo bem), todos com "id".
+#
+# O arquivo fica mapeado (mmap): as páginas só entram na memória quando lidas.
+# Quem grava por cima tem que SUBSTITUIR o arquivo (temporário + os.replace),
+# nunca truncar: o índice continua lendo o conteúdo antigo até ser descartado.
+# No Windows um arquivo mapeado não pode ser substituído, então lá o arquivo é
+# lido inteiro para a memória (só os bytes, sem montar nada).
+import json
+import mmap
+import os
+import re
+import threading
+from collections.abc import MutableMapping, MutableSequence
+
+_STRING = rb'"(?:[^"\\]|\\.)*"'
+# "id" seguido de ":" só aparece como chave: aspas dentro de strings vêm escapadas (\")
+_ID = re.compile(rb'"id"\s*:\s*(-?\d+|' + _STRING + rb')')
+_VALUE = rb'(' + _STRING + rb'|-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null)'
+_DECODER = json.JSONDecoder()
+
+
+class JsonIndex:
+    def __init__(self, path, sections):
+        self.path = path
+        with open(path, "rb") as f:
+            if os.name == "nt" or os.fstat(f.fileno()).st_size == 0:
+                self._buf = f.read()
+            else:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Onde cada seção começa (logo depois do "["); cada uma vai até a próxima ou até o fim do arquivo
+        starts = sorted((m.end(), name) for name in sections if (m := self._find_key(name, rb"\[")))
+        self._regions = {name: (pos, starts[k + 1][0] if k + 1 < len(starts) else len(self._buf))
+                         for k, (pos, name) in enumerate(starts)}
+        # {id: posição} de cada seção, montado na primeira vez que a seção é usada, e os ids na ordem
+        # do arquivo (o dicionário muda junto com o LazyDict; a lista não)
+        self._positions = {}
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def _find_key(self, key, value):
+        # Primeiro `"key": <value>` do arquivo (bytes.find acha a chave bem mais rápido que regex.search)
+        pattern = re.compile(rb'"' + re.escape(key.encode()) + rb'"\s*:\s*' + value)
+        needle = b'"' + key.encode() + b'"'
+        pos = self._buf.find(needle)
+        while pos >= 0:
+            m = pattern.match(self._buf, pos)
+            if m:
+                return m
+            pos = self._buf.find(needle, pos + 1)
+        return None
+
+    def positions(self, section):
+        """{id: posição} da seção, na ordem do arquivo (o LazyDict passa a ser o dono deste dicionário).
+
+        Uma passada de regex (em C) pela seção atrás das chaves "id", sem decodificar os registros.
+        """
+        with self._lock:
+            positions = self._positions.get(section)
+            if positions is None:
+                positions = self._positions[section] = {}
+                if section in self._regions:
+                    start, end = self._regions[section]
+                    for m in _ID.finditer(self._buf, start, end):
+                        raw = m.group(1)
+                        positions[json.loads(raw) if raw[0] == 34 else int(raw)] = m.start()
+                self._ids[section] = list(positions)
+            return positions
+
+    def ids(self, section):
+        """Ids da seção na ordem do arquivo (como estavam ao indexar)."""
+        self.positions(section)
+        return self._ids[section]
+
+    def column(self, section, key):
+        """Valor de `key` em cada registro da seção, na ordem de ids(), sem decodificar os registros:
+        uma passada de regex acha os valores e um json.loads só decodifica todos. None se algum
+        registro não tiver a chave como valor simples (string, número, true/false/null)."""
+        ids = self.ids(section)
+        if section not in self._regions:
+            return []
+        start, end = self._regions[section]
+        pattern = re.compile(rb'"' + re.escape(key.encode()) + rb'"\s*:\s*' + _VALUE)
+        raws = pattern.findall(self._buf, start, end)
+        # Cada registro tem cada chave no máximo uma vez: mesma contagem = uma por registro, na ordem
+        if len(raws) != len(ids):
+            return None
+        return json.loads(b"[" + b",".join(raws) + b"]")
+
+    def scalar(self, key, default=None):
+        """Valor inteiro de uma chave do topo (ex.: "proximo_id")."""
+        m = self._find_key(key, rb"(-?\d+)")
+        return int(m.group(1)) if m else default
+
+    def record(self, position, id_):
+        """Decodifica o registro cuja chave "id" está em `position`."""
+        start = position
+        while True:
+            # O "{" do registro é o último antes do "id", a menos que um campo anterior tenha "{" no texto;
+            # nesse caso a decodificação falha (ou traz outro id) e o próximo "{" para trás é tentado
+            start = self._buf.rfind(b"{", 0, start)
+            if start < 0:
+                raise KeyError(id_)
+            try:
+                record = self._decode(start)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get("id") == id_:
+                return record
+
+    def _decode(self, start):
+        size = 512
+        while True:
+            chunk = self._buf[start:start + size]
+            try:
+                # "ignore": a janela pode cortar um caractere no fim, depois do registro
+                return _DECODER.raw_decode(chunk.decode("utf-8", "ignore"))[0]
+            except ValueError:
+                if start + size >= len(self._buf):
+                    raise
+                size *= 4
+
+    def records(self, section):
+        """Todos os registros da seção (lista de dicionários), numa decodificação só."""
+        if section not in self._regions:
+            return []
+        start, end = self._regions[section]
+        text = b"[" + self._buf[start:end]
+        # raw_decode para no "]" da seção e ignora o resto (próximas chaves do topo)
+        return _DECODER.raw_decode(text.decode("utf-8"))[0]
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+
+class LazyDict(MutableMapping):
+    """{id: entidade} sobre uma seção do JsonIndex (ou vazio, com index=None).
+
+    build(registro) monta a entidade na primeira leitura (e pode devolver None
+    para registros que não servem: esses somem do dicionário quando tocados).
+    Entidades novas (self[id] = e) ficam só na memória.
+    """
+
+    def __init__(self, index, section, build):
+        self._index = index
+        self._build = build
+        self._section = section
+        self._own_positions = None if index else {}
+        self._cache = {}
+
+    @property
+    def _positions(self):
+        # {id: posição no arquivo, ou None para entidades novas}, na ordem do arquivo; a seção só é
+        # indexada quando o dicionário é usado pela primeira vez
+        positions = self._own_positions
+        if positions is None:
+            positions = self._own_positions = self._index.positions(self._section)
+        return positions
+
+    def __getitem__(self, id_):
+        entity = self._cache.get(id_)
+        if entity is None:
+            position = self._positions[id_]
+            if position is None:
+                raise KeyError(id_)
+            entity = self._build(self._index.record(position, id_))
+            if entity is None:
+                self._positions.pop(id_, None)
+                raise KeyError(id_)
+            # setdefault: se outra thread montou a mesma entidade ao mesmo tempo, fica valendo uma só
+            entity = self._cache.setdefault(id_, entity)
+        return entity
+
+    def __setitem__(self, id_, entity):
+        self._cache[id_] = entity
+        self._positions.setdefault(id_, None)
+
+    def __delitem__(self, id_):
+        del self._positions[id_]
+        self._cache.pop(id_, None)
+
+    def __contains__(self, id_):
+        return id_ in self._positions
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self):
+        return len(self._positions)
+
+    @property
+    def loaded(self):
+        """Quantas entidades já foram montadas."""
+        return len(self._cache)
+
+    def _missing(self):
+        return len(self._cache) < len(self._positions)
+
+    def values(self):
+        # Lista (na ordem do arquivo) com todas as entidades; monta as que faltam a partir de uma
+        # decodificação só da seção, em vez de um registro por vez
+        if self._missing():
+            for record in self._index.records(self._section):
+                id_ = record.get("id")
+                if id_ in self._cache or self._positions.get(id_, None) is None:
+                    continue
+                entity = self._build(record)
+                if entity is None:
+                    self._positions.pop(id_, None)
+                else:
+                    self._cache.setdefault(id_, entity)
+        cache = self._cache
+        return [e for e in map(cache.get, list(self._positions)) if e is not None]
+
+    def entries(self, keys=None):
+        """[(id, entidade ou None, registro ou None)], na ordem: a entidade se já foi montada, senão o
+        registro do arquivo (a seção é decodificada uma vez, sem montar nenhum objeto).
+
+        Com `keys`, o registro só traz essas chaves, lidas com JsonIndex.column (bem mais rápido que
+        decodificar a seção inteira quando só alguns campos interessam: índices, partições).
+        """
+        raw = {}
+        if self._missing():
+            columns = [self._index.column(self._section, key) for key in keys] if keys else [None]
+            if all(c is not None for c in columns):
+                raw = {id_: dict(zip(keys, values))
+                       for id_, *values in zip(self._index.ids(self._section), *columns)}
+            else:
+                raw = {record.get("id"): record for record in self._index.records(self._section)}
+        cache = self._cache
+        out = []
+        for id_ in list(self._positions):
+            entity = cache.get(id_)
+            record = None if entity is not None else raw.get(id_)
+            if entity is not None or record is not None:
+                out.append((id_, entity, record))
+        return out
+
+    def records(self, serialize):
+        """Dicionários para gravar, na ordem: serialize(entidade) para as montadas e, para as que
+        nunca foram lidas, o registro do arquivo como estava (sem montar o objeto)."""
+        return [record if entity is None else serialize(entity) for _, entity, record in self.entries()]
+
+
+class LazyList(MutableSequence):
+    """Lista de entidades (ordem do arquivo) sobre um LazyDict; as entidades precisam de .id."""
+
+    def __init__(self, entities):
+        self._entities = entities
+        self._ids = list(entities)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [e for e in map(self._entities.get, self._ids[i]) if e is not None]
+        while True:
+            try:
+                return self._entities[self._ids[i]]
+            except KeyError:
+                del self._ids[i]  # registro que o build recusou: sai da lista
+
+    def __iter__(self):
+        return (e for e in map(self._entities.get, list(self._ids)) if e is not None)
+
+    def __setitem__(self, i, value):
+        if isinstance(i, slice):
+            value = list(value)
+            self._ids[i] = [v.id for v in value]
+        else:
+            self._ids[i] = value.id
+            value = [value]
+        for v in value:
+            self._entities[v.id] = v
+
+    def __delitem__(self, i):
+        del self._ids[i]
+
+    def insert(self, i, value):
+        self._entities[value.id] = value
+        self._ids.insert(i, value.id)
+
+    def records(self, serialize):
+        """Como LazyDict.records, mas na ordem (e só com os ids) da lista (sobre um dict comum também)."""
+        if isinstance(self._entities, LazyDict):
+            entries = {id_: (entity, record) for id_, entity, record in self._entities.entries()}
+        else:
+            entries = {id_: (entity, None) for id_, entity in self._entities.items()}
+        out = []
+        for id_ in self._ids:
+            entity, record = entries.get(id_, (None, None))
+            if entity is not None:
+                out.append(serialize(entity))
+            elif record is not None:
+                out.append(record)
+        return out
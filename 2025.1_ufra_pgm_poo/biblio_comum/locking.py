@@ -0,0 +1,44 @@
+# locking.py — travas finas para várias mesas de atendimento no mesmo processo
+#
+# LockTable guarda uma trava por chave (("item", id), ("user", id)...), criada
+# na primeira vez que a chave é usada. hold(*chaves) pega todas as travas de
+# uma operação SEMPRE na mesma ordem (chaves ordenadas por repr), então duas
+# operações que disputam o mesmo usuário e o mesmo item nunca ficam esperando
+# uma pela outra (sem deadlock), e operações em itens/usuários diferentes
+# andam em paralelo.
+#
+# Regra de uso: a trava do registro (estrutura dos dicionários) é sempre a
+# última a ser pegada — nunca peça travas de entidade segurando a do registro.
+# As travas não são apagadas quando a entidade sai: outra thread pode estar
+# esperando por ela, e uma trava nova para o mesmo id deixaria duas passarem.
+import threading
+from contextlib import contextmanager
+
+
+class LockTable:
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()  # só para criar travas novas
+
+    def lock_for(self, key):
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(key, threading.Lock())
+        return lock
+
+    def __len__(self):
+        return len(self._locks)
+
+    @contextmanager
+    def hold(self, *keys):
+        locks = [self.lock_for(k) for k in sorted(set(keys), key=repr)]
+        taken = []
+        try:
+            for lock in locks:
+                lock.acquire()
+                taken.append(lock)
+            yield
+        finally:
+            for lock in reversed(taken):
+                lock.release()
@@ -0,0 +1,106 @@
+# redraw.py — redesenho por invalidação (e limite de FPS) para o loop do pygame
+#
+# Modo "continuous": igual ao loop antigo, desenha todo tick.
+# Modo "invalidate" (padrão): quando nada mudou o loop dorme em
+# pygame.event.wait; só redesenha depois de um evento, de invalidate(), de um
+# wake_in(ms) vencido (ex.: piscar do cursor) ou enquanto há animação.
+#
+# Configuração por variável de ambiente (ou parâmetros do construtor):
+#   BIBLIO_RENDER=continuous|invalidate    BIBLIO_FPS=<limite de quadros/s>
+#   BIBLIO_REDRAW_STATS=1    imprime o resumo (summary()) no stderr ao fechar
+#
+# report() estima o tempo de CPU economizado: quadros que o modo contínuo teria
+# desenhado no mesmo período x custo médio de CPU de um quadro.
+import os
+import sys
+import time
+
+import pygame
+
+MODES = ("invalidate", "continuous")
+
+
+class RedrawScheduler:
+    def __init__(self, fps=60, mode=None, idle_wait_ms=1000):
+        mode = mode or os.environ.get("BIBLIO_RENDER", "invalidate")
+        if mode not in MODES:
+            raise ValueError(f"Modo de redesenho desconhecido: {mode}")
+        self.mode = mode
+        self.fps = int(os.environ.get("BIBLIO_FPS", fps))
+        self.idle_wait_ms = idle_wait_ms
+        self.clock = pygame.time.Clock()
+        self.dirty = True
+        self._wake_at = None          # pygame.time.get_ticks() do próximo redesenho agendado
+        self._frame_cpu0 = 0.0
+        self.frames = 0
+        self.frame_cpu = 0.0          # CPU gasto desenhando (s), sem o 1º quadro
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+
+    # ---------- Invalidação ----------
+    def invalidate(self):
+        self.dirty = True
+
+    def wake_in(self, ms):
+        """Pede um redesenho daqui a ms milissegundos (sem eventos)."""
+        at = pygame.time.get_ticks() + max(0, int(ms))
+        if self._wake_at is None or at < self._wake_at:
+            self._wake_at = at
+
+    def _check_wake(self):
+        if self._wake_at is not None and pygame.time.get_ticks() >= self._wake_at:
+            self._wake_at = None
+            self.dirty = True
+
+    # ---------- Loop ----------
+    def events(self, animating=False):
+        """Eventos pendentes; no modo invalidate bloqueia enquanto não há o que desenhar."""
+        self._check_wake()
+        if self.mode == "continuous" or self.dirty or animating:
+            evs = pygame.event.get()
+        else:
+            timeout = self.idle_wait_ms
+            if self._wake_at is not None:
+                timeout = max(1, min(timeout, self._wake_at - pygame.time.get_ticks()))
+            ev = pygame.event.wait(timeout)
+            evs = [] if ev.type == pygame.NOEVENT else [ev] + pygame.event.get()
+            self._check_wake()
+        if evs:
+            self.dirty = True
+        return evs
+
+    def begin_frame(self, animating=False):
+        if self.mode == "continuous" or self.dirty or animating:
+            self._frame_cpu0 = time.process_time()
+            return True
+        return False
+
+    def end_frame(self):
+        """Chame depois do display.flip(): limpa a invalidação e aplica o limite de FPS."""
+        self.dirty = False
+        self.frames += 1
+        if self.frames > 1:  # o primeiro quadro paga carga de fontes/cache; fica fora da média
+            self.frame_cpu += time.process_time() - self._frame_cpu0
+        self.clock.tick(self.fps)
+
+    # ---------- Relatório ----------
+    def report(self):
+        wall = time.perf_counter() - self._wall0
+        cpu = time.process_time() - self._cpu0
+        per_frame = self.frame_cpu / (self.frames - 1) if self.frames > 1 else 0.0
+        continuous_frames = int(wall * self.fps) if self.fps else self.frames
+        skipped = max(0, continuous_frames - self.frames)
+        return {"mode": self.mode, "fps_cap": self.fps, "wall_s": round(wall, 2), "cpu_s": round(cpu, 2),
+                "frames": self.frames, "frames_skipped": skipped,
+                "cpu_saved_s": round(skipped * per_frame, 2) if self.mode == "invalidate" else 0.0}
+
+    def summary(self):
+        r = self.report()
+        return (f"[redesenho:{r['mode']}] {r['frames']} quadros em {r['wall_s']}s "
+                f"(CPU {r['cpu_s']}s); {r['frames_skipped']} quadros evitados, "
+                f"~{r['cpu_saved_s']}s de CPU economizados")
+
+    def close(self):
+        # fim do loop: o resumo só com BIBLIO_REDRAW_STATS=1
+        if os.environ.get("BIBLIO_REDRAW_STATS") == "1":
+            print(self.summary(), file=sys.stderr)
@@ -0,0 +1,65 @@
+# text_cache.py — cache LRU de superfícies de texto (font.render)
+#
+# As telas redesenham os mesmos rótulos 60 vezes por segundo; rasterizar o texto
+# de novo a cada quadro é desperdício. render_text(font, texto, aa, cor) tem a
+# mesma assinatura de font.render, mas devolve a superfície guardada quando a
+# chave (fonte, texto, cor, antialias, fundo) já foi vista.
+#
+# As superfícies devolvidas são compartilhadas: só use com blit (não altere
+# alpha/pixels delas).
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, antialias, color, background=None):
+        key = (font, text, tuple(color), bool(antialias), tuple(background) if background is not None else None)
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surf
+        self.misses += 1
+        if background is None:
+            surf = font.render(text, antialias, color)
+        else:
+            surf = font.render(text, antialias, color, background)
+        self._surfaces[key] = surf
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"size": len(self._surfaces), "maxsize": self.maxsize, "hits": self.hits,
+                "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+
+# cache compartilhado por todas as telas
+text_cache = TextCache()
+
+
+def render_text(font, text, antialias, color, background=None):
+    return text_cache.render(font, text, antialias, color, background)
+
+
+_fonts = {}
+
+
+def sys_font(name, size, bold=False, italic=False):
+    """pygame.font.SysFont memorizado: a mesma fonte vira a mesma chave no cache."""
+    key = (name, size, bold, italic)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(name, size, bold=bold, italic=italic)
+    return font
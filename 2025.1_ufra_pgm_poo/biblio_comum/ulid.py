@@ -0,0 +1,78 @@
+# ulid.py — ids curtos que ficam em ordem de criação (no estilo ULID)
+#
+# 26 caracteres em base32 de Crockford: os 10 primeiros são o tempo (ms desde
+# 1970, UTC) e os 16 últimos 80 bits aleatórios. Comparar dois ids como string
+# é comparar quando foram criados, então uma lista ordenada por id está
+# ordenada por data e um intervalo de datas vira duas buscas binárias
+# (time_prefix(início) <= id < time_prefix(fim)).
+#
+# Monotônico: no mesmo milissegundo (ou se o relógio voltar) o próximo id é o
+# anterior + 1 na parte aleatória, nunca um id menor. reserve(n) devolve n ids
+# seguidos com uma trava só (cargas em lote).
+import os
+import threading
+import time
+from datetime import datetime
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_VALID = frozenset(ALPHABET)
+_PAIRS = [a + b for a in ALPHABET for b in ALPHABET]   # 10 bits -> 2 caracteres
+_RANDOM_BITS = 80
+
+
+def _encode(value, length):
+    # `length` caracteres (par), do mais significativo para o menos
+    return "".join(_PAIRS[(value >> shift) & 1023] for shift in range(5 * (length - 2), -1, -10))
+
+
+def is_ulid(s):
+    return isinstance(s, str) and len(s) == 26 and _VALID.issuperset(s)
+
+
+def time_prefix(when):
+    """Os 10 caracteres de tempo de um id criado em `when` (datetime; sem fuso = hora local)."""
+    return _encode(int(when.timestamp() * 1000), 10)
+
+
+def timestamp(id_):
+    """datetime (hora local) em que o id foi criado."""
+    ms = 0
+    for c in id_[:10]:
+        ms = ms * 32 + ALPHABET.index(c)
+    return datetime.fromtimestamp(ms / 1000)
+
+
+class IdGenerator:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def _take(self, n):
+        # (ms, primeiro valor aleatório) para n ids seguidos
+        with self._lock:
+            ms = time.time_ns() // 1_000_000
+            if ms > self._last_ms:
+                # bit mais alto zerado: sobra espaço para 2**79 incrementos no mesmo ms
+                first = int.from_bytes(os.urandom(10), "big") >> 1
+            else:
+                ms, first = self._last_ms, self._last_random + 1
+                if first + n > 1 << _RANDOM_BITS:
+                    ms, first = ms + 1, 0   # estourou a parte aleatória: passa para o próximo ms
+            self._last_ms, self._last_random = ms, first + n - 1
+            return ms, first
+
+    def new(self):
+        ms, first = self._take(1)
+        return _encode((ms << _RANDOM_BITS) | first, 26)
+
+    def reserve(self, n):
+        """n ids em ordem crescente, reservados de uma vez."""
+        ms, first = self._take(n)
+        base = ms << _RANDOM_BITS
+        return [_encode(base | (first + k), 26) for k in range(n)]
+
+
+_default = IdGenerator()
+new_id = _default.new
+reserve = _default.reserve
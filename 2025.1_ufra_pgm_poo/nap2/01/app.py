@@ -4,7 +4,8 @@
 
 import sys, pygame
 from dominio import Livro, Revista, Dvd, Aluno, Professor, Visitante
-from servicos import criar_item, criar_usuario, processar_emprestimo, processar_devolucao, relatorio_disponiveis, relatorio_emprestados
+from repositorio import Repositorio
+from servicos import criar_item, criar_usuario, processar_emprestimo, processar_devolucao, contar_disponiveis, contar_emprestados
 
 # ====== Configs visuais básicas ======
 LARG, ALT = 1000, 640                      # resolucao da janela (quero algo mais “widescreen”)
@@ -79,9 +80,11 @@ TELA_MENU, TELA_GER, TELA_ITEM, TELA_USER = "menu","ger","item","user"
 tela_atual = TELA_MENU  # começo sempre no menu
 
 # ====== “Banco de dados” em memória (prototipo mesmo) ======
-itens = [Livro("Python","Guido"), Livro("Algoritmos","Wirth"), Revista("Ciencia Hoje","102"), Dvd("Interstellar",169)]
-usuarios = [Aluno("Ana")]    # deixo uma usuaria inicial pra testar o fluxo rápido
-transacoes = []              # registro bruto das operações (usado pelos serviços)
+# Repositorio = lista + busca por id (os serviços acham usuário/item sem percorrer tudo)
+itens = Repositorio([Livro("Python","Guido"), Livro("Algoritmos","Wirth"), Revista("Ciencia Hoje","102"), Dvd("Interstellar",169)],
+                    por_status=True)    # itens também guardam os status (relatórios prontos)
+usuarios = Repositorio([Aluno("Ana")])    # deixo uma usuaria inicial pra testar o fluxo rápido
+transacoes = Repositorio()                # registro bruto das operações (usado pelos serviços)
 sel_user, sel_item = 0, -1   # seleções padrão: já aponto 1º usuário, item nenhum
 
 # ====== Botões do menu e áreas de listagem ======
@@ -120,6 +123,15 @@ def desenhar_menu():
     for b in (b_menu_ger,b_menu_item,b_menu_user,b_menu_sair):
         b.desenhar()
 
+# ====== Resumo dos relatórios (só refaço o texto quando itens.versao muda) ======
+_resumo = {"versao": None, "img": None}
+def resumo_relatorios():
+    if _resumo["versao"] != itens.versao:
+        disp, emp = contar_disponiveis(itens), contar_emprestados(itens)
+        _resumo["img"] = fonte_peq.render(f"Disponiveis: {disp}  Emprestados: {emp}", True, CINZA)
+        _resumo["versao"] = itens.versao
+    return _resumo["img"]
+
 # ====== Telas: Gerenciar Empréstimos ======
 def desenhar_ger():
     fundo_draw()
@@ -129,6 +141,7 @@ def desenhar_ger():
     # botoes ação
     b_emp.desenhar()
     b_dev.desenhar()
+    tela.blit(resumo_relatorios(), (40, 200))   # quantos disponíveis/emprestados agora
 
     # painel usuários (nome em verde + quantos itens cada um tem)
     pygame.draw.rect(tela, BRANCO, area_users, border_radius=8)
@@ -11,14 +11,18 @@ class Item(EntidadeBiblioteca):
         # reaproveito a lógica do EntidadeBiblioteca (id, status, criado_em)
         super().__init__(id_=id_, status=status, criado_em=criado_em)
         self.__titulo = titulo   # título é obrigatório
+        self._ao_mudar_status = None   # quem guarda relatórios por status (Repositorio) se liga aqui
 
     @property
     def titulo(self): 
         return self.__titulo
 
     def atualizar_status(self, novo_status): 
-        # só mudo o status do item
+        # mudo o status do item e aviso quem estiver ouvindo (empréstimo/devolução passam por aqui)
+        antigo = self.status
         self.status = novo_status
+        if self._ao_mudar_status is not None and novo_status != antigo:
+            self._ao_mudar_status(self, antigo)
 
     def validar(self):
         # regra básica: não pode existir item sem título
@@ -1,82 +1,331 @@
 # repositorio.py
-# Esse arquivo cuida de salvar e carregar os dados em JSON (meu “banco de dados”).
+# Esse arquivo cuida de guardar os objetos (Repositorio: lista com busca direta por id)
+# e de salvar e carregar os dados em JSON (meu “banco de dados”) ou no snapshot binário.
 # Basicamente serializa os objetos (itens, usuários, transações) em dicionários
-# e depois reconstrói eles na hora de carregar.
+# e depois reconstrói eles na hora de carregar (um por um, só quando são usados).
 
 import json
+import os
+from bisect import bisect_left
+from itertools import chain
 from pathlib import Path   # Path facilita manipular arquivos
 from dominio import Livro, Revista, Dvd, Aluno, Professor, Visitante, Emprestimo, Devolucao
+import comum   # põe biblio_comum (módulos compartilhados entre os apps) no sys.path
+from biblio_comum.lazy_json import JsonIndex, LazyDict, LazyList   # leitura preguiçosa do JSON (só monta o que for usado)
+import snapshot   # formato binário compacto (mesma leitura preguiçosa)
 
-def salvar(caminho, itens, usuarios, transacoes):
-    # função que transforma todos os objetos em dicionários e salva num JSON
+# ===== Itens de um status, na ordem da lista =====
+class _Grupo:
+    # cada item tem uma posição (número que segue a ordem da lista) e o grupo guarda os seus em
+    # blocos de até BLOCO, ordenados pela posição (listas paralelas: posição, objeto, id). Entrar e
+    # sair mexem num bloco só (bisect + insert), então emprestar/devolver continua barato com 1M de
+    # itens, e o relatório é só juntar os blocos (em C). objeto None = ainda não lido do arquivo
+    BLOCO = 512
+
+    def __init__(self):
+        self.posicoes, self.objs, self.ids = [], [], []   # um bloco em cada
+        self.ultimas = []     # última posição de cada bloco (bisect acha o bloco)
+        self.n = 0
+        self.faltando = 0     # quantos objetos ainda None
+
+    def __len__(self):
+        return self.n
+
+    def entrar(self, pos, id_, obj):
+        if not self.ultimas or pos > self.ultimas[-1]:
+            # o caso comum (montar, item novo): no fim
+            if not self.ultimas or len(self.posicoes[-1]) >= self.BLOCO:
+                self.posicoes.append([]), self.objs.append([]), self.ids.append([]), self.ultimas.append(pos)
+            self.posicoes[-1].append(pos), self.objs[-1].append(obj), self.ids[-1].append(id_)
+            self.ultimas[-1] = pos
+        else:
+            b = bisect_left(self.ultimas, pos)
+            i = bisect_left(self.posicoes[b], pos)
+            self.posicoes[b].insert(i, pos), self.objs[b].insert(i, obj), self.ids[b].insert(i, id_)
+            if len(self.posicoes[b]) > 2 * self.BLOCO:
+                # bloco grande demais: divido ao meio
+                for partes in (self.posicoes, self.objs, self.ids):
+                    bloco = partes[b]
+                    partes[b:b + 1] = [bloco[:self.BLOCO], bloco[self.BLOCO:]]
+                self.ultimas[b:b + 1] = [self.posicoes[b][-1], self.posicoes[b + 1][-1]]
+        self.n += 1
+        if obj is None:
+            self.faltando += 1
+
+    def _achar(self, pos):
+        b = bisect_left(self.ultimas, pos)
+        if b < len(self.ultimas):
+            i = bisect_left(self.posicoes[b], pos)
+            if i < len(self.posicoes[b]) and self.posicoes[b][i] == pos:
+                return b, i
+        return None
+
+    def sair(self, pos):
+        achado = self._achar(pos)
+        if achado is None:
+            return
+        b, i = achado
+        if self.objs[b][i] is None:
+            self.faltando -= 1
+        del self.posicoes[b][i], self.objs[b][i], self.ids[b][i]
+        self.n -= 1
+        if self.posicoes[b]:
+            self.ultimas[b] = self.posicoes[b][-1]
+        else:
+            del self.posicoes[b], self.objs[b], self.ids[b], self.ultimas[b]
+
+    def preencher(self, pos, obj):
+        # o objeto foi montado agora (carregar): entra no lugar do None
+        achado = self._achar(pos)
+        if achado is not None and self.objs[achado[0]][achado[1]] is None:
+            self.objs[achado[0]][achado[1]] = obj
+            self.faltando -= 1
+
+    def faltantes(self):
+        # [(posição, id)] dos que ainda não foram lidos
+        return [(p, id_) for ps, os_, ids in zip(self.posicoes, self.objs, self.ids)
+                for p, o, id_ in zip(ps, os_, ids) if o is None]
+
+    def objetos(self):
+        return list(chain.from_iterable(self.objs))
+
+    def em_ordem(self):
+        return list(chain.from_iterable(self.ids))
+
+
+# ===== Repositorio: a lista de sempre + um dicionário {id: objeto} =====
+class Repositorio(LazyList):
+    # continua sendo lista (posição, fatias, append, ordem de inserção), então a tela não muda nada;
+    # a diferença é obter(id), que vai direto no dicionário em vez de percorrer a lista toda.
+    # Com por_status=True (itens), também guarda os itens de cada status (_Grupo, na ordem da
+    # lista), atualizados quando o item avisa que mudou (Item.atualizar_status): os relatórios não
+    # precisam varrer a lista
+    def __init__(self, objetos=(), por_id=None, por_status=False):
+        # por_id: de onde vêm os objetos (o LazyDict do carregar(), ou um dict novo)
+        super().__init__({} if por_id is None else por_id)
+        self.por_status = por_status
+        self._status = None   # {status: _Grupo}, montado no primeiro relatório (None: ainda não montado)
+        self._pos = None      # {id: posição na ordem da lista}, montado junto
+        self._proxima = 0     # posição do próximo item acrescentado no fim
+        self.versao = 0       # muda a cada inclusão, remoção ou mudança de status (a tela redesenha só aí)
+        self.extend(objetos)
+
+    def obter(self, id_):
+        # objeto com esse id, ou None
+        return self._entities.get(id_)
+
+    def __contains__(self, obj):
+        return self._entities.get(getattr(obj, "id", None)) is obj
+
+    def insert(self, i, obj):
+        # id repetido deixaria dois objetos na lista e só um no dicionário
+        if obj.id in self._entities:
+            raise ValueError(f"id repetido: {obj.id}")
+        n = len(self._ids)
+        k = min(max(i + n, 0) if i < 0 else i, n)   # onde ele fica de fato (regras do list.insert)
+        super().insert(i, obj)
+        self._entrou(obj, k)
+
+    def __setitem__(self, i, valor):
+        # quem sai da lista sai do dicionário (e dos status) também
+        for id_ in (self._ids[i] if isinstance(i, slice) else [self._ids[i]]):
+            self._saiu(id_, self._entities.pop(id_, None))
+        valor = list(valor) if isinstance(i, slice) else valor
+        super().__setitem__(i, valor)
+        if isinstance(i, slice):
+            self._status = self._pos = None   # raro: os status são remontados no próximo relatório
+            for obj in valor:
+                self._entrou(obj)
+        else:
+            self._entrou(valor, i if i >= 0 else i + len(self._ids))
+
+    def __delitem__(self, i):
+        ids = self._ids[i] if isinstance(i, slice) else [self._ids[i]]
+        super().__delitem__(i)
+        for id_ in ids:
+            self._saiu(id_, self._entities.pop(id_, None))
+
+    # ----- status -----
+    def ligar(self, obj):
+        # o objeto passa a avisar este repositório quando muda de status (o carregar() liga cada item
+        # na hora em que ele é montado)
+        if obj is not None and self.por_status:
+            obj._ao_mudar_status = self._status_mudou
+            if self._status is not None and obj.id in self._pos:
+                grupo = self._status.get(obj.status)
+                if grupo is not None:
+                    grupo.preencher(self._pos[obj.id], obj)
+        return obj
+
+    def _posicao(self, k):
+        # posição para quem acabou de entrar em self._ids[k]: depois de todos, ou entre os vizinhos
+        ids = self._ids
+        if k >= len(ids) - 1:
+            self._proxima += 1
+            return self._proxima - 1
+        depois = self._pos[ids[k + 1]]
+        antes = self._pos[ids[k - 1]] if k > 0 else depois - 1
+        return (antes + depois) / 2
+
+    def _entrou(self, obj, k=None):
+        self.versao += 1
+        self.ligar(obj)
+        if self._status is not None:
+            pos = self._pos[obj.id] = self._posicao(k)
+            self._grupo(obj.status).entrar(pos, obj.id, obj)
+
+    def _saiu(self, id_, obj):
+        self.versao += 1
+        if obj is not None and self.por_status:
+            obj._ao_mudar_status = None
+        if self._status is not None:
+            pos = self._pos.pop(id_, None)
+            if obj is not None and pos is not None:
+                self._grupo(obj.status).sair(pos)
+
+    def _status_mudou(self, obj, antigo):
+        self.versao += 1
+        if self._status is not None:
+            pos = self._pos.get(obj.id)
+            if pos is not None:
+                self._grupo(antigo).sair(pos)
+                self._grupo(obj.status).entrar(pos, obj.id, obj)
+
+    def _grupo(self, status):
+        grupo = self._status.get(status)
+        if grupo is None:
+            grupo = self._status[status] = _Grupo()
+        return grupo
+
+    def _montar_status(self):
+        # primeira vez: uma passada pelos objetos (do LazyDict, só o campo status dos que nunca foram lidos)
+        if isinstance(self._entities, LazyDict):
+            linhas = {id_: (obj.status if obj is not None else reg.get("status"), obj)
+                      for id_, obj, reg in self._entities.entries(("status",))}
+        else:
+            linhas = {id_: (obj.status, obj) for id_, obj in self._entities.items()}
+        self._status = {}
+        self._pos = {id_: k for k, id_ in enumerate(self._ids)}
+        self._proxima = len(self._ids)
+        for k, id_ in enumerate(self._ids):
+            if id_ in linhas:
+                status, obj = linhas[id_]
+                self._grupo(status).entrar(k, id_, obj)
+
+    def _grupo_pronto(self, status):
+        if self._status is None:
+            self._montar_status()
+        return self._status.get(status) or _Grupo()
+
+    def com_status(self, status):
+        # objetos com esse status, na ordem da lista (só esses são montados)
+        grupo = self._grupo_pronto(status)
+        if grupo.faltando:
+            # do carregar(): monto os que faltam (e ligar() põe cada um no grupo)
+            for pos, id_ in grupo.faltantes():
+                if self._entities.get(id_) is None:
+                    grupo.sair(pos)   # registro que o carregar() recusou
+                    self._pos.pop(id_, None)
+        return grupo.objetos()
+
+    def contar_status(self, status):
+        # quantos itens têm esse status (sem montar lista nem objetos)
+        return len(self._grupo_pronto(status))
+
+    def verificar_status(self):
+        # confere os status guardados (conteúdo e ordem) com uma varredura completa;
+        # AssertionError se algo divergir
+        if self._status is None:
+            self._montar_status()
+        esperado = {}
+        for obj in self:
+            esperado.setdefault(obj.status, []).append(obj.id)
+        guardado = {st: g.em_ordem() for st, g in self._status.items() if len(g)}
+        assert guardado == esperado, f"relatórios fora de sincronia: {guardado} x {esperado}"
+        for st, g in self._status.items():
+            assert len(g) == len(g.em_ordem()), f"contagem de {st} errada: {len(g)} x {len(g.em_ordem())}"
+
+def _registros(lista):
+    # cada objeto vira dict; se a lista veio do carregar(), quem nunca foi lido volta do arquivo como estava
+    if isinstance(lista, LazyList):
+        return lista.records(lambda o: o.para_dict())
+    return [o.para_dict() for o in lista]
+
+def salvar(caminho, itens, usuarios, transacoes, formato=None):
+    # função que transforma todos os objetos em dicionários e salva num arquivo:
+    # JSON (padrão) ou o snapshot binário (snapshot.py), com formato="binario" ou extensão .snap
     dados = {
-        "itens": [i.para_dict() for i in itens],              # cada item vira dict
-        "usuarios": [u.para_dict() for u in usuarios],        # cada usuário vira dict
-        "transacoes": [t.para_dict() for t in transacoes],    # cada transação vira dict
+        "itens": _registros(itens),
+        "usuarios": _registros(usuarios),
+        "transacoes": _registros(transacoes),
     }
-    # uso Path pra escrever direto o JSON no arquivo
-    Path(caminho).write_text(json.dumps(dados, indent=2, ensure_ascii=False))
+    if formato is None:
+        formato = "binario" if Path(caminho).suffix == snapshot.EXTENSAO else "json"
+    if formato not in ("json", "binario"):
+        raise ValueError(f"formato desconhecido: {formato}")
+    # escrevo num temporário e troco de uma vez: se der erro no meio, o arquivo antigo fica inteiro
+    # (e as listas do carregar() continuam lendo o arquivo antigo, que não pode ser truncado)
+    temporario = Path(str(caminho) + ".tmp")
+    if formato == "binario":
+        snapshot.escrever(temporario, dados)
+    else:
+        temporario.write_text(json.dumps(dados, indent=2, ensure_ascii=False))
+    os.replace(temporario, caminho)
+
+# ===== Reconstrução de cada objeto a partir do dict do arquivo =====
+# Registro de tipos: seção -> {"tipo" gravado: como montar o objeto}. Vale pros dois formatos;
+# tipo novo é uma linha aqui (em vez de mais um if em cada função)
+def _kw(d):
+    # o que todas as classes recebem
+    return dict(id_=d["id"], status=d["status"], criado_em=d["criado_em"])
+
+TIPOS = {
+    "itens": {
+        # Livro precisa de titulo e autor (o para_dict do Livro não grava isbn)
+        "Livro": lambda d: Livro(d["titulo"], d["autor"], **_kw(d)),
+        "Revista": lambda d: Revista(d["titulo"], d["edicao"], **_kw(d)),
+        "Dvd": lambda d: Dvd(d["titulo"], d["duracao_min"], **_kw(d)),
+    },
+    "usuarios": {
+        "Aluno": lambda d: Aluno(d["nome"], emprestados=d.get("emprestados", 0), **_kw(d)),
+        "Professor": lambda d: Professor(d["nome"], emprestados=d.get("emprestados", 0), **_kw(d)),
+        "Visitante": lambda d: Visitante(d["nome"], emprestados=d.get("emprestados", 0), **_kw(d)),
+    },
+    "transacoes": {
+        "Emprestimo": lambda d: Emprestimo(d["usuario_id"], d["item_id"], **_kw(d)),
+        "Devolucao": lambda d: Devolucao(d["usuario_id"], d["item_id"], **_kw(d)),
+    },
+}
+
+def _montar(secao, d):
+    montar = TIPOS[secao].get(d.get("tipo"))
+    return montar(d) if montar else None  # tipo desconhecido: fica de fora
 
 def carregar(caminho):
-    # função que lê o arquivo JSON e reconstrói os objetos de volta
+    # função que abre o arquivo (JSON ou snapshot binário) e devolve as 3 listas (itens, usuários, transações)
     p = Path(caminho)
     if not p.exists(): 
-        # se não existir o arquivo, retorno 3 listas vazias
-        return [], [], []
-    dados = json.loads(p.read_text())   # leio e converto de JSON pra dict
-
-    # ===== Reconstrução dos Itens =====
-    itens = []
-    for d in dados.get("itens", []):
-        t = d.get("tipo")
-        if t == "Livro":
-            # Livro precisa de titulo, autor, e isbn (no dict tem isso)
-            itens.append(Livro(
-                d["titulo"], d["autor"], d["isbn"],
-                id_=d["id"], status=d["status"], criado_em=d["criado_em"]
-            ))
-        elif t == "Revista":
-            itens.append(Revista(
-                d["titulo"], d["edicao"],
-                id_=d["id"], status=d["status"], criado_em=d["criado_em"]
-            ))
-        elif t == "Dvd":
-            itens.append(Dvd(
-                d["titulo"], d["duracao_min"],
-                id_=d["id"], status=d["status"], criado_em=d["criado_em"]
-            ))
-
-    # ===== Reconstrução dos Usuários =====
-    usuarios = []
-    for d in dados.get("usuarios", []):
-        t = d.get("tipo")
-        # preparo os kwargs que todas as classes precisam
-        kw = dict(
-            id_=d["id"], status=d["status"], 
-            criado_em=d["criado_em"], emprestados=d.get("emprestados", 0)
-        )
-        if t == "Aluno": usuarios.append(Aluno(d["nome"], **kw))
-        elif t == "Professor": usuarios.append(Professor(d["nome"], **kw))
-        elif t == "Visitante": usuarios.append(Visitante(d["nome"], **kw))
-
-    # ===== Reconstrução das Transações =====
-    transacoes = []
-    for d in dados.get("transacoes", []):
-        t = d.get("tipo")
-        kw = dict(id_=d["id"], status=d["status"], criado_em=d["criado_em"])
-        if t == "Emprestimo":
-            transacoes.append(Emprestimo(d["usuario_id"], d["item_id"], **kw))
-        elif t == "Devolucao":
-            transacoes.append(Devolucao(d["usuario_id"], d["item_id"], **kw))
-
-    return itens, usuarios, transacoes
+        # se não existir o arquivo, retorno 3 repositórios vazios
+        return Repositorio(por_status=True), Repositorio(), Repositorio()
+    # não decodifico o arquivo todo: o índice só acha onde está cada registro, e cada objeto
+    # é montado na primeira vez que alguém pega ele da lista (com 1M de itens abre em ~1 s).
+    # O formato é detectado pelo começo do arquivo, não pela extensão
+    if snapshot.eh_snapshot(p):
+        indice = snapshot.IndiceSnapshot(str(p))
+    else:
+        indice = JsonIndex(str(p), ("itens", "usuarios", "transacoes"))
+    # itens: o Repositorio guarda os status (relatórios), então cada item é ligado a ele ao ser montado
+    itens = Repositorio(por_id=LazyDict(indice, "itens", lambda d: itens.ligar(_montar("itens", d))), por_status=True)
+    return (itens,
+            Repositorio(por_id=LazyDict(indice, "usuarios", lambda d: _montar("usuarios", d))),
+            Repositorio(por_id=LazyDict(indice, "transacoes", lambda d: _montar("transacoes", d))))
 
 
 # ===== Teste rápido (só roda se eu chamar direto esse arquivo) =====
 if __name__ == "__main__":
-    itens, usuarios, transacoes = [], [], []
+    itens, usuarios, transacoes = Repositorio(por_status=True), Repositorio(), Repositorio()
     # crio um livro de teste
-    itens.append(Livro("Livro X", "Autora Y", "111"))
+    itens.append(Livro("Livro X", "Autora Y"))
     # crio um aluno de teste
     usuarios.append(Aluno("Joao"))
     # salvo em JSON
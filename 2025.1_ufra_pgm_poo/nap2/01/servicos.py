@@ -2,10 +2,19 @@
 # Esse arquivo concentra as funções de serviço (operações que mexem com listas).
 # Tipo um "controlador": cria, busca, processa empréstimos/devoluções e gera relatórios.
 
+import os
 from dominio import Emprestimo, Devolucao
+from repositorio import Repositorio
+
+# modo de verificação (testes/benchmarks): BIBLIO_VERIFICAR=1 faz cada relatório conferir os status
+# guardados no Repositorio com uma varredura completa da lista (AssertionError se divergirem)
+VERIFICAR_RELATORIOS = os.environ.get("BIBLIO_VERIFICAR", "0") != "0"
 
 def achar_por_id(lista, id_):
-    # função utilitária: percorro a lista e retorno o objeto com o id que bate
+    # função utilitária: num Repositorio vou direto pelo id; numa lista comum,
+    # percorro a lista e retorno o objeto com o id que bate
+    if isinstance(lista, Repositorio):
+        return lista.obter(id_)
     for obj in lista:
         if obj.id == id_: 
             return obj
@@ -13,7 +22,7 @@ def achar_por_id(lista, id_):
 
 # ===== CRUD básico =====
 def criar_item(lista_itens, item): 
-    # só adiciono o item na lista
+    # só adiciono o item na lista (ou no Repositorio, que também indexa pelo id)
     lista_itens.append(item)
 
 def criar_usuario(lista_usuarios, usuario): 
@@ -49,13 +58,37 @@ def processar_devolucao(usuarios, itens, transacoes, usuario_id, item_id):
     transacoes.append(d)
 
 # ===== Relatórios simples =====
+# Num Repositorio com por_status, o relatório já está pronto: os empréstimos e devoluções
+# (Emprestimo/Devolucao.processar -> item.atualizar_status) vão atualizando os status guardados,
+# e itens.versao diz se algo mudou desde o último relatório. Numa lista comum, filtro tudo.
+def _relatorio(itens, status):
+    if isinstance(itens, Repositorio) and itens.por_status:
+        if VERIFICAR_RELATORIOS:
+            itens.verificar_status()
+        return itens.com_status(status)
+    return [i for i in itens if i.status == status]
+
 def relatorio_disponiveis(itens):  
-    # filtro só os itens que estão disponíveis
-    return [i for i in itens if i.status == "disponivel"]
+    # só os itens que estão disponíveis
+    return _relatorio(itens, "disponivel")
 
 def relatorio_emprestados(itens): 
-    # filtro só os itens que estão emprestados
-    return [i for i in itens if i.status == "emprestado"]
+    # só os itens que estão emprestados
+    return _relatorio(itens, "emprestado")
+
+# Só a quantidade (resumo da tela): num Repositorio é o tamanho do grupo, sem montar lista
+def _contagem(itens, status):
+    if isinstance(itens, Repositorio) and itens.por_status:
+        if VERIFICAR_RELATORIOS:
+            itens.verificar_status()
+        return itens.contar_status(status)
+    return sum(1 for i in itens if i.status == status)
+
+def contar_disponiveis(itens):
+    return _contagem(itens, "disponivel")
+
+def contar_emprestados(itens):
+    return _contagem(itens, "emprestado")
 
 # ===== Teste rápido =====
 if __name__ == "__main__":
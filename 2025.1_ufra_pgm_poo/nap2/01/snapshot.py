@@ -0,0 +1,233 @@
+# snapshot.py
+# Formato binário compacto pro repositorio.salvar/carregar (alternativa ao JSON).
+# A ideia: em vez de um dict com os nomes dos campos repetidos em cada registro,
+# guardo cada tipo (Livro, Aluno, Emprestimo...) num bloco com uma coluna por campo.
+#
+# Layout (tudo little-endian):
+#   cabeçalho: MAGICO (8 bytes) | versão u16 | nº de seções u16
+#   seção:     nome | nº de registros u32 | nº de blocos u16 | ordem (u16 por registro:
+#              o bloco de cada registro, pra voltar à ordem original da lista)
+#   bloco:     tipo | nº de registros u32 | nº de colunas u16 | colunas
+#   coluna:    nome | código (b"i", b"s" ou b"j") | tamanho u64 | dados
+#                i: int64 de cada registro
+#                s: tamanho (em caracteres) u32 de cada string + todas juntas em utf-8
+#                j: lista JSON (colunas com tipos misturados, None etc.)
+#   nomes/tipos: u16 com o tamanho + utf-8
+#
+# IndiceSnapshot lê o arquivo do mesmo jeito que o JsonIndex (biblio_comum/lazy_json.py): ao abrir
+# só percorre os cabeçalhos; os ids de uma seção são decodificados quando ela é usada
+# e as outras colunas de um bloco na primeira vez que um registro dele é pedido.
+# Assim o LazyDict funciona igual por cima dos dois formatos.
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from itertools import accumulate
+
+MAGICO = b"BIBSNAP\x00"
+VERSAO = 1
+EXTENSAO = ".snap"   # salvar() usa o formato binário pra arquivos com essa extensão
+
+_U32 = "I" if array("I").itemsize == 4 else "L"
+_GRANDE = sys.byteorder == "big"   # arrays são gravados sempre little-endian
+
+
+def eh_snapshot(caminho):
+    # detecta o formato pelo começo do arquivo (não pela extensão)
+    with open(caminho, "rb") as f:
+        return f.read(len(MAGICO)) == MAGICO
+
+
+# ===== Escrita =====
+def _nome(s):
+    b = s.encode("utf-8")
+    return struct.pack("<H", len(b)) + b
+
+def _array(tipo, valores):
+    a = array(tipo, valores)
+    if _GRANDE: a.byteswap()
+    return a.tobytes()
+
+def _coluna(valores):
+    # escolho o código da coluna pelo que ela tem
+    if all(type(v) is int and -2**63 <= v < 2**63 for v in valores):
+        return b"i", _array("q", valores)
+    if all(type(v) is str for v in valores):
+        return b"s", _array(_U32, map(len, valores)) + "".join(valores).encode("utf-8", "surrogatepass")
+    return b"j", json.dumps(valores, ensure_ascii=False).encode("utf-8")
+
+def escrever(caminho, dados):
+    # dados: {"itens": [dict, ...], ...}, os mesmos dicts de para_dict() que vão pro JSON
+    with open(caminho, "wb") as f:
+        f.write(MAGICO + struct.pack("<HH", VERSAO, len(dados)))
+        for secao, registros in dados.items():
+            # separo por tipo, lembrando a ordem original
+            blocos, ordem = {}, array("H")
+            for r in registros:
+                bloco = blocos.setdefault(str(r.get("tipo") or ""), (len(blocos), []))
+                ordem.append(bloco[0])
+                bloco[1].append(r)
+            if _GRANDE: ordem.byteswap()
+            f.write(_nome(secao) + struct.pack("<IH", len(registros), len(blocos)) + ordem.tobytes())
+            for tipo, (_, regs) in blocos.items():
+                # campos na ordem em que aparecem (o "tipo" já está no bloco)
+                campos = list(dict.fromkeys(k for r in regs for k in r if k != "tipo"))
+                f.write(_nome(tipo) + struct.pack("<IH", len(regs), len(campos)))
+                for campo in campos:
+                    codigo, bruto = _coluna([r.get(campo) for r in regs])
+                    f.write(_nome(campo) + codigo + struct.pack("<Q", len(bruto)))
+                    f.write(bruto)
+
+
+# ===== Leitura =====
+class IndiceSnapshot:
+    # mesma interface que o LazyDict usa no JsonIndex: positions, ids, record, records, column
+
+    def __init__(self, caminho):
+        self.path = caminho
+        with open(caminho, "rb") as f:
+            if os.name == "nt" or os.fstat(f.fileno()).st_size == 0:
+                self._buf = f.read()
+            else:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._buf[:len(MAGICO)] != MAGICO:
+            raise ValueError(f"{caminho}: não é um snapshot")
+        self._pos = len(MAGICO)
+        versao, n_secoes = self._ler("<HH")
+        if versao > VERSAO:
+            raise ValueError(f"{caminho}: snapshot versão {versao}, sei ler até a {VERSAO}")
+        # {seção: (nº de registros, posição da ordem, [(tipo, n, {coluna: (código, início, fim)})])}
+        self._secoes = {}
+        for _ in range(n_secoes):
+            secao = self._ler_nome()
+            n, n_blocos = self._ler("<IH")
+            inicio_ordem = self._pos
+            self._pos += 2 * n
+            blocos = []
+            for _ in range(n_blocos):
+                tipo = self._ler_nome()
+                n_bloco, n_colunas = self._ler("<IH")
+                colunas = {}
+                for _ in range(n_colunas):
+                    campo = self._ler_nome()
+                    codigo = bytes(self._buf[self._pos:self._pos + 1])
+                    self._pos += 1
+                    tamanho, = self._ler("<Q")
+                    colunas[campo] = (codigo, self._pos, self._pos + tamanho)
+                    self._pos += tamanho
+                blocos.append((tipo, n_bloco, colunas))
+            self._secoes[secao] = (n, inicio_ordem, blocos)
+        self._decodificadas = {}   # {(seção, bloco, campo): lista de valores}
+        self._positions = {}
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def _ler(self, formato):
+        valores = struct.unpack_from(formato, self._buf, self._pos)
+        self._pos += struct.calcsize(formato)
+        return valores
+
+    def _ler_nome(self):
+        n, = self._ler("<H")
+        s = bytes(self._buf[self._pos:self._pos + n]).decode("utf-8")
+        self._pos += n
+        return s
+
+    def _valores(self, secao, b, campo):
+        # valores de uma coluna (decodificada uma vez só); None se o bloco não tem esse campo
+        chave = (secao, b, campo)
+        valores = self._decodificadas.get(chave)
+        if valores is None:
+            tipo, n, colunas = self._secoes[secao][2][b]
+            if campo not in colunas:
+                return None
+            codigo, inicio, fim = colunas[campo]
+            if codigo == b"i":
+                a = array("q")
+                a.frombytes(self._buf[inicio:fim])
+                if _GRANDE: a.byteswap()
+                valores = a.tolist()
+            elif codigo == b"s":
+                tamanhos = array(_U32)
+                tamanhos.frombytes(self._buf[inicio:inicio + 4 * n])
+                if _GRANDE: tamanhos.byteswap()
+                texto = self._buf[inicio + 4 * n:fim].decode("utf-8", "surrogatepass")
+                limites = list(accumulate(tamanhos, initial=0))
+                valores = list(map(texto.__getitem__, map(slice, limites, limites[1:])))
+            else:
+                valores = json.loads(self._buf[inicio:fim].decode("utf-8"))
+            self._decodificadas[chave] = valores
+        return valores
+
+    def _na_ordem(self, secao, por_bloco):
+        # junta as listas de cada bloco na ordem original dos registros
+        n, inicio, blocos = self._secoes[secao]
+        ordem = array("H")
+        ordem.frombytes(self._buf[inicio:inicio + 2 * n])
+        if _GRANDE: ordem.byteswap()
+        proximos = [iter(lista).__next__ for lista in por_bloco]
+        return [proximos[b]() for b in ordem]
+
+    def positions(self, section):
+        # {id: posição}, posição = bloco << 32 | linha (o LazyDict passa a ser o dono do dicionário)
+        with self._lock:
+            positions = self._positions.get(section)
+            if positions is None:
+                if section in self._secoes:
+                    blocos = self._secoes[section][2]
+                    ids = self._na_ordem(section, [self._valores(section, b, "id") or [None] * n
+                                                   for b, (_, n, _) in enumerate(blocos)])
+                    linhas = self._na_ordem(section, [range(b << 32, (b << 32) + n)
+                                                      for b, (_, n, _) in enumerate(blocos)])
+                    positions = dict(zip(ids, linhas))
+                else:
+                    positions = {}
+                self._positions[section] = positions
+                self._ids[section] = list(positions)
+            return positions
+
+    def ids(self, section):
+        self.positions(section)
+        return self._ids[section]
+
+    def _registro(self, secao, b, linha):
+        tipo, _, colunas = self._secoes[secao][2][b]
+        registro = {"tipo": tipo}
+        for campo in colunas:
+            registro[campo] = self._valores(secao, b, campo)[linha]
+        return registro
+
+    def record(self, position, id_):
+        for secao, positions in self._positions.items():
+            if positions.get(id_) == position:
+                return self._registro(secao, position >> 32, position & 0xFFFFFFFF)
+        raise KeyError(id_)
+
+    def records(self, section):
+        if section not in self._secoes:
+            return []
+        por_bloco = []
+        for b, (tipo, n, colunas) in enumerate(self._secoes[section][2]):
+            campos = list(colunas)
+            valores = [self._valores(section, b, c) for c in campos]
+            por_bloco.append([dict(zip(campos, linha), tipo=tipo) for linha in zip(*valores)] if campos
+                             else [{"tipo": tipo} for _ in range(n)])
+        return self._na_ordem(section, por_bloco)
+
+    def column(self, section, key):
+        if section not in self._secoes:
+            return []
+        por_bloco = []
+        for b, (tipo, n, colunas) in enumerate(self._secoes[section][2]):
+            valores = [tipo] * n if key == "tipo" else self._valores(section, b, key)
+            if valores is None:
+                return None
+            por_bloco.append(valores)
+        return self._na_ordem(section, por_bloco)
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
@@ -0,0 +1,140 @@
+# bench_catalog.py — tempo de frame com 100k itens: varredura linear x catálogo indexado
+#
+# Uso:  python bench_catalog.py [n_itens]
+# Roda sem janela (driver de vídeo "dummy") numa pasta temporária, então não
+# mexe em data/library_data.json.
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import statistics
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = Path(__file__).resolve().parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ui.app import BiblioApp
+
+
+def synthetic_data(n_items, n_users=500, seed=42):
+    rnd = random.Random(seed)
+    users = []
+    for i in range(n_users):
+        typ = rnd.choice(["Student", "Professor", "Visitor"])
+        users.append({"type": typ, "name": f"Usuario {i:05d}", "limit": 3})
+    items = []
+    for i in range(n_items):
+        typ = rnd.choice(["Book", "Magazine", "DVD"])
+        it = {"type": typ, "name": f"{typ} {i:06d}", "status": "available"}
+        if typ == "Book":
+            it.update(author=f"Autor {i % 997}", isbn=str(9780000000000 + i))
+        elif typ == "Magazine":
+            it["edition"] = f"Ed. {i % 120}"
+        else:
+            it["duration"] = f"{60 + i % 120}min"
+        if rnd.random() < 0.05:
+            it.update(status="borrowed", borrower=rnd.choice(users)["name"])
+        items.append(it)
+    return {"items": items, "users": users, "transactions": []}
+
+
+# ---------- Versões antigas (varredura linear), para comparação ----------
+def linear_count_items(app):
+    items = app.data.get("items", [])
+    total = len(items)
+    books = sum(1 for it in items if it.get("type") == "Book")
+    magazines = sum(1 for it in items if it.get("type") == "Magazine")
+    dvds = sum(1 for it in items if it.get("type") == "DVD")
+    borrowed = sum(1 for it in items if it.get("status") == "borrowed")
+    return {"total": total, "books": books, "magazines": magazines, "dvds": dvds, "available": total - borrowed, "borrowed": borrowed}
+
+
+def linear_count_users(app):
+    users = app.data.get("users", [])
+    return {"total": len(users),
+            "students": sum(1 for u in users if u.get("type") == "Student"),
+            "professors": sum(1 for u in users if u.get("type") == "Professor"),
+            "visitors": sum(1 for u in users if u.get("type") == "Visitor")}
+
+
+def linear_filtered_items(app):
+    t, s = app.rep_filter_type, app.rep_filter_status
+    return [it for it in app.data.get("items", [])
+            if (t == "All" or it.get("type") == t) and (s == "All" or it.get("status", "available") == s)]
+
+
+def linear_group_by_user(app):
+    m = {u.get("name"): [] for u in app.data.get("users", [])}
+    for it in app.data.get("items", []):
+        if it.get("status") == "borrowed" and it.get("borrower"):
+            m.setdefault(it.get("borrower"), []).append(it)
+    return m
+
+
+def frame_times(app, screen, frames, setup=None):
+    app.current_screen = screen
+    if setup:
+        setup(app)
+    render = {"dashboard": app.render_dashboard, "reports": app.render_reports}[screen]
+    out = []
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        render()
+        out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+
+def summarize(ms):
+    ms = sorted(ms)
+    return {"mean_ms": round(statistics.fmean(ms), 3),
+            "p50_ms": round(ms[len(ms) // 2], 3),
+            "p95_ms": round(ms[int(len(ms) * 0.95) - 1], 3)}
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    frames = 30
+    scenarios = [
+        ("dashboard", None),
+        ("reports: Book + borrowed", lambda a: setattr(a, "rep_filter_type", "Book") or setattr(a, "rep_filter_status", "borrowed")),
+        ("reports: por usuário", lambda a: setattr(a, "rep_mode", "by_user")),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs("data")
+        with open(os.path.join("data", "library_data.json"), "w", encoding="utf-8") as f:
+            json.dump(synthetic_data(n), f)
+        app = BiblioApp()
+        results = {}
+        for label, setup in scenarios:
+            screen = label.split(":")[0]
+            app.rep_mode, app.rep_filter_type, app.rep_filter_status = "items", "All", "All"
+            indexed = frame_times(app, screen, frames, setup)
+            app.rep_mode, app.rep_filter_type, app.rep_filter_status = "items", "All", "All"
+            # troca os métodos da instância pelas versões lineares
+            app._count_items = lambda: linear_count_items(app)
+            app._count_users = lambda: linear_count_users(app)
+            app._rep_filtered_items = lambda: linear_filtered_items(app)
+            app._rep_group_by_user = lambda: linear_group_by_user(app)
+            linear = frame_times(app, screen, frames, setup)
+            for name in ("_count_items", "_count_users", "_rep_filtered_items", "_rep_group_by_user"):
+                del app.__dict__[name]
+            results[label] = {"linear": summarize(linear), "indexed": summarize(indexed)}
+        os.chdir(ROOT)
+
+    print(f"Itens: {n}  |  frames por cenário: {frames}")
+    print(f"{'cenário':28s} {'linear p50':>12s} {'indexado p50':>14s} {'ganho':>8s}")
+    for label, r in results.items():
+        lin, idx = r["linear"]["p50_ms"], r["indexed"]["p50_ms"]
+        print(f"{label:28s} {lin:10.2f}ms {idx:12.2f}ms {lin / max(idx, 1e-6):7.1f}x")
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,33 @@
 import abc
 from datetime import datetime
 
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.compact import intern_status, pack_datetime, slots, unpack_datetime
+
 class LibraryEntity(abc.ABC):
     _next_id = 1
+    # __slots__ (sem __dict__ por instância) no modo compacto; ver models/compact.py
+    __slots__ = slots("__id", "name", "__created_at", "__status", root=True)
+
     def __init__(self, name):
         self.__id = LibraryEntity._next_id
         LibraryEntity._next_id += 1
         self.name = name
-        self.created_at = datetime.now()
+        self.created_at = datetime.now()  # guardado compacto (int), lido como datetime
         self.__status = "available"
 
     @property
     def id(self):
         return self.__id
 
+    @property
+    def created_at(self):
+        return unpack_datetime(self.__created_at)
+
+    @created_at.setter
+    def created_at(self, value):
+        self.__created_at = pack_datetime(value)
+
     @property
     def status(self):
         return self.__status
@@ -21,7 +35,7 @@ class LibraryEntity(abc.ABC):
     @status.setter
     def status(self, value):
         if value in ["available", "borrowed"]:
-            self.__status = value
+            self.__status = intern_status(value)
         else:
             raise ValueError("Status inválido.")
 
@@ -1,10 +1,16 @@
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.compact import slots
 from models.entities import LibraryEntity
 
 class Item(LibraryEntity):
+    __slots__ = slots()
+
     def __init__(self, name):
         super().__init__(name)
 
 class Book(Item):
+    __slots__ = slots("author", "isbn")
+
     def __init__(self, name, author, isbn):
         super().__init__(name)
         self.author = author
@@ -23,6 +29,8 @@ class Book(Item):
         return {"type": "Book", "name": self.name, "author": self.author, "isbn": self.isbn}
 
 class Magazine(Item):
+    __slots__ = slots("edition")
+
     def __init__(self, name, edition):
         super().__init__(name)
         self.edition = edition
@@ -40,6 +48,8 @@ class Magazine(Item):
         return {"type": "Magazine", "name": self.name, "edition": self.edition}
 
 class DVD(Item):
+    __slots__ = slots("duration")
+
     def __init__(self, name, duration):
         super().__init__(name)
         self.duration = duration
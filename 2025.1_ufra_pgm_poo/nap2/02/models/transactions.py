@@ -1,7 +1,11 @@
 import abc
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.compact import slots
 from models.entities import LibraryEntity
 
 class Transaction(LibraryEntity, abc.ABC):
+    __slots__ = slots()
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -10,6 +14,8 @@ class Transaction(LibraryEntity, abc.ABC):
         pass
 
 class Loan(Transaction):
+    __slots__ = slots()
+
     def display_info(self):
         return "Empréstimo"
 
@@ -30,6 +36,8 @@ class Loan(Transaction):
         return False
 
 class Return(Transaction):
+    __slots__ = slots()
+
     def display_info(self):
         return "Devolução"
 
@@ -48,6 +56,8 @@ class Return(Transaction):
         return True
 
 class Reservation(Transaction):
+    __slots__ = slots()
+
     def display_info(self):
         return "Reserva"
 
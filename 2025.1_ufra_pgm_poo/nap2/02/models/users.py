@@ -1,11 +1,17 @@
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.compact import slots
 from models.entities import LibraryEntity
 
 class User(LibraryEntity):
+    __slots__ = slots("limit")
+
     def __init__(self, name, limit):
         super().__init__(name)
         self.limit = limit
 
 class Student(User):
+    __slots__ = slots()
+
     def __init__(self, name):
         super().__init__(name, limit=3)
 
@@ -22,6 +28,8 @@ class Student(User):
         return {"type": "Student", "name": self.name, "limit": self.limit}
 
 class Professor(User):
+    __slots__ = slots()
+
     def __init__(self, name):
         super().__init__(name, limit=999)
 
@@ -38,6 +46,8 @@ class Professor(User):
         return {"type": "Professor", "name": self.name, "limit": self.limit}
 
 class Visitor(User):
+    __slots__ = slots()
+
     def __init__(self, name):
         super().__init__(name, limit=1)
 
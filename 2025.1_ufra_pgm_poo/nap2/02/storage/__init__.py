@@ -0,0 +1 @@
+# torna 'storage' um pacote Python
@@ -0,0 +1,282 @@
+# catalog.py — catálogo em memória com índices secundários
+#
+# Os dados continuam sendo o mesmo dicionário de listas salvo em JSON
+# ({"items": [...], "users": [...], "transactions": [...]}); o Catalog apenas
+# mantém índices ao lado dele:
+#   itens por "type", por "status" e por "borrower" (só os emprestados a alguém);
+#   usuários por "type".
+# Toda mutação passa por Catalog.apply (mesmas mudanças do diário), então os
+# índices nunca ficam desatualizados e filtros/contagens custam O(resultado).
+# Cada linha indexada tem uma posição (número que cresce na ordem do catálogo:
+# "add" pega a próxima, "ins" uma entre as vizinhas, "del" não mexe nas outras)
+# e cada balde guarda suas linhas ordenadas por ela. Quando um campo muda, a
+# linha sai de um balde e entra no outro no lugar certo (bisect + insert na
+# lista, que só desloca ponteiros em C), então os filtros saem na ordem do
+# catálogo sem ordenar nada. O resultado de cada
+# filtro fica guardado até a próxima mudança (version).
+#
+# Os contadores do dashboard (CatalogStats) também são materializados aqui e
+# atualizados em O(1) por mudança. Com self_check=True (ou variável de ambiente
+# BIBLIO_SELF_CHECK=1) cada apply confere os contadores e todos os baldes dos
+# índices contra uma varredura completa — caro, pensado para testes.
+import os
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+from storage.journal import apply_changes
+
+ITEM_KEYS = ("type", "status", "borrower")
+USER_KEYS = ("type",)
+_DEFAULTS = {"status": "available"}
+
+
+def _key_of(row, field):
+    return row.get(field, _DEFAULTS.get(field))
+
+
+class _Bucket:
+    """Linhas com um mesmo valor no índice, na ordem do catálogo (listas paralelas: posição, linha)."""
+    __slots__ = ("positions", "rows")
+
+    def __init__(self):
+        self.positions = []
+        self.rows = []
+
+    def add(self, pos, row):
+        i = bisect_right(self.positions, pos)   # ao montar, sempre no fim
+        self.positions.insert(i, pos)
+        self.rows.insert(i, row)
+
+    def remove(self, pos, row):
+        i = bisect_left(self.positions, pos)
+        if i < len(self.rows) and self.rows[i] is row:
+            del self.positions[i]
+            del self.rows[i]
+
+    def __len__(self):
+        return len(self.rows)
+
+
+_EMPTY = _Bucket()
+
+
+class _Index:
+    """Um índice por campo: valor -> _Bucket (linhas na ordem do catálogo).
+
+    Nos campos de `sparse`, linhas com None ficam fora do índice (em "borrower" esse balde
+    seria quase o catálogo inteiro, e ninguém consulta os itens sem ninguém).
+    """
+
+    def __init__(self, fields, sparse=()):
+        self.fields = fields
+        self.sparse = frozenset(sparse)
+        self.buckets = {f: {} for f in fields}
+        self.pos = {}   # id(row) -> posição no catálogo
+
+    def _put(self, f, key, pos, row):
+        if key is None and f in self.sparse:
+            return
+        bucket = self.buckets[f].get(key)
+        if bucket is None:
+            bucket = self.buckets[f][key] = _Bucket()
+        bucket.add(pos, row)
+
+    def add(self, row, pos):
+        self.pos[id(row)] = pos
+        for f in self.fields:
+            self._put(f, _key_of(row, f), pos, row)
+
+    def move(self, row, old_keys):
+        # depois de row.update: só troca de balde nos campos que mudaram
+        pos = self.pos[id(row)]
+        for f, old in zip(self.fields, old_keys):
+            new = _key_of(row, f)
+            if new != old:
+                self.buckets[f].get(old, _EMPTY).remove(pos, row)
+                self._put(f, new, pos, row)
+
+    def keys_of(self, row):
+        return [_key_of(row, f) for f in self.fields]
+
+    def verify(self, name, rows):
+        """Remonta os baldes por varredura e levanta AssertionError se algum divergir (conteúdo ou ordem)."""
+        for f in self.fields:
+            want = {}
+            for row in rows:
+                key = _key_of(row, f)
+                if key is not None or f not in self.sparse:
+                    want.setdefault(key, []).append(id(row))
+            got = {k: [id(r) for r in b.rows] for k, b in self.buckets[f].items() if b}   # baldes vazios ficam no dict
+            if got.keys() != want.keys():
+                raise AssertionError(f"Índice {name}.{f}: valores {sorted(map(str, got))} != {sorted(map(str, want))}")
+            for k, ids in want.items():
+                if got[k] != ids:
+                    missing = len(set(ids) - set(got[k]))
+                    extra = len(set(got[k]) - set(ids))
+                    raise AssertionError(f"Índice {name}.{f}={k!r}: {missing} linha(s) faltando, {extra} sobrando"
+                                         + ("" if missing or extra else ", fora da ordem do catálogo"))
+
+    def remove(self, row):
+        pos = self.pos.pop(id(row))
+        for f in self.fields:
+            self.buckets[f].get(_key_of(row, f), _EMPTY).remove(pos, row)
+
+    def get(self, field, value):
+        return self.buckets[field].get(value, _EMPTY)
+
+    def count(self, field, value):
+        return len(self.buckets[field].get(value, ()))
+
+
+class CatalogStats:
+    """Contadores agregados (total, por tipo, emprestados) mantidos incrementalmente."""
+
+    def __init__(self):
+        self.items = Counter()
+        self.users = Counter()
+
+    def add(self, col, row, sign=1):
+        if col == "items":
+            c = self.items
+            c["total"] += sign
+            c["type:" + str(row.get("type"))] += sign
+            if row.get("status") == "borrowed":
+                c["borrowed"] += sign
+        elif col == "users":
+            c = self.users
+            c["total"] += sign
+            c["type:" + str(row.get("type"))] += sign
+
+    def remove(self, col, row):
+        self.add(col, row, -1)
+
+    def item_counts(self):
+        c = self.items
+        return {"total": c["total"], "books": c["type:Book"], "magazines": c["type:Magazine"],
+                "dvds": c["type:DVD"], "available": c["total"] - c["borrowed"], "borrowed": c["borrowed"]}
+
+    def user_counts(self):
+        c = self.users
+        return {"total": c["total"], "students": c["type:Student"],
+                "professors": c["type:Professor"], "visitors": c["type:Visitor"]}
+
+    def verify(self, data):
+        """Recalcula tudo por varredura e levanta AssertionError se divergir."""
+        fresh = CatalogStats()
+        for col in ("items", "users"):
+            for row in data.get(col, []):
+                fresh.add(col, row)
+        for name in ("items", "users"):
+            got = +getattr(self, name)      # '+' descarta contagens zeradas
+            want = +getattr(fresh, name)
+            if got != want:
+                raise AssertionError(f"Contadores de {name} inconsistentes: {dict(got)} != {dict(want)}")
+
+
+class Catalog:
+    def __init__(self, data, self_check=None):
+        self.data = data
+        self.version = 0   # muda a cada apply; invalida os resultados guardados
+        self._results = {}  # (type, status) -> lista de itens, válida para self.version
+        self._indexes = {"items": _Index(ITEM_KEYS, sparse=("borrower",)), "users": _Index(USER_KEYS)}
+        self._next_pos = {}   # col -> posição da próxima linha acrescentada no fim
+        self.stats = CatalogStats()
+        if self_check is None:
+            self_check = os.environ.get("BIBLIO_SELF_CHECK") == "1"
+        self.self_check = self_check
+        for col, index in self._indexes.items():
+            rows = data.setdefault(col, [])
+            for pos, row in enumerate(rows):
+                self._track(col, row, pos)
+            self._next_pos[col] = len(rows)
+
+    # ---------- Manutenção dos índices ----------
+    def _track(self, col, row, pos):
+        self._indexes[col].add(row, pos)
+        self.stats.add(col, row)
+
+    def _position_at(self, col, rows, i):
+        # posição para a linha que acabou de entrar em rows[i]: depois de todas ("add"), ou
+        # entre as vizinhas ("ins", raro)
+        pos = self._indexes[col].pos
+        if i == len(rows) - 1:
+            self._next_pos[col] += 1
+            return self._next_pos[col] - 1
+        after = pos[id(rows[i + 1])]
+        before = pos[id(rows[i - 1])] if i > 0 else after - 1
+        return (before + after) / 2
+
+    def _untrack(self, col, row):
+        self._indexes[col].remove(row)
+        self.stats.remove(col, row)
+
+    def apply(self, changes):
+        """Aplica mudanças (formato do diário) mantendo os índices em dia."""
+        self.version += 1
+        self._results.clear()
+        for ch in changes:
+            op, col = ch[0], ch[1]
+            index = self._indexes.get(col)
+            if index is not None:
+                rows = self.data.setdefault(col, [])
+                if op == "set":
+                    row = rows[ch[2]]
+                    old_keys = index.keys_of(row)
+                    self.stats.remove(col, row)
+                    row.update(ch[3])
+                    index.move(row, old_keys)
+                    self.stats.add(col, row)
+                    continue
+                if op == "del":
+                    self._untrack(col, rows[ch[2]])
+            apply_changes(self.data, [ch])
+            if index is not None and op in ("add", "ins"):
+                row = ch[-1]
+                i = len(rows) - 1 if op == "add" else next(k for k, r in enumerate(rows) if r is row)
+                self._track(col, row, self._position_at(col, rows, i))
+        if self.self_check:
+            self.verify()
+
+    def verify(self):
+        """Confere contadores e índices contra uma varredura completa dos dados (AssertionError se divergir)."""
+        self.stats.verify(self.data)
+        for col, index in self._indexes.items():
+            index.verify(col, self.data.get(col, []))
+
+    # ---------- Consultas ----------
+    def items(self, type=None, status=None):
+        """Itens filtrados por tipo e/ou status, na ordem do catálogo (O(k); a mesma lista até a
+        próxima mudança — não altere)."""
+        key = (type, status)
+        rows = self._results.get(key)
+        if rows is None:
+            rows = self._results[key] = self._filter(type, status)
+        return rows
+
+    def _filter(self, type, status):
+        index = self._indexes["items"]
+        if type is None and status is None:
+            return list(self.data.get("items", []))
+        if type is None:
+            return list(index.get("status", status).rows)
+        by_type = index.get("type", type)
+        if status is None:
+            return list(by_type.rows)
+        by_status = index.get("status", status)
+        # percorre o menor dos dois baldes (já na ordem do catálogo) conferindo o outro campo
+        if len(by_type) <= len(by_status):
+            return [r for r in by_type.rows if _key_of(r, "status") == status]
+        return [r for r in by_status.rows if _key_of(r, "type") == type]
+
+    def items_by_borrower(self, borrower):
+        return list(self._indexes["items"].get("borrower", borrower).rows)
+
+    def borrowers(self):
+        """Nomes com pelo menos um item no índice de 'borrower' (exceto None)."""
+        return [b for b, rows in self._indexes["items"].buckets["borrower"].items() if b and rows]
+
+    def item_counts(self):
+        return self.stats.item_counts()
+
+    def user_counts(self):
+        return self.stats.user_counts()
@@ -0,0 +1,139 @@
+# export.py — exportação de relatórios em segundo plano, em streaming
+#
+# As linhas vêm de um gerador e são gravadas em blocos (chunk) numa thread
+# separada; nada de montar a lista inteira de strings/objetos na memória nem de
+# travar o loop do pygame. A tela de Relatórios lê job.done / job.total para
+# desenhar a barra de progresso.
+#
+# Formatos: "csv", "json" (um array, escrito elemento a elemento) e "ndjson"
+# (um objeto JSON por linha). Com json_object=True, o JSON é um objeto e as
+# linhas são pares (chave, valor), escritos um a um dentro de um só {...}.
+# O arquivo é escrito em <destino>.part e só é renomeado para o nome final
+# quando termina sem erro.
+import csv
+import io
+import json
+import os
+import threading
+
+FORMATS = ("json", "csv", "ndjson")
+
+
+def _csv_lines(rows, headers):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(headers)
+    yield buf.getvalue()
+    for row in rows:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerow([row.get(k, "") for k in headers])
+        yield buf.getvalue()
+
+
+def _json_lines(rows):
+    yield "["
+    first = True
+    for row in rows:
+        yield ("\n    " if first else ",\n    ") + json.dumps(row, ensure_ascii=False)
+        first = False
+    yield "\n]\n" if not first else "]\n"
+
+
+def _json_object_lines(pairs):
+    yield "{"
+    first = True
+    for key, value in pairs:
+        yield (("\n    " if first else ",\n    ") + json.dumps(key, ensure_ascii=False) + ": "
+               + json.dumps(value, ensure_ascii=False))
+        first = False
+    yield "\n}\n" if not first else "}\n"
+
+
+def _ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+class ExportJob:
+    """Uma exportação rodando numa thread; estado: running | done | error."""
+
+    def __init__(self, path, fmt, rows, total=None, headers=None, chunk_size=1000, json_object=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato de exportação desconhecido: {fmt}")
+        if fmt == "csv" and not headers:
+            raise ValueError("Exportação CSV precisa da lista de colunas")
+        self.path = path
+        self.fmt = fmt
+        self.total = total
+        self.done = 0
+        self.state = "running"
+        self.error = None
+        self._rows = rows
+        self._headers = headers
+        self._json_object = json_object
+        self._chunk_size = chunk_size
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    @property
+    def running(self):
+        return self.state == "running"
+
+    @property
+    def progress(self):
+        """Fração concluída (0..1), ou None se o total não é conhecido."""
+        if self.state == "done":
+            return 1.0
+        if not self.total:
+            return None
+        return min(self.done / self.total, 1.0)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _counted(self, rows):
+        for row in rows:
+            if self._cancel.is_set():
+                raise RuntimeError("Exportação cancelada")
+            yield row
+            self.done += 1
+
+    def _run(self):
+        rows = self._counted(self._rows)
+        if self.fmt == "csv":
+            lines = _csv_lines(rows, self._headers)
+        elif self.fmt == "json":
+            lines = _json_object_lines(rows) if self._json_object else _json_lines(rows)
+        else:
+            lines = _ndjson_lines(rows)
+        tmp = self.path + ".part"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8", newline="") as f:
+                chunk = []
+                for line in lines:
+                    chunk.append(line)
+                    if len(chunk) >= self._chunk_size:
+                        f.write("".join(chunk))
+                        chunk.clear()
+                f.write("".join(chunk))
+            os.replace(tmp, self.path)
+            self.state = "done"
+        except Exception as e:
+            self.error = e
+            self.state = "error"
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+def start_export(path, fmt, rows, total=None, headers=None, chunk_size=1000, json_object=False):
+    return ExportJob(path, fmt, rows, total=total, headers=headers, chunk_size=chunk_size,
+                     json_object=json_object).start()
@@ -0,0 +1,269 @@
+# journal.py — persistência em diário (append-only) + compactação em segundo plano
+#
+# Em vez de reescrever data/library_data.json inteiro a cada clique, cada mutação
+# vira UMA linha compacta no arquivo de diário (data/library_data.journal).
+# O JSON original continua existindo como "snapshot"; a compactação junta o
+# snapshot com o diário numa thread separada, sem travar a interface.
+#
+# Formato de cada linha do diário:
+#   {"n": 12, "k": "loan", "c": [["set", "items", 3, {...}], ["ins", "transactions", 0, {...}]]}
+#   n = número sequencial, k = tipo da operação (só informativo), c = lista de mudanças
+#
+# Mudanças suportadas (col = "items" | "users" | "transactions"):
+#   ["add", col, row]          -> data[col].append(row)
+#   ["ins", col, idx, row]     -> data[col].insert(idx, row)
+#   ["set", col, idx, campos]  -> data[col][idx].update(campos)
+#   ["del", col, idx]          -> data[col].pop(idx)
+#   ["log", col, row, limite]  -> row entra no início; ficam só as `limite` mais novas
+#                                 (em memória a coluna pode ser um deque com maxlen)
+#
+# O snapshot continua com o formato de sempre ({"items", "users", "transactions"}).
+# O "n" da última linha já incorporada a ele fica ao lado, em data/library_data.seq:
+#   [[n, tamanho, mtime_ns, inode], [n anterior, ...]]
+# cada n junto com a "assinatura" (os.stat) do snapshot a que pertence. O .seq é
+# gravado ANTES de o snapshot novo substituir o antigo e guarda também a entrada
+# do antigo: se o programa cair entre as duas gravações, load() ainda acha o n
+# certo para o snapshot que ficou no disco (e não reaplica linhas já incorporadas).
+#
+# A escrita no disco também sai da thread da interface: append() só serializa a
+# linha e a coloca num buffer; um AsyncWriter grava o buffer inteiro de uma vez
+# a cada flush_window segundos (rajadas de cliques viram uma escrita só).
+import json
+import os
+import threading
+from collections import deque
+
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.async_writer import AsyncWriter
+
+SEQ_KEY = "journal_seq"  # onde o "n" ficava antes (dentro do snapshot); só lido, para migrar
+_COMPACT = (",", ":")
+
+
+def empty_data():
+    return {"items": [], "users": [], "transactions": []}
+
+
+def apply_changes(data, changes):
+    """Aplica uma lista de mudanças (formato do diário) sobre o dicionário de dados."""
+    for ch in changes:
+        op, col = ch[0], ch[1]
+        rows = data.setdefault(col, [])
+        if op == "add":
+            rows.append(ch[2])
+        elif op == "ins":
+            rows.insert(ch[2], ch[3])
+        elif op == "set":
+            rows[ch[2]].update(ch[3])
+        elif op == "del":
+            rows.pop(ch[2])
+        elif op == "log":
+            if isinstance(rows, deque):
+                rows.appendleft(ch[2])
+            else:
+                rows.insert(0, ch[2])
+                del rows[ch[3]:]
+        else:
+            raise ValueError(f"Mudança desconhecida no diário: {op}")
+
+
+def _read_snapshot(path):
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        data = empty_data()
+    seq = data.pop(SEQ_KEY, None)
+    if seq is None:
+        seq = _read_seq(path)
+    return data, seq
+
+
+def _seq_path(path):
+    return os.path.splitext(path)[0] + ".seq"
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _seq_entries(path):
+    try:
+        with open(_seq_path(path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def _read_seq(path):
+    # o "n" da entrada cuja assinatura bate com o snapshot atual (0 se nenhuma)
+    if not os.path.exists(path):
+        return 0
+    stamp = _stamp(path)
+    for seq, *st in _seq_entries(path):
+        if st == stamp:
+            return seq
+    return 0
+
+
+def _replay(path, data, after_seq):
+    # Reaplica as linhas com n > after_seq. Uma última linha truncada (queda no
+    # meio da escrita) é ignorada — ela nunca chegou a ser confirmada.
+    last = after_seq
+    count = 0
+    if not os.path.exists(path):
+        return last, count
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                break
+            count += 1
+            if rec["n"] <= after_seq:
+                continue
+            apply_changes(data, rec["c"])
+            last = rec["n"]
+    return last, count
+
+
+def _jsonable(obj):
+    if isinstance(obj, deque):
+        return list(obj)
+    raise TypeError(f"Objeto não serializável: {type(obj).__name__}")
+
+
+def _write_atomic(path, data, seq):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False, default=_jsonable)
+        f.flush()
+        os.fsync(f.fileno())
+    # .seq primeiro, com a entrada do snapshot novo e a do que ainda está no disco
+    entries = [[seq] + _stamp(tmp)]
+    if os.path.exists(path):
+        entries.append([_read_seq(path)] + _stamp(path))
+    seq_tmp = _seq_path(path) + ".tmp"
+    with open(seq_tmp, "w", encoding="utf-8") as f:
+        json.dump(entries, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(seq_tmp, _seq_path(path))
+    os.replace(tmp, path)
+
+
+class JournalStore:
+    """Snapshot JSON + diário append-only; escrita custa O(mudança), não O(catálogo)."""
+
+    def __init__(self, snapshot_path, compact_every=500, flush_window=0.05):
+        base, _ = os.path.splitext(snapshot_path)
+        self.snapshot_path = snapshot_path
+        self.journal_path = base + ".journal"
+        self.sealed_path = base + ".journal.old"  # diário "congelado" sendo compactado
+        self.compact_every = compact_every
+        self._seq = 0
+        self._pending = 0       # linhas no diário ativo
+        self._fh = None
+        self._worker = None
+        self._buf = []          # linhas serializadas aguardando o AsyncWriter
+        self._buf_lock = threading.Lock()
+        self._writer = AsyncWriter(self._drain, window=flush_window, name="journal-writer")
+
+    # ---------- Leitura ----------
+    def load(self):
+        self._writer.flush()
+        self.wait()
+        data, seq = _read_snapshot(self.snapshot_path)
+        seq, _ = _replay(self.sealed_path, data, seq)
+        seq, self._pending = _replay(self.journal_path, data, seq)
+        self._seq = seq
+        return data
+
+    # ---------- Escrita incremental ----------
+    def append(self, kind, changes):
+        """Enfileira a mudança; devolve um Future que fica pronto quando a linha estiver no disco."""
+        self._seq += 1
+        rec = {"n": self._seq, "k": kind, "c": changes}
+        # serializa agora: as linhas do catálogo continuam mudando depois daqui
+        line = json.dumps(rec, ensure_ascii=False, separators=_COMPACT) + "\n"
+        with self._buf_lock:
+            self._buf.append(line)
+        return self._writer.mark_dirty()
+
+    def _drain(self):
+        # roda na thread do AsyncWriter
+        with self._buf_lock:
+            lines, self._buf = self._buf, []
+        if not lines:
+            return
+        if self._fh is None:
+            os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+            self._fh = open(self.journal_path, "a", encoding="utf-8")
+        self._fh.write("".join(lines))
+        self._fh.flush()
+        self._pending += len(lines)
+        if self._pending >= self.compact_every:
+            self.compact()
+
+    # ---------- Compactação ----------
+    def compact(self):
+        """Congela o diário atual e o funde ao snapshot numa thread em segundo plano.
+
+        Chamado pela thread do AsyncWriter (em _drain), a única que mexe no diário ativo.
+        """
+        if self._worker is not None and self._worker.is_alive():
+            return False
+        self._close_journal()
+        if not os.path.exists(self.journal_path):
+            return False
+        if os.path.exists(self.sealed_path):
+            # sobrou um diário congelado de uma compactação interrompida: junta os dois
+            with open(self.journal_path, "r", encoding="utf-8") as src, \
+                    open(self.sealed_path, "a", encoding="utf-8") as dst:
+                dst.write(src.read())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, self.sealed_path)
+        self._pending = 0
+        self._worker = threading.Thread(target=self._compact_worker, daemon=True)
+        self._worker.start()
+        return True
+
+    def _compact_worker(self):
+        # Trabalha só com arquivos (snapshot + diário congelado), nunca com os dados
+        # vivos da interface — por isso não precisa de trava.
+        data, seq = _read_snapshot(self.snapshot_path)
+        seq, _ = _replay(self.sealed_path, data, seq)
+        _write_atomic(self.snapshot_path, data, seq)
+        os.remove(self.sealed_path)
+
+    def wait(self):
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    # ---------- Snapshot completo (saída do programa) ----------
+    def snapshot(self, data):
+        self._writer.flush()
+        self.wait()
+        self._close_journal()
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        _write_atomic(self.snapshot_path, data, self._seq)
+        for path in (self.sealed_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._pending = 0
+
+    def close(self):
+        self._writer.close()
+        self.wait()
+        self._close_journal()
+
+    def _close_journal(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
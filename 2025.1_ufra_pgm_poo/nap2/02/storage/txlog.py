@@ -0,0 +1,179 @@
+# txlog.py — histórico de transações: anel "recentes" + segmentos de arquivo
+#
+# O dicionário de dados guarda só as últimas transações (data["transactions"],
+# um deque com maxlen, mais nova primeiro) — é o que a interface mostra e o que
+# vai para o snapshot. O histórico completo fica em arquivos NDJSON por mês:
+#   data/transactions/2025-08.ndjson, data/transactions/2025-09.ndjson, ...
+# Cada transação nova ganha "id" (sequencial) e "ts" (epoch) e é acrescentada
+# ao segmento do seu mês por um AsyncWriter (fora da thread da interface).
+#
+# query(inicio, fim) percorre só os segmentos dos meses do intervalo, linha a
+# linha, sem carregar o histórico na memória.
+#
+# Recuperação: se o programa cair depois de gravar o diário e antes de gravar o
+# segmento, as transações do anel com id maior que o último arquivado são
+# arquivadas de novo ao abrir. Transações antigas (sem "id") são copiadas uma
+# única vez para legacy.ndjson.
+import glob
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.async_writer import AsyncWriter
+
+LEGACY_SEGMENT = "legacy.ndjson"
+
+
+def _month_of(ts):
+    return time.strftime("%Y-%m", time.localtime(ts))
+
+
+def _as_ts(when):
+    if when is None or isinstance(when, (int, float)):
+        return when
+    if isinstance(when, datetime):
+        return when.timestamp()
+    return datetime.fromisoformat(str(when)).timestamp()
+
+
+def _tail_lines(path, n=2):
+    # lê só o fim do arquivo: as últimas n linhas não vazias
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        block = min(size, 4096)
+        while True:
+            f.seek(size - block)
+            lines = [ln for ln in f.read(block).splitlines() if ln.strip()]
+            if len(lines) > n or block == size:
+                return [ln.decode("utf-8", "replace") for ln in lines[-n:]]
+            block = min(size, block * 2)
+
+
+class TransactionLog:
+    def __init__(self, archive_dir, data, recent_size=200, flush_window=0.2):
+        self.archive_dir = archive_dir
+        self.recent_size = recent_size
+        os.makedirs(archive_dir, exist_ok=True)
+        rows = list(data.get("transactions", []))
+        self._migrate_legacy(rows)
+        self.recent = deque(rows[:recent_size], maxlen=recent_size)
+        data["transactions"] = self.recent
+        self._buf = []
+        self._buf_lock = threading.Lock()
+        self._writer = AsyncWriter(self._drain, window=flush_window, name="txlog-writer")
+        last = self._last_archived_id()
+        self._next_id = max([last] + [t["id"] for t in self.recent if "id" in t]) + 1
+        missing = [t for t in reversed(self.recent) if t.get("id", 0) > last]
+        for tx in missing:
+            self.archive(tx)
+
+    # ---------- Registro ----------
+    def new(self, **fields):
+        """Cria a transação com id/ts; quem chama grava no diário e depois chama archive()."""
+        tx = dict(fields)
+        tx["id"] = self._next_id
+        tx["ts"] = int(time.time())
+        self._next_id += 1
+        return tx
+
+    @property
+    def last_id(self):
+        """Id da transação mais nova já criada (0 se nenhuma)."""
+        return self._next_id - 1
+
+    def archive(self, tx):
+        line = json.dumps(tx, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._buf_lock:
+            self._buf.append((_month_of(tx["ts"]), line))
+        return self._writer.mark_dirty()
+
+    def _drain(self):
+        with self._buf_lock:
+            pending, self._buf = self._buf, []
+        by_month = {}
+        for month, line in pending:
+            by_month.setdefault(month, []).append(line)
+        for month, lines in by_month.items():
+            path = self._segment(month)
+            with open(path, "a+b") as f:
+                # uma linha cortada por queda não pode "colar" na próxima
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                f.write("".join(lines).encode("utf-8"))
+
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        self._writer.close()
+
+    # ---------- Segmentos ----------
+    def _segment(self, month):
+        return os.path.join(self.archive_dir, f"{month}.ndjson")
+
+    def segments(self):
+        """Meses com arquivo, em ordem cronológica (ex.: ['2025-08', '2025-09'])."""
+        names = glob.glob(os.path.join(self.archive_dir, "????-??.ndjson"))
+        return sorted(os.path.basename(n)[:-len(".ndjson")] for n in names)
+
+    def _last_archived_id(self):
+        for month in reversed(self.segments()):
+            for line in reversed(_tail_lines(self._segment(month))):
+                try:
+                    return json.loads(line).get("id", 0)
+                except ValueError:
+                    continue  # linha cortada por queda; será regravada a partir do anel
+        return 0
+
+    def _migrate_legacy(self, rows):
+        legacy = [t for t in rows if "id" not in t]
+        path = os.path.join(self.archive_dir, LEGACY_SEGMENT)
+        if not legacy or os.path.exists(path):
+            return
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for tx in reversed(legacy):  # mais antiga primeiro, como nos segmentos
+                f.write(json.dumps(tx, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp, path)
+
+    # ---------- Consulta ----------
+    def query(self, start=None, end=None, include_legacy=None):
+        """Transações com start <= ts < end (epoch, datetime ou ISO), da mais antiga à mais nova.
+
+        Sem start, inclui também as transações antigas sem data (legacy.ndjson).
+        """
+        self.flush()
+        start_ts, end_ts = _as_ts(start), _as_ts(end)
+        if include_legacy is None:
+            include_legacy = start_ts is None
+        paths = []
+        if include_legacy:
+            paths.append(os.path.join(self.archive_dir, LEGACY_SEGMENT))
+        first = _month_of(start_ts) if start_ts is not None else None
+        last = _month_of(end_ts) if end_ts is not None else None
+        for month in self.segments():
+            if (first is None or month >= first) and (last is None or month <= last):
+                paths.append(self._segment(month))
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            legacy = path.endswith(LEGACY_SEGMENT)
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        tx = json.loads(line)
+                    except ValueError:
+                        continue
+                    if legacy:
+                        yield tx
+                        continue
+                    ts = tx.get("ts", 0)
+                    if (start_ts is None or ts >= start_ts) and (end_ts is None or ts < end_ts):
+                        yield tx
@@ -1,11 +1,20 @@
 import pygame
 from ui.ui_nav import draw_exit_button
 from ui.ui_charts import draw_bar_chart
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.text_cache import render_text, sys_font
+from ui.virtual_grid import VirtualGrid
+from biblio_comum.redraw import RedrawScheduler
+from storage.journal import JournalStore
+from storage.catalog import Catalog
+from storage.export import start_export
+from storage.txlog import TransactionLog
+from biblio_comum.history import TransactionHistory
 import os
-import json
-import csv
+import threading
 import time
 import math
+import itertools
 
 # ---------- Cores/Estilos ----------
 BTN_BG = (255, 255, 255)
@@ -17,6 +26,29 @@ MUTED = (110, 120, 140)
 WIDTH = 1024
 HEIGHT = 768
 
+# ---------- Exportação de relatórios ----------
+REPORT_ITEM_HEADERS = ["type", "name", "status", "author", "isbn", "edition", "duration", "borrower"]
+REPORT_BY_USER_HEADERS = ["user", "borrowed_items"]
+
+
+def _export_row(item):
+    # roda na thread do exportador: dict(item) copia a linha inteira de uma vez (em C, sem
+    # troca de thread no meio), então a interface pode mexer no item enquanto isso
+    return dict(item)
+
+
+def _by_user_rows(pairs, fmt):
+    # JSON: o objeto {usuário: [nomes]} de sempre, um par por vez; CSV: nomes separados
+    # por "; "; NDJSON: um {"user", "borrowed_items"} por linha
+    for user, items in pairs:
+        names = [i.get("name", "") for i in items]
+        if fmt == "json":
+            yield user, names
+        elif fmt == "csv":
+            yield {"user": user, "borrowed_items": "; ".join(names)}
+        else:
+            yield {"user": user, "borrowed_items": names}
+
 class Button:
     def __init__(self, rect, label, on_click):
         self.rect = pygame.Rect(rect)
@@ -27,7 +59,7 @@ class Button:
     def draw(self, screen, font):
         pygame.draw.rect(screen, BTN_BG, self.rect, border_radius=12)
         pygame.draw.rect(screen, BTN_BORDER, self.rect, width=2, border_radius=12)
-        text = font.render(self.label, True, BTN_TEXT)
+        text = render_text(font, self.label, True, BTN_TEXT)
         screen.blit(text, (self.rect.centerx - text.get_width() // 2, self.rect.centery - text.get_height() // 2))
         if self.hover:
             s = pygame.Surface(self.rect.size, pygame.SRCALPHA)
@@ -57,7 +89,7 @@ class MenuButton(Button):
         fill_color = self.COLOR_PRESSED if self.pressed else self.COLOR_NORMAL
         pygame.draw.rect(screen, fill_color, self.rect, border_radius=12)
         pygame.draw.rect(screen, BTN_BORDER, self.rect, width=2, border_radius=12)
-        text = font.render(self.label, True, (255, 255, 255))
+        text = render_text(font, self.label, True, (255, 255, 255))
         screen.blit(text, (self.rect.centerx - text.get_width() // 2, self.rect.centery - text.get_height() // 2))
 
     def handle_event(self, event):
@@ -97,7 +129,7 @@ class InputField:
         pygame.draw.rect(screen, (200, 210, 225), self.rect, width=2, border_radius=10)
         shown = self.text if (self.text or self.focus) else self.placeholder
         color = (60, 70, 90) if self.text else (140, 150, 165)
-        surf = font.render(shown, True, color)
+        surf = render_text(font, shown, True, color)
         screen.blit(surf, (self.rect.x + 10, self.rect.y + (self.rect.height - surf.get_height()) // 2))
         if self.focus and pygame.time.get_ticks() % 800 < 400:
             cx = self.rect.x + 10 + surf.get_width() + 2
@@ -120,15 +152,32 @@ class BiblioApp:
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("BiblioManager")
-        self.clock = pygame.time.Clock()
+        self.redraw = RedrawScheduler(fps=60)  # redesenho por invalidação (ui/redraw.py)
         self.running = True
 
         # Estado geral
         self.current_screen = "dashboard"  # dashboard | shelf | add_item | manage_users | loans | reports
         self.scroll_offset = 0
+        # prateleira: 4 colunas de cartões 220x120, visíveis entre y=160 e y=700
+        self.shelf_grid = VirtualGrid(4, 220, 120, 20, 18, 40, 160, view_top=160, view_bottom=700)
 
-        # Dados
+        # Dados (snapshot JSON + diário de mudanças)
+        self.store = JournalStore(os.path.join("data", "library_data.json"))
         self.data = self.load_data()
+        self.catalog = Catalog(self.data)  # índices por tipo/status/borrower
+        # histórico: últimas 200 transações em memória, o resto em data/transactions/AAAA-MM.ndjson
+        self.txlog = TransactionLog(os.path.join("data", "transactions"), self.data, recent_size=200)
+        # histórico por usuário/item (biblio_comum/history.py): só contadores e empréstimos em aberto,
+        # montado dos segmentos numa thread; até ficar pronto os relatórios mostram "carregando…"
+        self.history = TransactionHistory(lambda t: t.get("user"), lambda t: t.get("item"), lambda t: t.get("type"),
+                                          loan_kinds=("Loan",), return_kinds=("Return",), keep_events=False)
+        self.history_ready = False
+        self.history_error = None
+        self._history_lock = threading.Lock()
+        self._history_pending = []   # transações de _commit que chegam durante a montagem
+        self._history_thread = threading.Thread(target=self._load_history, args=(self.txlog.last_id,),
+                                                daemon=True, name="history-loader")
+        self._history_thread.start()
 
         # Fontes
         self.font_title = pygame.font.SysFont("Arial", 36, bold=True)
@@ -160,6 +209,8 @@ class BiblioApp:
         self.rep_filter_status = "All"   # All | available | borrowed
         self.rep_mode = "items"          # items | by_user
         self.rep_message = ""
+        self.rep_job = None              # exportação em andamento (storage.export.ExportJob)
+        self.rep_job_label = ""
 
         # ----- CRUD Itens (Prateleira) -----
         self.item_selected_index = -1
@@ -188,17 +239,54 @@ class BiblioApp:
 
     # ---------- Persistência ----------
     def load_data(self):
-        data_path = os.path.join("data", "library_data.json")
-        if os.path.exists(data_path):
-            with open(data_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {"items": [], "users": [], "transactions": []}
+        # snapshot + reaplicação do diário
+        return self.store.load()
 
     def save_data(self, data):
-        os.makedirs("data", exist_ok=True)
-        data_path = os.path.join("data", "library_data.json")
-        with open(data_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        # snapshot completo (usado na saída); mutações do dia a dia passam por _commit
+        self.txlog.close()
+        self.store.snapshot(data)
+
+    def _commit(self, kind, *changes):
+        # aplica as mudanças nos dados em memória e grava UMA linha no diário
+        changes = list(changes)
+        self.catalog.apply(changes)
+        self.store.append(kind, changes)
+        for ch in changes:
+            if ch[0] == "log" and ch[1] == "transactions":
+                self.txlog.archive(ch[2])
+                with self._history_lock:
+                    if self._history_pending is not None:
+                        self._history_pending.append(ch[2])
+                    else:
+                        self.history.add(ch[2])
+
+    def _load_history(self, upto):
+        # roda na thread "history-loader": lê os segmentos até a transação `upto` (as mais novas
+        # ficam em _history_pending e entram no fim, na ordem, sem contar nada duas vezes)
+        try:
+            self.history.rebuild(t for t in self.txlog.query() if t.get("id", 0) <= upto)
+        except Exception as e:
+            with self._history_lock:
+                self.history_error = f"{type(e).__name__}: {e}"
+                self._history_pending = []
+        else:
+            with self._history_lock:
+                for tx in self._history_pending:
+                    self.history.add(tx)
+                self._history_pending = None
+                self.history_ready = True
+        self.redraw.invalidate()  # o loop acorda em até idle_wait_ms e troca o "carregando…"
+
+    def _history_status(self):
+        # texto para o lugar dos números enquanto o histórico não está pronto (None quando está)
+        if self.history_ready:
+            return None
+        return f"histórico indisponível ({self.history_error})" if self.history_error else "carregando…"
+
+    def _tx_change(self, **fields):
+        # nova transação: entra no anel de recentes (diário) e no arquivo mensal (_commit)
+        return ["log", "transactions", self.txlog.new(**fields), self.txlog.recent_size]
 
     # ---------- Navbar ----------
     def _build_navbar(self):
@@ -234,23 +322,12 @@ class BiblioApp:
         self.scroll_offset = 0
 
     # ---------- Dashboard helpers ----------
+    # contadores materializados no catálogo (atualizados em O(1) a cada _commit)
     def _count_items(self):
-        items = self.data.get("items", [])
-        total = len(items)
-        books = sum(1 for it in items if it.get("type") == "Book")
-        magazines = sum(1 for it in items if it.get("type") == "Magazine")
-        dvds = sum(1 for it in items if it.get("type") == "DVD")
-        borrowed = sum(1 for it in items if it.get("status") == "borrowed")
-        available = total - borrowed
-        return {"total": total, "books": books, "magazines": magazines, "dvds": dvds, "available": available, "borrowed": borrowed}
+        return self.catalog.item_counts()
 
     def _count_users(self):
-        users = self.data.get("users", [])
-        total = len(users)
-        students = sum(1 for u in users if u.get("type") == "Student")
-        professors = sum(1 for u in users if u.get("type") == "Professor")
-        visitors = sum(1 for u in users if u.get("type") == "Visitor")
-        return {"total": total, "students": students, "professors": professors, "visitors": visitors}
+        return self.catalog.user_counts()
 
     # ---------- Adicionar Item ----------
     def _add_build_fields(self):
@@ -302,8 +379,7 @@ class BiblioApp:
             item["edition"] = self.add_inputs["edition"].text.strip()
         elif self.add_type == "DVD":
             item["duration"] = self.add_inputs["duration"].text.strip()
-        self.data.setdefault("items", []).append(item)
-        self.save_data(self.data)
+        self._commit("add_item", ["add", "items", item])
         self.add_message = "Item salvo com sucesso!"
         for f in self.add_inputs.values():
             f.text = ""
@@ -312,7 +388,7 @@ class BiblioApp:
     def render_add_item(self):
         self.screen.fill(BG)
         self.render_navbar()
-        title = self.font_title.render("Adicionar Item", True, INK)
+        title = render_text(self.font_title, "Adicionar Item", True, INK)
         self.screen.blit(title, (40, 100))
 
         types = ["Book", "Magazine", "DVD"]
@@ -323,7 +399,7 @@ class BiblioApp:
             bg = (225, 235, 255) if is_sel else (255, 255, 255)
             pygame.draw.rect(self.screen, bg, rect, border_radius=10)
             pygame.draw.rect(self.screen, (80, 120, 200) if is_sel else BTN_BORDER, rect, width=2, border_radius=10)
-            label = self.font.render(t, True, (40, 60, 120) if is_sel else BTN_TEXT)
+            label = render_text(self.font, t, True, (40, 60, 120) if is_sel else BTN_TEXT)
             self.screen.blit(label, (rect.centerx - label.get_width() // 2, rect.centery - label.get_height() // 2))
             x += 160
 
@@ -334,13 +410,13 @@ class BiblioApp:
 
         save_rect, edit_rect, delete_rect, cancel_rect, list_rect = self._manage_users_toolbar_rects()
         pygame.draw.rect(self.screen, (70, 190, 120), save_rect, border_radius=10)
-        self.screen.blit(self.font.render("Salvar", True, (255, 255, 255)), (save_rect.centerx - 30, save_rect.centery - 12))
+        self.screen.blit(render_text(self.font, "Salvar", True, (255, 255, 255)), (save_rect.centerx - 30, save_rect.centery - 12))
 
         if self.add_message:
             color = (70, 140, 90) if "sucesso" in self.add_message.lower() else (200, 90, 90)
-            self.screen.blit(self.font.render(self.add_message, True, color), (500, 260))
+            self.screen.blit(render_text(self.font, self.add_message, True, color), (500, 260))
 
-        tip = self.font.render("Dica: clique nos campos para digitar. Use o botão Salvar.", True, MUTED)
+        tip = render_text(self.font, "Dica: clique nos campos para digitar. Use o botão Salvar.", True, MUTED)
         self.screen.blit(tip, (40, 740))
 
     def handle_add_item_event(self, event):
@@ -378,12 +454,16 @@ class BiblioApp:
     
     def _user_normalize_limits(self):
         # Garante limites 3/5/1 conforme perfil
+        # só grava quando algum limite realmente mudou (esta rotina roda a cada frame)
         users = self.data.get("users", [])
-        for u in users:
+        changes = []
+        for i, u in enumerate(users):
             typ = u.get("type", "Student")
             cap = self._user_limit_default(typ)
-            u["limit"] = cap
-        self.save_data(self.data)
+            if u.get("limit") != cap:
+                changes.append(["set", "users", i, {"limit": cap}])
+        if changes:
+            self._commit("normalize_limits", *changes)
     def _user_validate(self):
         name = self.user_inputs.get("name").text.strip()
         if not name:
@@ -399,8 +479,7 @@ class BiblioApp:
         user = {"type": self.user_type, "name": name, "limit": self._user_limit_default(self.user_type)}
         # força limite por perfil
         user["limit"] = self._user_limit_default(self.user_type)
-        self.data.setdefault("users", []).append(user)
-        self.save_data(self.data)
+        self._commit("add_user", ["add", "users", user])
         self.user_message = "Usuário salvo com sucesso!"
         for f in self.user_inputs.values():
             f.text = ""
@@ -409,8 +488,7 @@ class BiblioApp:
     def _user_delete(self, index):
         users = self.data.get("users", [])
         if 0 <= index < len(users):
-            users.pop(index)
-            self.save_data(self.data)
+            self._commit("del_user", ["del", "users", index])
             self.user_message = "Usuário removido."
             self.user_selected_index = -1
 
@@ -434,11 +512,12 @@ class BiblioApp:
         if not ok:
             self.user_message = msg
             return False
-        u = users[self.user_selected_index]
-        u["name"] = self.user_inputs["name"].text.strip()
-        u["type"] = self.user_type
-        u["limit"] = self._user_limit_default(self.user_type)
-        self.save_data(self.data)
+        fields = {
+            "name": self.user_inputs["name"].text.strip(),
+            "type": self.user_type,
+            "limit": self._user_limit_default(self.user_type),
+        }
+        self._commit("edit_user", ["set", "users", self.user_selected_index, fields])
         self.user_message = "Usuário atualizado."
         self.user_edit_mode = False
         return True
@@ -469,7 +548,7 @@ class BiblioApp:
         # Indicador de limite fixo por perfil (somente display)
         try:
             limit_val = self._user_limit_default(self.user_type)
-            info_lbl = self.font_md.render(f"Limite (fixo): {limit_val}", True, (80,120,90))
+            info_lbl = render_text(self.font_md, f"Limite (fixo): {limit_val}", True, (80,120,90))
             self.screen.blit(info_lbl, (680, 140))
         except Exception:
             pass
@@ -477,7 +556,7 @@ class BiblioApp:
         self._user_normalize_limits()
         self.screen.fill(BG)
         self.render_navbar()
-        title = self.font_title.render("Gerenciar Usuários", True, INK)
+        title = render_text(self.font_title, "Gerenciar Usuários", True, INK)
         self.screen.blit(title, (40, 100))
 
         types = ["Student", "Professor", "Visitor"]
@@ -488,7 +567,7 @@ class BiblioApp:
             bg = (225, 235, 255) if is_sel else (255, 255, 255)
             pygame.draw.rect(self.screen, bg, rect, border_radius=10)
             pygame.draw.rect(self.screen, (80, 120, 200) if is_sel else BTN_BORDER, rect, width=2, border_radius=10)
-            label = self.font.render(t, True, (40, 60, 120) if is_sel else BTN_TEXT)
+            label = render_text(self.font, t, True, (40, 60, 120) if is_sel else BTN_TEXT)
             self.screen.blit(label, (rect.centerx - label.get_width() // 2, rect.centery - label.get_height() // 2))
             x += 180
 
@@ -499,7 +578,7 @@ class BiblioApp:
 
         save_rect, edit_rect, delete_rect, cancel_rect, list_rect = self._manage_users_toolbar_rects()
         pygame.draw.rect(self.screen, (70, 190, 120), save_rect, border_radius=10)
-        self.screen.blit(self.font.render("Salvar", True, (255, 255, 255)), (save_rect.centerx - 30, save_rect.centery - 12))
+        self.screen.blit(render_text(self.font, "Salvar", True, (255, 255, 255)), (save_rect.centerx - 30, save_rect.centery - 12))
 
         edit_rect = edit_rect
         cancel_rect = cancel_rect
@@ -507,34 +586,34 @@ class BiblioApp:
         action_color = (60, 130, 200) if self.user_edit_mode else (100, 120, 200)
         # Editar/Salvar Edição
         pygame.draw.rect(self.screen, action_color, edit_rect, border_radius=10)
-        self.screen.blit(self.font.render(action_label, True, (255, 255, 255)), (edit_rect.centerx - self.font.size(action_label)[0]//2, edit_rect.centery - 12))
+        self.screen.blit(render_text(self.font, action_label, True, (255, 255, 255)), (edit_rect.centerx - self.font.size(action_label)[0]//2, edit_rect.centery - 12))
         # Excluir (habilita somente se há seleção)
         del_color = (190, 80, 80) if self.user_selected_index >= 0 else (200, 200, 200)
         pygame.draw.rect(self.screen, del_color, delete_rect, border_radius=10)
         del_label = "Excluir"
-        self.screen.blit(self.font.render(del_label, True, (255, 255, 255)), (delete_rect.centerx - self.font.size(del_label)[0]//2, delete_rect.centery - 12))
+        self.screen.blit(render_text(self.font, del_label, True, (255, 255, 255)), (delete_rect.centerx - self.font.size(del_label)[0]//2, delete_rect.centery - 12))
         # Cancelar Edição
         pygame.draw.rect(self.screen, (180, 90, 90), cancel_rect, border_radius=10)
-        self.screen.blit(self.font.render("Cancelar Edição", True, (255, 255, 255)), (cancel_rect.centerx - self.font.size("Cancelar Edição")[0]//2, cancel_rect.centery - 12))
+        self.screen.blit(render_text(self.font, "Cancelar Edição", True, (255, 255, 255)), (cancel_rect.centerx - self.font.size("Cancelar Edição")[0]//2, cancel_rect.centery - 12))
 
         users = self.data.get("users", [])
         pygame.draw.rect(self.screen, (255, 255, 255), list_rect, border_radius=14)
         pygame.draw.rect(self.screen, BTN_BORDER, list_rect, width=2, border_radius=14)
-        header = self.font_sub.render("Usuários cadastrados (clique para selecionar/remover)", True, BTN_TEXT)
+        header = render_text(self.font_sub, "Usuários cadastrados (clique para selecionar/remover)", True, BTN_TEXT)
         self.screen.blit(header, (list_rect.x + 20, list_rect.y + 18))
 
         y = list_rect.y + 60
         for i, u in enumerate(users[:12]):
             line = f"{i + 1:02d}. {u.get('name')} — {u.get('type')} — limite: {u.get('limit')}"
             color = (40, 80, 140) if i == self.user_selected_index else (70, 80, 100)
-            self.screen.blit(self.font.render(line, True, color), (60, y))
+            self.screen.blit(render_text(self.font, line, True, color), (60, y))
             y += 28
 
         if self.user_message:
             color = (70, 140, 90) if any(w in self.user_message.lower() for w in ["sucesso", "removido", "atualizado"]) else (200, 90, 90)
-            self.screen.blit(self.font.render(self.user_message, True, color), (500, 260))
+            self.screen.blit(render_text(self.font, self.user_message, True, color), (500, 260))
 
-        tip = self.font.render("Clique num usuário para selecionar. Delete remove o selecionado.", True, MUTED)
+        tip = render_text(self.font, "Clique num usuário para selecionar. Delete remove o selecionado.", True, MUTED)
         self.screen.blit(tip, (40, 740))
 
     def handle_manage_users_event(self, event):
@@ -613,14 +692,14 @@ class BiblioApp:
         if not self._loan_can_borrow(user):
             self.loan_message = "Usuário atingiu o limite de empréstimos."
             return False
-        item["status"] = "borrowed"
-        item["borrower"] = user["name"]
         now_ts = int(time.time())
-        item["loan_ts"] = now_ts
-        item["due_ts"] = now_ts + 7 * 24 * 3600
-        user["limit"] = max(0, user.get("limit", 0) - 1)
-        self.data.setdefault("transactions", []).insert(0, {"type": "Loan", "user": user["name"], "item": item["name"]})
-        self.save_data(self.data)
+        item_fields = {"status": "borrowed", "borrower": user["name"], "loan_ts": now_ts, "due_ts": now_ts + 7 * 24 * 3600}
+        self._commit(
+            "loan",
+            ["set", "items", self.loan_selected_item, item_fields],
+            ["set", "users", self.loan_selected_user, {"limit": max(0, user.get("limit", 0) - 1)}],
+            self._tx_change(type="Loan", user=user["name"], item=item["name"]),
+        )
         self.loan_message = "Empréstimo realizado com sucesso."
         return True
 
@@ -646,14 +725,13 @@ class BiblioApp:
             diff = now_ts - int(item.get("due_ts", now_ts))
             if diff > 0:
                 overdue_days = math.ceil(diff / (24 * 3600))
-        item["status"] = "available"
-        item["borrower"] = None
-        item["return_ts"] = now_ts
-        item["loan_ts"] = None
-        item["due_ts"] = None
-        user["limit"] = user.get("limit", 0) + 1
-        self.data.setdefault("transactions", []).insert(0, {"type": "Return", "user": user["name"], "item": item["name"]})
-        self.save_data(self.data)
+        item_fields = {"status": "available", "borrower": None, "return_ts": now_ts, "loan_ts": None, "due_ts": None}
+        self._commit(
+            "return",
+            ["set", "items", self.loan_selected_item, item_fields],
+            ["set", "users", self.loan_selected_user, {"limit": user.get("limit", 0) + 1}],
+            self._tx_change(type="Return", user=user["name"], item=item["name"]),
+        )
         self.loan_message = "Devolução registrada."
         if overdue_days > 0:
             self.loan_message += f" Atraso de {overdue_days} dia(s)."
@@ -669,22 +747,21 @@ class BiblioApp:
             return False
         user = users[self.loan_selected_user]
         item = items[self.loan_selected_item]
-        self.data.setdefault("transactions", []).insert(0, {"type": "Reservation", "user": user["name"], "item": item["name"]})
-        self.save_data(self.data)
+        self._commit("reserve", self._tx_change(type="Reservation", user=user["name"], item=item["name"]))
         self.loan_message = "Reserva registrada."
         return True
 
     def render_loans(self):
         self.screen.fill(BG)
         self.render_navbar()
-        title = self.font_title.render("Empréstimos / Devoluções / Reservas", True, INK)
+        title = render_text(self.font_title, "Empréstimos / Devoluções / Reservas", True, INK)
         self.screen.blit(title, (40, 100))
 
         users, items = self._loan_lists()
 
         pygame.draw.rect(self.screen, (255, 255, 255), (40, 160, 460, 460), border_radius=14)
         pygame.draw.rect(self.screen, BTN_BORDER, (40, 160, 460, 460), width=2, border_radius=14)
-        self.screen.blit(self.font_sub.render("Usuários", True, BTN_TEXT), (60, 180))
+        self.screen.blit(render_text(self.font_sub, "Usuários", True, BTN_TEXT), (60, 180))
 
         uy = 220
         for i, u in enumerate(users[:14]):
@@ -692,12 +769,12 @@ class BiblioApp:
             can = self._loan_can_borrow(u)
             line = f"{prefix}{u.get('name')} — {u.get('type')} (limite:{u.get('limit')})"
             color = (40, 120, 60) if can else (160, 80, 60)
-            self.screen.blit(self.font.render(line, True, color), (60, uy))
+            self.screen.blit(render_text(self.font, line, True, color), (60, uy))
             uy += 28
 
         pygame.draw.rect(self.screen, (255, 255, 255), (520, 160, 460, 460), border_radius=14)
         pygame.draw.rect(self.screen, BTN_BORDER, (520, 160, 460, 460), width=2, border_radius=14)
-        self.screen.blit(self.font_sub.render("Itens", True, BTN_TEXT), (540, 180))
+        self.screen.blit(render_text(self.font_sub, "Itens", True, BTN_TEXT), (540, 180))
 
         iy = 220
         for i, it in enumerate(items[:14]):
@@ -705,7 +782,7 @@ class BiblioApp:
             st = it.get("status", "available")
             line = f"{prefix}{it.get('name')} — {it.get('type')} [{st}]"
             color = (50, 90, 160) if st == "available" else (160, 80, 80)
-            self.screen.blit(self.font.render(line, True, color), (540, iy))
+            self.screen.blit(render_text(self.font, line, True, color), (540, iy))
             iy += 28
 
         btn_w = 180
@@ -718,15 +795,15 @@ class BiblioApp:
         pygame.draw.rect(self.screen, (200, 140, 70), return_rect, border_radius=12)
         pygame.draw.rect(self.screen, (90, 110, 200), reserve_rect, border_radius=12)
 
-        self.screen.blit(self.font.render("Emprestar", True, (255, 255, 255)), (loan_rect.centerx - 48, loan_rect.centery - 12))
-        self.screen.blit(self.font.render("Devolver", True, (255, 255, 255)), (return_rect.centerx - 48, return_rect.centery - 12))
-        self.screen.blit(self.font.render("Reservar", True, (255, 255, 255)), (reserve_rect.centerx - 48, reserve_rect.centery - 12))
+        self.screen.blit(render_text(self.font, "Emprestar", True, (255, 255, 255)), (loan_rect.centerx - 48, loan_rect.centery - 12))
+        self.screen.blit(render_text(self.font, "Devolver", True, (255, 255, 255)), (return_rect.centerx - 48, return_rect.centery - 12))
+        self.screen.blit(render_text(self.font, "Reservar", True, (255, 255, 255)), (reserve_rect.centerx - 48, reserve_rect.centery - 12))
 
         if self.loan_message:
             color = (70, 140, 90) if any(w in self.loan_message.lower() for w in ["sucesso", "registrada", "registrado"]) else (200, 90, 90)
-            self.screen.blit(self.font.render(self.loan_message, True, color), (640, 650))
+            self.screen.blit(render_text(self.font, self.loan_message, True, color), (640, 650))
 
-        tip = self.font.render("Clique em um usuário e um item; depois escolha Emprestar/Devolver/Reservar.", True, MUTED)
+        tip = render_text(self.font, "Clique em um usuário e um item; depois escolha Emprestar/Devolver/Reservar.", True, MUTED)
         self.screen.blit(tip, (40, 720))
 
     def handle_loans_event(self, event):
@@ -761,70 +838,68 @@ class BiblioApp:
 
     # ---------- Relatórios ----------
     def _rep_filtered_items(self):
-        items = self.data.get("items", [])
         t = self.rep_filter_type
         s = self.rep_filter_status
-        res = []
-        for it in items:
-            if t != "All" and it.get("type") != t:
-                continue
-            if s != "All" and it.get("status", "available") != s:
-                continue
-            res.append(it)
-        return res
-
-    def _rep_export_json(self, rows):
-        os.makedirs(os.path.join("data", "exports"), exist_ok=True)
-        ts = time.strftime("%Y%m%d_%H%M%S")
-        path = os.path.join("data", "exports", f"relatorio_{self.rep_filter_type}_{self.rep_filter_status}_{ts}.json")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(rows, f, indent=4, ensure_ascii=False)
-        self.rep_message = f"JSON exportado: data/exports/{os.path.basename(path)}"
-
-    def _rep_export_csv(self, rows):
-        os.makedirs(os.path.join("data", "exports"), exist_ok=True)
-        ts = time.strftime("%Y%m%d_%H%M%S")
-        path = os.path.join("data", "exports", f"relatorio_{self.rep_filter_type}_{self.rep_filter_status}_{ts}.csv")
-        headers = ["type", "name", "status", "author", "isbn", "edition", "duration", "borrower"]
-        with open(path, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader();
-            for r in rows:
-                writer.writerow({k: r.get(k, "") for k in headers})
-        self.rep_message = f"CSV exportado: data/exports/{os.path.basename(path)}"
+        return self.catalog.items(type=None if t == "All" else t, status=None if s == "All" else s)
 
     def _rep_group_by_user(self):
         users = self.data.get("users", [])
-        items = self.data.get("items", [])
         m = {u.get("name"): [] for u in users}
-        for it in items:
-            if it.get("status") == "borrowed" and it.get("borrower"):
-                m.setdefault(it.get("borrower"), []).append(it)
+        for borrower in self.catalog.borrowers():
+            rows = [it for it in self.catalog.items_by_borrower(borrower) if it.get("status") == "borrowed"]
+            if rows:
+                m.setdefault(borrower, []).extend(rows)
         return m
 
-    def _rep_export_by_user_json(self, grouped):
-        os.makedirs(os.path.join("data", "exports"), exist_ok=True)
+    # Exportações rodam em segundo plano (storage/export.py): as linhas são
+    # projetadas e gravadas na thread do exportador, em blocos.
+    def _rep_start_export(self, fmt, by_user=False):
+        if self.rep_job is not None and self.rep_job.running:
+            self.rep_message = "Já existe uma exportação em andamento..."
+            return
         ts = time.strftime("%Y%m%d_%H%M%S")
-        path = os.path.join("data", "exports", f"relatorio_por_usuario_{ts}.json")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump({k: [i.get("name") for i in v] for k, v in grouped.items()}, f, indent=4, ensure_ascii=False)
-        self.rep_message = f"JSON (por usuário) exportado: data/exports/{os.path.basename(path)}"
+        if by_user:
+            grouped = self._rep_group_by_user()
+            name = f"relatorio_por_usuario_{ts}.{fmt}"
+            total = len(grouped)
+            rows = _by_user_rows(list(grouped.items()), fmt)
+            label = f"{fmt.upper()} (por usuário)"
+        else:
+            items = self._rep_filtered_items()
+            name = f"relatorio_{self.rep_filter_type}_{self.rep_filter_status}_{ts}.{fmt}"
+            total = len(items)
+            rows = (_export_row(r) for r in items)
+            label = fmt.upper()
+        path = os.path.join("data", "exports", name)
+        headers = REPORT_BY_USER_HEADERS if by_user else REPORT_ITEM_HEADERS
+        self.rep_job = start_export(path, fmt, rows, total=total, headers=headers, json_object=by_user)
+        self.rep_job_label = label
+        self.rep_message = ""
 
-    def _rep_export_by_user_csv(self, grouped):
-        os.makedirs(os.path.join("data", "exports"), exist_ok=True)
-        ts = time.strftime("%Y%m%d_%H%M%S")
-        path = os.path.join("data", "exports", f"relatorio_por_usuario_{ts}.csv")
-        with open(path, "w", encoding="utf-8", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["user", "borrowed_items"])
-            for user, items in grouped.items():
-                writer.writerow([user, "; ".join(i.get("name", "") for i in items)])
-        self.rep_message = f"CSV (por usuário) exportado: data/exports/{os.path.basename(path)}"
+    def _rep_poll_export(self):
+        job = self.rep_job
+        if job is None or job.running:
+            return
+        if job.state == "done":
+            self.rep_message = f"{self.rep_job_label} exportado: data/exports/{os.path.basename(job.path)}"
+        else:
+            self.rep_message = f"Falha na exportação: {job.error}"
+        self.rep_job = None
+
+    def _rep_draw_progress(self, x, y, w=360, h=18):
+        job = self.rep_job
+        frac = job.progress or 0.0
+        pygame.draw.rect(self.screen, (255, 255, 255), (x, y, w, h), border_radius=6)
+        pygame.draw.rect(self.screen, (80, 120, 200), (x, y, int(w * frac), h), border_radius=6)
+        pygame.draw.rect(self.screen, BTN_BORDER, (x, y, w, h), width=2, border_radius=6)
+        total = job.total if job.total is not None else "?"
+        txt = f"Exportando {self.rep_job_label}: {job.done}/{total}"
+        self.screen.blit(render_text(self.font, txt, True, (70, 90, 120)), (x + w + 12, y - 4))
 
     def render_reports(self):
         self.screen.fill(BG)
         self.render_navbar()
-        title = self.font_title.render("Relatórios", True, INK)
+        title = render_text(self.font_title, "Relatórios", True, INK)
         self.screen.blit(title, (40, 100))
 
         # Toggle modo
@@ -834,8 +909,8 @@ class BiblioApp:
         pygame.draw.rect(self.screen, (225, 245, 230) if self.rep_mode == "by_user" else (255, 255, 255), mode_users_rect, border_radius=8)
         pygame.draw.rect(self.screen, BTN_BORDER, mode_items_rect, width=2, border_radius=8)
         pygame.draw.rect(self.screen, BTN_BORDER, mode_users_rect, width=2, border_radius=8)
-        self.screen.blit(self.font.render("Itens", True, (40, 60, 120)), (mode_items_rect.x + 20, mode_items_rect.y + 6))
-        self.screen.blit(self.font.render("Por Usuário", True, (40, 100, 80)), (mode_users_rect.x + 12, mode_users_rect.y + 6))
+        self.screen.blit(render_text(self.font, "Itens", True, (40, 60, 120)), (mode_items_rect.x + 20, mode_items_rect.y + 6))
+        self.screen.blit(render_text(self.font, "Por Usuário", True, (40, 100, 80)), (mode_users_rect.x + 12, mode_users_rect.y + 6))
 
         if self.rep_mode == "items":
             # Filtros
@@ -846,7 +921,7 @@ class BiblioApp:
                 is_sel = (self.rep_filter_type == t)
                 pygame.draw.rect(self.screen, (225, 235, 255) if is_sel else (255, 255, 255), rect, border_radius=10)
                 pygame.draw.rect(self.screen, (80, 120, 200) if is_sel else BTN_BORDER, rect, width=2, border_radius=10)
-                label = self.font.render(t, True, (40, 60, 120) if is_sel else BTN_TEXT)
+                label = render_text(self.font, t, True, (40, 60, 120) if is_sel else BTN_TEXT)
                 self.screen.blit(label, (rect.centerx - label.get_width() // 2, rect.centery - label.get_height() // 2))
                 x += 150
 
@@ -857,14 +932,14 @@ class BiblioApp:
                 is_sel = (self.rep_filter_status == s)
                 pygame.draw.rect(self.screen, (225, 245, 230) if is_sel else (255, 255, 255), rect, border_radius=10)
                 pygame.draw.rect(self.screen, (80, 160, 120) if is_sel else BTN_BORDER, rect, width=2, border_radius=10)
-                label = self.font.render(s, True, (40, 100, 80) if is_sel else BTN_TEXT)
+                label = render_text(self.font, s, True, (40, 100, 80) if is_sel else BTN_TEXT)
                 self.screen.blit(label, (rect.centerx - label.get_width() // 2, rect.centery - label.get_height() // 2))
                 x += 150
 
             rows = self._rep_filtered_items()
             pygame.draw.rect(self.screen, (255, 255, 255), (40, 420, 940, 230), border_radius=14)
             pygame.draw.rect(self.screen, BTN_BORDER, (40, 420, 940, 230), width=2, border_radius=14)
-            header = self.font_sub.render(f"Itens filtrados: {len(rows)}", True, BTN_TEXT)
+            header = render_text(self.font_sub, f"Itens filtrados: {len(rows)}", True, BTN_TEXT)
 
             # ==== GRÁFICOS (inseridos) ====
             try:
@@ -875,23 +950,23 @@ class BiblioApp:
                 # Contagens
                 types_ct = Counter([getattr(i,'type', i.get('type','Book')) for i in items_ref])
                 status_ct = Counter([getattr(i,'status', i.get('status','available')) for i in items_ref])
-                # Dados usuários (se houver self.transactions)
-                tx = getattr(self, 'transactions', []) or getattr(self, 'dm', None) and getattr(self.dm, 'transactions', []) or []
-                users_ct = Counter([t.get('user_id') or getattr(t,'user_id','') for t in tx if (t.get('type') if isinstance(t,dict) else getattr(t,'type','')) in ('loan','return')])
+                # Empréstimos por usuário: contadores do histórico, sem percorrer as transações
+                history_status = self._history_status()
+                top_users = self.history.top_users(10) if history_status is None else []
                 data_types  = [ {'label':'Book','value':types_ct.get('Book',0)},
                                 {'label':'Magazine','value':types_ct.get('Magazine',0)},
                                 {'label':'DVD','value':types_ct.get('DVD',0)} ]
                 data_status = [ {'label':'Disp.','value':status_ct.get('available',0)},
                                 {'label':'Emp.','value':status_ct.get('borrowed',0) or status_ct.get('loaned',0)},
                                 {'label':'Res.','value':status_ct.get('reserved',0)} ]
-                data_users  = [ {'label':u if u else '—', 'value':c} for u,c in users_ct.most_common(10) ]
+                data_users  = [ {'label':u if u else '—', 'value':c} for u,c in top_users ]
                 # áreas
                 rect_types  = pygame.Rect(20, 170, 320, 200)
                 rect_status = pygame.Rect(360,170, 320, 200)
                 rect_users  = pygame.Rect(700,170, 360, 200)
                 draw_bar_chart(self.screen, data_types,  rect_types,  'Itens por Tipo')
                 draw_bar_chart(self.screen, data_status, rect_status, 'Status dos Itens')
-                draw_bar_chart(self.screen, data_users,  rect_users,  'Uso por Usuário')
+                draw_bar_chart(self.screen, data_users,  rect_users,  'Uso por Usuário' + (f' ({history_status})' if history_status else ''))
             except Exception as _e:
                 pass
             # ==== /GRÁFICOS ====
@@ -902,37 +977,49 @@ class BiblioApp:
                 extra = r.get('author') or r.get('edition') or r.get('duration') or ''
                 if extra:
                     line += f" — {extra}"
-                self.screen.blit(self.font.render(line, True, (70, 80, 100)), (60, y))
+                self.screen.blit(render_text(self.font, line, True, (70, 80, 100)), (60, y))
                 y += 26
 
             export_json_rect = pygame.Rect(40, 660, 200, 44)
             export_csv_rect = pygame.Rect(260, 660, 200, 44)
+            export_ndjson_rect = pygame.Rect(480, 660, 200, 44)
             pygame.draw.rect(self.screen, (80, 120, 200), export_json_rect, border_radius=10)
             pygame.draw.rect(self.screen, (80, 160, 120), export_csv_rect, border_radius=10)
-            self.screen.blit(self.font.render("Exportar JSON", True, (255, 255, 255)), (export_json_rect.centerx - 70, export_json_rect.centery - 12))
-            self.screen.blit(self.font.render("Exportar CSV", True, (255, 255, 255)), (export_csv_rect.centerx - 70, export_csv_rect.centery - 12))
+            pygame.draw.rect(self.screen, (120, 100, 180), export_ndjson_rect, border_radius=10)
+            self.screen.blit(render_text(self.font, "Exportar JSON", True, (255, 255, 255)), (export_json_rect.centerx - 70, export_json_rect.centery - 12))
+            self.screen.blit(render_text(self.font, "Exportar CSV", True, (255, 255, 255)), (export_csv_rect.centerx - 70, export_csv_rect.centery - 12))
+            self.screen.blit(render_text(self.font, "Exportar NDJSON", True, (255, 255, 255)), (export_ndjson_rect.centerx - 80, export_ndjson_rect.centery - 12))
 
         else:
             grouped = self._rep_group_by_user()
             pygame.draw.rect(self.screen, (255, 255, 255), (40, 160, 940, 500), border_radius=14)
             pygame.draw.rect(self.screen, BTN_BORDER, (40, 160, 940, 500), width=2, border_radius=14)
-            header = self.font_sub.render("Itens emprestados por Usuário", True, BTN_TEXT)
+            history_status = self._history_status()
+            title = "Itens emprestados por Usuário" + (f" — empréstimos: {history_status}" if history_status else "")
+            header = render_text(self.font_sub, title, True, BTN_TEXT)
             self.screen.blit(header, (60, 178))
             y = 220
             for user, items in list(grouped.items())[:12]:
-                line = f"{user}: " + (", ".join(i.get('name', '') for i in items) if items else "— nenhum")
-                self.screen.blit(self.font.render(line, True, (70, 80, 100)), (60, y))
+                loans = self.history.loan_count(user=user) if history_status is None else "?"
+                line = f"{user} ({loans} empréstimo(s)): " + (", ".join(i.get('name', '') for i in items) if items else "— nenhum")
+                self.screen.blit(render_text(self.font, line, True, (70, 80, 100)), (60, y))
                 y += 26
 
             export_json_rect = pygame.Rect(40, 680, 240, 44)
             export_csv_rect = pygame.Rect(300, 680, 240, 44)
+            export_ndjson_rect = pygame.Rect(560, 680, 260, 44)
             pygame.draw.rect(self.screen, (80, 120, 200), export_json_rect, border_radius=10)
             pygame.draw.rect(self.screen, (80, 160, 120), export_csv_rect, border_radius=10)
-            self.screen.blit(self.font.render("Exportar JSON (por usuário)", True, (255, 255, 255)), (export_json_rect.x + 10, export_json_rect.y + 12))
-            self.screen.blit(self.font.render("Exportar CSV (por usuário)", True, (255, 255, 255)), (export_csv_rect.x + 10, export_csv_rect.y + 12))
+            pygame.draw.rect(self.screen, (120, 100, 180), export_ndjson_rect, border_radius=10)
+            self.screen.blit(render_text(self.font, "Exportar JSON (por usuário)", True, (255, 255, 255)), (export_json_rect.x + 10, export_json_rect.y + 12))
+            self.screen.blit(render_text(self.font, "Exportar CSV (por usuário)", True, (255, 255, 255)), (export_csv_rect.x + 10, export_csv_rect.y + 12))
+            self.screen.blit(render_text(self.font, "Exportar NDJSON (por usuário)", True, (255, 255, 255)), (export_ndjson_rect.x + 10, export_ndjson_rect.y + 12))
 
-        if self.rep_message:
-            self.screen.blit(self.font.render(self.rep_message, True, (70, 90, 120)), (480, 672))
+        self._rep_poll_export()
+        if self.rep_job is not None:
+            self._rep_draw_progress(40, 736)
+        elif self.rep_message:
+            self.screen.blit(render_text(self.font, self.rep_message, True, (70, 90, 120)), (40, 732))
 
     def handle_reports_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -962,25 +1049,21 @@ class BiblioApp:
                         self.rep_filter_status = s
                         return
                     x += 150
-                export_json_rect = pygame.Rect(40, 660, 200, 44)
-                export_csv_rect = pygame.Rect(260, 660, 200, 44)
-                rows = self._rep_filtered_items()
-                if export_json_rect.collidepoint(event.pos):
-                    self._rep_export_json(rows)
-                    return
-                if export_csv_rect.collidepoint(event.pos):
-                    self._rep_export_csv(rows)
-                    return
+                buttons = {"json": pygame.Rect(40, 660, 200, 44),
+                           "csv": pygame.Rect(260, 660, 200, 44),
+                           "ndjson": pygame.Rect(480, 660, 200, 44)}
+                for fmt, rect in buttons.items():
+                    if rect.collidepoint(event.pos):
+                        self._rep_start_export(fmt)
+                        return
             else:
-                export_json_rect = pygame.Rect(40, 680, 240, 44)
-                export_csv_rect = pygame.Rect(300, 680, 240, 44)
-                grouped = self._rep_group_by_user()
-                if export_json_rect.collidepoint(event.pos):
-                    self._rep_export_by_user_json(grouped)
-                    return
-                if export_csv_rect.collidepoint(event.pos):
-                    self._rep_export_by_user_csv(grouped)
-                    return
+                buttons = {"json": pygame.Rect(40, 680, 240, 44),
+                           "csv": pygame.Rect(300, 680, 240, 44),
+                           "ndjson": pygame.Rect(560, 680, 260, 44)}
+                for fmt, rect in buttons.items():
+                    if rect.collidepoint(event.pos):
+                        self._rep_start_export(fmt, by_user=True)
+                        return
 
     # ---------- Prateleira (CRUD Itens) ----------
     def _item_build_fields_from(self, item):
@@ -1030,15 +1113,15 @@ class BiblioApp:
         if not ok:
             self.item_message = msg
             return False
-        it["name"] = self.item_inputs["name"].text.strip()
+        fields = {"name": self.item_inputs["name"].text.strip()}
         if t == "Book":
-            it["author"] = self.item_inputs["author"].text.strip()
-            it["isbn"] = self.item_inputs["isbn"].text.strip()
+            fields["author"] = self.item_inputs["author"].text.strip()
+            fields["isbn"] = self.item_inputs["isbn"].text.strip()
         elif t == "Magazine":
-            it["edition"] = self.item_inputs["edition"].text.strip()
+            fields["edition"] = self.item_inputs["edition"].text.strip()
         elif t == "DVD":
-            it["duration"] = self.item_inputs["duration"].text.strip()
-        self.save_data(self.data)
+            fields["duration"] = self.item_inputs["duration"].text.strip()
+        self._commit("edit_item", ["set", "items", self.item_selected_index, fields])
         self.item_message = "Item atualizado."
         self.item_edit_mode = False
         return True
@@ -1049,31 +1132,22 @@ class BiblioApp:
             if items[self.item_selected_index].get("status") == "borrowed":
                 self.item_message = "Não é possível excluir um item emprestado."
                 return
-            items.pop(self.item_selected_index)
+            self._commit("del_item", ["del", "items", self.item_selected_index])
             self.item_selected_index = -1
-            self.save_data(self.data)
             self.item_message = "Item removido."
 
     def render_shelf(self):
         self.screen.fill(BG)
         self.render_navbar()
-        title = self.font_title.render("Prateleira (Itens)", True, INK)
+        title = render_text(self.font_title, "Prateleira (Itens)", True, INK)
         self.screen.blit(title, (40, 100))
 
         items = self.data.get("items", [])
-        cols = 4
-        card_w, card_h = 220, 120
-        gap_x, gap_y = 20, 18
-        start_x, start_y = 40, 160 + self.scroll_offset
-
-        for idx, it in enumerate(items):
-            row = idx // cols
-            col = idx % cols
-            x = start_x + col * (card_w + gap_x)
-            y = start_y + row * (card_h + gap_y)
-            if y > 700 or y + card_h < 160:
-                continue
-            rect = pygame.Rect(x, y, card_w, card_h)
+        grid = self.shelf_grid
+        for idx in grid.visible_range(len(items), self.scroll_offset):
+            it = items[idx]
+            rect = grid.rect_for(idx, self.scroll_offset)
+            x, y = rect.topleft
             is_sel = (idx == self.item_selected_index)
             bg = (250, 252, 255) if is_sel else (255, 255, 255)
             pygame.draw.rect(self.screen, bg, rect, border_radius=14)
@@ -1082,18 +1156,18 @@ class BiblioApp:
             name = it.get("name", "(sem nome)")
             typ = it.get("type", "Item")
             extra = it.get("author") or it.get("edition") or it.get("duration") or ""
-            t1 = self.font_sub.render(f"{typ}", True, BTN_TEXT)
+            t1 = render_text(self.font_sub, f"{typ}", True, BTN_TEXT)
             self.screen.blit(t1, (x + 12, y + 10))
-            t2 = self.font.render(name, True, (70, 80, 100))
+            t2 = render_text(self.font, name, True, (70, 80, 100))
             self.screen.blit(t2, (x + 12, y + 46))
             if extra:
-                t3 = self.font.render(str(extra), True, (110, 120, 140))
+                t3 = render_text(self.font, str(extra), True, (110, 120, 140))
                 self.screen.blit(t3, (x + 12, y + 74))
 
         panel = pygame.Rect(520, 160, 460, 380)
         pygame.draw.rect(self.screen, (255, 255, 255), panel, border_radius=14)
         pygame.draw.rect(self.screen, BTN_BORDER, panel, width=2, border_radius=14)
-        self.screen.blit(self.font_sub.render("Edição do Item", True, BTN_TEXT), (540, 178))
+        self.screen.blit(render_text(self.font_sub, "Edição do Item", True, BTN_TEXT), (540, 178))
 
         if 0 <= self.item_selected_index < len(items):
             it = items[self.item_selected_index]
@@ -1106,32 +1180,32 @@ class BiblioApp:
             del_rect = pygame.Rect(740, 360, 180, 44)
             pygame.draw.rect(self.screen, (70, 190, 120), save_rect, border_radius=10)
             pygame.draw.rect(self.screen, (190, 80, 80), del_rect, border_radius=10)
-            self.screen.blit(self.font.render("Salvar Alterações", True, (255, 255, 255)), (save_rect.centerx - 84, save_rect.centery - 12))
-            self.screen.blit(self.font.render("Excluir", True, (255, 255, 255)), (del_rect.centerx - 34, del_rect.centery - 12))
+            self.screen.blit(render_text(self.font, "Salvar Alterações", True, (255, 255, 255)), (save_rect.centerx - 84, save_rect.centery - 12))
+            self.screen.blit(render_text(self.font, "Excluir", True, (255, 255, 255)), (del_rect.centerx - 34, del_rect.centery - 12))
         else:
             self.item_edit_mode = False
             self.item_inputs = {}
             msg = "Selecione um item na prateleira (à esquerda) para editar."
-            self.screen.blit(self.font.render(msg, True, (100, 110, 130)), (540, 220))
+            self.screen.blit(render_text(self.font, msg, True, (100, 110, 130)), (540, 220))
 
         if self.item_message:
             color = (70, 140, 90) if any(w in self.item_message.lower() for w in ["atualiz", "remov"]) else (200, 90, 90)
-            self.screen.blit(self.font.render(self.item_message, True, color), (540, 420))
+            self.screen.blit(render_text(self.font, self.item_message, True, color), (540, 420))
 
-        tip = self.font.render("Clique em um cartão para selecionar. Use a rodinha para rolar.", True, MUTED)
+        tip = render_text(self.font, "Clique em um cartão para selecionar. Use a rodinha para rolar.", True, MUTED)
         self.screen.blit(tip, (40, 740))
 
     # ---------- Dashboard (render) ----------
     def render_dashboard(self):
         self.screen.fill(BG)
         self.render_navbar()
-        title = self.font_title.render("BiblioManager — Dashboard", True, INK)
+        title = render_text(self.font_title, "BiblioManager — Dashboard", True, INK)
         self.screen.blit(title, (40, 100))
         item_counts = self._count_items()
         user_counts = self._count_users()
         pygame.draw.rect(self.screen, (255, 255, 255), (40, 160, 460, 220), border_radius=18)
         pygame.draw.rect(self.screen, BTN_BORDER, (40, 160, 460, 220), width=2, border_radius=18)
-        t1 = self.font_sub.render("Itens cadastrados", True, BTN_TEXT)
+        t1 = render_text(self.font_sub, "Itens cadastrados", True, BTN_TEXT)
         self.screen.blit(t1, (60, 182))
         lines1 = [
             f"Total: {item_counts['total']}",
@@ -1143,11 +1217,11 @@ class BiblioApp:
         ]
         y = 218
         for line in lines1:
-            self.screen.blit(self.font.render(line, True, (70, 80, 100)), (60, y))
+            self.screen.blit(render_text(self.font, line, True, (70, 80, 100)), (60, y))
             y += 26
         pygame.draw.rect(self.screen, (255, 255, 255), (520, 160, 460, 220), border_radius=18)
         pygame.draw.rect(self.screen, BTN_BORDER, (520, 160, 460, 220), width=2, border_radius=18)
-        t2 = self.font_sub.render("Usuários", True, BTN_TEXT)
+        t2 = render_text(self.font_sub, "Usuários", True, BTN_TEXT)
         self.screen.blit(t2, (540, 182))
         lines2 = [
             f"Total: {user_counts['total']}",
@@ -1157,22 +1231,22 @@ class BiblioApp:
         ]
         y = 218
         for line in lines2:
-            self.screen.blit(self.font.render(line, True, (70, 80, 100)), (540, y))
+            self.screen.blit(render_text(self.font, line, True, (70, 80, 100)), (540, y))
             y += 26
         pygame.draw.rect(self.screen, (255, 255, 255), (40, 400, 940, 320), border_radius=18)
         pygame.draw.rect(self.screen, BTN_BORDER, (40, 400, 940, 320), width=2, border_radius=18)
-        t3 = self.font_sub.render("Transações recentes", True, BTN_TEXT)
+        t3 = render_text(self.font_sub, "Transações recentes", True, BTN_TEXT)
         self.screen.blit(t3, (60, 422))
         txs = self.data.get("transactions", [])
         if not txs:
-            self.screen.blit(self.font.render("Nenhuma transação registrada ainda.", True, (100, 110, 130)), (60, 460))
+            self.screen.blit(render_text(self.font, "Nenhuma transação registrada ainda.", True, (100, 110, 130)), (60, 460))
         else:
             y = 460
-            for tx in txs[:10]:
+            for tx in itertools.islice(txs, 10):
                 line = f"{tx.get('type', 'TX')} — usuário: {tx.get('user', 'N/A')} — item: {tx.get('item', 'N/A')}"
-                self.screen.blit(self.font.render(line, True, (70, 80, 100)), (60, y))
+                self.screen.blit(render_text(self.font, line, True, (70, 80, 100)), (60, y))
                 y += 24
-        footer = self.font.render("Use ESC para sair — os dados serão salvos automaticamente.", True, MUTED)
+        footer = render_text(self.font, "Use ESC para sair — os dados serão salvos automaticamente.", True, MUTED)
         self.screen.blit(footer, (40, 740))
 
     # ---------- Navbar render ----------
@@ -1186,15 +1260,26 @@ class BiblioApp:
     def render_placeholder(self, title_text):
         self.screen.fill(BG)
         self.render_navbar()
-        title = self.font_title.render(title_text, True, INK)
+        title = render_text(self.font_title, title_text, True, INK)
         self.screen.blit(title, (40, 100))
         msg = "Tela em construção."
-        self.screen.blit(self.font.render(msg, True, (90, 100, 120)), (40, 150))
+        self.screen.blit(render_text(self.font, msg, True, (90, 100, 120)), (40, 150))
 
     # ---------- Loop principal ----------
+    def _animating(self):
+        # barra de progresso da exportação precisa de quadros mesmo sem eventos
+        return self.rep_job is not None and self.current_screen == "reports"
+
+    def _schedule_blink(self):
+        # cursor do campo com foco pisca a cada 400 ms (ver InputField.draw)
+        for fields in (self.add_inputs, self.user_inputs, self.item_inputs):
+            if any(f.focus for f in fields.values()):
+                self.redraw.wake_in(400 - pygame.time.get_ticks() % 400)
+                return
+
     def run(self):
         while self.running:
-            for event in pygame.event.get():
+            for event in self.redraw.events(self._animating()):
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
@@ -1224,21 +1309,10 @@ class BiblioApp:
                     # Seleção na prateleira e ações do painel
                     if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                         items = self.data.get("items", [])
-                        cols = 4
-                        card_w, card_h = 220, 120
-                        gap_x, gap_y = 20, 18
-                        start_x, start_y = 40, 160 + self.scroll_offset
-                        clicked_any = False
-                        for idx, it in enumerate(items):
-                            row = idx // cols
-                            col = idx % cols
-                            x = start_x + col * (card_w + gap_x)
-                            y = start_y + row * (card_h + gap_y)
-                            rect = pygame.Rect(x, y, card_w, card_h)
-                            if rect.collidepoint(event.pos):
-                                self.item_selected_index = idx
-                                clicked_any = True
-                                break
+                        idx = self.shelf_grid.index_at(event.pos, len(items), self.scroll_offset)
+                        clicked_any = idx >= 0
+                        if clicked_any:
+                            self.item_selected_index = idx
                         if not clicked_any and 0 <= self.item_selected_index < len(items):
                             save_rect = pygame.Rect(540, 360, 180, 44)
                             del_rect = pygame.Rect(740, 360, 180, 44)
@@ -1250,6 +1324,9 @@ class BiblioApp:
                         for fld in self.item_inputs.values():
                             fld.handle_event(event)
 
+            if not self.redraw.begin_frame(self._animating()):
+                continue
+
             # Render por tela
             if self.current_screen == "dashboard":
                 self.render_dashboard()
@@ -1267,9 +1344,13 @@ class BiblioApp:
                 self.render_placeholder("Tela desconhecida")
 
             pygame.display.flip()
-            self.clock.tick(60)
+            self.redraw.end_frame()
+            self._schedule_blink()
 
+        self.redraw.close()
         # Salvar dados ao sair
+        if self.rep_job is not None:
+            self.rep_job.wait()
         self.save_data(self.data)
         pygame.quit()
 
@@ -1294,7 +1375,7 @@ def draw_navbar(self):
 
         # Tente tamanhos de fonte menores até caber
         for fs in (14, 13, 12):
-            nav_font = pygame.font.SysFont("Arial", fs)
+            nav_font = sys_font("Arial", fs)
             padd = 18  # padding horizontal total
             widths = [nav_font.size(txt)[0] + padd for txt in display]
             line_w = sum(widths) + gap*(n-1)
@@ -1302,7 +1383,7 @@ def draw_navbar(self):
                 break
         else:
             # se mesmo em 12 não couber, força compressão equalizada
-            nav_font = pygame.font.SysFont("Arial", 12)
+            nav_font = sys_font("Arial", 12)
             target = (W - left - right - gap*(n-1)) // n
             widths = [max(88, target) for _ in display]
 
@@ -1317,7 +1398,7 @@ def draw_navbar(self):
             # estilo
             pygame.draw.rect(self.screen, (240,244,250), r, border_radius=12)
             pygame.draw.rect(self.screen, (185,200,220), r, 1, border_radius=12)
-            txt = nav_font.render(show, True, (50,70,90))
+            txt = render_text(nav_font, show, True, (50,70,90))
             self.screen.blit(txt, (r.centerx - txt.get_width()//2, r.centery - txt.get_height()//2))
             self.nav_rects.append((lb, r))
             x += w + gap
@@ -1338,7 +1419,7 @@ def draw_navbar(self):
         # Tente fontes menores até caber naturalmente
         fit = False
         for fs in (14, 13, 12):
-            nav_font = pygame.font.SysFont("Arial", fs)
+            nav_font = sys_font("Arial", fs)
             padd = 14  # padding horizontal total (reduzido)
             txt_w = [nav_font.size(t)[0] + padd for t in display]
             total = sum(txt_w) + gap*(n-1)
@@ -1349,7 +1430,7 @@ def draw_navbar(self):
 
         if not fit:
             # Escala proporcional para caber no espaço disponível
-            nav_font = pygame.font.SysFont("Arial", 12)
+            nav_font = sys_font("Arial", 12)
             padd = 12
             txt_w = [nav_font.size(t)[0] + padd for t in display]
             avail = max(200, W - margin_l - margin_r - gap*(n-1))
@@ -1377,7 +1458,7 @@ def draw_navbar(self):
             # estilo "pill"
             pygame.draw.rect(self.screen, (240,244,250), r, border_radius=12)
             pygame.draw.rect(self.screen, (185,200,220), r, 1, border_radius=12)
-            txt = nav_font.render(show, True, (50,70,90))
+            txt = render_text(nav_font, show, True, (50,70,90))
             self.screen.blit(txt, (r.centerx - txt.get_width()//2, r.centery - txt.get_height()//2))
             self.nav_rects.append((lb, r))
             x += w + gap
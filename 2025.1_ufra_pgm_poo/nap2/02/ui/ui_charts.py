@@ -1,6 +1,8 @@
 
 # ui_charts.py — Widgets de gráficos em Pygame (barras simples)
 import pygame
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.text_cache import render_text, sys_font
 
 def draw_bar_chart(surface, data, rect, title="Gráfico", value_key='value', label_key='label'):
     """
@@ -10,17 +12,17 @@ def draw_bar_chart(surface, data, rect, title="Gráfico", value_key='value', lab
     """
     if not pygame.get_init(): pygame.init()
     if not pygame.font.get_init(): pygame.font.init()
-    font_title = pygame.font.SysFont('Arial', 20, bold=True)
-    font_lbl = pygame.font.SysFont('Arial', 14)
+    font_title = sys_font('Arial', 20, bold=True)
+    font_lbl = sys_font('Arial', 14)
 
     x, y, w, h = rect
     pygame.draw.rect(surface, (250,250,252), rect, border_radius=10)
     pygame.draw.rect(surface, (220,220,230), rect, width=1, border_radius=10)
 
-    title_s = font_title.render(title, True, (40,40,60))
+    title_s = render_text(font_title, title, True, (40,40,60))
     surface.blit(title_s, (x + 12, y + 8))
     if not data:
-        nd = font_lbl.render("Sem dados", True, (120,120,130))
+        nd = render_text(font_lbl, "Sem dados", True, (120,120,130))
         surface.blit(nd, (x + w//2 - nd.get_width()//2, y + h//2 - nd.get_height()//2))
         return
 
@@ -44,8 +46,8 @@ def draw_bar_chart(surface, data, rect, title="Gráfico", value_key='value', lab
         by = gy + gh - bh
         pygame.draw.rect(surface, (100,150,200), (bx, by, bar_w, bh), border_radius=6)
         # valor acima
-        val_s = font_lbl.render(str(v), True, (50,50,60))
+        val_s = render_text(font_lbl, str(v), True, (50,50,60))
         surface.blit(val_s, (bx + bar_w//2 - val_s.get_width()//2, by - 16))
         # label embaixo
-        lbl_s = font_lbl.render(lbl, True, (50,50,60))
+        lbl_s = render_text(font_lbl, lbl, True, (50,50,60))
         surface.blit(lbl_s, (bx + bar_w//2 - lbl_s.get_width()//2, gy + gh + 2))
@@ -0,0 +1,46 @@
+# virtual_grid.py — grade virtualizada (prateleira)
+#
+# A posição de cada cartão é aritmética (linha = idx // cols, coluna = idx % cols),
+# então dá para descobrir quais índices estão visíveis e qual cartão está sob o
+# mouse sem percorrer a lista de itens: desenhar custa O(cartões visíveis) e o
+# clique custa O(1), com 50 mil itens ou 50.
+import pygame
+
+
+class VirtualGrid:
+    def __init__(self, cols, card_w, card_h, gap_x, gap_y, origin_x, origin_y, view_top, view_bottom):
+        self.cols = cols
+        self.card_w, self.card_h = card_w, card_h
+        self.pitch_x = card_w + gap_x
+        self.pitch_y = card_h + gap_y
+        self.origin_x, self.origin_y = origin_x, origin_y
+        self.view_top, self.view_bottom = view_top, view_bottom
+
+    def rect_for(self, idx, scroll=0):
+        row, col = divmod(idx, self.cols)
+        return pygame.Rect(self.origin_x + col * self.pitch_x,
+                           self.origin_y + scroll + row * self.pitch_y,
+                           self.card_w, self.card_h)
+
+    def visible_range(self, count, scroll=0):
+        """Índices dos cartões que encostam na faixa [view_top, view_bottom]."""
+        top = self.origin_y + scroll
+        # primeira linha com y + card_h >= view_top; última com y <= view_bottom
+        first_row = max(0, -((top + self.card_h - self.view_top) // self.pitch_y))
+        last_row = (self.view_bottom - top) // self.pitch_y
+        if last_row < first_row:
+            return range(0)
+        return range(min(first_row * self.cols, count), min((last_row + 1) * self.cols, count))
+
+    def index_at(self, pos, count, scroll=0):
+        """Índice do cartão sob pos, ou -1 (vãos entre cartões não contam)."""
+        dx = pos[0] - self.origin_x
+        dy = pos[1] - (self.origin_y + scroll)
+        if dx < 0 or dy < 0:
+            return -1
+        col, off_x = divmod(dx, self.pitch_x)
+        row, off_y = divmod(dy, self.pitch_y)
+        if col >= self.cols or off_x >= self.card_w or off_y >= self.card_h:
+            return -1
+        idx = row * self.cols + col
+        return idx if idx < count else -1
@@ -0,0 +1,302 @@
+# armazenamento.py — onde o GerenciadorBiblioteca guarda os dados
+#
+# Os dois formatos trabalham com os dicionários de serializar() (o mesmo
+# {"proximo_id", "itens", "usuarios", "transacoes"} do arquivo JSON); quem
+# monta os objetos é o gerenciador.
+#
+# - ArmazenamentoJSON: o grafo inteiro num arquivo. Ao abrir, só indexa o
+#   arquivo (biblio_comum/lazy_json.py) e o gerenciador monta as entidades sob demanda;
+#   ao salvar, regrava tudo (temporário + os.replace). Continua sendo o
+#   formato de exportação.
+# - ArmazenamentoSQLite: um banco sqlite3 em modo WAL. Cada entidade é uma
+#   linha (colunas usadas em consultas + o dicionário completo em "dados"),
+#   gravada assim que muda; o gerenciador busca as linhas sob demanda
+#   (MapaPreguicoso) e as listas por status usam o índice (status, id).
+#
+# Migração de uma vez entre os formatos (escolhidos pela extensão):
+#   python armazenamento.py dados_biblioteca.json dados_biblioteca.db
+#   python armazenamento.py dados_biblioteca.db exportado.json
+import abc
+import json
+import os
+import sqlite3
+import sys
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.lazy_json import JsonIndex
+
+EXTENSOES_SQLITE = (".db", ".sqlite", ".sqlite3")
+
+
+class Armazenamento(abc.ABC):
+    incremental = False  # True: grava cada entidade quando muda (não precisa regravar o grafo)
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+
+    @abc.abstractmethod
+    def ler(self) -> Dict: pass  # Grafo inteiro, no formato do arquivo JSON
+
+    @abc.abstractmethod
+    def escrever(self, dados: Dict): pass  # Substitui tudo pelo grafo dado
+
+    def fechar(self): pass
+
+
+class ArmazenamentoJSON(Armazenamento):
+    SECOES = ("itens", "usuarios", "transacoes")
+
+    def ler(self) -> Dict:
+        with open(self.caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def indexar(self) -> JsonIndex:
+        # Sem decodificar nada: o gerenciador monta cada entidade quando ela é pedida (LazyDict)
+        return JsonIndex(self.caminho, self.SECOES)
+
+    def escrever(self, dados: Dict):
+        # Grava num temporário e troca de uma vez: um índice aberto continua lendo o arquivo antigo
+        # (e uma falha no meio não deixa o arquivo pela metade)
+        temporario = self.caminho + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, indent=4, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+
+
+# Colunas consultadas de cada tabela (além de id e do JSON completo em "dados")
+_COLUNAS = {
+    "itens": ("tipo", "titulo", "status"),
+    "usuarios": ("tipo", "nome"),
+    "transacoes": ("tipo", "id_usuario", "id_item"),
+}
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS itens (id INTEGER PRIMARY KEY, tipo TEXT NOT NULL, titulo TEXT NOT NULL,
+                                  status TEXT NOT NULL, dados TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS itens_status ON itens (status, id);
+CREATE TABLE IF NOT EXISTS usuarios (id INTEGER PRIMARY KEY, tipo TEXT NOT NULL, nome TEXT NOT NULL,
+                                     dados TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS transacoes (id INTEGER PRIMARY KEY, tipo TEXT NOT NULL, id_usuario INTEGER NOT NULL,
+                                       id_item INTEGER NOT NULL, dados TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS transacoes_item ON transacoes (id_item);
+"""
+
+
+class ArmazenamentoSQLite(Armazenamento):
+    incremental = True
+
+    def __init__(self, caminho: str):
+        super().__init__(caminho)
+        # isolation_level=None: sem transações implícitas; lote() abre e fecha as nossas
+        self._conexao = sqlite3.connect(caminho, isolation_level=None, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")  # no WAL, seguro contra queda do programa
+        self._conexao.executescript(_ESQUEMA)
+        self._profundidade = 0  # lotes aninhados: só o mais externo faz COMMIT
+        # Uma conexão para todas as threads: cada comando (e cada lote inteiro) passa por esta trava
+        self._trava = threading.RLock()
+
+    def _sql(self, consulta: str, parametros=()) -> List[Tuple]:
+        with self._trava:
+            return self._conexao.execute(consulta, parametros).fetchall()
+
+    @contextmanager
+    def lote(self):
+        # Agrupa as gravações numa transação só (tudo ou nada); outras threads esperam o lote terminar
+        with self._trava:
+            if self._profundidade == 0:
+                self._conexao.execute("BEGIN")
+            self._profundidade += 1
+            try:
+                yield
+            except BaseException:
+                self._profundidade -= 1
+                if self._profundidade == 0:
+                    self._conexao.execute("ROLLBACK")
+                raise
+            self._profundidade -= 1
+            if self._profundidade == 0:
+                self._conexao.execute("COMMIT")
+
+    # ----- Leitura por entidade -----
+    def obter(self, tabela: str, id_: int) -> Optional[Dict]:
+        linhas = self._sql(f"SELECT dados FROM {tabela} WHERE id = ?", (id_,))
+        return json.loads(linhas[0][0]) if linhas else None
+
+    def obter_varios(self, tabela: str, ids: Iterable[int]) -> Iterator[Tuple[int, Dict]]:
+        # (id, dicionário) dos ids pedidos que existem, em blocos de até 500 por SELECT
+        ids = list(ids)
+        for inicio in range(0, len(ids), 500):
+            bloco = ids[inicio:inicio + 500]
+            marcas = ", ".join("?" * len(bloco))
+            for id_, dados in self._sql(f"SELECT id, dados FROM {tabela} WHERE id IN ({marcas})", bloco):
+                yield id_, json.loads(dados)
+
+    def existe(self, tabela: str, id_: int) -> bool:
+        return bool(self._sql(f"SELECT 1 FROM {tabela} WHERE id = ?", (id_,)))
+
+    def contar(self, tabela: str) -> int:
+        return self._sql(f"SELECT COUNT(*) FROM {tabela}")[0][0]
+
+    def ids(self, tabela: str) -> List[int]:
+        return [i for (i,) in self._sql(f"SELECT id FROM {tabela} ORDER BY id")]
+
+    def linhas(self, tabela: str, bloco: int = 1000) -> Iterator[Tuple[int, Dict]]:
+        # (id, dicionário) de todas as linhas, lidas em blocos (id > último lido) para não segurar a trava
+        ultimo = None
+        while True:
+            if ultimo is None:
+                linhas = self._sql(f"SELECT id, dados FROM {tabela} ORDER BY id LIMIT ?", (bloco,))
+            else:
+                linhas = self._sql(f"SELECT id, dados FROM {tabela} WHERE id > ? ORDER BY id LIMIT ?", (ultimo, bloco))
+            if not linhas: return
+            ultimo = linhas[-1][0]
+            for id_, dados in linhas:
+                yield id_, json.loads(dados)
+
+    def nomes(self, tabela: str) -> List[Tuple[str, int]]:
+        # (nome, id) para montar o índice de nomes sem construir as entidades
+        coluna = "titulo" if tabela == "itens" else "nome"
+        return self._sql(f"SELECT {coluna}, id FROM {tabela} ORDER BY id")
+
+    # ----- Consultas por status (índice itens_status) -----
+    def contar_status(self, status: str) -> int:
+        return self._sql("SELECT COUNT(*) FROM itens WHERE status = ?", (status,))[0][0]
+
+    def ids_por_status(self, status: str, limite: int = -1, deslocamento: int = 0, depois_de: int = 0) -> List[int]:
+        # depois_de: paginação por chave (id > depois_de), sem o custo do OFFSET
+        return [i for (i,) in self._sql(
+            "SELECT id FROM itens WHERE status = ? AND id > ? ORDER BY id LIMIT ? OFFSET ?",
+            (status, depois_de, limite, deslocamento))]
+
+    # ----- Gravação por entidade -----
+    def gravar(self, tabela: str, registros: Iterable[Dict]):
+        # Upsert de cada registro (dicionário de serializar())
+        colunas = ("id",) + _COLUNAS[tabela] + ("dados",)
+        sql = (f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))}) "
+               f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in colunas[1:])}")
+        with self.lote():
+            self._conexao.executemany(sql, (self._linha(tabela, r) for r in registros))
+
+    def remover(self, tabela: str, id_: int):
+        with self.lote():
+            self._conexao.execute(f"DELETE FROM {tabela} WHERE id = ?", (id_,))
+
+    def proximo_id(self) -> int:
+        linhas = self._sql("SELECT valor FROM meta WHERE chave = 'proximo_id'")
+        return int(linhas[0][0]) if linhas else 1
+
+    def definir_proximo_id(self, proximo_id: int):
+        self._sql("INSERT INTO meta (chave, valor) VALUES ('proximo_id', ?) "
+                              "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor", (str(proximo_id),))
+
+    @staticmethod
+    def _linha(tabela: str, registro: Dict) -> Tuple:
+        if tabela == "itens":
+            campos = (registro["tipo"], registro["titulo"], registro.get("status", "disponivel"))
+        else:
+            campos = tuple(registro[c] for c in _COLUNAS[tabela])
+        return (registro["id"],) + campos + (json.dumps(registro, ensure_ascii=False),)
+
+    # ----- Grafo inteiro (migração e exportação) -----
+    def ler(self) -> Dict:
+        dados = {"proximo_id": self.proximo_id()}
+        for tabela in _COLUNAS:
+            dados[tabela] = [registro for _, registro in self.linhas(tabela)]
+        return dados
+
+    def escrever(self, dados: Dict):
+        with self.lote():
+            for tabela in _COLUNAS:
+                self._conexao.execute(f"DELETE FROM {tabela}")
+                self.gravar(tabela, dados.get(tabela, []))
+            self.definir_proximo_id(dados.get("proximo_id", 1))
+
+    def checkpoint(self):
+        # Leva o WAL para o arquivo principal (ao fechar o programa, por exemplo)
+        self._sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def fechar(self):
+        with self._trava:
+            self.checkpoint()
+            self._conexao.close()
+
+
+class MapaPreguicoso(MutableMapping):
+    """{id: entidade} sobre uma tabela do ArmazenamentoSQLite: cada entidade é
+    lida (e montada por `construir`) só quando pedida e fica em cache. Gravar no
+    banco é com o gerenciador; aqui só se mexe no cache."""
+
+    def __init__(self, armazenamento: ArmazenamentoSQLite, tabela: str, construir: Callable[[Dict], object]):
+        self._armazenamento = armazenamento
+        self._tabela = tabela
+        self._construir = construir
+        self._cache: Dict[int, object] = {}
+
+    def __getitem__(self, id_):
+        entidade = self._cache.get(id_)
+        if entidade is None:
+            dados = self._armazenamento.obter(self._tabela, id_)
+            if dados is None:
+                raise KeyError(id_)
+            # setdefault: se outra thread montou a mesma entidade ao mesmo tempo, fica valendo uma só
+            entidade = self._cache.setdefault(id_, self._construir(dados))
+        return entidade
+
+    def __setitem__(self, id_, entidade):
+        self._cache[id_] = entidade
+
+    def __delitem__(self, id_):
+        if self._cache.pop(id_, None) is None and not self._armazenamento.existe(self._tabela, id_):
+            raise KeyError(id_)
+
+    def __contains__(self, id_) -> bool:
+        return id_ in self._cache or self._armazenamento.existe(self._tabela, id_)
+
+    def __iter__(self):
+        return iter(self._armazenamento.ids(self._tabela))
+
+    def __len__(self) -> int:
+        return self._armazenamento.contar(self._tabela)
+
+    def values(self):
+        # Uma varredura só (em vez de um SELECT por id), reaproveitando o que já está em cache
+        for id_, dados in self._armazenamento.linhas(self._tabela):
+            entidade = self._cache.get(id_)
+            if entidade is None:
+                entidade = self._cache.setdefault(id_, self._construir(dados))
+            yield entidade
+
+    def pre_carregar(self, ids: Iterable[int]):
+        # Traz de uma vez (poucos SELECTs) os ids que ainda não estão em cache
+        faltando = [i for i in set(ids) if i not in self._cache]
+        for id_, dados in self._armazenamento.obter_varios(self._tabela, faltando):
+            self._cache.setdefault(id_, self._construir(dados))
+
+    def esvaziar_cache(self):
+        self._cache.clear()
+
+
+def abrir(caminho: str) -> Armazenamento:
+    # Escolhe o formato pela extensão do arquivo
+    if os.path.splitext(caminho)[1].lower() in EXTENSOES_SQLITE:
+        return ArmazenamentoSQLite(caminho)
+    return ArmazenamentoJSON(caminho)
+
+
+def migrar(origem: Armazenamento, destino: Armazenamento):
+    # Copia o grafo inteiro de um formato para o outro (substitui o que houver no destino)
+    destino.escrever(origem.ler())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("uso: python armazenamento.py <origem.json|.db> <destino.json|.db>")
+    origem, destino = abrir(sys.argv[1]), abrir(sys.argv[2])
+    migrar(origem, destino)
+    origem.fechar(); destino.fechar()
+    print(f"{sys.argv[1]} -> {sys.argv[2]}")
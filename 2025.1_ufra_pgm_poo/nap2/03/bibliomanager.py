@@ -1,8 +1,18 @@
 import pygame  # Biblioteca para criar a interface gráfica
-import json  # Biblioteca para trabalhar com arquivos JSON (salvar/carregar dados)
+import os  # Para ler a variável de ambiente com o arquivo de dados
 import abc  # Biblioteca para classes abstratas (ABC)
+import threading  # Travas do modo concorrente (várias mesas de atendimento)
+from collections import Counter  # Para contar pedidos de empréstimo por usuário no lote
+from contextlib import contextmanager, nullcontext  # Lotes de gravação
 from datetime import datetime, timedelta  # Para trabalhar com datas e horas
-from typing import Dict, List, Optional  # Para tipagem de dados (melhor organização)
+from itertools import islice  # Para paginar as visões sem copiar
+from typing import Dict, Iterable, Iterator, List, Optional  # Para tipagem de dados (melhor organização)
+from indice_nomes import IndiceNomes  # Índice de nomes (busca exata e por prefixo, sem acento/caixa)
+from armazenamento import Armazenamento, ArmazenamentoJSON, MapaPreguicoso, abrir, migrar  # JSON ou SQLite
+import comum  # Põe biblio_comum (módulos compartilhados entre os apps) no sys.path
+from biblio_comum.locking import LockTable  # Uma trava por item/usuário, pegas sempre na mesma ordem
+from biblio_comum.compact import intern_status, pack_datetime, slots, unpack_datetime  # Entidades compactas (__slots__)
+from biblio_comum.lazy_json import LazyDict  # JSON grande: entidades montadas só quando pedidas
 
 # Inicialização do Pygame
 pygame.init()  # Inicializa todos os módulos do Pygame
@@ -15,6 +25,9 @@ AZUL, VERDE, VERMELHO = (0, 120, 255), (0, 200, 0), (255, 0, 0)  # Cores princip
 CINZA_ESCURO, AMARELO = (100, 100, 100), (255, 255, 0)  # Cores para detalhes
 VERMELHO_CLARO = (255, 100, 100)  # Vermelho mais claro para hover
 
+# Arquivo de dados: .json (grafo inteiro) ou .db/.sqlite (SQLite, gravação por entidade)
+ARQUIVO_DADOS = os.environ.get("BIBLIO_DADOS", "dados_biblioteca.json")
+
 # Configurações de tamanho da janela
 LARGURA, ALTURA = 1024, 768  # Dimensões da janela do programa
 
@@ -26,13 +39,18 @@ FONTE_TITULO = pygame.font.SysFont("Arial", 32, bold=True)  # Fonte grande para
 # Classe abstrata base para todas as entidades da biblioteca
 class EntidadeBiblioteca(abc.ABC):
     _proximo_id = 1  # Variável de classe para con  trolar IDs únicos
+    _trava_ids = threading.RLock()  # Duas threads criando entidades ao mesmo tempo não podem pegar o mesmo ID
+    # Atributos de cada instância em __slots__ (sem __dict__) no modo compacto; ver compact.py
+    __slots__ = slots("__id", "__nome", "__data_criacao", "_ao_renomear", root=True)
     
     def __init__(self, nome: str):
         # Atributos privados (encapsulamento)
-        self.__id = EntidadeBiblioteca._proximo_id  # ID único automático
-        EntidadeBiblioteca._proximo_id += 1  # Incrementa para próximo ID
+        with EntidadeBiblioteca._trava_ids:
+            self.__id = EntidadeBiblioteca._proximo_id  # ID único automático
+            EntidadeBiblioteca._proximo_id += 1  # Incrementa para próximo ID
         self.__nome = nome  # Nome da entidade
-        self.__data_criacao = datetime.now()  # Data/hora de criação
+        self.__data_criacao = pack_datetime(datetime.now())  # Data/hora de criação (int no modo compacto)
+        self._ao_renomear = None  # Callback (entidade, nome_antigo) definido pelo gerenciador para manter o índice de nomes
     
     # Properties para acesso controlado aos atributos privados
     @property
@@ -42,10 +60,12 @@ class EntidadeBiblioteca(abc.ABC):
     def nome(self) -> str: return self.__nome  # Getter para nome
     
     @nome.setter
-    def nome(self, valor: str): self.__nome = valor  # Setter para nome
+    def nome(self, valor: str):  # Setter para nome (avisa o gerenciador para atualizar o índice)
+        antigo, self.__nome = self.__nome, valor
+        if self._ao_renomear and antigo != valor: self._ao_renomear(self, antigo)
     
     @property
-    def data_criacao(self) -> datetime: return self.__data_criacao  # Getter para data
+    def data_criacao(self) -> datetime: return unpack_datetime(self.__data_criacao)  # Getter para data
     
     # Métodos abstratos que devem ser implementados pelas subclasses
     @abc.abstractmethod
@@ -66,21 +86,26 @@ class EntidadeBiblioteca(abc.ABC):
 
 # Classe abstrata para itens da biblioteca (herda de EntidadeBiblioteca)
 class Item(EntidadeBiblioteca, abc.ABC):
+    __slots__ = slots("__status", "_ao_mudar_status")
+    
     def __init__(self, nome: str, status: str = "disponivel"):
         super().__init__(nome)  # Chama construtor da classe pai
-        self.__status = status  # Status do item (disponivel, emprestado, reservado)
+        self.__status = intern_status(status)  # Status do item (disponivel, emprestado, reservado)
+        self._ao_mudar_status = None  # Callback (item, status_antigo) definido pelo gerenciador para manter as partições por status
     
     # Property para acesso controlado ao status
     @property
     def status(self) -> str: return self.__status
     
     @status.setter
-    def status(self, valor: str): self.__status = valor
+    def status(self, valor: str):  # Setter para status (avisa o gerenciador)
+        antigo, self.__status = self.__status, intern_status(valor)  # Mesmo objeto str para cada status
+        if self._ao_mudar_status and antigo != valor: self._ao_mudar_status(self, antigo)
     
     def atualizar_status(self, novo_status: str) -> bool:
         # Verifica se o novo status é válido antes de atualizar
         if novo_status not in ["disponivel", "emprestado", "reservado"]: return False
-        self.__status = novo_status
+        self.status = novo_status
         return True
     
     def validar(self) -> bool: return bool(self.nome)  # Validação básica
@@ -89,6 +114,8 @@ class Item(EntidadeBiblioteca, abc.ABC):
 
 # Classe concreta para livros (herda de Item)
 class Livro(Item):
+    __slots__ = slots("autor", "isbn", "ano")
+    
     def __init__(self, titulo: str, autor: str, isbn: str, ano: int):
         super().__init__(titulo)  # Chama construtor da classe pai (Item)
         self.autor = autor  # Autor do livro
@@ -113,6 +140,8 @@ class Livro(Item):
 
 # Classe concreta para revistas (herda de Item)
 class Revista(Item):
+    __slots__ = slots("edicao", "data")
+    
     def __init__(self, titulo: str, edicao: str, data: str):
         super().__init__(titulo)  # Chama construtor da classe pai (Item)
         self.edicao = edicao  # Edição da revista
@@ -135,6 +164,8 @@ class Revista(Item):
 
 # Classe concreta para DVDs (herda de Item)
 class DVD(Item):
+    __slots__ = slots("diretor", "duracao")
+    
     def __init__(self, titulo: str, diretor: str, duracao: int):
         super().__init__(titulo)  # Chama construtor da classe pai (Item)
         self.diretor = diretor  # Diretor do DVD
@@ -159,6 +190,8 @@ class DVD(Item):
 
 # Classe abstrata para usuários (herda de EntidadeBiblioteca)
 class Usuario(EntidadeBiblioteca, abc.ABC):
+    __slots__ = slots("email", "itens_emprestados")
+    
     def __init__(self, nome: str, email: str):
         super().__init__(nome)  # Chama construtor da classe pai
         self.email = email  # Email do usuário
@@ -194,6 +227,7 @@ class Usuario(EntidadeBiblioteca, abc.ABC):
 
 # Classe concreta para estudantes (herda de Usuario)
 class Estudante(Usuario):
+    __slots__ = slots("id_estudante")
     MAXIMO_ITENS = 3  # Limite máximo de itens que um estudante pode emprestar
     
     def __init__(self, nome: str, email: str, id_estudante: str):
@@ -220,6 +254,8 @@ class Estudante(Usuario):
 
 # Classe concreta para professores (herda de Usuario)
 class Professor(Usuario):
+    __slots__ = slots("departamento")
+    
     def __init__(self, nome: str, email: str, departamento: str):
         super().__init__(nome, email)  # Chama construtor da classe pai (Usuario)
         self.departamento = departamento  # Departamento do professor
@@ -243,6 +279,7 @@ class Professor(Usuario):
 
 # Classe concreta para visitantes (herda de Usuario)
 class Visitante(Usuario):
+    __slots__ = slots("telefone")
     MAXIMO_ITENS = 1  # Limite máximo de itens que um visitante pode emprestar
     
     def __init__(self, nome: str, email: str, telefone: str):
@@ -269,6 +306,8 @@ class Visitante(Usuario):
 
 # Classe abstrata para transações (herda de EntidadeBiblioteca)
 class Transacao(EntidadeBiblioteca, abc.ABC):
+    __slots__ = slots("id_usuario", "id_item", "__data_transacao")
+    
     def __init__(self, id_usuario: int, id_item: int):
         # Cria nome único para a transação baseado nos IDs
         super().__init__(f"Transacao_{id_usuario}_{id_item}")
@@ -276,6 +315,13 @@ class Transacao(EntidadeBiblioteca, abc.ABC):
         self.id_item = id_item  # ID do item envolvido
         self.data_transacao = datetime.now()  # Data/hora da transação
     
+    # Data guardada compacta (int no modo compacto), lida e atribuída como datetime
+    @property
+    def data_transacao(self) -> datetime: return unpack_datetime(self.__data_transacao)
+    
+    @data_transacao.setter
+    def data_transacao(self, valor: datetime): self.__data_transacao = pack_datetime(valor)
+    
     @abc.abstractmethod
     def processar(self, usuario: Usuario, item: Item) -> bool: pass  # Método abstrato
     
@@ -292,10 +338,18 @@ class Transacao(EntidadeBiblioteca, abc.ABC):
 
 # Classe concreta para empréstimos (herda de Transacao)
 class Emprestimo(Transacao):
+    __slots__ = slots("__data_vencimento")
+    
     def __init__(self, id_usuario: int, id_item: int):
         super().__init__(id_usuario, id_item)  # Chama construtor da classe pai
         self.data_vencimento = datetime.now() + timedelta(days=14)  # Data de vencimento (14 dias)
     
+    @property
+    def data_vencimento(self) -> datetime: return unpack_datetime(self.__data_vencimento)
+    
+    @data_vencimento.setter
+    def data_vencimento(self, valor: datetime): self.__data_vencimento = pack_datetime(valor)
+    
     def exibir_info(self) -> str:
         # Retorna string formatada com informações do empréstimo
         return f"Empréstimo: Usuário #{self.id_usuario} → Item #{self.id_item} | Vencimento: {self.data_vencimento.strftime('%d/%m/%Y')}"
@@ -313,6 +367,8 @@ class Emprestimo(Transacao):
 
 # Classe concreta para devoluções (herda de Transacao)
 class Devolucao(Transacao):
+    __slots__ = slots()
+    
     def exibir_info(self) -> str:
         # Retorna string formatada com informações da devolução
         return f"Devolução: Usuário #{self.id_usuario} → Item #{self.id_item}"
@@ -322,63 +378,256 @@ class Devolucao(Transacao):
         if item.status != "emprestado" or self.id_item not in usuario.itens_emprestados: return False
         return usuario.devolver_item(item.id) and item.atualizar_status("disponivel")
 
+# Visão (somente leitura) dos itens de um status: acompanha as mudanças sem copiar nada
+class VisaoItens:
+    def __init__(self, membros: Dict[int, None], itens: Dict[int, Item], instantaneo: bool = False):
+        self._membros = membros  # partição do gerenciador {id: None}, na ordem em que os itens entraram no status
+        self._itens = itens  # de onde vêm os objetos (num JSON carregado, só a página pedida é montada)
+        # instantaneo (modo concorrente): iterar percorre uma cópia feita de uma vez, sem travas, porque
+        # outras mesas podem mudar a partição no meio da iteração; quem foi removido depois da cópia fica de fora
+        self._instantaneo = instantaneo
+    
+    def __len__(self) -> int: return len(self._membros)
+    
+    def __bool__(self) -> bool: return bool(self._membros)
+    
+    def __iter__(self) -> Iterator[Item]:
+        if not self._instantaneo: return map(self._itens.__getitem__, self._membros)
+        return (item for item in map(self._itens.get, list(self._membros)) if item is not None)
+    
+    def __contains__(self, item) -> bool:
+        return isinstance(item, Item) and item.id in self._membros and self._itens.get(item.id) is item
+    
+    def pagina(self, numero: int, tamanho: int = 20) -> List[Item]:
+        # Itens da página `numero` (começando em 0); custa O(numero * tamanho + tamanho), sem copiar a partição
+        # (list(islice(...)) roda inteiro em C, então também é uma leitura instantânea)
+        inicio = numero * tamanho
+        ids = list(islice(self._membros, inicio, inicio + tamanho))
+        if not self._instantaneo: return [self._itens[i] for i in ids]
+        return [item for item in map(self._itens.get, ids) if item is not None]
+    
+    def paginas(self, tamanho: int = 20) -> Iterator[List[Item]]:
+        # Percorre todas as páginas de uma vez (O(total)); não altere o status dos itens no meio da iteração
+        membros = iter(self)
+        while True:
+            pagina = list(islice(membros, tamanho))
+            if not pagina: return
+            yield pagina
+
+# Mesma visão, mas com os itens no ArmazenamentoSQLite: usa o índice (status, id) do banco
+class VisaoItensSQL(VisaoItens):
+    def __init__(self, gerenciador: "GerenciadorBiblioteca", status: str):
+        self._gerenciador = gerenciador
+        self._status = status
+    
+    def __len__(self) -> int: return self._gerenciador.armazenamento.contar_status(self._status)
+    
+    def __bool__(self) -> bool: return bool(self.pagina(0, 1))
+    
+    def __iter__(self) -> Iterator[Item]:
+        for pagina in self.paginas(500): yield from pagina
+    
+    def __contains__(self, item) -> bool:
+        return isinstance(item, Item) and item.status == self._status and self._gerenciador.itens.get(item.id) is item
+    
+    def pagina(self, numero: int, tamanho: int = 20) -> List[Item]:
+        ids = self._gerenciador.armazenamento.ids_por_status(self._status, tamanho, numero * tamanho)
+        return [self._gerenciador.itens[i] for i in ids]
+    
+    def paginas(self, tamanho: int = 20) -> Iterator[List[Item]]:
+        # Paginação por chave (id > último id visto): cada página custa O(tamanho)
+        ultimo = 0
+        while True:
+            ids = self._gerenciador.armazenamento.ids_por_status(self._status, tamanho, depois_de=ultimo)
+            if not ids: return
+            ultimo = ids[-1]
+            yield [self._gerenciador.itens[i] for i in ids]
+
 # Classe principal que gerencia toda a biblioteca
 class GerenciadorBiblioteca:
-    def __init__(self):
-        # Dicionários para armazenar todas as entidades
-        self.itens: Dict[int, Item] = {}  # {id: Item}
-        self.usuarios: Dict[int, Usuario] = {}  # {id: Usuario}
-        self.transacoes: Dict[int, Transacao] = {}  # {id: Transacao}
+    _TIPOS_ITEM = ("Livro", "Revista", "DVD")  # Tipos que _criar_item sabe montar
+    _TIPOS_USUARIO = ("Estudante", "Professor", "Visitante")  # Tipos que _criar_usuario sabe montar
+    
+    def __init__(self, armazenamento: Optional[Armazenamento] = None, concorrente: bool = False):
+        # Onde os dados ficam; sem armazenamento, o arquivo JSON de sempre
+        self.armazenamento = armazenamento or ArmazenamentoJSON("dados_biblioteca.json")
+        self._incremental = self.armazenamento.incremental
+        
+        # Modo concorrente (várias mesas/threads no mesmo processo): empréstimo e devolução travam só o
+        # usuário e o item envolvidos; incluir/remover também trava o registro (sempre a última trava).
+        # As leituras não travam: obter_*/buscar_* leem o dicionário e as visões percorrem cópias.
+        self._travas = LockTable() if concorrente else None
+        self._registro = threading.RLock() if concorrente else nullcontext()
+        self._local = threading.local()  # _pendentes é de cada thread
+        
+        # Dicionários para armazenar todas as entidades (no SQLite, carregadas do banco sob demanda)
+        if self._incremental:
+            self.itens = MapaPreguicoso(self.armazenamento, "itens", self._montar_item)
+            self.usuarios = MapaPreguicoso(self.armazenamento, "usuarios", self._montar_usuario)
+            self.transacoes = MapaPreguicoso(self.armazenamento, "transacoes", self._criar_transacao)
+        else:
+            self.itens: Dict[int, Item] = {}  # {id: Item}
+            self.usuarios: Dict[int, Usuario] = {}  # {id: Usuario}
+            self.transacoes: Dict[int, Transacao] = {}  # {id: Transacao}
+        # Índices de nomes (sem acento/caixa) para a busca do balcão e as sugestões
+        self._nomes_itens = IndiceNomes()  # {nome: ids de itens}
+        self._nomes_usuarios = IndiceNomes()  # {nome: ids de usuários}
+        # Partições dos itens por status, atualizadas pelo callback de Item (no SQLite, o índice do banco)
+        self._por_status: Dict[str, Dict[int, None]] = {"disponivel": {}, "emprestado": {}, "reservado": {}}
+        # False depois de carregar um JSON: índices e partições esperam a primeira busca/visão (_indexar_*)
+        self._itens_indexados = self._usuarios_indexados = True
+        # Callbacks ligados uma vez só: self._metodo cria um objeto novo a cada acesso (um por entidade)
+        self._cb_renomear_item, self._cb_renomear_usuario = self._renomeado_item, self._renomeado_usuario
+        self._cb_status_item = self._status_mudou
+    
+    @property
+    def _pendentes(self):
+        # Durante _gravacao_adiada: {(tabela, id): entidade} a gravar no fim (só da thread atual)
+        return getattr(self._local, "pendentes", None)
+    
+    @_pendentes.setter
+    def _pendentes(self, valor): self._local.pendentes = valor
+    
+    def _segurar(self, *chaves):
+        # Trava as entidades dadas (("item", id), ("usuario", id)) no modo concorrente; fora dele, nada
+        return self._travas.hold(*chaves) if self._travas is not None else nullcontext()
+    
+    def _lote(self):
+        # Gravações de uma operação numa transação só do banco (no JSON, nada a fazer)
+        return self.armazenamento.lote() if self._incremental else nullcontext()
+    
+    def _persistir(self, tabela: str, entidade: EntidadeBiblioteca):
+        # Upsert da entidade no banco, junto com o contador de IDs
+        if self._pendentes is not None:
+            self._pendentes[(tabela, entidade.id)] = entidade
+        elif self._incremental:
+            with self.armazenamento.lote():
+                self.armazenamento.gravar(tabela, [entidade.serializar()])
+                self.armazenamento.definir_proximo_id(EntidadeBiblioteca._proximo_id)
+    
+    @contextmanager
+    def _gravacao_adiada(self):
+        # Junta os upserts do bloco (a última versão de cada entidade) e grava tudo de uma vez no fim,
+        # numa transação só do banco; se o bloco falhar, nada é gravado
+        if not self._incremental:
+            yield
+            return
+        self._pendentes = {}
+        try:
+            yield
+            with self.armazenamento.lote():
+                for tabela in ("itens", "usuarios", "transacoes"):
+                    registros = [e.serializar() for (t, _), e in self._pendentes.items() if t == tabela]
+                    if registros: self.armazenamento.gravar(tabela, registros)
+                self.armazenamento.definir_proximo_id(EntidadeBiblioteca._proximo_id)
+        finally:
+            self._pendentes = None
+    
+    def _status_mudou(self, item: Item, antigo: str):
+        if self._incremental:
+            self._persistir("itens", item)
+            return
+        if not self._itens_indexados:
+            # Partições ainda não montadas: vão sair do status atual. A trava espera uma montagem em andamento
+            with self._registro:
+                if not self._itens_indexados: return
+        self._por_status.get(antigo, {}).pop(item.id, None)
+        self._por_status.setdefault(item.status, {})[item.id] = None
+    
+    def _registrar_item(self, item: Item):
+        # Liga os callbacks do item aos índices deste gerenciador
+        if not self._incremental and self._itens_indexados:
+            self._por_status.setdefault(item.status, {})[item.id] = None
+        item._ao_renomear = self._cb_renomear_item
+        item._ao_mudar_status = self._cb_status_item
+    
+    def _renomeado_item(self, item: Item, antigo: str):
+        with self._registro:
+            if self._itens_indexados: self._nomes_itens.renomear(antigo, item.nome, item.id)
+        self._persistir("itens", item)
+    
+    def _renomeado_usuario(self, usuario: Usuario, antigo: str):
+        with self._registro:
+            if self._usuarios_indexados: self._nomes_usuarios.renomear(antigo, usuario.nome, usuario.id)
+        self._persistir("usuarios", usuario)
     
     def adicionar_item(self, item: Item) -> bool:
         # Adiciona item se for válido e não existir outro com mesmo ID
-        if item.validar() and item.id not in self.itens:
-            self.itens[item.id] = item
-            return True
+        with self._segurar(("item", item.id)), self._registro:
+            if item.validar() and item.id not in self.itens:
+                self.itens[item.id] = item
+                if self._itens_indexados: self._nomes_itens.adicionar(item.nome, item.id)
+                self._registrar_item(item)
+                self._persistir("itens", item)
+                return True
         return False
     
     def remover_item(self, id_item: int) -> bool:
         # Remove item se existir e estiver disponível
-        if id_item in self.itens and self.itens[id_item].status == "disponivel":
-            del self.itens[id_item]
-            return True
+        with self._segurar(("item", id_item)), self._registro:
+            if id_item in self.itens and self.itens[id_item].status == "disponivel":
+                item = self.itens.pop(id_item)
+                if self._itens_indexados:
+                    self._nomes_itens.remover(item.nome, id_item)
+                    self._por_status[item.status].pop(id_item, None)
+                item._ao_renomear = item._ao_mudar_status = None
+                if self._incremental: self.armazenamento.remover("itens", id_item)
+                return True
         return False
     
     def obter_item(self, id_item: int) -> Optional[Item]:
-        # Retorna item pelo ID ou None se não existir
+        # Retorna item pelo ID ou None se não existir (no SQLite, lê do banco na primeira vez)
         return self.itens.get(id_item)
     
     def buscar_item_por_nome(self, nome: str) -> Optional[Item]:
-        # Busca item pelo nome (case insensitive)
-        for item in self.itens.values():
-            if item.nome.lower() == nome.lower():
-                return item
-        return None
+        # Busca item pelo nome (sem diferença de caixa e acentos); com nomes repetidos, o mais antigo
+        self._indexar_itens()
+        id_item = self._nomes_itens.primeiro(nome)
+        return None if id_item is None else self.itens.get(id_item)
+    
+    def buscar_itens_por_prefixo(self, prefixo: str, limite: int = 10) -> List[Item]:
+        # Itens cujo nome começa com o prefixo, em ordem alfabética (sugestões do formulário)
+        self._indexar_itens()
+        with self._registro: ids = self._nomes_itens.buscar_prefixo(prefixo, limite)  # a busca reorganiza o índice
+        return [self.itens[i] for i in ids]
     
     def adicionar_usuario(self, usuario: Usuario) -> bool:
         # Adiciona usuário se for válido e não existir outro com mesmo ID
-        if usuario.validar() and usuario.id not in self.usuarios:
-            self.usuarios[usuario.id] = usuario
-            return True
+        with self._segurar(("usuario", usuario.id)), self._registro:
+            if usuario.validar() and usuario.id not in self.usuarios:
+                self.usuarios[usuario.id] = usuario
+                if self._usuarios_indexados: self._nomes_usuarios.adicionar(usuario.nome, usuario.id)
+                usuario._ao_renomear = self._cb_renomear_usuario
+                self._persistir("usuarios", usuario)
+                return True
         return False
     
     def remover_usuario(self, id_usuario: int) -> bool:
         # Remove usuário se existir e não tiver itens emprestados
-        if id_usuario in self.usuarios and not self.usuarios[id_usuario].itens_emprestados:
-            del self.usuarios[id_usuario]
-            return True
+        with self._segurar(("usuario", id_usuario)), self._registro:
+            if id_usuario in self.usuarios and not self.usuarios[id_usuario].itens_emprestados:
+                usuario = self.usuarios.pop(id_usuario)
+                if self._usuarios_indexados: self._nomes_usuarios.remover(usuario.nome, id_usuario)
+                usuario._ao_renomear = None
+                if self._incremental: self.armazenamento.remover("usuarios", id_usuario)
+                return True
         return False
     
     def obter_usuario(self, id_usuario: int) -> Optional[Usuario]:
-        # Retorna usuário pelo ID ou None se não existir
+        # Retorna usuário pelo ID ou None se não existir (no SQLite, lê do banco na primeira vez)
         return self.usuarios.get(id_usuario)
     
     def buscar_usuario_por_nome(self, nome: str) -> Optional[Usuario]:
-        # Busca usuário pelo nome (case insensitive)
-        for usuario in self.usuarios.values():
-            if usuario.nome.lower() == nome.lower():
-                return usuario
-        return None
+        # Busca usuário pelo nome (sem diferença de caixa e acentos); com nomes repetidos, o mais antigo
+        self._indexar_usuarios()
+        id_usuario = self._nomes_usuarios.primeiro(nome)
+        return None if id_usuario is None else self.usuarios.get(id_usuario)
+    
+    def buscar_usuarios_por_prefixo(self, prefixo: str, limite: int = 10) -> List[Usuario]:
+        # Usuários cujo nome começa com o prefixo, em ordem alfabética (sugestões do formulário)
+        self._indexar_usuarios()
+        with self._registro: ids = self._nomes_usuarios.buscar_prefixo(prefixo, limite)
+        return [self.usuarios[i] for i in ids]
     
     def processar_transacao(self, transacao: Transacao) -> bool:
         # Processa transação se todos os dados forem válidos
@@ -387,93 +636,243 @@ class GerenciadorBiblioteca:
         
         if not usuario or not item or not transacao.validar(): return False
         
-        if transacao.processar(usuario, item):
-            self.transacoes[transacao.id] = transacao
-            return True
+        # Trava usuário e item (modo concorrente) e, no SQLite, grava os três juntos (tudo ou nada)
+        with self._segurar(("usuario", usuario.id), ("item", item.id)), self._lote():
+            # Outra mesa pode ter removido o item/usuário enquanto esta esperava a trava
+            if self._travas is not None and (self.itens.get(item.id) is not item or self.usuarios.get(usuario.id) is not usuario):
+                return False
+            if transacao.processar(usuario, item):
+                self.transacoes[transacao.id] = transacao
+                self._persistir("itens", item)
+                self._persistir("usuarios", usuario)
+                self._persistir("transacoes", transacao)
+                return True
         return False
     
-    def obter_itens_disponiveis(self) -> List[Item]:
-        # Retorna lista de itens disponíveis para empréstimo
-        return [item for item in self.itens.values() if item.esta_disponivel()]
-    
-    def obter_itens_emprestados(self) -> List[Item]:
-        # Retorna lista de itens emprestados
-        return [item for item in self.itens.values() if item.status == "emprestado"]
-    
-    def salvar_dados(self, nome_arquivo: str = "dados_biblioteca.json") -> bool:
+    def processar_transacoes(self, transacoes: Iterable[Transacao]) -> List[bool]:
+        # Processa um lote de empréstimos/devoluções (ex.: início do semestre) com o mesmo resultado
+        # de chamar processar_transacao em ordem, mas: cada usuário/item é buscado uma vez, o limite
+        # de cada usuário é consultado uma vez e tudo é gravado numa transação só no fim.
+        # Devolve, na ordem de entrada, True/False para cada transação.
+        transacoes = list(transacoes)
+        
+        # 1) Busca em bloco (no SQLite, poucos SELECTs em vez de um por transação)
+        if self._incremental:
+            self.usuarios.pre_carregar(t.id_usuario for t in transacoes)
+            self.itens.pre_carregar(t.id_item for t in transacoes)
+        usuarios = {i: self.usuarios.get(i) for i in {t.id_usuario for t in transacoes}}
+        itens = {i: self.itens.get(i) for i in {t.id_item for t in transacoes}}
+        chaves = [("usuario", i) for i, u in usuarios.items() if u] + [("item", i) for i, it in itens.items() if it]
+        with self._segurar(*chaves):  # modo concorrente: todo o lote com as mesmas travas, na mesma ordem
+            return self._processar_lote(transacoes, usuarios, itens)
+    
+    def _processar_lote(self, transacoes: List[Transacao], usuarios: Dict[int, Optional[Usuario]],
+                        itens: Dict[int, Optional[Item]]) -> List[bool]:
+        resultado = [False] * len(transacoes)
+        
+        # 2) Quantos empréstimos novos cabem para cada usuário (pode_emprestar uma vez por usuário)
+        pedidos = Counter(t.id_usuario for t in transacoes if isinstance(t, Emprestimo))
+        capacidade = {i: self._capacidade(usuarios[i], n) for i, n in pedidos.items() if usuarios[i]}
+        
+        # 3) Simula o lote em ordem, sem alterar nada, para decidir quais transações passam
+        status = {}  # {id_item: status depois das transações anteriores do lote}
+        dono = {}  # {id_item: id do usuário que está com ele (None = devolvido)} no lote
+        emprestados = Counter()  # empréstimos líquidos (empréstimos - devoluções) por usuário no lote
+        aprovadas = []
+        for k, transacao in enumerate(transacoes):
+            usuario, item = usuarios[transacao.id_usuario], itens[transacao.id_item]
+            if not usuario or not item or not transacao.validar(): continue
+            status_item = status.get(item.id, item.status)
+            if isinstance(transacao, Emprestimo):
+                if status_item != "disponivel" or emprestados[usuario.id] >= capacidade[usuario.id]: continue
+                status[item.id], dono[item.id] = "emprestado", usuario.id
+                emprestados[usuario.id] += 1
+            elif isinstance(transacao, Devolucao):
+                com_usuario = dono[item.id] == usuario.id if item.id in dono else item.id in usuario.itens_emprestados
+                if status_item != "emprestado" or not com_usuario: continue
+                status[item.id], dono[item.id] = "disponivel", None
+                emprestados[usuario.id] -= 1
+            else: continue  # Outros tipos de transação: use processar_transacao
+            aprovadas.append(k)
+        
+        # 4) Aplica as aprovadas e grava tudo de uma vez
+        with self._gravacao_adiada():
+            for k in aprovadas:
+                transacao = transacoes[k]
+                usuario, item = usuarios[transacao.id_usuario], itens[transacao.id_item]
+                if transacao.processar(usuario, item):
+                    self.transacoes[transacao.id] = transacao
+                    self._persistir("itens", item)
+                    self._persistir("usuarios", usuario)
+                    self._persistir("transacoes", transacao)
+                    resultado[k] = True
+        return resultado
+    
+    @staticmethod
+    def _capacidade(usuario: Usuario, pedidos: int) -> int:
+        # Maior q <= pedidos com pode_emprestar(q) (o limite só cresce com a quantidade); busca binária
+        if usuario.pode_emprestar(pedidos): return pedidos
+        baixo, alto = 0, pedidos
+        while alto - baixo > 1:
+            meio = (baixo + alto) // 2
+            if usuario.pode_emprestar(meio): baixo = meio
+            else: alto = meio
+        return baixo
+    
+    def obter_itens_disponiveis(self) -> VisaoItens:
+        # Retorna visão dos itens disponíveis para empréstimo (itere ou use .pagina(); list() para copiar)
+        if self._incremental: return VisaoItensSQL(self, "disponivel")
+        self._indexar_itens()
+        return VisaoItens(self._por_status["disponivel"], self.itens, instantaneo=self._travas is not None)
+    
+    def obter_itens_emprestados(self) -> VisaoItens:
+        # Retorna visão dos itens emprestados
+        if self._incremental: return VisaoItensSQL(self, "emprestado")
+        self._indexar_itens()
+        return VisaoItens(self._por_status["emprestado"], self.itens, instantaneo=self._travas is not None)
+    
+    # Montagem das entidades a partir dos dicionários de serializar()
+    @staticmethod
+    def _reconstruir(classe, dados: Dict, *args) -> EntidadeBiblioteca:
+        # Cria a entidade com o ID salvo, sem consumir um ID novo do contador
+        with EntidadeBiblioteca._trava_ids:
+            proximo_id = EntidadeBiblioteca._proximo_id
+            entidade = classe(*args)
+            EntidadeBiblioteca._proximo_id = proximo_id
+        # Define ID manualmente (acesso direto ao atributo privado)
+        entidade._EntidadeBiblioteca__id = dados["id"]
+        return entidade
+    
+    def _criar_item(self, dados_item: Dict) -> Optional[Item]:
+        if dados_item["tipo"] == "Livro":
+            item = self._reconstruir(Livro, dados_item, dados_item["titulo"], dados_item["autor"], dados_item["isbn"], dados_item["ano"])
+        elif dados_item["tipo"] == "Revista":
+            item = self._reconstruir(Revista, dados_item, dados_item["titulo"], dados_item["edicao"], dados_item["data"])
+        elif dados_item["tipo"] == "DVD":
+            item = self._reconstruir(DVD, dados_item, dados_item["titulo"], dados_item["diretor"], dados_item["duracao"])
+        else: return None
+        item.status = dados_item.get("status", "disponivel")
+        return item
+    
+    def _criar_usuario(self, dados_usuario: Dict) -> Optional[Usuario]:
+        if dados_usuario["tipo"] == "Estudante":
+            usuario = self._reconstruir(Estudante, dados_usuario, dados_usuario["nome"], dados_usuario["email"], dados_usuario["id_estudante"])
+        elif dados_usuario["tipo"] == "Professor":
+            usuario = self._reconstruir(Professor, dados_usuario, dados_usuario["nome"], dados_usuario["email"], dados_usuario["departamento"])
+        elif dados_usuario["tipo"] == "Visitante":
+            usuario = self._reconstruir(Visitante, dados_usuario, dados_usuario["nome"], dados_usuario["email"], dados_usuario["telefone"])
+        else: return None
+        # Restaura itens emprestados
+        for id_item in dados_usuario.get("itens_emprestados", []): 
+            usuario.emprestar_item(id_item)
+        return usuario
+    
+    def _criar_transacao(self, dados_transacao: Dict) -> Optional[Transacao]:
+        if dados_transacao["tipo"] == "Emprestimo":
+            transacao = self._reconstruir(Emprestimo, dados_transacao, dados_transacao["id_usuario"], dados_transacao["id_item"])
+            transacao.data_vencimento = datetime.fromisoformat(dados_transacao["data_vencimento"])
+        elif dados_transacao["tipo"] == "Devolucao":
+            transacao = self._reconstruir(Devolucao, dados_transacao, dados_transacao["id_usuario"], dados_transacao["id_item"])
+        else: return None
+        transacao.data_transacao = datetime.fromisoformat(dados_transacao["data"])
+        return transacao
+    
+    def _montar_item(self, dados_item: Dict) -> Optional[Item]:
+        item = self._criar_item(dados_item)
+        if item: self._registrar_item(item)
+        return item
+    
+    def _montar_usuario(self, dados_usuario: Dict) -> Optional[Usuario]:
+        usuario = self._criar_usuario(dados_usuario)
+        if usuario: usuario._ao_renomear = self._cb_renomear_usuario
+        return usuario
+    
+    # Depois de carregar um JSON, os índices e partições de cada seção só são montados na primeira busca/visão
+    # que precisa deles: com os objetos já montados e, para o resto, só os campos usados, lidos do arquivo
+    # (LazyDict.entries(keys)) sem montar entidades
+    def _indexar_itens(self):
+        if self._itens_indexados: return
+        with self._registro:
+            if self._itens_indexados: return
+            nomes, status = [], {}
+            for id_item, item, dados in self.itens.entries(("tipo", "titulo", "status")):
+                if item is None:
+                    if dados.get("tipo") not in self._TIPOS_ITEM: continue
+                    nome, estado = dados["titulo"], intern_status(dados.get("status", "disponivel"))
+                else:
+                    nome, estado = item.nome, item.status
+                nomes.append((nome, id_item))
+                status.setdefault(estado, []).append(id_item)
+            self._nomes_itens.reconstruir(nomes)
+            for estado in set(self._por_status) | set(status):
+                self._por_status[estado] = dict.fromkeys(status.get(estado, ()))
+            self._itens_indexados = True
+    
+    def _indexar_usuarios(self):
+        if self._usuarios_indexados: return
+        with self._registro:
+            if self._usuarios_indexados: return
+            self._nomes_usuarios.reconstruir(
+                (dados["nome"], id_usuario) if usuario is None else (usuario.nome, id_usuario)
+                for id_usuario, usuario, dados in self.usuarios.entries(("tipo", "nome"))
+                if usuario is not None or dados.get("tipo") in self._TIPOS_USUARIO)
+            self._usuarios_indexados = True
+    
+    @staticmethod
+    def _registros(entidades) -> List[Dict]:
+        # Dicionários de serializar() para gravar; do LazyDict, os registros nunca lidos voltam como estavam
+        if isinstance(entidades, LazyDict): return entidades.records(lambda e: e.serializar())
+        # list(...) copia de uma vez: outras mesas podem mexer nos dicionários enquanto isso
+        return [e.serializar() for e in list(entidades.values())]
+    
+    def salvar_dados(self, nome_arquivo: Optional[str] = None) -> bool:
+        # JSON: grava o grafo inteiro (em nome_arquivo, se dado). SQLite: tudo já está no banco;
+        # só consolida o WAL, ou exporta para o JSON nome_arquivo
         try:
+            if self._incremental:
+                if nome_arquivo is None:
+                    self.armazenamento.checkpoint()
+                else:
+                    ArmazenamentoJSON(nome_arquivo).escrever(self.armazenamento.ler())
+                return True
+            
             # Prepara dados para serialização
             dados = {
                 "proximo_id": EntidadeBiblioteca._proximo_id,
-                "itens": [item.serializar() for item in self.itens.values()],
-                "usuarios": [usuario.serializar() for usuario in self.usuarios.values()],
-                "transacoes": [t.serializar() for t in self.transacoes.values()]
+                "itens": self._registros(self.itens),
+                "usuarios": self._registros(self.usuarios),
+                "transacoes": self._registros(self.transacoes)
             }
-            # Salva dados em arquivo JSON
-            with open(nome_arquivo, 'w', encoding='utf-8') as f:
-                json.dump(dados, f, indent=4, ensure_ascii=False)
+            (ArmazenamentoJSON(nome_arquivo) if nome_arquivo else self.armazenamento).escrever(dados)
             return True
         except:
             return False
     
-    def carregar_dados(self, nome_arquivo: str = "dados_biblioteca.json") -> bool:
+    def carregar_dados(self, nome_arquivo: Optional[str] = None) -> bool:
+        # JSON: indexa o arquivo (de nome_arquivo, se dado) e monta as entidades sob demanda. SQLite: só abre o banco (as entidades
+        # vêm sob demanda); com nome_arquivo, antes importa aquele JSON para o banco
         try:
-            # Carrega dados do arquivo JSON
-            with open(nome_arquivo, 'r', encoding='utf-8') as f:
-                dados = json.load(f)
-            
-            # Configura próximo ID
-            EntidadeBiblioteca.definir_proximo_id(dados.get("proximo_id", 1))
-            # Limpa dados atuais
-            self.itens.clear(); self.usuarios.clear(); self.transacoes.clear()
-            
-            # Carrega itens
-            for dados_item in dados.get("itens", []):
-                if dados_item["tipo"] == "Livro":
-                    item = Livro(dados_item["titulo"], dados_item["autor"], dados_item["isbn"], dados_item["ano"])
-                elif dados_item["tipo"] == "Revista":
-                    item = Revista(dados_item["titulo"], dados_item["edicao"], dados_item["data"])
-                elif dados_item["tipo"] == "DVD":
-                    item = DVD(dados_item["titulo"], dados_item["diretor"], dados_item["duracao"])
-                else: continue
-                
-                # Define ID manualmente (acesso direto ao atributo privado)
-                item._EntidadeBiblioteca__id = dados_item["id"]
-                item.status = dados_item.get("status", "disponivel")
-                self.itens[item.id] = item
-            
-            # Carrega usuários
-            for dados_usuario in dados.get("usuarios", []):
-                if dados_usuario["tipo"] == "Estudante":
-                    usuario = Estudante(dados_usuario["nome"], dados_usuario["email"], dados_usuario["id_estudante"])
-                elif dados_usuario["tipo"] == "Professor":
-                    usuario = Professor(dados_usuario["nome"], dados_usuario["email"], dados_usuario["departamento"])
-                elif dados_usuario["tipo"] == "Visitante":
-                    usuario = Visitante(dados_usuario["nome"], dados_usuario["email"], dados_usuario["telefone"])
-                else: continue
-                
-                # Define ID manualmente (acesso direto ao atributo privado)
-                usuario._EntidadeBiblioteca__id = dados_usuario["id"]
-                # Restaura itens emprestados
-                for id_item in dados_usuario.get("itens_emprestados", []): 
-                    usuario.emprestar_item(id_item)
-                self.usuarios[usuario.id] = usuario
-            
-            # Carrega transações
-            for dados_transacao in dados.get("transacoes", []):
-                if dados_transacao["tipo"] == "Emprestimo":
-                    transacao = Emprestimo(dados_transacao["id_usuario"], dados_transacao["id_item"])
-                    transacao._EntidadeBiblioteca__id = dados_transacao["id"]
-                    transacao.data_transacao = datetime.fromisoformat(dados_transacao["data"])
-                    transacao.data_vencimento = datetime.fromisoformat(dados_transacao["data_vencimento"])
-                elif dados_transacao["tipo"] == "Devolucao":
-                    transacao = Devolucao(dados_transacao["id_usuario"], dados_transacao["id_item"])
-                    transacao._EntidadeBiblioteca__id = dados_transacao["id"]
-                    transacao.data_transacao = datetime.fromisoformat(dados_transacao["data"])
-                else: continue
-                
-                self.transacoes[transacao.id] = transacao
+            if self._incremental:
+                if nome_arquivo is not None:
+                    migrar(ArmazenamentoJSON(nome_arquivo), self.armazenamento)
+                EntidadeBiblioteca.definir_proximo_id(self.armazenamento.proximo_id())
+                self.itens.esvaziar_cache(); self.usuarios.esvaziar_cache(); self.transacoes.esvaziar_cache()
+                # Os índices de nomes são montados só com (nome, id), sem criar as entidades
+                self._nomes_itens.reconstruir(self.armazenamento.nomes("itens"))
+                self._nomes_usuarios.reconstruir(self.armazenamento.nomes("usuarios"))
+                self._itens_indexados = self._usuarios_indexados = True
+                return True
             
+            # JSON: só indexa o arquivo (biblio_comum/lazy_json.py); cada entidade é montada na primeira vez que é pedida,
+            # e os índices de nomes e as partições por status na primeira busca/visão
+            indice = (ArmazenamentoJSON(nome_arquivo) if nome_arquivo else self.armazenamento).indexar()
+            EntidadeBiblioteca.definir_proximo_id(indice.scalar("proximo_id", 1))
+            with self._registro:
+                self.itens = LazyDict(indice, "itens", self._montar_item)
+                self.usuarios = LazyDict(indice, "usuarios", self._montar_usuario)
+                self.transacoes = LazyDict(indice, "transacoes", self._criar_transacao)
+                for membros in self._por_status.values(): membros.clear()
+                self._itens_indexados = self._usuarios_indexados = False
             return True
         except:
             return False
@@ -488,7 +887,7 @@ class AppBiblioManager:
         self.executando = True  # Controla loop principal
         
         # Instancia o gerenciador da biblioteca
-        self.biblioteca = GerenciadorBiblioteca()
+        self.biblioteca = GerenciadorBiblioteca(abrir(ARQUIVO_DADOS))
         self.tela_atual = "menu_principal"  # Estado inicial
         
         # Dicionários para controle de interface
@@ -571,6 +970,7 @@ class AppBiblioManager:
             self.renderizar()
             self.relogio.tick(60)
         self.biblioteca.salvar_dados()
+        self.biblioteca.armazenamento.fechar()
         pygame.quit()
     
     def processar_eventos(self):
@@ -762,15 +1162,8 @@ class AppBiblioManager:
                     self.tela_atual = "menu_principal"
             
             elif self.tela_atual == "emprestar_item":
-                # Buscar usuário e item por nome
-                usuario_encontrado = None
-                item_encontrado = None
-                
-                for usuario in self.biblioteca.usuarios.values():
-                    if usuario.nome.lower() == self.valores_entrada["nome_usuario"].lower():
-                        usuario_encontrado = usuario
-                        break
-                
+                # Buscar usuário e item por nome (pelos índices do gerenciador)
+                usuario_encontrado = self.biblioteca.buscar_usuario_por_nome(self.valores_entrada["nome_usuario"])
                 item_encontrado = self.biblioteca.buscar_item_por_nome(self.valores_entrada["nome_item"])
                 
                 if usuario_encontrado and item_encontrado:
@@ -795,15 +1188,8 @@ class AppBiblioManager:
                         self.cor_mensagem = VERMELHO
             
             elif self.tela_atual == "devolver_item":
-                # Buscar usuário e item por nome
-                usuario_encontrado = None
-                item_encontrado = None
-                
-                for usuario in self.biblioteca.usuarios.values():
-                    if usuario.nome.lower() == self.valores_entrada["nome_usuario"].lower():
-                        usuario_encontrado = usuario
-                        break
-                
+                # Buscar usuário e item por nome (pelos índices do gerenciador)
+                usuario_encontrado = self.biblioteca.buscar_usuario_por_nome(self.valores_entrada["nome_usuario"])
                 item_encontrado = self.biblioteca.buscar_item_por_nome(self.valores_entrada["nome_item"])
                 
                 if usuario_encontrado and item_encontrado:
@@ -905,7 +1291,16 @@ class AppBiblioManager:
             
             texto_valor = FONTE_MEDIA.render(self.valores_entrada[nome_campo], True, PRETO)
             self.tela.blit(texto_valor, (retangulo_campo.x + 5, retangulo_campo.y + 5))
-            
+
+            # Sugestões (busca por prefixo) logo abaixo do campo de nome ativo
+            valor = self.valores_entrada[nome_campo]
+            if self.campo_ativo == nome_campo and valor.strip() and nome_campo in ("nome_item", "nome_usuario"):
+                busca = self.biblioteca.buscar_itens_por_prefixo if nome_campo == "nome_item" else self.biblioteca.buscar_usuarios_por_prefixo
+                sugestoes = [e.nome for e in busca(valor, 3)]
+                if sugestoes:
+                    texto_sugestoes = FONTE_PEQUENA.render("Sugestões: " + " | ".join(sugestoes), True, CINZA_ESCURO)
+                    self.tela.blit(texto_sugestoes, (retangulo_campo.x, retangulo_campo.bottom + 2))
+
             y_offset += 50
         
         for botao in self.botoes_formulario:
@@ -0,0 +1,119 @@
+# Índice de nomes para a busca do balcão (itens e usuários)
+#
+# As chaves são "dobradas": sem diferença de maiúsculas/minúsculas nem de
+# acentos ("São Paulo", "sao paulo" e "SAO PAULO" viram a mesma chave).
+# - busca exata: dicionário chave -> ids (na ordem em que foram cadastrados)
+# - busca por prefixo (sugestões enquanto digita): lista ordenada de chaves +
+#   bisect, custa O(log n + resultados)
+# Chaves novas entram na lista ordenada só na próxima busca por prefixo (em
+# lote); chaves removidas ficam na lista até a próxima reconstrução e são
+# ignoradas porque não estão mais no dicionário.
+import bisect
+import unicodedata
+from itertools import islice
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+
+def dobrar(texto: str) -> str:
+    # Remove acentos (decomposição NFKD + descarte das marcas) e ignora caixa
+    if texto.isascii():  # caminho rápido: a maioria dos nomes não tem acento
+        return texto.strip().casefold()
+    decomposto = unicodedata.normalize("NFKD", texto.strip())
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+class IndiceNomes:
+    LOTE_INSERCAO = 64  # acima disso, reordena a lista inteira em vez de inserir uma a uma
+
+    def __init__(self):
+        self._ids: Dict[str, Dict[Hashable, None]] = {}  # {chave: {id: None}} (dict mantém a ordem)
+        self._ordenadas: List[str] = []  # chaves em ordem (pode ter chaves já removidas)
+        self._novas: set = set()  # chaves que ainda não entraram em _ordenadas
+        self._removidas = 0  # chaves mortas dentro de _ordenadas
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._ids.values())
+
+    def limpar(self):
+        self._ids.clear()
+        self._ordenadas = []
+        self._novas.clear()
+        self._removidas = 0
+
+    def reconstruir(self, pares: Iterable[Tuple[str, Hashable]]):
+        # Carga em lote (ex.: ao carregar o arquivo): uma ordenação só no final
+        self.limpar()
+        for nome, id_ in pares:
+            self._ids.setdefault(dobrar(nome), {})[id_] = None
+        self._ordenadas = sorted(self._ids)
+
+    def adicionar(self, nome: str, id_: Hashable):
+        chave = dobrar(nome)
+        ids = self._ids.get(chave)
+        if ids is None:
+            ids = self._ids[chave] = {}
+            if not self._na_lista(chave):
+                self._novas.add(chave)
+            else:
+                self._removidas -= 1  # a chave morta voltou a valer
+        ids[id_] = None
+
+    def remover(self, nome: str, id_: Hashable):
+        chave = dobrar(nome)
+        ids = self._ids.get(chave)
+        if ids is None or id_ not in ids:
+            return
+        del ids[id_]
+        if not ids:
+            del self._ids[chave]
+            if chave in self._novas:
+                self._novas.discard(chave)
+            else:
+                self._removidas += 1
+
+    def renomear(self, antigo: str, novo: str, id_: Hashable):
+        self.remover(antigo, id_)
+        self.adicionar(novo, id_)
+
+    def buscar(self, nome: str) -> List[Hashable]:
+        # Ids com exatamente esse nome (dobrado), do mais antigo para o mais novo
+        return list(self._ids.get(dobrar(nome), ()))
+
+    def primeiro(self, nome: str):
+        ids = self._ids.get(dobrar(nome))
+        primeiro = list(islice(ids, 1)) if ids else ()  # list(islice) roda inteiro em C: leitura sem trava
+        return primeiro[0] if primeiro else None
+
+    def buscar_prefixo(self, prefixo: str, limite: int = 10) -> List[Hashable]:
+        # Ids cujos nomes começam com o prefixo, em ordem alfabética (dobrada)
+        self._consolidar()
+        chave = dobrar(prefixo)
+        resultado = []
+        i = bisect.bisect_left(self._ordenadas, chave)
+        while i < len(self._ordenadas) and len(resultado) < limite:
+            atual = self._ordenadas[i]
+            if not atual.startswith(chave):
+                break
+            for id_ in self._ids.get(atual, ()):
+                resultado.append(id_)
+                if len(resultado) >= limite:
+                    break
+            i += 1
+        return resultado
+
+    def _na_lista(self, chave: str) -> bool:
+        i = bisect.bisect_left(self._ordenadas, chave)
+        return i < len(self._ordenadas) and self._ordenadas[i] == chave
+
+    def _consolidar(self):
+        # Leva as chaves novas para a lista ordenada e descarta as mortas quando acumulam
+        if self._removidas > len(self._ordenadas) // 2:
+            self._ordenadas = sorted(self._ids)
+        elif len(self._novas) > self.LOTE_INSERCAO:
+            self._ordenadas = sorted(self._ordenadas + list(self._novas))
+        else:
+            for chave in self._novas:
+                bisect.insort(self._ordenadas, chave)
+        self._novas.clear()
+        if len(self._ordenadas) == len(self._ids):
+            self._removidas = 0
@@ -1,21 +1,79 @@
 import pygame
 import json
 import abc
-import uuid
-from datetime import datetime
-from typing import Dict, List, Optional
+import sys
+from operator import attrgetter
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.async_writer import json_snapshot_writer, write_json_atomic
+from event_log import EventLog
+from biblio_comum.history import TransactionHistory
+from biblio_comum import ulid
+from biblio_comum.redraw import RedrawScheduler
 
 
 DATA_FILE = "bibliomanager.json"
+LOG_FILE = "bibliomanager.log"   # empréstimos/devoluções depois do último snapshot (NDJSON, event_log.py)
+SNAPSHOT_EVERY = 500             # eventos no log que disparam um snapshot novo (e encurtam o log)
+
+# -------------------------
+# Registro de tipos (desserialização)
+# -------------------------
+class TypeRegistry:
+    """Valor do campo de tipo ("type", "user_type") -> classe que monta o registro.
+
+    Cada classe se registra com @REGISTRO.register("Nome") e tem um classmethod
+    from_dict(d, created) que monta o objeto a partir do registro (chaves obrigatórias com
+    d["chave"], opcionais com d.get("chave", padrão)).
+    """
+
+    def __init__(self, key: str, default: Optional[str] = None):
+        self.key = key          # campo do registro que diz o tipo
+        self.default = default  # tipo usado quando o campo falta ou é desconhecido (None: descarta)
+        self._specs = {}
+
+    def register(self, *names: str):
+        def deco(cls):
+            for name in names:
+                self._specs[name] = cls.from_dict
+            return cls
+        return deco
+
+    def build_many(self, records: Iterable[dict]) -> list:
+        """Monta a lista inteira de uma vez (None para tipos desconhecidos), na ordem.
+
+        As entidades do lote compartilham o mesmo `created` (a hora da carga), em vez de um
+        datetime.now() por objeto.
+        """
+        specs, key, fallback = self._specs, self.key, self._specs.get(self.default)
+        created = datetime.now().isoformat()
+        out = []
+        append = out.append
+        for d in records:
+            build = specs.get(d.get(key), fallback)
+            append(None if build is None else build(d, created))
+        return out
+
+    def build(self, d: dict):
+        return self.build_many((d,))[0]
+
+
+ITEM_TYPES = TypeRegistry("type")
+USER_TYPES = TypeRegistry("user_type", default="visitor")
+TRANSACTION_TYPES = TypeRegistry("type", default="loan")
+
 
 # -------------------------
 # Abstrações e Entidades
 # -------------------------
 class LibraryEntity(abc.ABC):
-    def __init__(self, id: str, name: str):
+    def __init__(self, id: str, name: str, created: Optional[str] = None):
         self.__id = id
         self.__name = name
-        self.__created = datetime.now().isoformat()
+        self.__created = created or datetime.now().isoformat()
 
     @property
     def id(self) -> str:
@@ -53,8 +111,8 @@ class LibraryEntity(abc.ABC):
 
 
 class Item(LibraryEntity):
-    def __init__(self, id: str, name: str, status: str = "available"):
-        super().__init__(id, name)
+    def __init__(self, id: str, name: str, status: str = "available", created: Optional[str] = None):
+        super().__init__(id, name, created)
         self.__status = status
 
     @property
@@ -77,13 +135,20 @@ class Item(LibraryEntity):
         return {"id": self.id, "name": self.name, "status": self.status, "type": self.__class__.__name__}
 
 
+@ITEM_TYPES.register("Book")
 class Book(Item):
-    def __init__(self, id: str, name: str, author: str, isbn: str, year: str, status: str = "available"):
-        super().__init__(id, name, status)
+    def __init__(self, id: str, name: str, author: str, isbn: str, year: str, status: str = "available",
+                 created: Optional[str] = None):
+        super().__init__(id, name, status, created)
         self.__author = author
         self.__isbn = isbn
         self.__year = year
 
+    @classmethod
+    def from_dict(cls, d: dict, created: Optional[str] = None) -> "Book":
+        return cls(d["id"], d["name"], d.get("author", ""), d.get("isbn", ""), d.get("year", ""),
+                   d.get("status", "available"), created=created)
+
     def display_info(self) -> str:
         return f"Livro: {self.name} | Autor: {self.__author} | ISBN: {self.__isbn} | {self.status}"
 
@@ -92,16 +157,18 @@ class Book(Item):
         d.update({"author": self.__author, "isbn": self.__isbn, "year": self.__year})
         return d
 
-    @classmethod
-    def deserialize(cls, d: dict):
-        return cls(d["id"], d["name"], d.get("author", ""), d.get("isbn", ""), d.get("year", ""), d.get("status", "available"))
-
 
+@ITEM_TYPES.register("Magazine")
 class Magazine(Item):
-    def __init__(self, id: str, name: str, issue: str, status: str = "available"):
-        super().__init__(id, name, status)
+    def __init__(self, id: str, name: str, issue: str, status: str = "available",
+                 created: Optional[str] = None):
+        super().__init__(id, name, status, created)
         self.__issue = issue
 
+    @classmethod
+    def from_dict(cls, d: dict, created: Optional[str] = None) -> "Magazine":
+        return cls(d["id"], d["name"], d.get("issue", ""), d.get("status", "available"), created=created)
+
     def display_info(self) -> str:
         return f"Revista: {self.name} | Edição: {self.__issue} | {self.status}"
 
@@ -110,17 +177,20 @@ class Magazine(Item):
         d.update({"issue": self.__issue})
         return d
 
-    @classmethod
-    def deserialize(cls, d: dict):
-        return cls(d["id"], d["name"], d.get("issue", ""), d.get("status", "available"))
-
 
+@ITEM_TYPES.register("DVD")
 class DVD(Item):
-    def __init__(self, id: str, name: str, director: str, duration: str, status: str = "available"):
-        super().__init__(id, name, status)
+    def __init__(self, id: str, name: str, director: str, duration: str, status: str = "available",
+                 created: Optional[str] = None):
+        super().__init__(id, name, status, created)
         self.__director = director
         self.__duration = duration
 
+    @classmethod
+    def from_dict(cls, d: dict, created: Optional[str] = None) -> "DVD":
+        return cls(d["id"], d["name"], d.get("director", ""), d.get("duration", ""), d.get("status", "available"),
+                   created=created)
+
     def display_info(self) -> str:
         return f"DVD: {self.name} | Dir: {self.__director} | {self.__duration} min | {self.status}"
 
@@ -129,20 +199,22 @@ class DVD(Item):
         d.update({"director": self.__director, "duration": self.__duration})
         return d
 
-    @classmethod
-    def deserialize(cls, d: dict):
-        return cls(d["id"], d["name"], d.get("director", ""), d.get("duration", ""), d.get("status", "available"))
-
 
 # -------------------------
 # Usuários
 # -------------------------
 class User(LibraryEntity):
-    def __init__(self, id: str, name: str, email: str, user_type: str):
-        super().__init__(id, name)
+    def __init__(self, id: str, name: str, email: str, user_type: str, borrowed: Iterable[str] = (),
+                 created: Optional[str] = None):
+        super().__init__(id, name, created)
         self.__email = email
         self.__user_type = user_type
-        self.__borrowed: List[str] = []
+        self.__borrowed: List[str] = list(borrowed)
+
+    @classmethod
+    def from_dict(cls, d: dict, created: Optional[str] = None) -> "User":
+        # para as subclasses (Student, Professor, Visitor), que já fixam o user_type
+        return cls(d["id"], d["name"], d.get("email", ""), d.get("borrowed", ()), created=created)
 
     @property
     def email(self) -> str:
@@ -181,27 +253,31 @@ class User(LibraryEntity):
 
     def serialize(self) -> dict:
         return {"id": self.id, "name": self.name, "email": self.__email,
-                "user_type": self.__user_type, "borrowed": self.__borrowed}
+                "user_type": self.__user_type, "borrowed": list(self.__borrowed)}
 
 
+@USER_TYPES.register("student")
 class Student(User):
-    def __init__(self, id: str, name: str, email: str):
-        super().__init__(id, name, email, "student")
+    def __init__(self, id: str, name: str, email: str, borrowed: Iterable[str] = (), created: Optional[str] = None):
+        super().__init__(id, name, email, "student", borrowed, created)
 
 
+@USER_TYPES.register("professor")
 class Professor(User):
-    def __init__(self, id: str, name: str, email: str):
-        super().__init__(id, name, email, "professor")
+    def __init__(self, id: str, name: str, email: str, borrowed: Iterable[str] = (), created: Optional[str] = None):
+        super().__init__(id, name, email, "professor", borrowed, created)
 
 
+@USER_TYPES.register("visitor")
 class Visitor(User):
-    def __init__(self, id: str, name: str, email: str):
-        super().__init__(id, name, email, "visitor")
+    def __init__(self, id: str, name: str, email: str, borrowed: Iterable[str] = (), created: Optional[str] = None):
+        super().__init__(id, name, email, "visitor", borrowed, created)
 
 
 # -------------------------
 # Transactions
 # -------------------------
+@TRANSACTION_TYPES.register("loan", "return", "reservation")
 class Transaction:
     def __init__(self, tx_id: str, tx_type: str, user_id: str, item_id: str, when: Optional[str] = None):
         self.__id = tx_id
@@ -210,6 +286,10 @@ class Transaction:
         self.__item_id = item_id
         self.__when = when or datetime.now().isoformat()
 
+    @classmethod
+    def from_dict(cls, d: dict, created: Optional[str] = None) -> "Transaction":
+        return cls(d["id"], d["type"], d["user_id"], d["item_id"], d.get("when"))
+
     @property
     def id(self) -> str:
         return self.__id
@@ -233,9 +313,116 @@ class Transaction:
     def serialize(self) -> dict:
         return {"id": self.__id, "type": self.__type, "user_id": self.__user_id, "item_id": self.__item_id, "when": self.__when}
 
-    @classmethod
-    def deserialize(cls, d: dict):
-        return cls(d["id"], d["type"], d["user_id"], d["item_id"], d.get("when"))
+
+class TransactionStore:
+    """Transações em ordem de id, que é a ordem de criação (ids do ulid.py).
+
+    Os ids antigos (uuid4) não dizem a hora: para esses a chave é a hora de `when` na frente
+    do id. between(início, fim) acha o intervalo com duas buscas binárias nas chaves.
+    """
+
+    def __init__(self):
+        self._txs: List[Transaction] = []
+        self._keys: List[str] = []
+
+    @staticmethod
+    def sort_key(tx: Transaction) -> str:
+        if ulid.is_ulid(tx.id):
+            return tx.id
+        try:
+            return ulid.time_prefix(datetime.fromisoformat(tx.when)) + tx.id
+        except (TypeError, ValueError):
+            return "0" * 10 + tx.id
+
+    def append(self, tx: Transaction):
+        key = self.sort_key(tx)
+        if not self._keys or key >= self._keys[-1]:
+            # o caso comum: id novo é sempre o maior
+            self._keys.append(key)
+            self._txs.append(tx)
+        else:
+            i = bisect_right(self._keys, key)
+            self._keys.insert(i, key)
+            self._txs.insert(i, tx)
+
+    def extend(self, txs: Iterable[Transaction]):
+        pairs = [(self.sort_key(tx), tx) for tx in txs]
+        if pairs and self._keys and pairs[0][0] < self._keys[-1]:
+            pairs += zip(self._keys, self._txs)
+            self.clear()
+        if any(pairs[k][0] > pairs[k + 1][0] for k in range(len(pairs) - 1)):
+            pairs.sort(key=lambda p: p[0])   # só o arquivo antigo (uuid4 fora de ordem) passa por aqui
+        self._keys.extend(k for k, _ in pairs)
+        self._txs.extend(tx for _, tx in pairs)
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Transaction]:
+        """Transações com start <= data < end (None: sem limite), em ordem."""
+        lo = bisect_left(self._keys, ulid.time_prefix(start)) if start else 0
+        hi = bisect_left(self._keys, ulid.time_prefix(end)) if end else len(self._keys)
+        return self._txs[lo:hi]
+
+    def clear(self):
+        self._keys.clear()
+        self._txs.clear()
+
+    def __len__(self):
+        return len(self._txs)
+
+    def __iter__(self):
+        return iter(self._txs)
+
+    def __reversed__(self):
+        return reversed(self._txs)
+
+
+# -------------------------
+# Snapshot + log de eventos
+# -------------------------
+def apply_event(data: dict, rec: dict):
+    """Aplica um evento do log (Transaction.serialize() + seq) aos dicionários do snapshot."""
+    item = data["items"].get(rec["item_id"])
+    user = data["users"].get(rec["user_id"])
+    borrowed = user.setdefault("borrowed", []) if user else []
+    if rec["type"] == "loan":
+        if item:
+            item["status"] = "borrowed"
+        if user and rec["item_id"] not in borrowed:
+            borrowed.append(rec["item_id"])
+    elif rec["type"] == "return":
+        if item:
+            item["status"] = "available"
+        if rec["item_id"] in borrowed:
+            borrowed.remove(rec["item_id"])
+    data["transactions"].append({k: v for k, v in rec.items() if k != "seq"})
+
+
+def read_data(log: EventLog, data_file: str = DATA_FILE) -> dict:
+    """Último snapshot + os eventos do log que ele ainda não inclui, como dicionários."""
+    try:
+        with open(data_file, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+    data.setdefault("items", {})
+    data.setdefault("users", {})
+    data.setdefault("transactions", [])
+    for rec in log.replay(data.get("log_seq", 0)):
+        apply_event(data, rec)
+    data["log_seq"] = log.seq
+    return data
+
+
+def compact_data(data_file: str = DATA_FILE, log_file: str = LOG_FILE) -> int:
+    """Junta o log no snapshot e esvazia o log; devolve quantos eventos foram incorporados.
+
+    Para rodar com o app fechado: python BiblioManager.py --compact
+    """
+    log = EventLog(log_file)
+    data = read_data(log, data_file)
+    n = log.pending
+    write_json_atomic(data_file, data, ensure_ascii=False, indent=2)
+    log.compact(data["log_seq"])
+    return n
 
 
 # -------------------------
@@ -264,7 +451,9 @@ class BiblioManager:
 
         self.items: Dict[str, Item] = {}
         self.users: Dict[str, User] = {}
-        self.transactions: List[Transaction] = []
+        self.transactions = TransactionStore()
+        # histórico por usuário e por item (history.py): remontado no load, acrescentado a cada evento
+        self.history = TransactionHistory(attrgetter("user_id"), attrgetter("item_id"), attrgetter("tx_type"))
 
         self.form_data: Dict[str, str] = {}
         self.active_input: Optional[str] = None
@@ -273,52 +462,57 @@ class BiblioManager:
         self.selected_user: Optional[str] = None
         self.selected_item: Optional[str] = None
         self.report_filter: str = "all"  
+        self.report_days: Optional[int] = None   # período do relatório (últimos N dias; None: tudo)
+        self.report_scope: Optional[str] = None  # "user"/"item": só o histórico do selecionado em Empréstimos
 
+        # empréstimos e devoluções vão para o log (uma linha cada); o snapshot completo é periódico
+        self._log = EventLog(LOG_FILE)
         self.load()
+        # gravação em segundo plano: rajadas de save() viram uma escrita só; depois de cada snapshot
+        # gravado, o log perde os eventos que ele já inclui. O snapshot é montado na thread de
+        # gravação com self._log.lock, a trava que toda alteração de items/users/transações segura
+        self._writer = json_snapshot_writer(DATA_FILE, self._payload, after_write=self._trim_log,
+                                            lock=self._log.lock, ensure_ascii=False, indent=2)
 
     # -------------------------
     # Persistence
     # -------------------------
     def gen_id(self) -> str:
-        return str(uuid.uuid4())
-
-    def save(self):
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            payload = {
+        # ordenável pelo tempo (ulid.py): as transações ficam em ordem de id = ordem de data
+        return ulid.new_id()
+
+    def _payload(self) -> dict:
+        # com o lock do log (o writer segura): nenhum empréstimo entra entre ler o estado e ler o seq
+        with self._log.lock:
+            return {
+                "log_seq": self._log.seq,
                 "items": {k: v.serialize() for k, v in self.items.items()},
                 "users": {k: v.serialize() for k, v in self.users.items()},
                 "transactions": [t.serialize() for t in self.transactions]
             }
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+
+    def _trim_log(self, payload: dict):
+        self._log.compact(payload["log_seq"])
+
+    def save(self):
+        """Agenda um snapshot completo; devolve um Future (use .result() para esperar o disco)."""
+        return self._writer.mark_dirty()
+
+    def _log_event(self, tx: Transaction):
+        # chamado com self._log.lock: o evento entra no log junto com a mudança no estado
+        self._log.append(tx.serialize())
+        if self._log.pending >= SNAPSHOT_EVERY and not self._writer.pending:
+            self.save()
 
     def load(self):
-        try:
-            with open(DATA_FILE, encoding="utf-8") as f:
-                d = json.load(f)
-        except FileNotFoundError:
-            return
-        for k, v in d.get("items", {}).items():
-            t = v.get("type")
-            if t == "Book":
-                self.items[k] = Book.deserialize(v)
-            elif t == "Magazine":
-                self.items[k] = Magazine.deserialize(v)
-            elif t == "DVD":
-                self.items[k] = DVD.deserialize(v)
-        for k, v in d.get("users", {}).items():
-            typ = v.get("user_type", "visitor")
-            if typ == "student":
-                u = Student(v["id"], v["name"], v.get("email", ""))
-            elif typ == "professor":
-                u = Professor(v["id"], v["name"], v.get("email", ""))
-            else:
-                u = Visitor(v["id"], v["name"], v.get("email", ""))
-            # restore borrowed list privately
-            for bid in v.get("borrowed", []):
-                u._User__borrowed = v.get("borrowed", []) 
-            self.users[k] = u
-        for tx in d.get("transactions", []):
-            self.transactions.append(Transaction.deserialize(tx))
+        d = read_data(self._log)
+        # cada lista é montada de uma vez pelo registro de tipos (a lista de emprestados de cada
+        # usuário já vem no construtor)
+        items, users = d["items"], d["users"]
+        self.items.update((k, it) for k, it in zip(items, ITEM_TYPES.build_many(items.values())) if it is not None)
+        self.users.update(zip(users, USER_TYPES.build_many(users.values())))
+        self.transactions.extend(TRANSACTION_TYPES.build_many(d["transactions"]))
+        self.history.rebuild(self.transactions)
 
     # -------------------------
     # UI Helpers
@@ -410,7 +604,8 @@ class BiblioManager:
                 year = self.form_data.get("book_year", "").strip()
                 if name and author:
                     b = Book(self.gen_id(), name, author, isbn, year)
-                    self.items[b.id] = b
+                    with self._log.lock:   # o snapshot é montado em outra thread
+                        self.items[b.id] = b
                     self.save()
                     self.form_data.clear()
                 self.current = "items"
@@ -443,7 +638,8 @@ class BiblioManager:
                 issue = self.form_data.get("mag_issue", "").strip()
                 if name and issue:
                     m = Magazine(self.gen_id(), name, issue)
-                    self.items[m.id] = m
+                    with self._log.lock:   # o snapshot é montado em outra thread
+                        self.items[m.id] = m
                     self.save()
                     self.form_data.clear()
                 self.current = "items"
@@ -474,7 +670,8 @@ class BiblioManager:
                 duration = self.form_data.get("dvd_duration", "").strip()
                 if name and director:
                     d = DVD(self.gen_id(), name, director, duration)
-                    self.items[d.id] = d
+                    with self._log.lock:   # o snapshot é montado em outra thread
+                        self.items[d.id] = d
                     self.save()
                     self.form_data.clear()
                 self.current = "items"
@@ -549,7 +746,8 @@ class BiblioManager:
                         u.department = dept  # Armazena departamento
                     else:
                         u = Visitor(self.gen_id(), name, email)
-                    self.users[u.id] = u
+                    with self._log.lock:   # o snapshot é montado em outra thread
+                        self.users[u.id] = u
                     self.save()
                     self.form_data.clear()
                 self.current = "main"
@@ -643,8 +841,50 @@ class BiblioManager:
             elif res_btn.collidepoint((mx, my)):
                 self.report_filter = "reservation"
                 pygame.time.delay(120)
-        y = 160
-        for tx in reversed(self.transactions): 
+        # Período: as transações estão em ordem de data, então o período é uma busca binária
+        periods = [("Tudo", None), ("Hoje", 0), ("7 dias", 7), ("30 dias", 30)]
+        for k, (label, days) in enumerate(periods):
+            r = pygame.Rect(60 + k * 140, 150, 120, 34)
+            self.draw_button(r, label, self.LIGHT_GRAY if self.report_days == days else None)
+            if pygame.mouse.get_pressed()[0] and r.collidepoint((mx, my)):
+                self.report_days = days
+                pygame.time.delay(120)
+        # Histórico só do usuário/item selecionado: a lista dele no self.history, sem varrer tudo
+        scopes = [("Do usuário", "user"), ("Do item", "item")]
+        for k, (label, scope) in enumerate(scopes):
+            r = pygame.Rect(620 + k * 140, 150, 120, 34)
+            self.draw_button(r, label, self.LIGHT_GRAY if self.report_scope == scope else None)
+            if pygame.mouse.get_pressed()[0] and r.collidepoint((mx, my)):
+                self.report_scope = None if self.report_scope == scope else scope
+                pygame.time.delay(120)
+        start = None
+        if self.report_days is not None:
+            start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            start -= timedelta(days=self.report_days)
+        y = 200
+        u = self.users.get(self.selected_user) if self.report_scope == "user" else None
+        it = self.items.get(self.selected_item) if self.report_scope == "item" else None
+        if u:
+            txs = self.history.events(user=u.id)
+            self.draw_text(f"{u.name}: {self.history.loan_count(user=u.id)} empréstimo(s), "
+                           f"{len(u.borrowed)} em aberto", self.FONT_MED, 60, y)
+        elif it:
+            txs = self.history.events(item=it.id)
+            holder = self.users.get(self.history.current_borrower(it.id) or "")
+            self.draw_text(f"{it.name}: {self.history.loan_count(item=it.id)} empréstimo(s), "
+                           f"com: {holder.name if holder else '-'}", self.FONT_MED, 60, y)
+        elif self.report_scope:
+            txs = []
+            self.draw_text("Selecione o usuário/item na tela de Empréstimos", self.FONT_MED, 60, y)
+        else:
+            txs = self.transactions.between(start) if start else self.transactions
+            start = None
+        if self.report_scope:
+            y += 30
+        low = ulid.time_prefix(start) if start else None
+        for tx in reversed(txs):
+            if low and TransactionStore.sort_key(tx) < low:
+                break   # a lista está em ordem de data: daqui para trás é tudo mais antigo
             if self.report_filter != "all" and tx.tx_type != self.report_filter:
                 continue
             user = self.users.get(tx.user_id)
@@ -674,11 +914,13 @@ class BiblioManager:
         if not u.can_borrow():
             return
 
-        u._borrow_direct(it.id) 
-        it.update_status("borrowed")
-        tx = Transaction(self.gen_id(), "loan", u.id, it.id)
-        self.transactions.append(tx)
-        self.save()
+        with self._log.lock:
+            u._borrow_direct(it.id)
+            it.update_status("borrowed")
+            tx = Transaction(self.gen_id(), "loan", u.id, it.id)
+            self.transactions.append(tx)
+            self.history.add(tx)
+            self._log_event(tx)
 
     def do_return(self):
         if not self.selected_user or not self.selected_item:
@@ -689,11 +931,13 @@ class BiblioManager:
             return
         if it.id not in u.borrowed:
             return
-        u._return_direct(it.id)  
-        it.update_status("available")
-        tx = Transaction(self.gen_id(), "return", u.id, it.id)
-        self.transactions.append(tx)
-        self.save()
+        with self._log.lock:
+            u._return_direct(it.id)
+            it.update_status("available")
+            tx = Transaction(self.gen_id(), "return", u.id, it.id)
+            self.transactions.append(tx)
+            self.history.add(tx)
+            self._log_event(tx)
 
     # -------------------------
     # Auxiliar
@@ -708,10 +952,12 @@ class BiblioManager:
     # Loop principal
     # -------------------------
     def run(self):
-        clock = pygame.time.Clock()
+        # As telas tratam o clique durante o desenho (mouse.get_pressed), então
+        # enquanto o botão estiver pressionado o loop continua desenhando.
+        redraw = RedrawScheduler(fps=30)
         running = True
         while running:
-            for e in pygame.event.get():
+            for e in redraw.events(pygame.mouse.get_pressed()[0]):
                 if e.type == pygame.QUIT:
                     running = False
                 if e.type == pygame.KEYDOWN and self.active_input:
@@ -723,7 +969,10 @@ class BiblioManager:
                         self.input_text = ""
                     else:
                         self.input_text += e.unicode
+            if not redraw.begin_frame(pygame.mouse.get_pressed()[0]):
+                continue
 
+            current = self.current
             if self.current == "main":
                 self.draw_main()
             elif self.current == "items":
@@ -746,10 +995,18 @@ class BiblioManager:
                 running = False
 
             pygame.display.flip()
-            clock.tick(30)
+            redraw.end_frame()
+            if self.current != current:
+                redraw.invalidate()  # a tela mudou durante o desenho: mostra a nova
+        redraw.close()
         self.save()
+        self._writer.close()
+        self._log.close()
         pygame.quit()
 
 
 if __name__ == "__main__":
-    BiblioManager().run()
+    if "--compact" in sys.argv[1:]:
+        print(f"{compact_data()} eventos do log incorporados em {DATA_FILE}")
+    else:
+        BiblioManager().run()
@@ -0,0 +1,10 @@
+# comum.py — deixa o app importar os módulos compartilhados (biblio_comum/, na raiz do repositório)
+#
+# Importe antes de qualquer "from biblio_comum... import ...". A raiz entra no fim do
+# sys.path, então os módulos do próprio app continuam tendo prioridade.
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[2]
+if str(RAIZ) not in sys.path:
+    sys.path.append(str(RAIZ))
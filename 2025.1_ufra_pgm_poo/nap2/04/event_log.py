@@ -0,0 +1,89 @@
+# event_log.py — log de eventos em NDJSON (um JSON por linha), só de acréscimo
+#
+# Cada append() grava uma linha com o registro + "seq" (número crescente do
+# evento) e dá flush: o custo por evento é uma linha, não o arquivo inteiro.
+# Quem usa guarda, junto com o snapshot completo, o seq do último evento que o
+# snapshot já inclui; ao abrir, replay(seq) devolve só os eventos depois dele.
+#
+# compact(seq) descarta do arquivo os eventos que um snapshot gravado já cobre
+# (substitui o arquivo: temporário + os.replace). Se o programa cair entre o
+# snapshot e o compact, os eventos velhos continuam no log, mas o replay pula
+# pelo seq. Uma linha cortada no fim (queda no meio da gravação) é ignorada.
+#
+# `lock` (reentrante) serializa append/compact; quem monta o snapshot deve
+# segurá-lo enquanto lê o estado e o seq, para os dois ficarem coerentes.
+import json
+import os
+import threading
+
+
+class EventLog:
+    def __init__(self, path):
+        self.path = path
+        self.seq = 0        # seq do último evento (gravado no log ou já incluído no snapshot)
+        self.pending = 0    # eventos no arquivo (o que compact() ainda não descartou)
+        self.lock = threading.RLock()
+        self._file = None
+
+    def _read(self):
+        try:
+            f = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return []
+        records = []
+        with f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
+
+    def replay(self, after=0):
+        """Eventos do arquivo com seq > after, na ordem; os próximos append() continuam a numeração."""
+        with self.lock:
+            records = self._read()
+            self.pending = len(records)
+            self.seq = max([after, self.seq] + [r.get("seq", 0) for r in records])
+            return [r for r in records if r.get("seq", 0) > after]
+
+    def _open(self):
+        if self._file is None:
+            # se a última linha ficou cortada, começo numa linha nova (senão o próximo evento se perde junto)
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    broken = f.read(1) != b"\n"
+            except (FileNotFoundError, OSError):
+                broken = False
+            self._file = open(self.path, "a", encoding="utf-8")
+            if broken:
+                self._file.write("\n")
+        return self._file
+
+    def append(self, record):
+        """Grava o evento (dict) numa linha; devolve o seq dele."""
+        with self.lock:
+            self.seq += 1
+            f = self._open()
+            f.write(json.dumps(dict(record, seq=self.seq), ensure_ascii=False) + "\n")
+            f.flush()
+            self.pending += 1
+            return self.seq
+
+    def compact(self, upto):
+        """Descarta os eventos com seq <= upto (já estão num snapshot gravado)."""
+        with self.lock:
+            self.close()
+            keep = [r for r in self._read() if r.get("seq", 0) > upto]
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in keep)
+            os.replace(tmp, self.path)
+            self.pending = len(keep)
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -169,25 +169,65 @@ class Return(Transaction):
     def serialize(self): return {"type": "Return", "user_id": self._user.id, "item_id": self._item.id, "date": self._date.isoformat()}
     def update_status(self, new_status): self.status = new_status
 
+# --- Registro por id ---
+class Registry:
+    """Entidades por id, na ordem de cadastro.
+
+    Um dict por baixo: buscar e remover por id são O(1) e iterar não copia nada.
+    new_id() nunca repete um id, nem depois de remoções.
+    """
+    def __init__(self, first_id=1):
+        self._by_id = {}
+        self._next_id = first_id
+    def new_id(self):
+        entity_id = self._next_id
+        self._next_id += 1
+        return entity_id
+    def add(self, entity):
+        self._by_id[entity.id] = entity
+        if isinstance(entity.id, int) and entity.id >= self._next_id:
+            self._next_id = entity.id + 1   # id dado de fora: o próximo new_id() vem depois dele
+        return entity
+    def remove(self, entity_id): return self._by_id.pop(entity_id, None)
+    def get(self, entity_id): return self._by_id.get(entity_id)
+    def __contains__(self, entity_id): return entity_id in self._by_id
+    def __len__(self): return len(self._by_id)
+    def __iter__(self): return iter(self._by_id.values())
+
 # --- Dados da biblioteca ---
-items = []
-users = []
-loans = []
+items = Registry()
+users = Registry()
+loans = Registry()      # todos os empréstimos; o id também numera as devoluções
+open_loans = {}         # id do item -> empréstimo em aberto
 
 # --- Funções de CRUD ---
-def add_item(item): items.append(item)
-def remove_item(item_id): global items; items = [i for i in items if i.id != item_id]
-def add_user(user): users.append(user)
-def remove_user(user_id): global users; users = [u for u in users if u.id != user_id]
+def add_item(item): items.add(item)
+def remove_item(item_id):
+    items.remove(item_id)
+    # item emprestado que sai do acervo: o empréstimo deixa de estar em aberto (Devoluções, return_report)
+    loan = open_loans.pop(item_id, None)
+    if loan is not None:
+        loan._user.loans[:] = [l for l in loan._user.loans if l is not loan]
+def add_user(user): users.add(user)
+def remove_user(user_id):
+    user = users.remove(user_id)
+    # os itens que estavam com o usuário voltam a ficar disponíveis
+    for loan in (user.loans if user is not None else []):
+        if open_loans.get(loan._item.id) is loan:
+            del open_loans[loan._item.id]
+            loan._item.available = True
 def process_loan(user, item):
-    loan = Loan(len(loans)+1, user, item)
+    loan = Loan(loans.new_id(), user, item)
     if loan.process(user, item):
-        loans.append(loan)
+        loans.add(loan)
+        open_loans[item.id] = loan
         return True
     return False
 def process_return(user, item):
-    ret = Return(len(loans)+1, user, item)
-    if ret.process(user, item): return True
+    ret = Return(loans.new_id(), user, item)
+    if ret.process(user, item):
+        open_loans.pop(item.id, None)
+        return True
     return False
 
 # --- Interface Gráfica ---
@@ -329,7 +369,7 @@ def return_report(screen, font, start_y=100, scroll_y=0):
     y = start_y + scroll_y
     box_width = 900
     box_height = 40
-    for idx, ret in enumerate([l for l in loans if not l._item.available]):
+    for idx, ret in enumerate(open_loans.values()):
         user_id = ret._user.id
         item_id = ret._item.id
         info = f"Devolução: Usuário {user_id} ({ret._user.name}) -> Item {item_id} ({ret._item.name})"
@@ -352,9 +392,6 @@ def main():
     add_user(Professor(2, "Carlos"))
     add_user(Visitor(3, "João"))
 
-    next_item_id = 4
-    next_user_id = 4
-
     selected_user_idx = 0
     selected_item_idx = 0
 
@@ -446,12 +483,11 @@ def main():
                     tipo = user_boxes[1].get_text().lower()
                     if nome and tipo:
                         if tipo == "aluno":
-                            add_user(Student(next_user_id, nome))
+                            add_user(Student(users.new_id(), nome))
                         elif tipo == "professor":
-                            add_user(Professor(next_user_id, nome))
+                            add_user(Professor(users.new_id(), nome))
                         elif tipo == "visitante":
-                            add_user(Visitor(next_user_id, nome))
-                        next_user_id += 1
+                            add_user(Visitor(users.new_id(), nome))
                         user_boxes[0].text = ""
                         user_boxes[1].text = ""
             # Cadastro de item
@@ -465,16 +501,15 @@ def main():
                     autores = item_boxes[3].get_text().split(",") if item_boxes[3].get_text() else []
                     if nome and tipo:
                         if tipo == "livro":
-                            add_item(Book(next_item_id, nome, info, autores))
+                            add_item(Book(items.new_id(), nome, info, autores))
                         elif tipo == "revista":
-                            add_item(Magazine(next_item_id, nome, info))
+                            add_item(Magazine(items.new_id(), nome, info))
                         elif tipo == "dvd":
                             try:
                                 duracao = int(info)
                             except:
                                 duracao = 0
-                            add_item(DVD(next_item_id, nome, duracao))
-                        next_item_id += 1
+                            add_item(DVD(items.new_id(), nome, duracao))
                         for box in item_boxes:
                             box.text = ""
             # Remover usuário
@@ -505,8 +540,9 @@ def main():
                     try:
                         uid = int(loan_boxes[0].get_text())
                         iid = int(loan_boxes[1].get_text())
-                        user = next((u for u in users if u.id == uid), None)
-                        item = next((i for i in items if i.id == iid and i.available), None)
+                        user = users.get(uid)
+                        item = items.get(iid)
+                        item = item if item and item.available else None
                         if user and item:
                             if process_loan(user, item):
                                 print(f"Usuário {user.id} ({user.name}) emprestou o item {item.id} ({item.name})")
@@ -522,8 +558,9 @@ def main():
                     try:
                         uid = int(return_boxes[0].get_text())
                         iid = int(return_boxes[1].get_text())
-                        user = next((u for u in users if u.id == uid), None)
-                        item = next((i for i in items if i.id == iid and not i.available), None)
+                        user = users.get(uid)
+                        item = items.get(iid)
+                        item = item if item and not item.available else None
                         if user and item:
                             process_return(user, item)
                             print(f"Usuário {user.id} ({user.name}) devolveu o item {item.id} ({item.name})")
@@ -579,7 +616,7 @@ def main():
             draw_button(screen, "Digite o ID do usuário e do item disponível e pressione ENTER", 200, 120, 600, 50, GRAY, font)
             for box in loan_boxes:
                 box.draw(screen)
-            available_items = [item for item in items if item.available]
+            available_items = (item for item in items if item.available)
             user_list_left(screen, font, start_y=380, scroll_y=scroll_y_users)
             item_shelf_right(screen, font, available_items, start_y=380, scroll_y=scroll_y_items)
 
@@ -587,7 +624,7 @@ def main():
             draw_button(screen, "Digite o ID do usuário e do item emprestado e pressione ENTER", 200, 120, 600, 50, GRAY, font)
             for box in return_boxes:
                 box.draw(screen)
-            loaned_items = [item for item in items if not item.available]
+            loaned_items = (open_loan._item for open_loan in open_loans.values())
             user_list_left(screen, font, start_y=380, scroll_y=scroll_y_users)
             item_shelf_right(screen, font, loaned_items, start_y=380, scroll_y=scroll_y_items)
         elif state == "report":
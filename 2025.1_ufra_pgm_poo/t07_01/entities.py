@@ -11,12 +11,18 @@ Este módulo demonstra conceitos de POO:
 from abc import ABC, abstractmethod
 from datetime import datetime
 
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.compact import intern_status, pack_datetime, slots, unpack_datetime
+
 class LibraryEntity(ABC):
     """Classe base abstrata para todas as entidades da biblioteca."""
+    # __slots__ (sem __dict__ por instância) no modo compacto; ver compact.py
+    __slots__ = slots("__id", "__name", "__created_at", root=True)
+
     def __init__(self, id, name):
         self.__id = id
         self.__name = name
-        self.__created_at = datetime.now()
+        self.__created_at = pack_datetime(datetime.now())
 
     @property
     def id(self):
@@ -54,6 +60,8 @@ class LibraryEntity(ABC):
 
 class Item(LibraryEntity):
     """Representa um item emprestável (livro, revista, etc.)."""
+    __slots__ = slots("__status", "__category")
+
     def __init__(self, id, name, category):
         super().__init__(id, name)
         self.__status = "available"
@@ -67,7 +75,7 @@ class Item(LibraryEntity):
     def status(self, value):
         if value not in ["available", "borrowed"]:
             raise ValueError("Invalid status")
-        self.__status = value
+        self.__status = intern_status(value)
 
     def update_status(self, new_status):
         self.status = new_status
@@ -86,6 +94,8 @@ class Item(LibraryEntity):
 
 class Book(Item):
     """Livro com autor e ISBN."""
+    __slots__ = slots("__author", "__isbn")
+
     def __init__(self, id, name, author, isbn):
         super().__init__(id, name, "book")
         self.__author = author
@@ -101,6 +111,8 @@ class Book(Item):
 
 class Magazine(Item):
     """Revista com edição."""
+    __slots__ = slots("__edition")
+
     def __init__(self, id, name, edition):
         super().__init__(id, name, "magazine")
         self.__edition = edition
@@ -115,6 +127,8 @@ class Magazine(Item):
 
 class User(LibraryEntity):
     """Usuário da biblioteca (abstrato)."""
+    __slots__ = slots("__user_type", "__borrowed_items", "__status")
+
     def __init__(self, id, name, user_type):
         super().__init__(id, name)
         self.__user_type = user_type
@@ -130,7 +144,7 @@ class User(LibraryEntity):
         # Basic user status tracking; can be extended (e.g., suspended, banned)
         if not isinstance(new_status, str) or not new_status.strip():
             raise ValueError("Invalid status")
-        self.__status = new_status.strip()
+        self.__status = intern_status(new_status.strip())
 
     def borrow_item(self, item):
         if len(self.__borrowed_items) >= self._max_borrow_limit():
@@ -160,6 +174,8 @@ class User(LibraryEntity):
 
 class Student(User):
     """Aluno com limite de 3 itens."""
+    __slots__ = slots()
+
     def __init__(self, id, name):
         super().__init__(id, name, "student")
 
@@ -171,6 +187,8 @@ class Student(User):
 
 class Professor(User):
     """Professor com limite de 10 itens."""
+    __slots__ = slots()
+
     def __init__(self, id, name):
         super().__init__(id, name, "professor")
 
@@ -182,11 +200,13 @@ class Professor(User):
 
 class Transaction(LibraryEntity):
     """Transação abstrata entre um usuário e um item (empréstimo/devolução)."""
+    __slots__ = slots("__user", "__item", "__date", "__status")
+
     def __init__(self, id, user, item):
         super().__init__(id, f"Transaction {id}")
         self.__user = user
         self.__item = item
-        self.__date = datetime.now()
+        self.__date = pack_datetime(datetime.now())
         self.__status = "pending"
 
     @property
@@ -208,14 +228,14 @@ class Transaction(LibraryEntity):
     # Sem cálculo de multa/prazo: removido do sistema
 
     def update_status(self, new_status):
-        self.__status = new_status
+        self.__status = intern_status(new_status)
 
     def serialize(self):
         return {
             "id": self.id,
             "user_id": self.__user.id,
             "item_id": self.__item.id,
-            "date": self.__date.isoformat(),
+            "date": unpack_datetime(self.__date).isoformat(),
             "status": self.__status,
             "type": self.__class__.__name__
         }
@@ -226,6 +246,8 @@ class Transaction(LibraryEntity):
 
 class Loan(Transaction):
     """Empréstimo de item ao usuário."""
+    __slots__ = slots()
+
     def __init__(self, id, user, item):
         super().__init__(id, user, item)
 
@@ -241,6 +263,8 @@ class Loan(Transaction):
 
 class Return(Transaction):
     """Devolução de item por um usuário."""
+    __slots__ = slots()
+
     def __init__(self, id, user, item):
         super().__init__(id, user, item)
 
@@ -1,13 +1,16 @@
 import pygame
 from entities import Book, Magazine, Student, Professor, Loan, Return
-import random
+from utils import generate_id
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.text_cache import render_text
+from biblio_comum.redraw import RedrawScheduler
 
 class LibraryGUI:
     def __init__(self, library):
         self.library = library
         self.screen = pygame.display.set_mode((1024, 768))
         pygame.display.set_caption("BiblioManager")
-        self.clock = pygame.time.Clock()
+        self.redraw = RedrawScheduler(fps=30)  # redesenho por invalidação (redraw.py)
         # Fonts (fallbacks ensured by pygame)
         self.font = pygame.font.SysFont("Segoe UI", 22) or pygame.font.SysFont("Arial", 22)
         self.title_font = pygame.font.SysFont("Segoe UI Semibold", 36) or pygame.font.SysFont("Arial", 36)
@@ -39,7 +42,7 @@ class LibraryGUI:
 
     def draw_header(self, title):
         # Simplified: just draw the title text
-        title_surface = self.title_font.render(title, True, (0, 0, 0))
+        title_surface = render_text(self.title_font, title, True, (0, 0, 0))
         self.screen.blit(title_surface, (32, 20))
 
     def draw_button(self, rect, label, variant="primary", align_center_text=True):
@@ -53,7 +56,7 @@ class LibraryGUI:
         else:
             color = (148, 163, 184)
         pygame.draw.rect(self.screen, color, rect, border_radius=6)
-        text_surface = self.font.render(label, True, self.theme["text_on_primary"])
+        text_surface = render_text(self.font, label, True, self.theme["text_on_primary"])
         if align_center_text:
             text_pos = (rect.centerx - text_surface.get_width() // 2, rect.centery - text_surface.get_height() // 2)
         else:
@@ -66,19 +69,26 @@ class LibraryGUI:
     def run(self):
         running = True
         while running:
-            for event in pygame.event.get():
+            for event in self.redraw.events():
                 if event.type == pygame.QUIT:
                     self.library.save_data()
+                    self.library.close()
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     self.handle_click(event.pos)
                 elif event.type == pygame.KEYDOWN:
                     self.handle_key(event)
 
+            if not running or not self.redraw.begin_frame():
+                continue
             self.clear_background()
             self.draw()
             pygame.display.flip()
-            self.clock.tick(30)
+            self.redraw.end_frame()
+            if self.toast_message:
+                # redesenha quando o aviso expirar
+                self.redraw.wake_in(self.toast_until_ms - pygame.time.get_ticks() + 1)
+        self.redraw.close()
 
     def handle_click(self, pos):
         for button in self.buttons:
@@ -128,7 +138,7 @@ class LibraryGUI:
         if pygame.time.get_ticks() > self.toast_until_ms:
             self.toast_message = ""
             return
-        text_surface = self.font.render(self.toast_message, True, self.theme["text_on_primary"]) 
+        text_surface = render_text(self.font, self.toast_message, True, self.theme["text_on_primary"]) 
         padding_x, padding_y = 16, 10
         rect = pygame.Rect(0, 0, text_surface.get_width() + padding_x * 2, text_surface.get_height() + padding_y * 2)
         rect.centerx = 1024 // 2
@@ -143,7 +153,7 @@ class LibraryGUI:
             ("Users", lambda: setattr(self, "state", "users"), "primary"),
             ("Transactions", lambda: setattr(self, "state", "transactions"), "primary"),
             ("Report", lambda: setattr(self, "state", "report"), "primary"),
-            ("Exit", lambda: self.library.save_data() or pygame.quit(), "danger")
+            ("Exit", lambda: (self.library.save_data(), self.library.close(), pygame.quit()), "danger")
         ]
         for i, (text, action, variant) in enumerate(buttons):
             rect = pygame.Rect(312, 140 + i * 90, 400, 64)
@@ -159,7 +169,7 @@ class LibraryGUI:
         for i, item in enumerate(self.library.get_items()):
             # Cada item ocupa dois "rows": 1) texto, 2) botões à direita
             base_y = 170 + i * 60
-            text_surface = self.font.render(item.display_info(), True, self.theme["text_primary"])
+            text_surface = render_text(self.font, item.display_info(), True, self.theme["text_primary"])
             self.screen.blit(text_surface, (50, base_y))
             # Linha de botões (abaixo do texto), alinhados à direita
             btn_y = base_y + 24
@@ -214,7 +224,7 @@ class LibraryGUI:
         for i, user in enumerate(self.library.get_users()):
             # Dois "rows" por usuário: 1) texto, 2) botões à direita
             base_y = 170 + i * 60
-            text_surface = self.font.render(user.display_info(), True, self.theme["text_primary"])
+            text_surface = render_text(self.font, user.display_info(), True, self.theme["text_primary"])
             self.screen.blit(text_surface, (50, base_y))
             btn_y = base_y + 24
             btn_w = 120
@@ -257,12 +267,12 @@ class LibraryGUI:
         self.draw_header("Edit Item")
         self.draw_back_button()
         hint = "Edit and save (Book: Name, Author, ISBN) or (Magazine: Name, Edition):"
-        hint_surface = self.font.render(hint, True, self.theme["muted"]) 
+        hint_surface = render_text(self.font, hint, True, self.theme["muted"]) 
         self.screen.blit(hint_surface, (50, 100))
         input_rect = pygame.Rect(50, 150, 700, 44)
         pygame.draw.rect(self.screen, self.theme["input_bg"], input_rect, border_radius=8)
         pygame.draw.rect(self.screen, self.theme["input_border"], input_rect, width=2, border_radius=8)
-        text_surface = self.font.render(self.input_text, True, self.theme["text_primary"]) 
+        text_surface = render_text(self.font, self.input_text, True, self.theme["text_primary"]) 
         self.screen.blit(text_surface, (input_rect.x + 12, input_rect.y + 10))
         save_rect = pygame.Rect(770, 150, 180, 44)
         self.draw_button(save_rect, "Save Changes", "primary")
@@ -272,14 +282,14 @@ class LibraryGUI:
         self.draw_header("Add Item")
         self.draw_back_button()
         hint = "Enter Item (e.g., 'Book: Name, Author, ISBN' or 'Magazine: Name, Edition'):"
-        hint_surface = self.font.render(hint, True, self.theme["muted"]) 
+        hint_surface = render_text(self.font, hint, True, self.theme["muted"]) 
         self.screen.blit(hint_surface, (50, 100))
         input_rect = pygame.Rect(50, 150, 700, 44)
         # input background and border
         pygame.draw.rect(self.screen, self.theme["input_bg"], input_rect, border_radius=8)
         border_color = self.theme["input_border"]
         pygame.draw.rect(self.screen, border_color, input_rect, width=2, border_radius=8)
-        text_surface = self.font.render(self.input_text, True, self.theme["text_primary"]) 
+        text_surface = render_text(self.font, self.input_text, True, self.theme["text_primary"]) 
         self.screen.blit(text_surface, (input_rect.x + 12, input_rect.y + 10))
         # Save button
         save_rect = pygame.Rect(770, 150, 180, 44)
@@ -290,12 +300,12 @@ class LibraryGUI:
         self.draw_header("Add User")
         self.draw_back_button()
         hint = "Enter User (e.g., 'Student: Name' or 'Professor: Name'):"
-        hint_surface = self.font.render(hint, True, self.theme["muted"]) 
+        hint_surface = render_text(self.font, hint, True, self.theme["muted"]) 
         self.screen.blit(hint_surface, (50, 100))
         input_rect = pygame.Rect(50, 150, 700, 44)
         pygame.draw.rect(self.screen, self.theme["input_bg"], input_rect, border_radius=8)
         pygame.draw.rect(self.screen, self.theme["input_border"], input_rect, width=2, border_radius=8)
-        text_surface = self.font.render(self.input_text, True, self.theme["text_primary"]) 
+        text_surface = render_text(self.font, self.input_text, True, self.theme["text_primary"]) 
         self.screen.blit(text_surface, (input_rect.x + 12, input_rect.y + 10))
         # Save button
         save_rect = pygame.Rect(770, 150, 180, 44)
@@ -306,12 +316,12 @@ class LibraryGUI:
         self.draw_header("Edit User")
         self.draw_back_button()
         hint = "Edit and save (Student: Name) or (Professor: Name):"
-        hint_surface = self.font.render(hint, True, self.theme["muted"]) 
+        hint_surface = render_text(self.font, hint, True, self.theme["muted"]) 
         self.screen.blit(hint_surface, (50, 100))
         input_rect = pygame.Rect(50, 150, 700, 44)
         pygame.draw.rect(self.screen, self.theme["input_bg"], input_rect, border_radius=8)
         pygame.draw.rect(self.screen, self.theme["input_border"], input_rect, width=2, border_radius=8)
-        text_surface = self.font.render(self.input_text, True, self.theme["text_primary"]) 
+        text_surface = render_text(self.font, self.input_text, True, self.theme["text_primary"]) 
         self.screen.blit(text_surface, (input_rect.x + 12, input_rect.y + 10))
         save_rect = pygame.Rect(770, 150, 180, 44)
         self.draw_button(save_rect, "Save Changes", "primary")
@@ -378,7 +388,7 @@ class LibraryGUI:
         self.draw_header("Transactions")
         self.draw_back_button()
         # Titles
-        title_user = self.font.render("Select User", True, self.theme["muted"]) 
+        title_user = render_text(self.font, "Select User", True, self.theme["muted"]) 
         self.screen.blit(title_user, (50, 90))
 
         # Users list (stacked)
@@ -390,7 +400,7 @@ class LibraryGUI:
             y = start_y + i * 34
             btn = pygame.Rect(50, y - 4, 120, 28)
             self.draw_button(btn, "Select", "primary")
-            info = self.font.render(u.display_info(), True, self.theme["text_primary"]) 
+            info = render_text(self.font, u.display_info(), True, self.theme["text_primary"]) 
             self.screen.blit(info, (50 + 120 + 16, y))
             def make_sel_user(u_):
                 def _act():
@@ -402,7 +412,7 @@ class LibraryGUI:
 
         # Items title below users
         items_title_y = start_y + user_rows * 34 + 20
-        title_item = self.font.render("Select Item (available)", True, self.theme["muted"]) 
+        title_item = render_text(self.font, "Select Item (available)", True, self.theme["muted"]) 
         self.screen.blit(title_item, (50, items_title_y))
 
         # Items list (available only, stacked)
@@ -414,7 +424,7 @@ class LibraryGUI:
             y = items_start_y + i * 34
             btn = pygame.Rect(50, y - 4, 120, 28)
             self.draw_button(btn, "Select", "primary")
-            info = self.font.render(it.display_info(), True, self.theme["text_primary"]) 
+            info = render_text(self.font, it.display_info(), True, self.theme["text_primary"]) 
             self.screen.blit(info, (50 + 120 + 16, y))
             def make_sel_item(it_):
                 def _act():
@@ -427,7 +437,7 @@ class LibraryGUI:
         # Current selection summary below items
         summary_y = items_start_y + item_rows * 34 + 20
         sel_summary = f"User: {self.selected_user.name if self.selected_user else '-'} | Item: {self.selected_item.name if self.selected_item else '-'}"
-        sel_surface = self.font.render(sel_summary, True, self.theme["text_primary"]) 
+        sel_surface = render_text(self.font, sel_summary, True, self.theme["text_primary"]) 
         self.screen.blit(sel_surface, (50, summary_y))
         if self.selected_user and self.selected_item:
             button = pygame.Rect(50, summary_y + 32, 240, 44)
@@ -439,7 +449,7 @@ class LibraryGUI:
 
         # Open loans section below summary
         open_title_y = summary_y + 90
-        open_title = self.font.render("Open Loans", True, self.theme["muted"]) 
+        open_title = render_text(self.font, "Open Loans", True, self.theme["muted"]) 
         self.screen.blit(open_title, (50, open_title_y))
         row = 0
         for u in users:
@@ -448,7 +458,7 @@ class LibraryGUI:
                 if y > 740:
                     break
                 text = f"{u.name} — {it.name}"
-                t_surf = self.font.render(text, True, self.theme["text_primary"]) 
+                t_surf = render_text(self.font, text, True, self.theme["text_primary"]) 
                 self.screen.blit(t_surf, (50, y))
                 btn = pygame.Rect(420, y - 4, 180, 24)
                 self.draw_button(btn, "Finalize", "primary")
@@ -464,7 +474,7 @@ class LibraryGUI:
         self.draw_back_button()
         report = self.library.generate_report().split("\n")
         for i, line in enumerate(report):
-            text_surface = self.font.render(line, True, self.theme["text_primary"]) 
+            text_surface = render_text(self.font, line, True, self.theme["text_primary"]) 
             self.screen.blit(text_surface, (50, 120 + i * 30))
 
     def draw_back_button(self):
@@ -490,7 +500,7 @@ class LibraryGUI:
                 type_ = "magazine"
 
             details = [d.strip() for d in details_str.split(",")]
-            item_id = f"item_{random.randint(1000, 9999)}"
+            item_id = generate_id("item")
             created = False
             if type_ == "book" and len(details) == 3:
                 self.library.add_item(Book(item_id, details[0], details[1], details[2]))
@@ -527,7 +537,7 @@ class LibraryGUI:
             if type_ in ("professor",):
                 type_ = "professor"
 
-            user_id = f"user_{random.randint(1000, 9999)}"
+            user_id = generate_id("user")
             if type_ == "student" and name:
                 self.library.add_user(Student(user_id, name))
             elif type_ == "professor" and name:
@@ -547,7 +557,7 @@ class LibraryGUI:
 
     def process_loan(self):
         try:
-            transaction_id = f"loan_{random.randint(1000, 9999)}"
+            transaction_id = generate_id("loan")
             transaction = Loan(transaction_id, self.selected_user, self.selected_item)
             self.library.process_transaction(transaction)
             self.library.save_data()
@@ -560,7 +570,7 @@ class LibraryGUI:
 
     def process_return(self):
         try:
-            transaction_id = f"return_{random.randint(1000, 9999)}"
+            transaction_id = generate_id("return")
             transaction = Return(transaction_id, self.selected_user, self.selected_item)
             self.library.process_transaction(transaction)
             self.library.save_data()
@@ -570,7 +580,7 @@ class LibraryGUI:
 
     def process_return_for(self, user, item):
         try:
-            transaction_id = f"return_{random.randint(1000, 9999)}"
+            transaction_id = generate_id("return")
             transaction = Return(transaction_id, user, item)
             self.library.process_transaction(transaction)
             self.library.save_data()
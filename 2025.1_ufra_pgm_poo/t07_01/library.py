@@ -1,5 +1,10 @@
-import json
+import threading
+from contextlib import nullcontext
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum.async_writer import json_snapshot_writer
 from entities import Book, Magazine, Student, Professor, Loan, Return
+from biblio_comum.lazy_json import JsonIndex, LazyDict
+from biblio_comum.locking import LockTable
 
 class Library:
     """Camada de dados simples da aplicação.
@@ -7,27 +12,61 @@ class Library:
     Responsabilidades:
     - Armazenar itens, usuários e transações em memória
     - Oferecer operações para adicionar/atualizar/excluir
-    - Salvar e carregar os dados do arquivo JSON
+    - Salvar e carregar os dados do arquivo JSON (ao carregar, cada entidade
+      só é montada quando é usada: biblio_comum/lazy_json.py)
+
+    Com concurrent=True, várias mesas (threads) podem usar a mesma Library:
+    empréstimo/devolução seguram só a trava do usuário e a do item (sempre na
+    mesma ordem, locking.py), e as leituras (get_items, relatórios...) copiam
+    os dicionários sem travar nada.
+
+    Toda alteração (dicionários e estado das entidades) acontece com a trava
+    de estado segura, em qualquer modo: o snapshot de library_data.json é
+    montado na thread de gravação com essa mesma trava.
     """
-    def __init__(self):
+    def __init__(self, concurrent=False):
         self.__items = {}
         self.__users = {}
         self.__transactions = {}
+        self.__locks = LockTable() if concurrent else None
+        # estado salvo (incluir/excluir, empréstimo/devolução); sempre a última trava a ser pegada
+        self.__state = threading.Lock()
         self.load_data()
+        # gravação em segundo plano (async_writer.py): várias chamadas de
+        # save_data() dentro da janela viram uma escrita só, montada na thread
+        # de gravação com self.__state
+        self.__writer = json_snapshot_writer("library_data.json", self._snapshot, lock=self.__state, indent=2)
+
+    def _hold(self, *keys):
+        """Trava as entidades dadas (modo concorrente); fora dele, não faz nada."""
+        return self.__locks.hold(*keys) if self.__locks is not None else nullcontext()
 
     def add_item(self, item):
         """Adiciona um item ao repositório (chave é o id do item)."""
-        self.__items[item.id] = item
+        with self._hold(("item", item.id)), self.__state:
+            self.__items[item.id] = item
 
     def add_user(self, user):
         """Adiciona um usuário ao repositório (chave é o id do usuário)."""
-        self.__users[user.id] = user
+        with self._hold(("user", user.id)), self.__state:
+            self.__users[user.id] = user
 
     def process_transaction(self, transaction):
-        """Executa a transação (process) e a registra."""
-        transaction.process()
-        self.__transactions[transaction.id] = transaction
+        """Executa a transação (process) e a registra.
 
+        No modo concorrente, a validação e a mudança acontecem com o usuário e o
+        item travados: duas mesas não conseguem emprestar o mesmo item.
+        """
+        with self._hold(("user", transaction.user.id), ("item", transaction.item.id)):
+            if self.__locks is not None and (self.__items.get(transaction.item.id) is not transaction.item
+                                 or self.__users.get(transaction.user.id) is not transaction.user):
+                raise ValueError("Item or user changed by another desk")
+            with self.__state:
+                transaction.process()
+                self.__transactions[transaction.id] = transaction
+
+    # As leituras copiam os valores numa chamada só (list(dict.values()) roda
+    # inteira em C, sem troca de thread no meio): é uma foto sem travas.
     def get_items(self):
         """Retorna a lista de itens (valores do dicionário)."""
         return list(self.__items.values())
@@ -42,112 +81,145 @@ class Library:
 
     def update_item(self, item_id, new_data):
         """Atualiza um item recriando a entidade com os novos dados."""
-        if item_id not in self.__items:
-            raise KeyError("Item not found")
-        t = new_data.get("type")
-        if t == "book":
-            from entities import Book
-            self.__items[item_id] = Book(item_id, new_data["name"], new_data["author"], new_data["isbn"])
-        elif t == "magazine":
-            from entities import Magazine
-            self.__items[item_id] = Magazine(item_id, new_data["name"], new_data["edition"])
-        else:
-            raise ValueError("Unknown item type")
+        with self._hold(("item", item_id)):
+            if item_id not in self.__items:
+                raise KeyError("Item not found")
+            t = new_data.get("type")
+            if t == "book":
+                from entities import Book
+                updated = Book(item_id, new_data["name"], new_data["author"], new_data["isbn"])
+            elif t == "magazine":
+                from entities import Magazine
+                updated = Magazine(item_id, new_data["name"], new_data["edition"])
+            else:
+                raise ValueError("Unknown item type")
+            with self.__state:
+                self.__items[item_id] = updated
 
     def update_user(self, user_id, new_data):
         """Atualiza usuário recriando a entidade e preservando itens emprestados."""
-        if user_id not in self.__users:
-            raise KeyError("User not found")
-        old = self.__users[user_id]
-        t = new_data.get("type")
-        if t == "student":
-            from entities import Student
-            updated = Student(user_id, new_data["name"])
-        elif t == "professor":
-            from entities import Professor
-            updated = Professor(user_id, new_data["name"])
-        else:
-            raise ValueError("Unknown user type")
-        # preserva itens emprestados
-        for it in old.borrowed_items:
-            updated.borrow_item(it)
-        self.__users[user_id] = updated
+        with self._hold(("user", user_id)):
+            if user_id not in self.__users:
+                raise KeyError("User not found")
+            old = self.__users[user_id]
+            t = new_data.get("type")
+            if t == "student":
+                from entities import Student
+                updated = Student(user_id, new_data["name"])
+            elif t == "professor":
+                from entities import Professor
+                updated = Professor(user_id, new_data["name"])
+            else:
+                raise ValueError("Unknown user type")
+            # preserva itens emprestados
+            for it in old.borrowed_items:
+                updated.borrow_item(it)
+            with self.__state:
+                self.__users[user_id] = updated
 
     def delete_item(self, item_id):
         """Exclui item se não houver empréstimo em aberto (status borrowed)."""
-        item = self.__items.get(item_id)
-        if not item:
-            raise KeyError("Item not found")
-        if getattr(item, 'status', 'available') == 'borrowed':
-            raise ValueError("Item has an open loan and cannot be deleted")
-        del self.__items[item_id]
+        with self._hold(("item", item_id)):
+            item = self.__items.get(item_id)
+            if not item:
+                raise KeyError("Item not found")
+            if getattr(item, 'status', 'available') == 'borrowed':
+                raise ValueError("Item has an open loan and cannot be deleted")
+            with self.__state:
+                del self.__items[item_id]
 
     def delete_user(self, user_id):
         """Exclui usuário se não houver empréstimos em aberto (lista borrowed_items)."""
-        user = self.__users.get(user_id)
-        if not user:
-            raise KeyError("User not found")
-        if getattr(user, 'borrowed_items', []):
-            if len(user.borrowed_items) > 0:
-                raise ValueError("User has open loans and cannot be deleted")
-        del self.__users[user_id]
+        with self._hold(("user", user_id)):
+            user = self.__users.get(user_id)
+            if not user:
+                raise KeyError("User not found")
+            if getattr(user, 'borrowed_items', []):
+                if len(user.borrowed_items) > 0:
+                    raise ValueError("User has open loans and cannot be deleted")
+            with self.__state:
+                del self.__users[user_id]
 
     def generate_report(self):
         """Retorna um texto com informações de itens e usuários."""
         report = []
-        for item in self.__items.values():
+        for item in self.get_items():
             report.append(item.display_info())
-        for user in self.__users.values():
+        for user in self.get_users():
             report.append(user.display_info())
         return "\n".join(report)
 
-    def save_data(self):
-        """Salva o estado atual em library_data.json."""
-        data = {
-            "items": [item.serialize() for item in self.__items.values()],
-            "users": [user.serialize() for user in self.__users.values()],
-            "transactions": [t.serialize() for t in self.__transactions.values()]
+    def _snapshot(self):
+        """Monta o dicionário salvo em library_data.json."""
+        return {
+            "items": self._records(self.__items),
+            "users": self._records(self.__users),
+            "transactions": self._records(self.__transactions)
         }
-        with open("library_data.json", "w") as f:
-            json.dump(data, f, indent=2)
+
+    @staticmethod
+    def _records(entities):
+        """serialize() de cada entidade; as nunca lidas do arquivo voltam como estavam."""
+        if isinstance(entities, LazyDict):
+            return entities.records(lambda e: e.serialize())
+        return [e.serialize() for e in list(entities.values())]
+
+    def save_data(self):
+        """Agenda a gravação de library_data.json; devolve um Future da escrita."""
+        return self.__writer.mark_dirty()
+
+    def close(self):
+        """Grava o que estiver pendente e encerra a thread de gravação."""
+        self.__writer.close()
 
     def load_data(self):
-        """Carrega library_data.json e reconstrói os objetos de domínio."""
+        """Indexa library_data.json; os objetos de domínio são montados quando pedidos."""
         try:
-            with open("library_data.json", "r") as f:
-                data = json.load(f)
-            for item_data in data.get("items", []):
-                if item_data["type"] == "book":
-                    item = Book(item_data["id"], item_data["name"], item_data["author"], item_data["isbn"])
-                elif item_data["type"] == "magazine":
-                    item = Magazine(item_data["id"], item_data["name"], item_data["edition"])
-                item.update_status(item_data["status"])
-                self.__items[item_data["id"]] = item
-            for user_data in data.get("users", []):
-                if user_data["user_type"] == "student":
-                    user = Student(user_data["id"], user_data["name"])
-                elif user_data["user_type"] == "professor":
-                    user = Professor(user_data["id"], user_data["name"])
-                for item_id in user_data["borrowed_items"]:
-                    if item_id in self.__items:
-                        user.borrow_item(self.__items[item_id])
-                # Restaura status, se existir
-                if "status" in user_data:
-                    user.update_status(user_data["status"])
-                self.__users[user_data["id"]] = user
-            for t_data in data.get("transactions", []):
-                user = self.__users.get(t_data["user_id"])
-                item = self.__items.get(t_data["item_id"])
-                if user and item:
-                    t_type = t_data.get("type")
-                    if t_type == "Loan":
-                        transaction = Loan(t_data["id"], user, item)
-                    elif t_type == "Return":
-                        transaction = Return(t_data["id"], user, item)
-                    else:
-                        # Fallback para dados antigos
-                        transaction = Loan(t_data["id"], user, item) if t_data["id"].startswith("loan_") else Return(t_data["id"], user, item)
-                    transaction.update_status(t_data.get("status", "completed"))
-                    self.__transactions[t_data["id"]] = transaction
+            index = JsonIndex("library_data.json", ("items", "users", "transactions"))
         except FileNotFoundError:
-            pass
\ No newline at end of file
+            return
+        self.__items = LazyDict(index, "items", self._build_item)
+        self.__users = LazyDict(index, "users", self._build_user)
+        self.__transactions = LazyDict(index, "transactions", self._build_transaction)
+
+    def _build_item(self, item_data):
+        if item_data["type"] == "book":
+            item = Book(item_data["id"], item_data["name"], item_data["author"], item_data["isbn"])
+        elif item_data["type"] == "magazine":
+            item = Magazine(item_data["id"], item_data["name"], item_data["edition"])
+        else:
+            return None
+        item.update_status(item_data["status"])
+        return item
+
+    def _build_user(self, user_data):
+        if user_data["user_type"] == "student":
+            user = Student(user_data["id"], user_data["name"])
+        elif user_data["user_type"] == "professor":
+            user = Professor(user_data["id"], user_data["name"])
+        else:
+            return None
+        for item_id in user_data["borrowed_items"]:
+            item = self.__items.get(item_id)
+            if item is not None:
+                user.borrow_item(item)
+        # Restaura status, se existir
+        if "status" in user_data:
+            user.update_status(user_data["status"])
+        return user
+
+    def _build_transaction(self, t_data):
+        user = self.__users.get(t_data["user_id"])
+        item = self.__items.get(t_data["item_id"])
+        if not (user and item):
+            return None
+        t_type = t_data.get("type")
+        if t_type == "Loan":
+            transaction = Loan(t_data["id"], user, item)
+        elif t_type == "Return":
+            transaction = Return(t_data["id"], user, item)
+        else:
+            # Fallback para dados antigos
+            transaction = Loan(t_data["id"], user, item) if t_data["id"].startswith("loan_") else Return(t_data["id"], user, item)
+        transaction.update_status(t_data.get("status", "completed"))
+        return transaction
@@ -1,6 +1,14 @@
 # Utilidades simples e funções auxiliares.
 # Este módulo pode crescer com funções de validação e geração de ids, etc.
+import comum  # noqa: F401  (biblio_comum no sys.path)
+from biblio_comum import ulid
+
 
 def generate_id(prefix):
-    import random
-    return f"{prefix}_{random.randint(1000, 9999)}"
\ No newline at end of file
+    # prefixo + id ordenável pelo tempo (ulid.py): ids do mesmo prefixo ficam em ordem de criação
+    return f"{prefix}_{ulid.new_id()}"
+
+
+def generate_ids(prefix, n):
+    """n ids em ordem, reservados de uma vez (inclusões em lote)."""
+    return [f"{prefix}_{id_}" for id_ in ulid.reserve(n)]